@@ -0,0 +1,113 @@
+import asyncio
+from collections import deque
+from .exceptions import *
+from .protocol import raiseIfError, responseText
+
+class AsyncMemclidSocket:
+    """
+    asyncio counterpart of MemclidSocket
+
+    Requests can be sent by many tasks at once, they are written to the connection in the order request() is
+    called and a single reader task resolves their futures as the responses come back in the same order,
+    so all of them are pipelined on the one connection
+    """
+    def __init__(self):
+        self.reader = None
+        self.writer = None
+        self.pending = deque()
+        self.readerTask = None
+
+    async def connect(self, host, port=None):
+        """Connects over TCP (asyncio sets TCP_NODELAY) or, when port is None, over the unix domain socket at the path host"""
+        try:
+            self.host=host
+            self.port=port
+            if port is None:
+                self.reader, self.writer = await asyncio.open_unix_connection(host)
+            else:
+                self.reader, self.writer = await asyncio.open_connection(host, port)
+        except asyncio.CancelledError:
+            raise
+        except:
+            raise MemclidConnectionError(host,port)
+        self.readerTask = asyncio.get_running_loop().create_task(self.readResponses())
+
+    async def disconnect(self):
+        try:
+            self.readerTask.cancel()
+            self.writer.close()
+            await self.writer.wait_closed()
+            self.reader = None
+            self.writer = None
+        except asyncio.CancelledError:
+            raise
+        except:
+            raise MemclidDisconnectError(self.host,self.port)
+        finally:
+            self.failPending(MemclidConnectionBreakError(self.host,self.port,"The connection was closed"))
+
+    async def request(self, msg):
+        """Sends msg and returns the response for it once it arrives"""
+        if self.writer is None or self.readerTask.done():
+            raise MemclidConnectionBreakError(self.host,self.port)
+        future = asyncio.get_running_loop().create_future()
+        try:
+            #write and append don't yield to the event loop in between, which keeps the futures in the order of the requests
+            self.writer.write(msg.encode() if isinstance(msg, str) else msg)
+            self.pending.append(future)
+            await self.writer.drain()
+        except asyncio.CancelledError:
+            raise
+        except:
+            raise MemclidSendError(self.host,self.port)
+        return await future
+
+    async def readResponses(self):
+        try:
+            while True:
+                data = await self.readResponse()
+                if not self.pending:
+                    raise MemclidUnrecognizedResponseSentByServer(self.host,self.port,responseText(data))
+                future = self.pending.popleft()
+                if future.done():
+                    continue #the task waiting for it was cancelled
+                try:
+                    raiseIfError(data,self.host,self.port)
+                    future.set_result(data)
+                except (MemclidErrorSentByServer,MemclidClientErrorSentByServer,MemclidServerErrorSentByServer) as err:
+                    future.set_exception(err)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.IncompleteReadError:
+            self.failPending(MemclidConnectionBreakError(self.host,self.port,"It was possibly a bad request"))
+        except MemclidUnrecognizedResponseSentByServer as err:
+            self.failPending(err)
+        except:
+            self.failPending(MemclidRecvError(self.host,self.port))
+
+    async def readResponse(self):
+        #Same framing as MemclidSocket.readResponse
+        line = await self.reader.readuntil(b"\r\n")
+        if line.startswith(b"VA "):
+            size = line.split(b" ",2)[1].strip()
+            if not size.isdigit():
+                raise MemclidUnrecognizedResponseSentByServer(self.host,self.port,line.decode(errors="replace"))
+            return line+await self.reader.readexactly(int(size)+2)
+        if not line.startswith(b"VALUE "):
+            return line
+        response = bytearray()
+        while line != b"END\r\n":
+            header = line.split()
+            if len(header) < 4 or header[0] != b"VALUE" or not header[3].isdigit():
+                raise MemclidUnrecognizedResponseSentByServer(self.host,self.port,line.decode(errors="replace"))
+            response += line
+            response += await self.reader.readexactly(int(header[3])+2)
+            line = await self.reader.readuntil(b"\r\n")
+        response += line
+        return bytes(response)
+
+    def failPending(self, err):
+        while self.pending:
+            future = self.pending.popleft()
+            if not future.done():
+                future.set_exception(err)
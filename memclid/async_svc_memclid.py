@@ -0,0 +1,153 @@
+import asyncio
+from .exceptions import MemclidInvalidCommandError
+from .svc_memclid import MemclidUtility
+
+class AsyncMemclidUtility(MemclidUtility):
+    """
+    asyncio counterpart of MemclidUtility working on an AsyncMemclidSocket
+
+    The requests are built and the responses parsed by the prepare methods of MemclidUtility,
+    only sending and waiting for the response is awaited, so any number of calls can be in flight
+    on the connection at once (e.g. with asyncio.gather). The values are compressed by compressor and serialized by serializer like with MemclidUtility
+
+    The many-key calls send one request per key concurrently instead of quiet meta requests, as every request is
+    matched with exactly one response. setFile and getFile stream through a blocking socket and aren't supported
+    """
+    def __init__(self, asyncMemclidSocket, compressor=None, serializer=None):
+        super().__init__(asyncMemclidSocket,compressor=compressor,serializer=serializer)
+
+    async def get(self,keys):
+        try:
+            return await self.retrieve("get",keys)
+        except Exception as err:
+            self.handleAllExceptions(err)
+
+    async def set(self,key,value,flag,exptime):
+        try:
+            return await self.execute(*self.prepareSet(key,value,flag,exptime))
+        except Exception as err:
+            self.handleAllExceptions(err)
+
+    async def add(self,key,value,flag,exptime):
+        try:
+            return await self.execute(*self.prepareAdd(key,value,flag,exptime))
+        except Exception as err:
+            self.handleAllExceptions(err)
+
+    async def replace(self,key,value,flag,exptime):
+        try:
+            return await self.execute(*self.prepareReplace(key,value,flag,exptime))
+        except Exception as err:
+            self.handleAllExceptions(err)
+
+    async def append(self,key,value):
+        try:
+            return await self.execute(*self.prepareAppend(key,value))
+        except Exception as err:
+            self.handleAllExceptions(err)
+
+    async def prepend(self,key,value):
+        try:
+            return await self.execute(*self.preparePrepend(key,value))
+        except Exception as err:
+            self.handleAllExceptions(err)
+
+    async def gets(self,keys):
+        try:
+            return await self.retrieve("gets",keys)
+        except Exception as err:
+            self.handleAllExceptions(err)
+
+    async def cas(self,key,value,cas_unique,flag,exptime):
+        try:
+            return await self.execute(*self.prepareCas(key,value,cas_unique,flag,exptime))
+        except Exception as err:
+            self.handleAllExceptions(err)
+
+    async def delete(self,key):
+        try:
+            return await self.execute(*self.prepareDelete(key))
+        except Exception as err:
+            self.handleAllExceptions(err)
+
+    async def incr(self,key,value):
+        try:
+            return await self.execute(*self.prepareIncr(key,value))
+        except Exception as err:
+            self.handleAllExceptions(err)
+
+    async def decr(self,key,value):
+        try:
+            return await self.execute(*self.prepareDecr(key,value))
+        except Exception as err:
+            self.handleAllExceptions(err)
+
+    async def setMany(self,items,flag,exptime):
+        try:
+            items = list(items)
+            results = await asyncio.gather(*(self.execute(*self.prepareSet(key,value,flag,exptime)) for key, value in items))
+            return dict(zip([key for key, value in items],results))
+        except Exception as err:
+            self.handleAllExceptions(err)
+
+    def setFile(self,key,file,flag,exptime,noreply=False,size=None):
+        self.handleAllExceptions(MemclidInvalidCommandError("set","Values can't be streamed from files with the async client"))
+
+    def getFile(self,key,file):
+        self.handleAllExceptions(MemclidInvalidCommandError("get","Values can't be streamed to files with the async client"))
+
+    async def metaGet(self,key,value=True,cas=False,ttl=False,lastAccess=False,opaque=None):
+        try:
+            return await self.execute(*self.prepareMetaGet(key,value,cas,ttl,lastAccess,opaque))
+        except Exception as err:
+            self.handleAllExceptions(err)
+
+    async def metaGetMany(self,keys,value=True,cas=False,ttl=False,lastAccess=False):
+        try:
+            keys = list(dict.fromkeys(keys))
+            results = await asyncio.gather(*(self.execute(*self.prepareMetaGet(key,value,cas,ttl,lastAccess)) for key in keys))
+            return dict(zip(keys,results))
+        except Exception as err:
+            self.handleAllExceptions(err)
+
+    async def metaSet(self,key,value,flag=0,exptime=0,cas_unique=None,mode="set",returnCas=False,opaque=None):
+        try:
+            return await self.execute(*self.prepareMetaSet(key,value,flag,exptime,cas_unique,mode,returnCas,opaque))
+        except Exception as err:
+            self.handleAllExceptions(err)
+
+    async def metaSetMany(self,items,flag=0,exptime=0,mode="set"):
+        try:
+            items = list(items)
+            results = await asyncio.gather(*(self.execute(*self.prepareMetaSet(key,value,flag,exptime,None,mode)) for key, value in items))
+            return dict(zip([key for key, value in items],results))
+        except Exception as err:
+            self.handleAllExceptions(err)
+
+    async def metaDelete(self,key,cas_unique=None,opaque=None):
+        try:
+            return await self.execute(*self.prepareMetaDelete(key,cas_unique,opaque))
+        except Exception as err:
+            self.handleAllExceptions(err)
+
+    async def metaArithmetic(self,key,delta=1,decrement=False,initial=None,exptime=0,opaque=None):
+        try:
+            return await self.execute(*self.prepareMetaArithmetic(key,delta,decrement,initial,exptime,opaque))
+        except Exception as err:
+            self.handleAllExceptions(err)
+
+    async def execute(self,msg,parse):
+        return parse(await self.sock.request(msg))
+
+    async def retrieve(self,command,keys):
+        singleKey = isinstance(keys,str)
+        if singleKey:
+            keys = [keys]
+        keys = list(dict.fromkeys(keys))
+        finalResult = {}
+        #the requests for all the key groups are pipelined instead of waiting for each response in turn
+        for result in await asyncio.gather(*(self.execute(*self.prepareRetrieval(command,keysInRequest)) for keysInRequest in self.splitKeys(command,keys))):
+            finalResult.update(result)
+        if singleKey:
+            return finalResult[keys[0]]
+        return finalResult
@@ -0,0 +1,54 @@
+from .exceptions import *
+from .memclid_socket import MemclidSocket
+from .binary_protocol import *
+
+class MemclidBinarySocket(MemclidSocket):
+    """
+    MemclidSocket for the binary protocol
+
+    receive returns the response as a list of BinaryPackets: the responses to quiet requests are collected
+    until the response to a request that isn't quiet (usually a NOOP sent last), which ends the list
+    """
+    def readResponse(self):
+        packets = []
+        while True:
+            packet = self.readPacket()
+            packets.append(packet)
+            if packet.opcode not in QUIET_OPCODES:
+                return packets
+
+    def readPacket(self):
+        try:
+            header = unpackHeader(self.readExact(HEADER_LENGTH))
+        except ValueError:
+            raise MemclidUnrecognizedResponseSentByServer(self.host,self.port,"Invalid binary response header")
+        return splitBody(header, self.readExact(header[4]))
+
+    def barrierRequest(self):
+        return packRequest(OPCODE_NOOP)
+
+    def readBarrier(self):
+        #the replies to the quiet (noreply) requests sent before the NOOP come ahead of its response
+        self.barrierPending = False
+        self.droppedWrites = self.droppedWrites + len(self.readResponse())-1
+
+    def responseBuffered(self):
+        #the responses to noreply (quiet) requests are single packets
+        available = len(self.buffer)-self.bufferPos
+        if available < HEADER_LENGTH:
+            return False
+        totalBody = HEADER.unpack_from(self.buffer, self.bufferPos)[6]
+        return available >= HEADER_LENGTH+totalBody
+
+    def readPendingResponse(self):
+        return self.readPacket()
+
+    def raiseIfError(self, packets):
+        #only raised once all the packets of the response are read, so the connection is still usable afterwards
+        for packet in packets:
+            if packet.status in CLIENT_ERROR_STATUSES:
+                raise MemclidClientErrorSentByServer(self.host,self.port,bytes(packet.value).decode(errors="replace"))
+            elif packet.status == STATUS_UNKNOWN_COMMAND:
+                raise MemclidErrorSentByServer(self.host,self.port)
+            elif packet.status > STATUS_UNKNOWN_COMMAND:
+                raise MemclidServerErrorSentByServer(self.host,self.port,bytes(packet.value).decode(errors="replace"))
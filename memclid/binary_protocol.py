@@ -0,0 +1,88 @@
+"""
+Packets of the memcached binary protocol
+
+Every packet starts with a 24 byte header (magic, opcode, key length, extras length, data type,
+vbucket id for requests or status for responses, total body length, opaque, cas) followed by
+the extras, the key and the value. The opaque is copied by the server into the response so
+that responses can be matched to their requests, and the quiet opcodes only get a response
+for the outcomes the client has to know about (e.g. GETKQ only replies for hits).
+"""
+
+import struct
+from collections import namedtuple
+
+REQUEST_MAGIC=0x80
+RESPONSE_MAGIC=0x81
+HEADER=struct.Struct(">BBHBBHIIQ")
+HEADER_LENGTH=HEADER.size
+
+OPCODE_GET=0x00
+OPCODE_SET=0x01
+OPCODE_ADD=0x02
+OPCODE_REPLACE=0x03
+OPCODE_DELETE=0x04
+OPCODE_INCREMENT=0x05
+OPCODE_DECREMENT=0x06
+OPCODE_NOOP=0x0a
+OPCODE_GETK=0x0c
+OPCODE_GETKQ=0x0d
+OPCODE_APPEND=0x0e
+OPCODE_PREPEND=0x0f
+OPCODE_SETQ=0x11
+
+QUIET_OPCODES=frozenset((0x09, OPCODE_GETKQ, OPCODE_SETQ, 0x12, 0x13, 0x14, 0x15, 0x16, 0x17, 0x18, 0x19, 0x1a))
+QUIET_VARIANTS={OPCODE_SET: OPCODE_SETQ, OPCODE_ADD: 0x12, OPCODE_REPLACE: 0x13, OPCODE_DELETE: 0x14,
+    OPCODE_INCREMENT: 0x15, OPCODE_DECREMENT: 0x16, OPCODE_APPEND: 0x19, OPCODE_PREPEND: 0x1a} #used for noreply requests
+
+OPCODE_NAMES={OPCODE_GET: "get", OPCODE_SET: "set", OPCODE_ADD: "add", OPCODE_REPLACE: "replace", OPCODE_DELETE: "delete",
+    OPCODE_INCREMENT: "incr", OPCODE_DECREMENT: "decr", OPCODE_NOOP: "noop", OPCODE_GETK: "get", OPCODE_GETKQ: "get",
+    OPCODE_APPEND: "append", OPCODE_PREPEND: "prepend"} #command name of every opcode (the quiet variants are added below)
+OPCODE_NAMES.update({quiet: OPCODE_NAMES[opcode] for opcode, quiet in QUIET_VARIANTS.items()})
+STORAGE_OPCODES={"set": OPCODE_SET, "add": OPCODE_ADD, "replace": OPCODE_REPLACE, "cas": OPCODE_SET, "append": OPCODE_APPEND, "prepend": OPCODE_PREPEND}
+ARITHMETIC_OPCODES={"incr": OPCODE_INCREMENT, "decr": OPCODE_DECREMENT}
+
+STATUS_NO_ERROR=0x0000
+STATUS_KEY_NOT_FOUND=0x0001
+STATUS_KEY_EXISTS=0x0002
+STATUS_VALUE_TOO_LARGE=0x0003
+STATUS_INVALID_ARGUMENTS=0x0004
+STATUS_ITEM_NOT_STORED=0x0005
+STATUS_NON_NUMERIC_VALUE=0x0006
+STATUS_UNKNOWN_COMMAND=0x0081
+
+CLIENT_ERROR_STATUSES=frozenset((STATUS_VALUE_TOO_LARGE, STATUS_INVALID_ARGUMENTS, STATUS_NON_NUMERIC_VALUE))
+
+STORAGE_EXTRAS=struct.Struct(">II") #flags, exptime
+ARITHMETIC_EXTRAS=struct.Struct(">QQI") #delta, initial value, exptime
+FLAGS_EXTRAS=struct.Struct(">I")
+COUNTER_VALUE=struct.Struct(">Q")
+ARITHMETIC_NO_CREATE=0xffffffff #exptime that makes incr/decr fail on a missing key instead of creating it
+
+BinaryPacket = namedtuple("BinaryPacket", ["opcode", "status", "opaque", "cas", "extras", "key", "value"])
+
+def packRequest(opcode, key=b"", extras=b"", value=b"", opaque=0, cas=0):
+    """Returns the request packet as a single bytes buffer, key can be str (encoded here) or bytes and value any bytes-like object"""
+    if isinstance(key, str):
+        key = key.encode()
+    valueLength = memoryview(value).nbytes
+    header = HEADER.pack(REQUEST_MAGIC, opcode, len(key), len(extras), 0, 0, len(extras)+len(key)+valueLength, opaque, cas)
+    return b"".join((header, extras, key, value))
+
+def unpackHeader(data):
+    """Returns (opcode, key length, extras length, status, total body length, opaque, cas) for a response header
+
+    Raises ValueError if it isn't the header of a response"""
+    magic, opcode, keyLength, extrasLength, dataType, status, totalBody, opaque, cas = HEADER.unpack(data)
+    if magic != RESPONSE_MAGIC or keyLength+extrasLength > totalBody:
+        raise ValueError("Invalid response header")
+    return opcode, keyLength, extrasLength, status, totalBody, opaque, cas
+
+def splitBody(header, body):
+    """Returns the BinaryPacket for a header returned by unpackHeader and the body that followed it"""
+    opcode, keyLength, extrasLength, status, totalBody, opaque, cas = header
+    keyEnd = extrasLength+keyLength
+    return BinaryPacket(opcode, status, opaque, cas, bytes(body[:extrasLength]), bytes(body[extrasLength:keyEnd]), body[keyEnd:])
+
+def packetText(packets):
+    #packets sent by the server in a form that can be shown in an error message
+    return ", ".join(f"opcode 0x{packet.opcode:02x} status 0x{packet.status:04x}" for packet in packets)
@@ -0,0 +1,174 @@
+import time
+from .exceptions import *
+from .constants import *
+from .config import MEMCLID_BATCH_WINDOW
+from .svc_memclid import MemclidUtility
+from .binary_protocol import *
+
+class MemclidBinaryUtility(MemclidUtility):
+    """
+    MemclidUtility that talks the binary protocol over a MemclidBinarySocket
+
+    The public methods and the prepare methods are the ones of MemclidUtility, only the requests are built as
+    binary packets and the response packets are interpreted, so the results are the same as with the text protocol.
+    Multi key get/gets send a GETKQ for every key (with the index of the key as opaque) followed by a NOOP, the server
+    only replies for the hits and the NOOP response marks the end of the response. The meta commands and setFile/getFile
+    need the text protocol
+    """
+    def setMany(self,items,flag,exptime,deadline=None):
+        """Stores a list of (key, value) with SETQ requests (returns a mapping of key to result)
+
+        Every group of requests is followed by a NOOP, the server only replies for the keys that could not be stored.
+        When the deadline (or a timeout of the socket) is reached the keys of the groups not acknowledged get a timed out result"""
+        try:
+            items = list(items)
+            results = []
+            if deadline is not None:
+                self.sock.setDeadline(deadline)
+            try:
+                for groupStart in range(0,len(items),MEMCLID_BATCH_WINDOW):
+                    group = items[groupStart:groupStart+MEMCLID_BATCH_WINDOW]
+                    msgs = []
+                    for index, (key, value) in enumerate(group):
+                        value, valueFlag = self.encodeValue("set",value,flag)
+                        msgs.append(packRequest(OPCODE_SETQ,key,STORAGE_EXTRAS.pack(valueFlag,exptime),value.encode() if isinstance(value,str) else value,index))
+                    msgs.append(packRequest(OPCODE_NOOP,opaque=len(group)))
+                    times = [time.perf_counter()]
+                    self.sock.send(b"".join(msgs))
+                    times.append(time.perf_counter())
+                    packets = self.sock.receive()
+                    times.append(time.perf_counter())
+                    self.checkNoop(packets,len(group))
+                    statuses = [STATUS_NO_ERROR]*len(group)
+                    for packet in packets[:-1]:
+                        if packet.opcode != OPCODE_SETQ or packet.opaque >= len(group):
+                            raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,packetText(packets))
+                        statuses[packet.opaque] = packet.status
+                    for status in statuses:
+                        results.append(self.parseStorageResponse([BinaryPacket(OPCODE_SET,status,0,0,b"",b"",b"")],
+                            "The data was saved successfully",
+                            "The data could not be stored"))
+                    if self.hooks:
+                        #the requests share the times of the group, the server only replied for the failed ones
+                        times.append(time.perf_counter())
+                        replies = {packet.opaque: [packet] for packet in packets[:-1]}
+                        for index, msg in enumerate(msgs[:-1]):
+                            self.notifyHooks(msg,replies.get(index,[]),results[groupStart+index],None,times)
+            except MemclidTimeoutError:
+                results += [self.timedOutResult() for index in range(len(results),len(items))]
+            return dict(zip([key for key, value in items],results))
+        except Exception as err:
+            self.handleAllExceptions(err)
+        finally:
+            if deadline is not None:
+                self.sock.setDeadline(None)
+            for key, value in items:
+                self.invalidate(key,exptime)
+
+    def splitKeys(self,command,keys):
+        #binary requests don't have a line length limit
+        return [keys]
+
+    def retrievalRequest(self,command,keys):
+        msgs = [packRequest(OPCODE_GETKQ,key,opaque=index) for index, key in enumerate(keys)]
+        msgs.append(packRequest(OPCODE_NOOP,opaque=len(keys)))
+        return b"".join(msgs)
+
+    def deleteRequest(self,key,noreply=False):
+        return packRequest(self.opcode(OPCODE_DELETE,noreply),key)
+
+    def arithmeticRequest(self,command,key,value,noreply=False):
+        return packRequest(self.opcode(ARITHMETIC_OPCODES[command],noreply),key,ARITHMETIC_EXTRAS.pack(value,0,ARITHMETIC_NO_CREATE))
+
+    def storageRequest(self,command,key,value,flag,exptime,cas_unique=None,noreply=False):
+        if isinstance(value,str):
+            value = value.encode()
+        extras = b"" if command in ("append","prepend") else STORAGE_EXTRAS.pack(flag,exptime)
+        return packRequest(self.opcode(STORAGE_OPCODES[command],noreply),key,extras,value,cas=int(cas_unique or 0))
+
+    def opcode(self,opcode,noreply):
+        #noreply requests are sent with the quiet opcodes, the server then only replies when they fail
+        return QUIET_VARIANTS[opcode] if noreply else opcode
+
+    def describeRequest(self,msg):
+        #a retrieval is a GETKQ for every key followed by a NOOP, a set with a cas unique is a cas
+        magic, opcode, keyLength, extrasLength, dataType, status, totalBody, opaque, cas = HEADER.unpack_from(msg)
+        command = OPCODE_NAMES.get(opcode,f"0x{opcode:02x}")
+        if command == "set" and cas:
+            return "cas", 1
+        if opcode == OPCODE_GETKQ:
+            keys = 0
+            offset = 0
+            while offset < len(msg):
+                keys = keys+1
+                offset = offset+HEADER_LENGTH+HEADER.unpack_from(msg,offset)[6]
+            return command, keys-1
+        return command, 1
+
+    def responseSize(self,packets):
+        return sum(HEADER_LENGTH+len(packet.extras)+len(packet.key)+memoryview(packet.value).nbytes for packet in packets)
+
+    def metaRequest(self,command,key,flags,opaque,quiet):
+        raise MemclidInvalidCommandError(command.split()[0],"The meta commands are only available with the text protocol")
+
+    def storageHeader(self,command,key,flag,exptime,size,cas_unique=None,noreply=False):
+        raise MemclidInvalidCommandError(command,"Values can only be streamed from files with the text protocol")
+
+    def fileRetrievalRequest(self,key):
+        raise MemclidInvalidCommandError("get","Values can only be streamed to files with the text protocol")
+
+    def checkNoop(self,packets,opaque):
+        if packets[-1].opcode != OPCODE_NOOP or packets[-1].opaque != opaque:
+            raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,packetText(packets))
+
+    def textResponse(self,packets,responses):
+        """Returns the text protocol response matching the status of a single response packet
+
+        responses is a mapping of the expected statuses to their text response, the text parsers of MemclidUtility
+        then build the result so that the messages are the same for both protocols"""
+        if len(packets) != 1 or packets[0].status not in responses:
+            raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,packetText(packets))
+        return responses[packets[0].status]
+
+    def parseStorageResponse(self,packets,storedMessage,notStoredMessage):
+        data = self.textResponse(packets,{
+            STATUS_NO_ERROR: b"STORED\r\n",
+            STATUS_KEY_NOT_FOUND: b"NOT_STORED\r\n",
+            STATUS_KEY_EXISTS: b"NOT_STORED\r\n",
+            STATUS_ITEM_NOT_STORED: b"NOT_STORED\r\n"})
+        return super().parseStorageResponse(data,storedMessage,notStoredMessage)
+
+    def parseCasResponse(self,packets):
+        data = self.textResponse(packets,{
+            STATUS_NO_ERROR: b"STORED\r\n",
+            STATUS_KEY_EXISTS: b"EXISTS\r\n",
+            STATUS_KEY_NOT_FOUND: b"NOT_FOUND\r\n"})
+        return super().parseCasResponse(data)
+
+    def parseDeleteResponse(self,packets):
+        data = self.textResponse(packets,{
+            STATUS_NO_ERROR: b"DELETED\r\n",
+            STATUS_KEY_NOT_FOUND: b"NOT_FOUND\r\n"})
+        return super().parseDeleteResponse(data)
+
+    def parseArithmeticResponse(self,packets,storedMessage,notFoundMessage):
+        data = self.textResponse(packets,{
+            STATUS_NO_ERROR: None,
+            STATUS_KEY_NOT_FOUND: b"NOT_FOUND\r\n"})
+        if data is None:
+            if len(packets[0].value) != COUNTER_VALUE.size:
+                raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,packetText(packets))
+            data = str(COUNTER_VALUE.unpack(packets[0].value)[0]).encode()+b"\r\n"
+        return super().parseArithmeticResponse(data,storedMessage,notFoundMessage)
+
+    def parseRetrievalResponse(self,packets,command,keys):
+        withCas = command == "gets"
+        finalResult = super().parseRetrievalResponse(b"END\r\n",command,keys)
+        self.checkNoop(packets,len(keys))
+        for packet in packets[:-1]:
+            if (packet.opcode != OPCODE_GETKQ or packet.status != STATUS_NO_ERROR or packet.opaque >= len(keys)
+                    or packet.key != keys[packet.opaque].encode() or len(packet.extras) != FLAGS_EXTRAS.size):
+                raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,packetText(packets))
+            key = keys[packet.opaque]
+            finalResult[key] = self.hitResult(key,packet.value,FLAGS_EXTRAS.unpack(packet.extras)[0],str(packet.cas) if withCas else None)
+        return finalResult
@@ -1,73 +1,228 @@
 import click
+import json
+import os
+import shutil
+import stat
+import tempfile
+import time
 
 from .exceptions import MemclidConnectionError, MemclidDisconnectError
-from .config import DEFAULT_MEMCLID_HOST, DEFAULT_MEMCLID_PORT
+from .config import *
 from .memclid_socket import MemclidSocket
 from .svc_memclid import MemclidUtility
+from .binary_memclid_socket import MemclidBinarySocket
+from .binary_svc_memclid import MemclidBinaryUtility
+from .svc_batch import MemclidBatch
+from .svc_load import MemclidLoader
+from .svc_dump import MemclidDumper
+from .svc_cluster import MemclidClusterUtility
+from .svc_shell import MemclidShell
+from .svc_bench import MemclidBench, parseMix, parseValueSize
+from .svc_stats import MemclidStats, STATS_GROUPS, statsRates, totalStats
 from .constants import *
 
 class Context:
     #Defining a context manager (anything with __enter__ and __exit__ defined)
-    def __init__(self,host=None,port=None): #Called when the object is created
-        self.MEMCLID_HOST = host or DEFAULT_MEMCLID_HOST
-        self.MEMCLID_PORT = port or DEFAULT_MEMCLID_PORT
+    def __init__(self,host=None,port=None,servers=None,protocol="text",socketPath=None,socketOptions=None): #Called when the object is created
+        #the connection goes to the unix domain socket at socketPath (with port None) when it is given
+        self.MEMCLID_HOST = socketPath or host or DEFAULT_MEMCLID_HOST
+        self.MEMCLID_PORT = None if socketPath else port or DEFAULT_MEMCLID_PORT
+        self.MEMCLID_SERVERS = servers
+        self.MEMCLID_PROTOCOL = protocol
+        self.MEMCLID_SOCKET_PATH = socketPath
+        self.MEMCLID_SOCKET_OPTIONS = socketOptions or {}
     def __enter__(self): #Called when the  object is used with the "with" statement
+        socketClass, utilityClass = PROTOCOL_ENGINES[self.MEMCLID_PROTOCOL]
         try:
-            self.MEMCLID_SOCKET = MemclidSocket()
-            self.MEMCLID_SOCKET.connect(self.MEMCLID_HOST,self.MEMCLID_PORT)
-            self.MEMCLID_UTILITY = MemclidUtility(self.MEMCLID_SOCKET)
+            if self.MEMCLID_SERVERS:
+                self.MEMCLID_SOCKETS = []
+                for host, port, weight in self.MEMCLID_SERVERS:
+                    memclidSocket = socketClass(**self.MEMCLID_SOCKET_OPTIONS)
+                    memclidSocket.connect(host,port)
+                    self.MEMCLID_SOCKETS.append(memclidSocket)
+                self.MEMCLID_UTILITY = MemclidClusterUtility(self.MEMCLID_SERVERS,self.MEMCLID_SOCKETS,utilityClass)
+            else:
+                self.MEMCLID_SOCKET = socketClass(**self.MEMCLID_SOCKET_OPTIONS)
+                self.MEMCLID_SOCKET.connect(self.MEMCLID_HOST,self.MEMCLID_PORT)
+                self.MEMCLID_SOCKETS = [self.MEMCLID_SOCKET]
+                self.MEMCLID_UTILITY = utilityClass(self.MEMCLID_SOCKET)
         except MemclidConnectionError as err:
+            self.disconnectAll()
             click.echo(err.message)
             raise click.Abort()
         except :
+            self.disconnectAll()
             click.echo("An unexpected error occured")
             raise click.Abort()
         return self
     def __exit__(self, exc_type, exc_value, tb):
         try:
-            self.MEMCLID_SOCKET.disconnect()
+            for memclidSocket in self.MEMCLID_SOCKETS:
+                memclidSocket.disconnect()
         except MemclidDisconnectError as err:
             click.echo(err.message)
             raise click.Abort()
         except :
             click.echo("An unexpected error occured")
             raise click.Abort()
+    def disconnectAll(self):
+        #Closes the connections that were opened before connecting to one of the servers failed
+        for memclidSocket in getattr(self,"MEMCLID_SOCKETS",[]):
+            try:
+                memclidSocket.disconnect()
+            except MemclidDisconnectError:
+                pass
+    def reconnect(self):
+        #Opens new connections in place of the ones that broke (used by the shell to keep the session going)
+        self.disconnectAll()
+        self.__enter__()
+    def requireSingleServer(self,command):
+        if self.MEMCLID_SERVERS:
+            raise click.UsageError(f"The {command} command works on a single server, use --host/--port instead of --servers")
+    def requireTextProtocol(self,command):
+        if self.MEMCLID_PROTOCOL != "text":
+            raise click.UsageError(f"The {command} command is only available with the text protocol")
+
+#socket and utility classes used for every --protocol
+PROTOCOL_ENGINES = {
+    "text": (MemclidSocket, MemclidUtility),
+    "binary": (MemclidBinarySocket, MemclidBinaryUtility)
+}
+
+def parseServers(ctx,param,value):
+    #host:port[:weight] separated by commas, the weight defaults to 1 (IPv6 addresses are written in brackets, [::1]:11211)
+    if value is None:
+        return None
+    servers = []
+    for server in value.split(","):
+        server = server.strip()
+        try:
+            if server.startswith("["):
+                host, bracket, rest = server[1:].partition("]")
+                if not bracket or (rest and not rest.startswith(":")):
+                    raise ValueError()
+                parts = [host]+(rest[1:].split(":") if rest else [])
+            else:
+                parts = server.split(":")
+            if len(parts) < 1 or len(parts) > 3 or parts[0] == "":
+                raise ValueError()
+            port = int(parts[1]) if len(parts) > 1 else DEFAULT_MEMCLID_PORT
+            weight = int(parts[2]) if len(parts) > 2 else 1
+            if weight < 1:
+                raise ValueError()
+        except ValueError:
+            raise click.BadParameter(f"{server} is not in the format host:port[:weight]")
+        servers.append((parts[0],port,weight))
+    return servers
 
 @click.group()
 @click.option("-h","--host", type=str, help="Host of memcached server (default is localhost)")
 @click.option("-p","--port", type=int, help="Port of memcached server (default is 11211)")
+@click.option("-s","--servers", type=str, callback=parseServers, help="Comma separated host:port[:weight] of the servers of a memcached cluster, keys are distributed with ketama consistent hashing")
+@click.option("--socket", "socketPath", type=click.Path(dir_okay=False), help="Path of the unix domain socket of memcached server, used instead of --host/--port")
+@click.option("--protocol", type=click.Choice(list(PROTOCOL_ENGINES)), default="text", help="Protocol used to talk to memcached server (default is text)")
+@click.option("--tcp-nodelay/--no-tcp-nodelay", default=MEMCLID_SOCKET_NODELAY, help="Send small requests right away instead of letting Nagle's algorithm hold them back (default is on)")
+@click.option("--keepalive", is_flag=True, help="Enable TCP keepalive probes on the connections")
+@click.option("--sndbuf", type=click.IntRange(min=1), help="Size in bytes of the send buffer of the connections (SO_SNDBUF)")
+@click.option("--rcvbuf", type=click.IntRange(min=1), help="Size in bytes of the receive buffer of the connections (SO_RCVBUF)")
+@click.option("--connect-timeout", type=click.FloatRange(min=0, min_open=True), help="Seconds to wait for a connection to be established (default is no limit)")
+@click.option("--timeout", type=click.FloatRange(min=0, min_open=True), help="Seconds to wait for every read from and write to the server before the request is abandoned (default is no limit)")
 @click.pass_context
-def cli(ctx,host,port):
+def cli(ctx,host,port,servers,socketPath,protocol,tcp_nodelay,keepalive,sndbuf,rcvbuf,connect_timeout,timeout):
     """
     Welcome to Memclid
 
     A CLI tool for your memcached server
     """
-    ctx.obj = ctx.with_resource(Context(host,port))
+    if socketPath and (host or port or servers):
+        raise click.UsageError("--socket can't be used along with --host, --port or --servers")
+    socketOptions = {"noDelay": tcp_nodelay, "keepAlive": keepalive, "sendBufferSize": sndbuf,
+        "receiveBufferSize": rcvbuf, "connectTimeout": connect_timeout, "readTimeout": timeout, "writeTimeout": timeout}
+    ctx.obj = ctx.with_resource(Context(host,port,servers,protocol,socketPath,socketOptions))
 
-@cli.command()
-@click.argument("key",type=str)
-@click.pass_context
-def get(ctx,key):
-    """Get the value corresponding to a key stored in memcached server"""
-    result = ctx.obj.MEMCLID_UTILITY.get(key)
+def readKeys(keys):
+    #Keys are read from stdin (separated by whitespace) when none are passed or when - is passed
+    if len(keys)==0 or keys==("-",):
+        keys = click.get_text_stream("stdin").read().split()
+    if len(keys)==0:
+        raise click.UsageError("No keys were given")
+    return list(dict.fromkeys(keys))
+
+def echoRetrievalResult(result):
     if result["status"] == STATUS_DATA_AVAILABLE:
         click.echo(result["message"])
         click.echo()
         click.echo(f'Value:  {result["value"]}')
         click.echo(f'Flag/Metadata:  {result["flag"]}')
+        if "cas_unique" in result:
+            click.echo(f'CAS Unique Value:  {result["cas_unique"]}')
     else:
         click.echo(result["message"])
 
+def regularFile(ctx,file):
+    #the length of a value is sent before it, so a value streamed from a pipe (like stdin) is spooled to a temporary file first
+    try:
+        if stat.S_ISREG(os.fstat(file.fileno()).st_mode):
+            return file
+    except (AttributeError, OSError, ValueError):
+        pass
+    spooled = ctx.with_resource(tempfile.TemporaryFile())
+    shutil.copyfileobj(file,spooled,MEMCLID_RECV_CHUNK_SIZE)
+    spooled.seek(0)
+    return spooled
+
+@cli.command()
+@click.argument("keys",type=str,nargs=-1)
+@click.option("-o","--output",type=click.Path(dir_okay=False,allow_dash=True),help="file the value of a single key is written to while it is received (- for stdout)")
+@click.pass_context
+def get(ctx,keys,output):
+    """
+    Get the value corresponding to one or more keys stored in memcached server
+
+    All the keys are fetched in a single request (split automatically if the key list is too long).
+    Keys are read from stdin when no key or - is passed
+    """
+    keys = readKeys(keys)
+    if output is not None:
+        if len(keys) != 1:
+            raise click.UsageError("--output takes a single key")
+        ctx.obj.requireTextProtocol("get --output")
+        with click.open_file(output,"wb") as outputFile:
+            result = ctx.obj.MEMCLID_UTILITY.getFile(keys[0],outputFile)
+        #the messages go to stderr when the value is written to stdout
+        toStderr = output == "-"
+        if result["status"] == STATUS_DATA_AVAILABLE:
+            click.echo(result["message"],err=toStderr)
+            click.echo(f'Size:  {result["size"]} bytes',err=toStderr)
+            click.echo(f'Flag/Metadata:  {result["flag"]}',err=toStderr)
+        else:
+            if not toStderr:
+                os.remove(output)
+            click.echo(result["message"],err=toStderr)
+        return
+    results = ctx.obj.MEMCLID_UTILITY.get(keys)
+    for index, key in enumerate(keys):
+        if index > 0:
+            click.echo()
+        echoRetrievalResult(results[key])
+
 @cli.command()
 @click.argument("key",type=str)
 @click.argument("value",type=str,default="")
 @click.option("-f","--flag",type=int,default=0,help="flag/metadata to be stored along with the value (default is 0)")
 @click.option("-et","--exptime",type=int,default=3600,help="expiry time in seconds for the records (default is 3600 = 1 hour)")
+@click.option("--noreply",is_flag=True,help="send the request without waiting for the reply of the server")
+@click.option("--file","valueFile",type=click.File("rb"),help="file the value is streamed from instead of the VALUE argument (- for stdin)")
 @click.pass_context
-def set(ctx,key,value,flag,exptime):
+def set(ctx,key,value,flag,exptime,noreply,valueFile):
     """Set the value corresponding to a key stored in memcached server"""
-    result = ctx.obj.MEMCLID_UTILITY.set(key,value,flag,exptime)
+    if valueFile is not None:
+        if value != "":
+            raise click.UsageError("Pass either a VALUE or --file")
+        ctx.obj.requireTextProtocol("set --file")
+        result = ctx.obj.MEMCLID_UTILITY.setFile(key,regularFile(ctx,valueFile),flag,exptime,noreply)
+    else:
+        result = ctx.obj.MEMCLID_UTILITY.set(key,value,flag,exptime,noreply)
     if result["status"] == STATUS_RECORD_STORED:
         click.echo(result["message"])
     else:
@@ -78,14 +233,15 @@ def set(ctx,key,value,flag,exptime):
 @click.argument("value",type=str,default="")
 @click.option("-f","--flag",type=int,default=0,help="flag/metadata to be stored along with the value (default is 0)")
 @click.option("-et","--exptime",type=int,default=3600,help="expiry time in seconds for the records (default is 3600 = 1 hour)")
+@click.option("--noreply",is_flag=True,help="send the request without waiting for the reply of the server")
 @click.pass_context
-def add(ctx,key,value,flag,exptime):
+def add(ctx,key,value,flag,exptime,noreply):
     """
     Add the value corresponding to a new key in memcached server
 
     This command won't work if a record for the Key is already stored in the memcached server
     """
-    result = ctx.obj.MEMCLID_UTILITY.add(key,value,flag,exptime)
+    result = ctx.obj.MEMCLID_UTILITY.add(key,value,flag,exptime,noreply)
     if result["status"] == STATUS_RECORD_STORED:
         click.echo(result["message"])
     else:
@@ -96,14 +252,15 @@ def add(ctx,key,value,flag,exptime):
 @click.argument("value",type=str,default="")
 @click.option("-f","--flag",type=int,default=0,help="flag/metadata to be stored along with the value (default is 0)")
 @click.option("-et","--exptime",type=int,default=3600,help="expiry time in seconds for the records (default is 3600 = 1 hour)")
+@click.option("--noreply",is_flag=True,help="send the request without waiting for the reply of the server")
 @click.pass_context
-def replace(ctx,key,value,flag,exptime):
+def replace(ctx,key,value,flag,exptime,noreply):
     """
     Replace the value corresponding to an existing key stored in memcached server
 
     This command won't work if a record for the Key doesn't already exist in the memcached server
     """
-    result = ctx.obj.MEMCLID_UTILITY.replace(key,value,flag,exptime)
+    result = ctx.obj.MEMCLID_UTILITY.replace(key,value,flag,exptime,noreply)
     if result["status"] == STATUS_RECORD_STORED:
         click.echo(result["message"])
     else:
@@ -112,14 +269,15 @@ def replace(ctx,key,value,flag,exptime):
 @cli.command()
 @click.argument("key",type=str)
 @click.argument("value",type=str,default="")
+@click.option("--noreply",is_flag=True,help="send the request without waiting for the reply of the server")
 @click.pass_context
-def append(ctx,key,value):
+def append(ctx,key,value,noreply):
     """
     Append the value to the value corresponding to an existing key stored in memcached server
 
     This command won't work if a record for the Key doesn't already exist in the memcached server
     """
-    result = ctx.obj.MEMCLID_UTILITY.append(key,value)
+    result = ctx.obj.MEMCLID_UTILITY.append(key,value,noreply)
     if result["status"] == STATUS_RECORD_STORED:
         click.echo(result["message"])
     else:
@@ -128,33 +286,36 @@ def append(ctx,key,value):
 @cli.command()
 @click.argument("key",type=str)
 @click.argument("value",type=str,default="")
+@click.option("--noreply",is_flag=True,help="send the request without waiting for the reply of the server")
 @click.pass_context
-def prepend(ctx,key,value):
+def prepend(ctx,key,value,noreply):
     """
     Prepend the value to the value corresponding to an existing key stored in memcached server
 
     This command won't work if a record for the Key doesn't already exist in the memcached server
     """
-    result = ctx.obj.MEMCLID_UTILITY.prepend(key,value)
+    result = ctx.obj.MEMCLID_UTILITY.prepend(key,value,noreply)
     if result["status"] == STATUS_RECORD_STORED:
         click.echo(result["message"])
     else:
         click.echo(result["message"])
 
 @cli.command()
-@click.argument("key",type=str)
+@click.argument("keys",type=str,nargs=-1)
 @click.pass_context
-def gets(ctx,key):
-    """Get the cas unique value for the entry and the value corresponding to a key stored in memcached server"""
-    result = ctx.obj.MEMCLID_UTILITY.gets(key)
-    if result["status"] == STATUS_DATA_AVAILABLE:
-        click.echo(result["message"])
-        click.echo()
-        click.echo(f'Value:  {result["value"]}')
-        click.echo(f'Flag/Metadata:  {result["flag"]}')
-        click.echo(f'CAS Unique Value:  {result["cas_unique"]}')
-    else:
-        click.echo(result["message"])
+def gets(ctx,keys):
+    """
+    Get the cas unique value for the entry and the value corresponding to one or more keys stored in memcached server
+
+    All the keys are fetched in a single request (split automatically if the key list is too long).
+    Keys are read from stdin when no key or - is passed
+    """
+    keys = readKeys(keys)
+    results = ctx.obj.MEMCLID_UTILITY.gets(keys)
+    for index, key in enumerate(keys):
+        if index > 0:
+            click.echo()
+        echoRetrievalResult(results[key])
 
 @cli.command()
 @click.argument("cas_unique",type=int)
@@ -181,10 +342,11 @@ def cas(ctx,cas_unique,key,value,flag,exptime):
 
 @cli.command()
 @click.argument("key",type=str)
+@click.option("--noreply",is_flag=True,help="send the request without waiting for the reply of the server")
 @click.pass_context
-def delete(ctx,key):
+def delete(ctx,key,noreply):
     """Deletes the key-value stored in memcached server"""
-    result = ctx.obj.MEMCLID_UTILITY.delete(key)
+    result = ctx.obj.MEMCLID_UTILITY.delete(key,noreply)
     if result["status"] == STATUS_RECORD_DELETED:
         click.echo(result["message"])
     else:
@@ -193,8 +355,9 @@ def delete(ctx,key):
 @cli.command()
 @click.argument("key",type=str)
 @click.argument("value",type=int,default=0)
+@click.option("--noreply",is_flag=True,help="send the request without waiting for the reply of the server")
 @click.pass_context
-def incr(ctx,key,value):
+def incr(ctx,key,value,noreply):
     """
     Increment the value corresponding to an existing key stored in memcached server by the value specified by the user
 
@@ -202,7 +365,7 @@ def incr(ctx,key,value):
 
     This command also won't work if the existing value is not of Integer type
     """
-    result = ctx.obj.MEMCLID_UTILITY.incr(key,value)
+    result = ctx.obj.MEMCLID_UTILITY.incr(key,value,noreply)
     if result["status"] == STATUS_RECORD_STORED:
         click.echo(result["message"])
         click.echo()
@@ -213,8 +376,9 @@ def incr(ctx,key,value):
 @cli.command()
 @click.argument("key",type=str)
 @click.argument("value",type=int,default=0)
+@click.option("--noreply",is_flag=True,help="send the request without waiting for the reply of the server")
 @click.pass_context
-def decr(ctx,key,value):
+def decr(ctx,key,value,noreply):
     """
     Decrement the value corresponding to an existing key stored in memcached server by the value specified by the user
 
@@ -222,10 +386,362 @@ def decr(ctx,key,value):
 
     This command also won't work if the existing value is not of Integer type
     """
-    result = ctx.obj.MEMCLID_UTILITY.decr(key,value)
+    result = ctx.obj.MEMCLID_UTILITY.decr(key,value,noreply)
     if result["status"] == STATUS_RECORD_STORED:
         click.echo(result["message"])
         click.echo()
         click.echo(f'Updated Value:  {result["updated_value"]}')
     else:
-        click.echo(result["message"])
\ No newline at end of file
+        click.echo(result["message"])
+
+def echoMetaResult(result):
+    click.echo(result["message"])
+    details = [("Value","value"),("Flag/Metadata","flag"),("CAS Unique Value","cas_unique"),("TTL","ttl"),("Seconds Since Last Access","last_access"),("Updated Value","updated_value")]
+    details = [(label,result[field]) for label, field in details if result.get(field) is not None]
+    if details:
+        click.echo()
+    for label, value in details:
+        click.echo(f'{label}:  {value}')
+
+@cli.command()
+@click.argument("keys",type=str,nargs=-1)
+@click.option("--cas",is_flag=True,help="also fetch the CAS unique value")
+@click.option("--ttl",is_flag=True,help="also fetch the remaining time to live in seconds (-1 when the item doesnt expire)")
+@click.option("--last-access",is_flag=True,help="also fetch the number of seconds since the item was last accessed")
+@click.option("--no-value",is_flag=True,help="only fetch the metadata, not the value")
+@click.pass_context
+def mg(ctx,keys,cas,ttl,last_access,no_value):
+    """
+    Get the value and metadata of one or more keys with the meta protocol (mg)
+
+    Several keys are pipelined in quiet mode, so the server only replies for the keys it has.
+    Keys are read from stdin when no key or - is passed
+    """
+    ctx.obj.requireTextProtocol("mg")
+    keys = readKeys(keys)
+    if len(keys) == 1:
+        results = {keys[0]: ctx.obj.MEMCLID_UTILITY.metaGet(keys[0],not no_value,cas,ttl,last_access)}
+    else:
+        results = ctx.obj.MEMCLID_UTILITY.metaGetMany(keys,not no_value,cas,ttl,last_access)
+    for index, key in enumerate(keys):
+        if index > 0:
+            click.echo()
+        echoMetaResult(results[key])
+
+@cli.command()
+@click.argument("key",type=str)
+@click.argument("value",type=str,default="")
+@click.option("-f","--flag",type=int,default=0,help="flag/metadata to be stored along with the value (default is 0)")
+@click.option("-et","--exptime",type=int,default=3600,help="expiry time in seconds for the records (default is 3600 = 1 hour)")
+@click.option("--cas-unique",type=int,help="only store the value if the CAS unique value of the record still matches")
+@click.option("--mode",type=click.Choice(list(META_SET_MODES)),default="set",help="storage command the request behaves like (default is set)")
+@click.pass_context
+def ms(ctx,key,value,flag,exptime,cas_unique,mode):
+    """
+    Store the key-value with the meta protocol (ms)
+
+    The new CAS unique value of the record is printed when it is stored
+    """
+    ctx.obj.requireTextProtocol("ms")
+    echoMetaResult(ctx.obj.MEMCLID_UTILITY.metaSet(key,value,flag,exptime,cas_unique,mode,True))
+
+@cli.command()
+@click.argument("key",type=str)
+@click.option("--cas-unique",type=int,help="only delete the record if its CAS unique value still matches")
+@click.pass_context
+def md(ctx,key,cas_unique):
+    """Deletes the key-value with the meta protocol (md)"""
+    ctx.obj.requireTextProtocol("md")
+    echoMetaResult(ctx.obj.MEMCLID_UTILITY.metaDelete(key,cas_unique))
+
+@cli.command()
+@click.argument("key",type=str)
+@click.option("-d","--delta",type=click.IntRange(min=0),default=1,help="value the record is incremented or decremented by (default is 1)")
+@click.option("--decr",is_flag=True,help="decrement instead of incrementing")
+@click.option("--initial",type=click.IntRange(min=0),help="create the record with this value when the key doesnt exist")
+@click.option("-et","--exptime",type=int,default=0,help="expiry time in seconds of the record created with --initial (default is 0 = never expires)")
+@click.pass_context
+def ma(ctx,key,delta,decr,initial,exptime):
+    """
+    Increment or decrement the value of a key with the meta protocol (ma)
+
+    The updated value is returned in the same request
+    """
+    ctx.obj.requireTextProtocol("ma")
+    echoMetaResult(ctx.obj.MEMCLID_UTILITY.metaArithmetic(key,delta,decr,initial,exptime))
+
+def echoBatchResult(index,command,result,error):
+    click.echo(f'[{index}] {command}')
+    if error is not None:
+        click.echo(f'    {error.message}')
+    elif "status" not in result:
+        #get and gets return a result for every key
+        for keyResult in result.values():
+            click.echo(f'    {keyResult["message"]}')
+            if keyResult["status"] == STATUS_DATA_AVAILABLE:
+                click.echo(f'    Value:  {keyResult["value"]}')
+                click.echo(f'    Flag/Metadata:  {keyResult["flag"]}')
+                if "cas_unique" in keyResult:
+                    click.echo(f'    CAS Unique Value:  {keyResult["cas_unique"]}')
+    else:
+        click.echo(f'    {result["message"]}')
+        if result.get("updated_value") is not None:
+            click.echo(f'    Updated Value:  {result["updated_value"]}')
+
+@cli.command()
+@click.argument("file",type=click.File("r"),default="-")
+@click.option("-w","--window",type=click.IntRange(min=1),default=MEMCLID_BATCH_WINDOW,help=f"number of requests kept in flight before waiting for a response (default is {MEMCLID_BATCH_WINDOW})")
+@click.option("-q","--quiet",is_flag=True,help="only print the summary and the commands that failed")
+@click.pass_context
+def batch(ctx,file,window,quiet):
+    """
+    Execute the commands in FILE (or stdin) pipelined over a single connection
+
+    Every line holds one command with the same arguments as the memclid commands,
+    e.g. "set KEY VALUE FLAG EXPTIME", "cas CAS_UNIQUE KEY VALUE" or "get KEY1 KEY2".
+    Values with spaces can be quoted. Empty lines and lines starting with # are skipped
+    """
+    ctx.obj.requireSingleServer("batch")
+    memclidBatch = MemclidBatch(ctx.obj.MEMCLID_UTILITY,window)
+    executed = 0
+    failed = 0
+    start = time.perf_counter()
+    try:
+        for command, result, error in memclidBatch.run(file):
+            executed = executed+1
+            if error is not None:
+                failed = failed+1
+            if not quiet or error is not None:
+                echoBatchResult(executed,command,result,error)
+    except Exception as err:
+        ctx.obj.MEMCLID_UTILITY.handleAllExceptions(err)
+    elapsed = time.perf_counter()-start
+    click.echo()
+    click.echo(f'Executed {executed} commands in {elapsed:.3f}s ({executed/elapsed if elapsed > 0 else 0:.0f} commands/sec), {failed} failed')
+
+@cli.command()
+@click.argument("file",type=click.File("r"),default="-")
+@click.option("--format","fileFormat",type=click.Choice(["csv","jsonl"]),help="format of the file (default is picked from the file extension, jsonl for stdin)")
+@click.option("-c","--command",type=click.Choice(["set","add","replace"]),default="set",help="storage command used for every row (default is set)")
+@click.option("-f","--flag",type=int,default=0,help="flag/metadata for the rows that don't have one (default is 0)")
+@click.option("-et","--exptime",type=int,default=3600,help="expiry time in seconds for the rows that don't have one (default is 3600 = 1 hour)")
+@click.option("-w","--window",type=click.IntRange(min=1),default=MEMCLID_BATCH_WINDOW,help=f"number of requests kept in flight before waiting for a response (default is {MEMCLID_BATCH_WINDOW})")
+@click.pass_context
+def load(ctx,file,fileFormat,command,flag,exptime,window):
+    """
+    Load the key-values in a CSV or JSONL FILE (or stdin) into memcached server
+
+    CSV rows are key,value[,flag[,exptime]] and JSONL rows are objects with key, value and optionally flag and exptime.
+    The file is streamed row by row and the requests are pipelined over a single connection
+    """
+    ctx.obj.requireSingleServer("load")
+    if fileFormat is None:
+        fileFormat = "csv" if file.name.lower().endswith(".csv") else "jsonl"
+    memclidLoader = MemclidLoader(ctx.obj.MEMCLID_UTILITY,window,command,flag,exptime)
+    loaded = 0
+    failed = 0
+    start = time.perf_counter()
+    try:
+        for label, result, error in memclidLoader.run(file,fileFormat):
+            if error is not None:
+                failed = failed+1
+                click.echo(f'{label}: {error.message}')
+            elif result["status"] != STATUS_RECORD_STORED:
+                failed = failed+1
+                click.echo(f'{label}: {result["message"]}')
+            else:
+                loaded = loaded+1
+    except Exception as err:
+        ctx.obj.MEMCLID_UTILITY.handleAllExceptions(err)
+    elapsed = time.perf_counter()-start
+    click.echo(f'Loaded {loaded} items in {elapsed:.3f}s ({loaded/elapsed if elapsed > 0 else 0:.0f} items/sec), {failed} failed')
+
+@cli.command()
+@click.option("-o","--output",type=click.File("w"),default="-",help="file the items are written to (default is stdout)")
+@click.option("--prefix",type=str,help="only dump the keys starting with this prefix")
+@click.option("--min-size",type=int,help="only dump the items taking at least this many bytes in memcached server")
+@click.option("--max-size",type=int,help="only dump the items taking at most this many bytes in memcached server")
+@click.option("--min-ttl",type=int,help="only dump the items with at least this many seconds left before they expire")
+@click.option("--max-ttl",type=int,help="only dump the items expiring within this many seconds (items without expiry are skipped)")
+@click.option("--keys-only",is_flag=True,help="only dump the metadata of the items without fetching the values")
+@click.option("-b","--batch-size",type=click.IntRange(min=1),default=MEMCLID_DUMP_BATCH_SIZE,help=f"number of keys fetched with a single get request (default is {MEMCLID_DUMP_BATCH_SIZE})")
+@click.option("-w","--window",type=click.IntRange(min=1),default=MEMCLID_BATCH_WINDOW,help=f"number of get requests kept in flight before waiting for a response (default is {MEMCLID_BATCH_WINDOW})")
+@click.pass_context
+def dump(ctx,output,prefix,min_size,max_size,min_ttl,max_ttl,keys_only,batch_size,window):
+    """
+    Dump the items stored in memcached server as NDJSON (one JSON object per line)
+
+    The keys are listed with "lru_crawler metadump all" and the values are fetched in pipelined
+    multi-key gets over a second connection, so the items are streamed with constant memory.
+    Every line has key, value, flag, exptime, ttl, size and last_access, the output can be loaded back with the load command.
+    Values that aren't valid UTF-8 (binary, compressed or pickled) are written base64 encoded with "encoding": "base64"
+    """
+    ctx.obj.requireSingleServer("dump")
+    ctx.obj.requireTextProtocol("dump")
+    valueContext = ctx.with_resource(Context(ctx.obj.MEMCLID_HOST,ctx.obj.MEMCLID_PORT,socketPath=ctx.obj.MEMCLID_SOCKET_PATH,socketOptions=ctx.obj.MEMCLID_SOCKET_OPTIONS))
+    memclidDumper = MemclidDumper(ctx.obj.MEMCLID_UTILITY,valueContext.MEMCLID_UTILITY,window,batch_size,prefix,min_size,max_size,min_ttl,max_ttl,not keys_only)
+    dumped = 0
+    start = time.perf_counter()
+    try:
+        for item in memclidDumper.run():
+            output.write(json.dumps(item)+"\n")
+            dumped = dumped+1
+    except Exception as err:
+        ctx.obj.MEMCLID_UTILITY.handleAllExceptions(err)
+    output.flush()
+    elapsed = time.perf_counter()-start
+    click.echo(f'Dumped {dumped} items in {elapsed:.3f}s ({dumped/elapsed if elapsed > 0 else 0:.0f} items/sec)',err=True)
+
+def formatStat(value,pattern):
+    return format(value,pattern) if value is not None else "-"
+
+def echoStats(server,stats):
+    click.echo(server)
+    for name, value in stats.items():
+        if name == "classes":
+            for slabClass, classStats in sorted(value.items()):
+                for className, classValue in classStats.items():
+                    click.echo(f'  {str(slabClass)+":"+className:32}{classValue}')
+        else:
+            click.echo(f'  {name:32}{value}')
+
+def statsTable(samples,previous,elapsed):
+    #one row of rates per server, with the totals of all the servers when there are more than one
+    rows = [(server,statsRates(previous and previous[server],stats,elapsed)) for server, stats in samples.items()]
+    if len(samples) > 1:
+        rows.append(("total",statsRates(previous and totalStats(previous.values()),totalStats(samples.values()),elapsed)))
+    lines = [f'{"server":24}{"gets/s":>10}{"hits/s":>10}{"hit%":>8}{"sets/s":>10}{"evict/s":>10}{"read/s":>12}{"written/s":>12}{"conns":>8}{"items":>10}']
+    for server, rates in rows:
+        hitPercent = rates["hit_ratio"]*100 if rates["hit_ratio"] is not None else None
+        lines.append(f'{server:24}{formatStat(rates["cmd_get/sec"],".0f"):>10}{formatStat(rates["get_hits/sec"],".0f"):>10}'
+            f'{formatStat(hitPercent,".1f"):>8}{formatStat(rates["cmd_set/sec"],".0f"):>10}{formatStat(rates["evictions/sec"],".0f"):>10}'
+            f'{formatStat(rates["bytes_read/sec"],".0f"):>12}{formatStat(rates["bytes_written/sec"],".0f"):>12}'
+            f'{formatStat(rates["curr_connections"],"d"):>8}{formatStat(rates["curr_items"],"d"):>10}')
+    return lines
+
+@cli.command()
+@click.argument("group",type=click.Choice(STATS_GROUPS),required=False)
+@click.option("--json","asJson",is_flag=True,help="print the statistics of every server as a JSON object (one object per sample with --watch)")
+@click.option("-w","--watch",type=click.FloatRange(min=0,min_open=True),is_flag=False,flag_value=MEMCLID_STATS_WATCH_INTERVAL,help=f"sample the general statistics every this many seconds (default is {MEMCLID_STATS_WATCH_INTERVAL}) and show the rates per second in place until ctrl-c")
+@click.option("-n","--count",type=click.IntRange(min=1),help="stop watching after this many samples")
+@click.pass_context
+def stats(ctx,group,asJson,watch,count):
+    """
+    Show the statistics of memcached server, or of every server given with --servers
+
+    GROUP selects the settings, slabs or items statistics instead of the general ones, the slabs and
+    items statistics are grouped per slab class. With --watch the gets, hits, sets, evictions and bytes
+    read/written per second, the hit ratio of the interval and the open connections and items are shown for every server
+    """
+    ctx.obj.requireTextProtocol("stats")
+    if watch is not None and group is not None:
+        raise click.UsageError("--watch shows the general statistics, it can't be used with a group")
+    memclidStats = MemclidStats(ctx.obj.MEMCLID_SOCKETS)
+    try:
+        if watch is None:
+            results = memclidStats.fetch(group)
+            if asJson:
+                click.echo(json.dumps(results,indent=2))
+                return
+            for index, (server, serverStats) in enumerate(results.items()):
+                if index > 0:
+                    click.echo()
+                echoStats(server,serverStats)
+            return
+        previous, previousTime, shown, sampled = None, None, 0, 0
+        interactive = click.get_text_stream("stdout").isatty()
+        while True:
+            sampleTime, samples = memclidStats.sample()
+            elapsed = sampleTime-previousTime if previous else 0
+            if asJson:
+                #one JSON object per sample
+                click.echo(json.dumps({server: statsRates(previous and previous[server],serverStats,elapsed) for server, serverStats in samples.items()}))
+            else:
+                lines = statsTable(samples,previous,elapsed)
+                if interactive and shown:
+                    #moves the cursor back to the first line of the previous table and clears it
+                    click.echo(f"\x1b[{shown}F\x1b[J",nl=False)
+                click.echo("\n".join(lines))
+                shown = len(lines)
+            sampled = sampled+1
+            if count is not None and sampled >= count:
+                return
+            previous, previousTime = samples, sampleTime
+            time.sleep(watch)
+    except KeyboardInterrupt:
+        return
+    except Exception as err:
+        ctx.obj.MEMCLID_UTILITY.handleAllExceptions(err)
+
+@cli.command()
+@click.option("--timing/--no-timing",default=True,help="print how long every command took (default is on)")
+@click.option("--history-file",type=click.Path(dir_okay=False),default=MEMCLID_SHELL_HISTORY_FILE,help=f"file the command history is kept in between sessions (default is {MEMCLID_SHELL_HISTORY_FILE})")
+@click.pass_context
+def shell(ctx,timing,history_file):
+    """
+    Start an interactive shell that runs the memclid commands over a connection kept open for the whole session
+
+    The commands take the same arguments and options as on the command line (e.g. "set KEY VALUE -et 60"),
+    help lists them and exit (or ctrl-d) leaves the shell. The connection is opened again if it breaks
+    """
+    click.echo(f"Connected to memcached server, type help to list the commands")
+    MemclidShell(cli,ctx.find_root(),timing,os.path.expanduser(history_file)).run()
+
+def parseBenchOption(parse):
+    #click callback turning the ValueError of a bench option parser into a usage error
+    def callback(ctx,param,value):
+        try:
+            return parse(value)
+        except ValueError as err:
+            raise click.BadParameter(str(err))
+    return callback
+
+def echoLatencies(name,latency):
+    values = [latency.percentile(percent) for percent in (50,90,99,99.9)]+[latency.max]
+    click.echo(f'{name:8}'+"".join(f'{value/1000:10.3f}' if value is not None else f'{"-":>10}' for value in values))
+
+@cli.command()
+@click.option("-c","--connections",type=click.IntRange(min=1),default=MEMCLID_BENCH_CONNECTIONS,help=f"number of connections, each one used by its own thread (default is {MEMCLID_BENCH_CONNECTIONS})")
+@click.option("--mode",type=click.Choice(["threads","async"]),default="threads",help="run the workers as threads or as asyncio tasks (default is threads)")
+@click.option("-t","--tasks-per-connection",type=click.IntRange(min=1),default=1,help="asyncio tasks sharing every connection in async mode (default is 1)")
+@click.option("-d","--duration",type=click.FloatRange(min=0,min_open=True),default=MEMCLID_BENCH_DURATION,help=f"seconds to measure for (default is {MEMCLID_BENCH_DURATION})")
+@click.option("--warmup",type=click.FloatRange(min=0),default=MEMCLID_BENCH_WARMUP,help=f"seconds to run before measuring (default is {MEMCLID_BENCH_WARMUP})")
+@click.option("--mix",type=str,callback=parseBenchOption(parseMix),default=MEMCLID_BENCH_MIX,help=f"weights of the get, set, incr and cas commands (default is {MEMCLID_BENCH_MIX})")
+@click.option("-k","--keys",type=click.IntRange(min=1),default=MEMCLID_BENCH_KEYS,help=f"number of distinct keys (default is {MEMCLID_BENCH_KEYS})")
+@click.option("--key-distribution",type=click.Choice(["uniform","zipf"]),default="uniform",help="how often every key is picked (default is uniform)")
+@click.option("--zipf-exponent",type=click.FloatRange(min=0),default=0.99,help="skew of the zipf key distribution (default is 0.99)")
+@click.option("--value-size",type=str,callback=parseBenchOption(parseValueSize),default="100",help="size of the values in bytes: SIZE, MIN-MAX (uniform) or MIN-MAX:log (log-uniform) (default is 100)")
+@click.option("-r","--rate",type=click.FloatRange(min=0,min_open=True),help="commands per second sent on a fixed schedule (open loop), by default every worker sends its next command once the previous one completed (closed loop)")
+@click.option("--prefix",type=str,default="memclid:bench:",help="prefix of the keys (default is memclid:bench:)")
+@click.option("-et","--exptime",type=int,default=0,help="expiry time in seconds of the values stored (default is 0 = never expires)")
+@click.option("--seed",type=int,help="seed of the random choices, to run the same commands again")
+@click.pass_context
+def bench(ctx,connections,mode,tasks_per_connection,duration,warmup,mix,keys,key_distribution,zipf_exponent,value_size,rate,prefix,exptime,seed):
+    """
+    Measure the throughput and latency of memcached server under a mix of get, set, incr and cas commands
+
+    The latency percentiles are printed in milliseconds for all the commands and for every command.
+    Use a memcached server (or a stand-in) you can fill with test data, the keys all start with the prefix
+    """
+    ctx.obj.requireSingleServer("bench")
+    if mode == "async":
+        ctx.obj.requireTextProtocol("bench --mode async")
+    socketClass, utilityClass = PROTOCOL_ENGINES[ctx.obj.MEMCLID_PROTOCOL]
+    memclidBench = MemclidBench(ctx.obj.MEMCLID_HOST,ctx.obj.MEMCLID_PORT,connections,mix,keys,key_distribution,zipf_exponent,
+        value_size,duration,warmup,rate,mode,tasks_per_connection,prefix,exptime,seed,socketClass,utilityClass,ctx.obj.MEMCLID_SOCKET_OPTIONS)
+    workers = connections*(tasks_per_connection if mode == "async" else 1)
+    click.echo(f'Running {"open loop at "+format(rate,"g")+" commands/sec" if rate else "closed loop"} with {connections} connections and {workers} {"tasks" if mode == "async" else "threads"}, {warmup:g}s warm-up then {duration:g}s measured')
+    report = memclidBench.run()
+    for failure in dict.fromkeys(report["failures"]):
+        click.echo(f'A worker stopped: {failure}')
+    click.echo()
+    click.echo(f'{report["operations"]} commands, {report["throughput"]:.0f} commands/sec')
+    for name, commandReport in report["commands"].items():
+        count = commandReport["latency"].count
+        outcome = {"get": "hits", "set": "stored", "incr": "hits", "cas": "stored"}[name]
+        click.echo(f'{name:8}{count} commands, {commandReport["hits"]/count*100 if count else 0:.1f}% {outcome}, {commandReport["errors"]} errors')
+    click.echo()
+    click.echo(f'{"ms":8}{"p50":>10}{"p90":>10}{"p99":>10}{"p999":>10}{"max":>10}')
+    echoLatencies("all",report["latency"])
+    for name, commandReport in report["commands"].items():
+        echoLatencies(name,commandReport["latency"])
@@ -0,0 +1,76 @@
+import threading
+import zlib
+from .constants import *
+from .config import MEMCLID_COMPRESSION_THRESHOLD, MEMCLID_COMPRESSION_LEVEL
+
+class ZlibCodec:
+    """Codec compressing with zlib at the given level, any object with compress and decompress methods taking
+    and returning bytes can be given to a MemclidCompressor instead"""
+    def __init__(self, level=MEMCLID_COMPRESSION_LEVEL):
+        self.level = level
+
+    def compress(self, data):
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data):
+        return zlib.decompress(data)
+
+class MemclidCompressor:
+    """
+    Compresses the values stored by a MemclidUtility and decompresses them when they are fetched
+
+        memclidUtility = MemclidUtility(memclidSocket, compressor=MemclidCompressor(threshold=1024, level=6))
+
+    The values of set/add/replace/cas of at least threshold bytes are compressed with codec (zlib at the given
+    level by default) and stored with the FLAG_COMPRESSED bit of the flag set, a value that doesn't get smaller is
+    stored as it is. get/gets decompress the values with the bit set and return the flag without it, so the bit
+    can't be used by the application. append/prepend never compress (the data would be added to compressed data).
+    The compressor can be shared by many utilities
+
+    Attributes:
+        compressed -- values stored compressed
+        skipped -- values above the threshold stored as they were because compressing didn't make them smaller
+        decompressed -- values decompressed
+        bytesIn, bytesOut -- size of the compressed values before and after compressing
+    """
+    def __init__(self, codec=None, threshold=MEMCLID_COMPRESSION_THRESHOLD, level=MEMCLID_COMPRESSION_LEVEL):
+        self.codec = codec if codec is not None else ZlibCodec(level)
+        self.threshold = threshold
+        self.lock = threading.Lock()
+        self.compressed = 0
+        self.skipped = 0
+        self.decompressed = 0
+        self.bytesIn = 0
+        self.bytesOut = 0
+
+    def compress(self, value, flag):
+        """Returns (value to store, flag to store it with) for a value given as str or bytes-like"""
+        if isinstance(value, str):
+            value = value.encode()
+        size = memoryview(value).nbytes
+        if size < self.threshold:
+            return value, flag
+        compressed = self.codec.compress(value)
+        with self.lock:
+            if len(compressed) >= size:
+                self.skipped = self.skipped+1
+                return value, flag
+            self.compressed = self.compressed+1
+            self.bytesIn = self.bytesIn+size
+            self.bytesOut = self.bytesOut+len(compressed)
+        return compressed, flag | FLAG_COMPRESSED
+
+    def decompress(self, value, flag):
+        """Returns (value, flag) for a value and flag (an int) read from the server"""
+        if not flag & FLAG_COMPRESSED:
+            return value, flag
+        value = self.codec.decompress(value)
+        with self.lock:
+            self.decompressed = self.decompressed+1
+        return value, flag & ~FLAG_COMPRESSED
+
+    def stats(self):
+        """Returns the counters along with the compression ratio (size before compressing / size after) of the compressed values"""
+        with self.lock:
+            return {"compressed": self.compressed, "skipped": self.skipped, "decompressed": self.decompressed,
+                "bytesIn": self.bytesIn, "bytesOut": self.bytesOut, "ratio": self.bytesIn/self.bytesOut if self.bytesOut else None}
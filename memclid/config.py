@@ -1,2 +1,25 @@
 DEFAULT_MEMCLID_HOST="localhost"
-DEFAULT_MEMCLID_PORT=11211
\ No newline at end of file
+DEFAULT_MEMCLID_PORT=11211
+MEMCLID_RECV_CHUNK_SIZE=65536 #number of bytes requested from the socket per recv call
+MEMCLID_SOCKET_NODELAY=True #TCP_NODELAY is set on the connections so that small requests are sent without waiting for more data
+MEMCLID_MAX_COMMAND_LINE_LENGTH=2048 #retrieval commands with longer key lists are split into multiple commands
+MEMCLID_BATCH_WINDOW=100 #number of requests the batch command keeps in flight before waiting for a response
+MEMCLID_DUMP_BATCH_SIZE=100 #number of keys fetched with a single get request by the dump command
+MEMCLID_POOL_MAX_SIZE=10 #maximum number of connections opened by a MemclidPool
+MEMCLID_POOL_IDLE_TIMEOUT=60 #seconds after which an unused connection of a MemclidPool is closed instead of being reused
+MEMCLID_SHELL_HISTORY_FILE="~/.memclid_history" #file the commands typed in the shell are saved to between sessions
+MEMCLID_SHELL_HISTORY_LENGTH=1000 #number of commands kept in the shell history
+MEMCLID_BENCH_CONNECTIONS=4 #number of connections (and threads) used by the bench command
+MEMCLID_BENCH_DURATION=10 #seconds the bench command measures for, after the warm-up
+MEMCLID_BENCH_WARMUP=2 #seconds the bench command runs before it starts measuring
+MEMCLID_BENCH_KEYS=10000 #number of distinct keys used by the bench command
+MEMCLID_BENCH_MIX="get=80,set=15,incr=3,cas=2" #weights of the commands sent by the bench command
+MEMCLID_STATS_WATCH_INTERVAL=1 #seconds between two samples of the stats command in watch mode
+MEMCLID_NEAR_CACHE_MAX_BYTES=16*1024*1024 #memory the values of a MemclidNearCache can take before the least recently used ones are evicted
+MEMCLID_NEAR_CACHE_TTL=5 #seconds a value fetched from memcached server is served by a MemclidNearCache
+MEMCLID_COMPRESSION_THRESHOLD=1024 #values of at least this many bytes are compressed by a MemclidCompressor
+MEMCLID_COMPRESSION_LEVEL=6 #zlib compression level (1 is the fastest, 9 compresses the most)
+MEMCLID_CHUNK_SIZE=1000*1000 #largest chunk a MemclidChunkedStore stores a value in, below the default 1 MB item size limit of memcached
+MEMCLID_CHUNK_READ_RETRIES=2 #times a MemclidChunkedStore reads a value again after its chunks changed while they were read
+MEMCLID_FAKE_SERVER_MAX_BYTES=64*1024*1024 #memory the items of a MemclidFakeServer can take before the least recently used ones are evicted
+MEMCLID_FAKE_SERVER_ITEM_SIZE_MAX=1024*1024 #largest value a MemclidFakeServer stores, like the default item size limit of memcached
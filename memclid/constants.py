@@ -3,4 +3,14 @@ STATUS_DATA_NOT_AVAILABLE="Data not available"
 STATUS_RECORD_STORED="Record stored successfully"
 STATUS_RECORD_NOT_STORED="Record could not be stored"
 STATUS_RECORD_DELETED="Record deleted successfully"
-STATUS_RECORD_NOT_DELETED="Record could not be deleted"
\ No newline at end of file
+STATUS_RECORD_NOT_DELETED="Record could not be deleted"
+STATUS_REQUEST_SENT="Request sent without waiting for a reply"
+STATUS_TIMED_OUT="Request timed out before the reply was received"
+META_SET_MODES={"set":"S","add":"E","replace":"R","append":"A","prepend":"P"} #mode flag (M) of the meta set command for every storage command
+FLAG_COMPRESSED=1<<3 #bit of the flag set on the values compressed by a MemclidCompressor (the same bit as other python memcached clients)
+#bits of the flag naming the type of a value stored by a MemclidSerializer, a value without any of them is raw bytes
+#(pickle, int and str use the same bits as other python memcached clients)
+FLAG_PICKLE=1<<0
+FLAG_INTEGER=1<<1
+FLAG_TEXT=1<<4
+FLAG_JSON=1<<5
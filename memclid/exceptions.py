@@ -11,6 +11,8 @@ class MemclidConnectionError(Exception):
         self.message = message;
         if host!=None and port!=None :
             self.message = message + " (host: " + str(host) + ", port: " + str(port) +")" 
+        elif host!=None :
+            self.message = message + " (socket: " + str(host) + ")"
         super().__init__(self.message)
 
 class MemclidDisconnectError(Exception):
@@ -26,6 +28,8 @@ class MemclidDisconnectError(Exception):
         self.message = message;
         if host!=None and port!=None :
             self.message = message + " (host: " + str(host) + ", port: " + str(port) +")" 
+        elif host!=None :
+            self.message = message + " (socket: " + str(host) + ")"
         super().__init__(self.message)
 
 class MemclidConnectionBreakError(Exception):
@@ -44,6 +48,8 @@ class MemclidConnectionBreakError(Exception):
             self.message = self.message + ". " + helperMessage
         if host!=None and port!=None :
             self.message = self.message + " (host: " + str(host) + ", port: " + str(port) +")" 
+        elif host!=None :
+            self.message = self.message + " (socket: " + str(host) + ")"
         super().__init__(self.message)
 
 class MemclidSendError(Exception):
@@ -59,6 +65,8 @@ class MemclidSendError(Exception):
         self.message = message;
         if host!=None and port!=None :
             self.message = message + " (host: " + str(host) + ", port: " + str(port) +")" 
+        elif host!=None :
+            self.message = message + " (socket: " + str(host) + ")"
         super().__init__(self.message)
 
 class MemclidRecvError(Exception):
@@ -74,6 +82,8 @@ class MemclidRecvError(Exception):
         self.message = message;
         if host!=None and port!=None :
             self.message = message + " (host: " + str(host) + ", port: " + str(port) +")" 
+        elif host!=None :
+            self.message = message + " (socket: " + str(host) + ")"
         super().__init__(self.message)
 
 class MemclidErrorSentByServer(Exception):
@@ -90,6 +100,8 @@ class MemclidErrorSentByServer(Exception):
         self.message = message;
         if host!=None and port!=None :
             self.message = message + " (host: " + str(host) + ", port: " + str(port) +")" 
+        elif host!=None :
+            self.message = message + " (socket: " + str(host) + ")"
         super().__init__(self.message)
 
 class MemclidClientErrorSentByServer(Exception):
@@ -109,6 +121,8 @@ class MemclidClientErrorSentByServer(Exception):
             self.message = self.message + " Error message sent by server: " + messageSentByServer
         if host!=None and port!=None :
             self.message = self.message + " (host: " + str(host) + ", port: " + str(port) +")" 
+        elif host!=None :
+            self.message = self.message + " (socket: " + str(host) + ")"
         super().__init__(self.message)
 
 class MemclidServerErrorSentByServer(Exception):
@@ -128,6 +142,8 @@ class MemclidServerErrorSentByServer(Exception):
             self.message = self.message + " Error message sent by server: " + messageSentByServer
         if host!=None and port!=None :
             self.message = self.message + " (host: " + str(host) + ", port: " + str(port) +")" 
+        elif host!=None :
+            self.message = self.message + " (socket: " + str(host) + ")"
         super().__init__(self.message)
 
 class MemclidUnrecognizedResponseSentByServer(Exception):
@@ -147,4 +163,61 @@ class MemclidUnrecognizedResponseSentByServer(Exception):
             self.message = self.message + " Response sent by server: " + responseSentByServer
         if host!=None and port!=None :
             self.message = self.message + " (host: " + str(host) + ", port: " + str(port) +")" 
-        super().__init__(self.message)
\ No newline at end of file
+        elif host!=None :
+            self.message = self.message + " (socket: " + str(host) + ")"
+        super().__init__(self.message)
+
+class MemclidInvalidCommandError(Exception):
+    """Exception raised when a command given to memclid as text (for example a line of a batch file)
+    can't be understood, this is detected before anything is sent to the memcached server
+
+    Attributes:
+        command -- the command that was given
+        reason -- why the command couldn't be understood
+        message -- explanation of the error
+    """
+
+    def __init__(self, command="", reason="", message="Invalid command"):
+        self.message = message;
+        if reason!="" and reason!=None:
+            self.message = self.message + ". " + reason
+        if command!="" and command!=None:
+            self.message = self.message + " (command: " + command + ")"
+        super().__init__(self.message)
+
+class MemclidPoolTimeoutError(Exception):
+    """Exception raised when no connection of the pool became free in time
+    (all of the connections allowed by the max size of the pool are in use)
+
+    Attributes:
+        host -- host of the memcache server
+        port -- port of the memcache server
+        message -- explanation of the error
+    """
+
+    def __init__(self, host=None, port=None, message="Timed out waiting for a free connection to the memcached server in the pool"):
+        self.message = message;
+        if host!=None and port!=None :
+            self.message = message + " (host: " + str(host) + ", port: " + str(port) +")" 
+        elif host!=None :
+            self.message = message + " (socket: " + str(host) + ")"
+        super().__init__(self.message)
+
+class MemclidTimeoutError(Exception):
+    """Exception raised when sending a request or receiving its response took longer than the timeout of the socket
+    or went past the deadline of the call (once part of the request was sent the connection can't be used anymore,
+    a late response could still arrive)
+
+    Attributes:
+        host -- host of the memcache server
+        port -- port of the memcache server
+        message -- explanation of the error
+    """
+
+    def __init__(self, host=None, port=None, message="The memcached server didn't reply in time"):
+        self.message = message;
+        if host!=None and port!=None :
+            self.message = message + " (host: " + str(host) + ", port: " + str(port) +")" 
+        elif host!=None :
+            self.message = message + " (socket: " + str(host) + ")"
+        super().__init__(self.message)
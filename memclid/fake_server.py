@@ -0,0 +1,545 @@
+import asyncio
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import quote
+from .config import MEMCLID_FAKE_SERVER_MAX_BYTES, MEMCLID_FAKE_SERVER_ITEM_SIZE_MAX
+
+FAKE_SERVER_VERSION = "1.6.0-memclid"
+ITEM_OVERHEAD = 48 #bytes counted for every item on top of its key and value, close to the item header of memcached
+RELATIVE_EXPTIME_MAX = 60*60*24*30 #larger exptimes are absolute unix times
+MAX_KEY_LENGTH = 250
+STORAGE_COMMANDS = ("set", "add", "replace", "append", "prepend", "cas")
+
+class FakeItem:
+    __slots__ = ("value", "flags", "exptime", "cas", "lastAccess")
+
+    def __init__(self, value, flags, exptime, cas, lastAccess):
+        self.value = value
+        self.flags = flags
+        self.exptime = exptime
+        self.cas = cas
+        self.lastAccess = lastAccess
+
+class MemclidFakeServer:
+    """
+    In-process memcached stand-in speaking the text protocol (storage, retrieval, gat/touch, delete, incr/decr, the meta
+    commands, flush_all, stats with the settings/slabs/items groups, version and lru_crawler metadump) over real sockets
+
+    Items expire like on memcached (exptimes up to 30 days are relative, larger ones unix times) and the least
+    recently used items are evicted once the items take more than maxBytes. The time is read from clock, so the
+    expiry can be tested without sleeping. The server runs an asyncio loop in a thread of its own, it can be used
+    from blocking and asyncio code alike:
+
+        with MemclidFakeServer() as server:
+            memclidSocket.connect(server.host, server.port)
+
+    Faults can be injected while it runs: latency (seconds) delays every response, fragmentSize splits every
+    response into writes of that many bytes (fragmentDelay seconds apart) so that the client receives them in
+    pieces, and injectError replaces the next responses to a command with an error or a closed connection.
+    With path the server listens on a unix domain socket instead, host is then the path and port None
+    """
+    def __init__(self, host="127.0.0.1", port=0, maxBytes=MEMCLID_FAKE_SERVER_MAX_BYTES, itemSizeMax=MEMCLID_FAKE_SERVER_ITEM_SIZE_MAX,
+            latency=0, fragmentSize=None, fragmentDelay=0.001, clock=time.time, path=None):
+        self.path = path
+        self.host = host if path is None else path
+        self.port = port if path is None else None
+        self.maxBytes = maxBytes
+        self.itemSizeMax = itemSizeMax
+        self.latency = latency
+        self.fragmentSize = fragmentSize
+        self.fragmentDelay = fragmentDelay
+        self.clock = clock
+        self.items = OrderedDict() #least recently used first
+        self.bytes = 0
+        self.casCounter = 0
+        self.injectedErrors = {}
+        self.connections = set()
+        self.started = self.clock()
+        self.stats = dict.fromkeys(("total_connections", "cmd_get", "cmd_set", "cmd_touch", "get_hits", "get_misses",
+            "delete_hits", "delete_misses", "incr_hits", "incr_misses", "decr_hits", "decr_misses", "cas_hits", "cas_misses",
+            "cas_badval", "touch_hits", "touch_misses", "evictions", "total_items", "bytes_read", "bytes_written"), 0)
+        self.commands = {
+            "get": self.retrieval, "gets": self.retrieval, "gat": self.retrieval, "gats": self.retrieval,
+            "set": self.storage, "add": self.storage, "replace": self.storage, "append": self.storage,
+            "prepend": self.storage, "cas": self.storage, "delete": self.delete, "incr": self.arithmetic,
+            "decr": self.arithmetic, "touch": self.touch, "flush_all": self.flushAll, "version": self.version,
+            "verbosity": self.verbosity, "stats": self.statsCommand, "lru_crawler": self.lruCrawler,
+            "mg": self.metaGet, "ms": self.metaSet, "md": self.metaDelete, "ma": self.metaArithmetic, "mn": self.metaNoop
+        }
+        self.statsGroups = {b"settings": self.settingsStats, b"slabs": self.slabsStats, b"items": self.itemsStats}
+        self.loop = None
+        self.thread = None
+        self.server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """Starts listening (port 0 picks a free port, stored in port once started) and returns the server"""
+        ready = threading.Event()
+        self.startError = None
+        self.thread = threading.Thread(target=self.runLoop, args=(ready,), daemon=True)
+        self.thread.start()
+        ready.wait()
+        if self.startError is not None:
+            raise self.startError
+        return self
+
+    def stop(self):
+        """Closes every connection and stops listening"""
+        if self.loop is not None and self.thread.is_alive():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+
+    def injectError(self, command, response=b"SERVER_ERROR injected error\r\n", times=1):
+        """The next times requests of command (e.g. "get" or "ms") get response instead of being run,
+        a response of None closes the connection instead of replying"""
+        self.injectedErrors[command] = [response, times]
+
+    def runLoop(self, ready):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            if self.path is None:
+                self.server = self.loop.run_until_complete(asyncio.start_server(self.handle, self.host, self.port))
+            else:
+                self.server = self.loop.run_until_complete(asyncio.start_unix_server(self.handle, self.path))
+        except OSError as err:
+            self.startError = err
+            self.loop.close()
+            ready.set()
+            return
+        if self.path is None:
+            self.port = self.server.sockets[0].getsockname()[1]
+        ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            #stops accepting first and lets the connections already accepted reach handle, a transport still being
+            #created when the server is closed would never be closed
+            for sock in self.server.sockets:
+                self.loop.remove_reader(sock.fileno())
+            self.loop.run_until_complete(asyncio.sleep(0.01))
+            self.server.close()
+            for writer in list(self.connections):
+                writer.transport.abort() #close would wait for the responses still buffered to be sent
+            tasks = asyncio.all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self.loop.run_until_complete(asyncio.sleep(0)) #lets the closed transports release their sockets
+            self.loop.close()
+
+    async def handle(self, reader, writer):
+        self.connections.add(writer)
+        self.stats["total_connections"] += 1
+        try:
+            sock = writer.get_extra_info("socket")
+            if sock is not None and sock.family != socket.AF_UNIX:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1) #so that the fragments are sent as they are written
+            while True:
+                line = await reader.readline()
+                if not line.endswith(b"\n"):
+                    return #closed by the client
+                self.stats["bytes_read"] += len(line)
+                response = await self.request(line, reader)
+                if response is None:
+                    return
+                if response:
+                    await self.respond(writer, response)
+        except (OSError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass #closed by the client in the middle of a request, or the server is stopping
+        finally:
+            self.connections.discard(writer)
+            writer.close()
+
+    async def request(self, line, reader):
+        """Runs the request starting with line and returns its response, None when the connection has to be closed"""
+        tokens = line.split()
+        if len(tokens) == 0:
+            return b"ERROR\r\n"
+        name = tokens[0].decode(errors="replace")
+        if name == "quit":
+            return None
+        data = None
+        if name in STORAGE_COMMANDS or name == "ms":
+            lengthIndex = 2 if name == "ms" else 4
+            if len(tokens) <= lengthIndex or not tokens[lengthIndex].isdigit():
+                return b"CLIENT_ERROR bad command line format\r\n"
+            length = int(tokens[lengthIndex])
+            data = await reader.readexactly(length+2)
+            self.stats["bytes_read"] += length+2
+            if data[-2:] != b"\r\n":
+                return b"CLIENT_ERROR bad data chunk\r\n"
+            if length > self.itemSizeMax:
+                return b"SERVER_ERROR object too large for cache\r\n"
+            data = data[:-2]
+        injected = self.injectedErrors.get(name)
+        if injected is not None:
+            response, injected[1] = injected[0], injected[1]-1
+            if injected[1] <= 0:
+                del self.injectedErrors[name]
+            return response
+        handler = self.commands.get(name)
+        if handler is None:
+            return b"ERROR\r\n"
+        noreply = tokens[-1] == b"noreply" and name in STORAGE_COMMANDS+("delete", "incr", "decr", "touch", "flush_all", "verbosity")
+        if noreply:
+            tokens = tokens[:-1]
+        if len(tokens) > 1 and len(tokens[1]) > MAX_KEY_LENGTH and name not in ("stats", "lru_crawler"):
+            response = b"CLIENT_ERROR bad command line format\r\n"
+        else:
+            try:
+                response = handler(tokens, data)
+            except (IndexError, ValueError):
+                response = b"CLIENT_ERROR bad command line format\r\n"
+        return b"" if noreply else response
+
+    async def respond(self, writer, response):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.stats["bytes_written"] += len(response)
+        if not self.fragmentSize:
+            writer.write(response)
+            await writer.drain()
+            return
+        for start in range(0, len(response), self.fragmentSize):
+            if start:
+                await asyncio.sleep(self.fragmentDelay)
+            writer.write(response[start:start+self.fragmentSize])
+            await writer.drain()
+
+    #Item store
+
+    def absoluteExptime(self, exptime):
+        if exptime == 0:
+            return 0
+        if exptime < 0:
+            return -1 #already expired
+        if exptime <= RELATIVE_EXPTIME_MAX:
+            return self.clock()+exptime
+        return exptime
+
+    def fetch(self, key, touch=True):
+        """Returns the item stored for key (None when missing or expired) and marks it as the most recently used"""
+        item = self.items.get(key)
+        if item is None:
+            return None
+        now = self.clock()
+        if item.exptime and item.exptime <= now:
+            self.remove(key)
+            return None
+        if touch:
+            item.lastAccess = now
+            self.items.move_to_end(key)
+        return item
+
+    def store(self, key, value, flags, exptime):
+        self.remove(key)
+        self.casCounter += 1
+        self.items[key] = FakeItem(value, flags, exptime, self.casCounter, self.clock())
+        self.bytes += len(key)+len(value)+ITEM_OVERHEAD
+        self.stats["total_items"] += 1
+        while self.bytes > self.maxBytes and len(self.items) > 1:
+            evicted, item = self.items.popitem(last=False)
+            self.bytes -= len(evicted)+len(item.value)+ITEM_OVERHEAD
+            self.stats["evictions"] += 1
+        return self.items[key]
+
+    def remove(self, key):
+        item = self.items.pop(key, None)
+        if item is not None:
+            self.bytes -= len(key)+len(item.value)+ITEM_OVERHEAD
+        return item
+
+    def ttl(self, item):
+        return -1 if item.exptime == 0 else max(int(item.exptime-self.clock()), 0)
+
+    def arithmeticResult(self, item, delta, incr):
+        """Returns the new value of item after adding/substracting delta (None when it isn't a number)"""
+        if not item.value.isdigit() or len(item.value) > 20:
+            return None
+        if incr:
+            return (int(item.value)+delta) % 2**64
+        return max(int(item.value)-delta, 0)
+
+    #Text commands, every one of them gets the tokens of the command line and the data block (storage commands only)
+
+    def retrieval(self, tokens, data):
+        name = tokens[0].decode()
+        keys = tokens[1:]
+        exptime = None
+        if name in ("gat", "gats"):
+            exptime, keys = self.absoluteExptime(int(tokens[1])), tokens[2:]
+            self.stats["cmd_touch"] += len(keys)
+        if len(keys) == 0:
+            return b"ERROR\r\n"
+        response = []
+        for key in keys:
+            self.stats["cmd_get"] += 1
+            item = self.fetch(key)
+            if item is None:
+                self.stats["get_misses"] += 1
+                continue
+            self.stats["get_hits"] += 1
+            if exptime is not None:
+                item.exptime = exptime
+            header = b"VALUE %s %d %d" % (key, item.flags, len(item.value))
+            if name in ("gets", "gats"):
+                header += b" %d" % item.cas
+            response += [header, b"\r\n", item.value, b"\r\n"]
+        response.append(b"END\r\n")
+        return b"".join(response)
+
+    def storage(self, tokens, data):
+        name = tokens[0].decode()
+        key, flags, exptime = tokens[1], int(tokens[2]), self.absoluteExptime(int(tokens[3]))
+        self.stats["cmd_set"] += 1
+        item = self.fetch(key, touch=False)
+        if name == "cas":
+            casUnique = int(tokens[5])
+            if item is None:
+                self.stats["cas_misses"] += 1
+                return b"NOT_FOUND\r\n"
+            if item.cas != casUnique:
+                self.stats["cas_badval"] += 1
+                return b"EXISTS\r\n"
+            self.stats["cas_hits"] += 1
+        elif name == "add" and item is not None:
+            return b"NOT_STORED\r\n"
+        elif name in ("replace", "append", "prepend") and item is None:
+            return b"NOT_STORED\r\n"
+        if name == "append":
+            data, flags, exptime = item.value+data, item.flags, item.exptime
+        elif name == "prepend":
+            data, flags, exptime = data+item.value, item.flags, item.exptime
+        self.store(key, data, flags, exptime)
+        return b"STORED\r\n"
+
+    def delete(self, tokens, data):
+        if len(tokens) > 2 and tokens[2] != b"0":
+            return b"CLIENT_ERROR bad command line format.  Usage: delete <key> [noreply]\r\n"
+        if self.fetch(tokens[1], touch=False) is None:
+            self.stats["delete_misses"] += 1
+            return b"NOT_FOUND\r\n"
+        self.stats["delete_hits"] += 1
+        self.remove(tokens[1])
+        return b"DELETED\r\n"
+
+    def arithmetic(self, tokens, data):
+        name = tokens[0].decode()
+        if not tokens[2].isdigit() or int(tokens[2]) >= 2**64:
+            return b"CLIENT_ERROR invalid numeric delta argument\r\n"
+        item = self.fetch(tokens[1])
+        if item is None:
+            self.stats[name+"_misses"] += 1
+            return b"NOT_FOUND\r\n"
+        result = self.arithmeticResult(item, int(tokens[2]), name == "incr")
+        if result is None:
+            return b"CLIENT_ERROR cannot increment or decrement non-numeric value\r\n"
+        self.stats[name+"_hits"] += 1
+        self.store(tokens[1], str(result).encode(), item.flags, item.exptime)
+        return b"%d\r\n" % result
+
+    def touch(self, tokens, data):
+        self.stats["cmd_touch"] += 1
+        item = self.fetch(tokens[1])
+        if item is None:
+            self.stats["touch_misses"] += 1
+            return b"NOT_FOUND\r\n"
+        self.stats["touch_hits"] += 1
+        item.exptime = self.absoluteExptime(int(tokens[2]))
+        return b"TOUCHED\r\n"
+
+    def flushAll(self, tokens, data):
+        delay = int(tokens[1]) if len(tokens) > 1 else 0
+        if delay > 0:
+            #the items expire at the given time, like the lazy flush of memcached
+            flushTime = self.absoluteExptime(delay)
+            for item in self.items.values():
+                if item.exptime == 0 or item.exptime > flushTime:
+                    item.exptime = flushTime
+        else:
+            self.items.clear()
+            self.bytes = 0
+        return b"OK\r\n"
+
+    def version(self, tokens, data):
+        return b"VERSION %s\r\n" % FAKE_SERVER_VERSION.encode()
+
+    def verbosity(self, tokens, data):
+        return b"OK\r\n"
+
+    def statsCommand(self, tokens, data):
+        if len(tokens) > 1:
+            if tokens[1] == b"reset":
+                for name in self.stats:
+                    self.stats[name] = 0
+                return b"RESET\r\n"
+            group = self.statsGroups.get(tokens[1])
+            return self.statLines(group() if group is not None else {})
+        now = self.clock()
+        stats = {
+            "pid": os.getpid(), "uptime": int(now-self.started), "time": int(now), "version": FAKE_SERVER_VERSION,
+            "curr_connections": len(self.connections), "curr_items": len(self.items), "bytes": self.bytes,
+            "limit_maxbytes": self.maxBytes, "threads": 1
+        }
+        stats.update(self.stats)
+        return self.statLines(stats)
+
+    def statLines(self, stats):
+        return b"".join(b"STAT %s %s\r\n" % (name.encode(), str(value).encode()) for name, value in stats.items())+b"END\r\n"
+
+    def settingsStats(self):
+        return {"maxbytes": self.maxBytes, "maxconns": 1024, "tcpport": self.port or 0, "evictions": "on",
+            "item_size_max": self.itemSizeMax, "cas_enabled": "yes", "lru_crawler": "yes"}
+
+    #All the items are kept in slab class 1, which is only listed once it holds items like on memcached
+    def slabsStats(self):
+        if not self.items:
+            return {"active_slabs": 0, "total_malloced": 0}
+        chunkSize = self.itemSizeMax+ITEM_OVERHEAD
+        return {"1:chunk_size": chunkSize, "1:chunks_per_page": 1, "1:total_pages": len(self.items),
+            "1:total_chunks": len(self.items), "1:used_chunks": len(self.items), "1:free_chunks": 0,
+            "1:get_hits": self.stats["get_hits"], "1:cmd_set": self.stats["cmd_set"],
+            "active_slabs": 1, "total_malloced": chunkSize*len(self.items)}
+
+    def itemsStats(self):
+        if not self.items:
+            return {}
+        oldest = min(item.lastAccess for item in self.items.values())
+        return {"items:1:number": len(self.items), "items:1:age": int(self.clock()-oldest),
+            "items:1:evicted": self.stats["evictions"], "items:1:outofmemory": 0}
+
+    def lruCrawler(self, tokens, data):
+        if tokens[1:] != [b"metadump", b"all"]:
+            return b"CLIENT_ERROR bad command line format\r\n"
+        response = []
+        for key, item in list(self.items.items()):
+            if self.fetch(key, touch=False) is None:
+                continue
+            exptime = -1 if item.exptime == 0 else int(item.exptime)
+            response.append(b"key=%s exp=%d la=%d cas=%d fetch=no cls=1 size=%d\r\n" % (quote(key).encode(), exptime,
+                int(item.lastAccess), item.cas, len(key)+len(item.value)+ITEM_OVERHEAD))
+        response.append(b"END\r\n")
+        return b"".join(response)
+
+    #Meta commands, the flags are single letters optionally followed by a token
+
+    def metaFlags(self, tokens):
+        return [(token[:1].decode(), token[1:]) for token in tokens]
+
+    def metaResponse(self, code, key, item, flags, value=None):
+        """Builds the response line with the return flags asked for, in the order they were asked for"""
+        returned = []
+        for flag, token in flags:
+            if flag == "O":
+                returned.append(b"O"+token)
+            elif flag == "k":
+                returned.append(b"k"+key)
+            elif item is not None and flag == "f":
+                returned.append(b"f%d" % item.flags)
+            elif item is not None and flag == "c":
+                returned.append(b"c%d" % item.cas)
+            elif item is not None and flag == "t":
+                returned.append(b"t%d" % self.ttl(item))
+            elif item is not None and flag == "s":
+                returned.append(b"s%d" % len(item.value))
+            elif item is not None and flag == "l":
+                returned.append(b"l%d" % int(self.clock()-item.lastAccess))
+        if value is not None:
+            return b"".join((b" ".join([b"VA %d" % len(value)]+returned), b"\r\n", value, b"\r\n"))
+        return b" ".join([code]+returned)+b"\r\n"
+
+    def metaGet(self, tokens, data):
+        key, flags = tokens[1], self.metaFlags(tokens[2:])
+        letters = dict(flags)
+        self.stats["cmd_get"] += 1
+        item = self.fetch(key, touch=False) #l is the time since the access before this one
+        if item is None:
+            self.stats["get_misses"] += 1
+            return b"" if "q" in letters else self.metaResponse(b"EN", key, None, flags)
+        self.stats["get_hits"] += 1
+        if "T" in letters:
+            item.exptime = self.absoluteExptime(int(letters["T"]))
+        response = self.metaResponse(b"HD", key, item, flags, item.value if "v" in letters else None)
+        self.fetch(key)
+        return response
+
+    def metaSet(self, tokens, data):
+        key, flags = tokens[1], self.metaFlags(tokens[3:])
+        letters = dict(flags)
+        mode = letters.get("M", b"S").upper()
+        if mode not in (b"S", b"E", b"R", b"A", b"P"):
+            return b"CLIENT_ERROR invalid mode for ms\r\n"
+        self.stats["cmd_set"] += 1
+        item = self.fetch(key, touch=False)
+        if "C" in letters:
+            if item is None:
+                self.stats["cas_misses"] += 1
+                return self.metaResponse(b"NF", key, None, flags)
+            if item.cas != int(letters["C"]):
+                self.stats["cas_badval"] += 1
+                return self.metaResponse(b"EX", key, item, flags)
+            self.stats["cas_hits"] += 1
+        if (mode == b"E" and item is not None) or (mode in (b"R", b"A", b"P") and item is None):
+            return self.metaResponse(b"NS", key, item, flags)
+        flagsValue = int(letters.get("F", b"0"))
+        exptime = self.absoluteExptime(int(letters.get("T", b"0")))
+        if mode == b"A":
+            data, flagsValue, exptime = item.value+data, item.flags, item.exptime
+        elif mode == b"P":
+            data, flagsValue, exptime = data+item.value, item.flags, item.exptime
+        item = self.store(key, data, flagsValue, exptime)
+        return b"" if "q" in letters else self.metaResponse(b"HD", key, item, flags)
+
+    def metaDelete(self, tokens, data):
+        key, flags = tokens[1], self.metaFlags(tokens[2:])
+        letters = dict(flags)
+        item = self.fetch(key, touch=False)
+        if item is None:
+            self.stats["delete_misses"] += 1
+            return b"" if "q" in letters else self.metaResponse(b"NF", key, None, flags)
+        if "C" in letters and item.cas != int(letters["C"]):
+            return self.metaResponse(b"EX", key, item, flags)
+        self.stats["delete_hits"] += 1
+        self.remove(key)
+        return b"" if "q" in letters else self.metaResponse(b"HD", key, None, flags)
+
+    def metaArithmetic(self, tokens, data):
+        key, flags = tokens[1], self.metaFlags(tokens[2:])
+        letters = dict(flags)
+        incr = letters.get("M", b"I").upper() in (b"I", b"+")
+        name = "incr" if incr else "decr"
+        delta = letters.get("D", b"1")
+        if not delta.isdigit():
+            return b"CLIENT_ERROR invalid numeric delta argument\r\n"
+        item = self.fetch(key)
+        if item is None:
+            self.stats[name+"_misses"] += 1
+            if "N" not in letters:
+                return self.metaResponse(b"NF", key, None, flags)
+            #autovivify with the initial value
+            item = self.store(key, letters.get("J", b"0"), 0, self.absoluteExptime(int(letters["N"])))
+        else:
+            if "C" in letters and item.cas != int(letters["C"]):
+                return self.metaResponse(b"EX", key, item, flags)
+            result = self.arithmeticResult(item, int(delta), incr)
+            if result is None:
+                return b"CLIENT_ERROR cannot increment or decrement non-numeric value\r\n"
+            self.stats[name+"_hits"] += 1
+            item = self.store(key, str(result).encode(), item.flags, item.exptime)
+        if "T" in letters:
+            item.exptime = self.absoluteExptime(int(letters["T"]))
+        if "v" in letters:
+            return self.metaResponse(b"VA", key, item, flags, item.value)
+        return b"" if "q" in letters else self.metaResponse(b"HD", key, item, flags)
+
+    def metaNoop(self, tokens, data):
+        return b"MN\r\n"
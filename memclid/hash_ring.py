@@ -0,0 +1,41 @@
+import hashlib
+from bisect import bisect_left
+
+class MemclidHashRing:
+    """
+    Ketama consistent hash ring mapping keys to memcached servers
+
+    Every server gets 160 points on the ring (scaled by its share of the total weight), 4 points for every
+    md5 digest of "host:port-i" like the original ketama library, so other ketama clients place keys the same way.
+    The points are kept in a sorted list, a key is mapped to the first point at or after its hash (wrapping around)
+    with a binary search
+
+    Attributes:
+        servers -- list of (host, port, weight)
+        points -- sorted hash values of the points on the ring
+        pointServers -- index (in servers) of the server owning the point at the same position in points
+    """
+    def __init__(self, servers):
+        self.servers = list(servers)
+        totalWeight = sum(weight for host, port, weight in self.servers)
+        ring = []
+        for index, (host, port, weight) in enumerate(self.servers):
+            digests = max(int(weight/totalWeight*40*len(self.servers)),1)
+            for i in range(digests):
+                digest = hashlib.md5((host+":"+str(port)+"-"+str(i)).encode()).digest()
+                for h in range(4):
+                    ring.append((self.pointFromDigest(digest,h),index))
+        ring.sort()
+        self.points = [point for point, index in ring]
+        self.pointServers = [index for point, index in ring]
+
+    def pointFromDigest(self, digest, h):
+        return (digest[3+h*4] << 24) | (digest[2+h*4] << 16) | (digest[1+h*4] << 8) | digest[h*4]
+
+    def getServer(self, key):
+        """Returns the index (in servers) of the server the key is stored on"""
+        point = self.pointFromDigest(hashlib.md5(key.encode()).digest(),0)
+        position = bisect_left(self.points,point)
+        if position == len(self.points):
+            position = 0
+        return self.pointServers[position]
@@ -0,0 +1,75 @@
+class MemclidHistogram:
+    """
+    Latency histogram with HDR-style log-linear buckets
+
+    Values (integers, e.g. microseconds) below 2**subBucketBits get a bucket of their own, larger values are
+    kept with subBucketBits significant bits (2**-(subBucketBits-1) relative error, under 2% by default), so
+    the memory used only grows with the log of the largest value and recording a value is a few integer operations.
+    Histograms of several threads can be merged before reading the percentiles
+
+    Attributes:
+        counts -- number of values recorded in every bucket
+        count -- number of values recorded
+        total -- sum of the values recorded
+        min -- smallest value recorded (None when empty)
+        max -- largest value recorded (None when empty)
+    """
+    def __init__(self, subBucketBits=7):
+        self.subBucketBits = subBucketBits
+        self.halfCount = 1 << (subBucketBits-1)
+        self.counts = []
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def bucketIndex(self, value):
+        shift = value.bit_length()-self.subBucketBits
+        if shift <= 0:
+            return value
+        return shift*self.halfCount+(value >> shift)
+
+    def bucketValue(self, index):
+        #highest value that falls in the bucket, so percentiles are never reported lower than they were
+        if index < 2*self.halfCount:
+            return index
+        shift = index//self.halfCount-1
+        return ((index-shift*self.halfCount+1) << shift)-1
+
+    def record(self, value):
+        value = max(int(value), 0)
+        index = self.bucketIndex(value)
+        if index >= len(self.counts):
+            self.counts.extend([0]*(index+1-len(self.counts)))
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0]*(len(other.counts)-len(self.counts)))
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def percentile(self, percent):
+        """Returns the value below which percent % of the recorded values are (None when empty)"""
+        if self.count == 0:
+            return None
+        target = max(1, -(-self.count*percent//100)) #rank of the value, rounded up
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self.bucketValue(index), self.max)
+        return self.max
+
+    def mean(self):
+        return self.total/self.count if self.count else None
@@ -0,0 +1,93 @@
+import threading
+from collections import namedtuple
+from .constants import *
+from .histogram import MemclidHistogram
+
+#Event passed to the hooks of a MemclidUtility once a request completed (or failed):
+#command -- name of the request (get, set, mg, ...)
+#keys -- number of keys in the request
+#bytesSent, bytesReceived -- size of the request and of its response
+#sendTime -- seconds spent writing the request to the socket (shared by the requests of a pipelined group)
+#waitTime -- seconds from the end of the send until the whole response was read
+#parseTime -- seconds spent turning the response into the result
+#outcome -- hit, miss or partial (some of the keys found) for retrievals, stored, not_stored, deleted, not_deleted,
+#    sent for noreply requests and error when an exception was raised
+#hits -- number of keys found by a retrieval
+#error -- the exception raised, None otherwise
+MemclidCommandEvent = namedtuple("MemclidCommandEvent", ["command", "keys", "bytesSent", "bytesReceived", "sendTime",
+    "waitTime", "parseTime", "outcome", "hits", "error"])
+
+STATUS_OUTCOMES = {
+    STATUS_DATA_AVAILABLE: "hit",
+    STATUS_DATA_NOT_AVAILABLE: "miss",
+    STATUS_RECORD_STORED: "stored",
+    STATUS_RECORD_NOT_STORED: "not_stored",
+    STATUS_RECORD_DELETED: "deleted",
+    STATUS_RECORD_NOT_DELETED: "not_deleted",
+    STATUS_REQUEST_SENT: "sent"
+}
+
+def commandOutcome(result, error):
+    """Returns (outcome, hits) for the result of a request, see MemclidCommandEvent"""
+    if error is not None:
+        return "error", 0
+    if "status" in result:
+        outcome = STATUS_OUTCOMES.get(result["status"], "unknown")
+        return outcome, int(outcome == "hit")
+    #mapping of key to result of a multi key retrieval
+    hits = sum(1 for keyResult in result.values() if keyResult["status"] == STATUS_DATA_AVAILABLE)
+    if hits == len(result):
+        return "hit", hits
+    return ("miss" if hits == 0 else "partial"), hits
+
+class MemclidMetrics:
+    """
+    Hook keeping counters and latency histograms for every command, it can be shared by the utilities of many threads
+
+        metrics = MemclidMetrics()
+        memclidUtility.addHook(metrics)
+        metrics.snapshot()["get"]["latency"].percentile(99)
+
+    Recording an event is a few additions and histogram updates, the latencies are kept in microseconds
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.commands = {}
+
+    def __call__(self, event):
+        with self.lock:
+            stats = self.commands.get(event.command)
+            if stats is None:
+                stats = self.commands[event.command] = self.newStats()
+            stats["count"] += 1
+            stats["keys"] += event.keys
+            stats["hits"] += event.hits
+            stats["bytesSent"] += event.bytesSent
+            stats["bytesReceived"] += event.bytesReceived
+            stats["outcomes"][event.outcome] = stats["outcomes"].get(event.outcome, 0)+1
+            stats["send"].record(event.sendTime*1000000)
+            stats["wait"].record(event.waitTime*1000000)
+            stats["parse"].record(event.parseTime*1000000)
+            stats["latency"].record((event.sendTime+event.waitTime+event.parseTime)*1000000)
+
+    def newStats(self):
+        return {
+            "count": 0, "keys": 0, "hits": 0, "bytesSent": 0, "bytesReceived": 0, "outcomes": {},
+            "send": MemclidHistogram(), "wait": MemclidHistogram(), "parse": MemclidHistogram(), "latency": MemclidHistogram()
+        }
+
+    def snapshot(self):
+        """Returns a copy of the stats of every command: count, keys, hits, bytesSent, bytesReceived, the count
+        of every outcome and the histograms of the send, wait and parse times and of the whole latency"""
+        with self.lock:
+            snapshot = {}
+            for command, stats in self.commands.items():
+                copy = dict(stats, outcomes=dict(stats["outcomes"]))
+                for phase in ("send", "wait", "parse", "latency"):
+                    copy[phase] = MemclidHistogram().merge(stats[phase])
+                snapshot[command] = copy
+            return snapshot
+
+    def reset(self):
+        with self.lock:
+            self.commands = {}
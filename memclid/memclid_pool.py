@@ -0,0 +1,187 @@
+import select
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from .exceptions import *
+from .config import DEFAULT_MEMCLID_HOST, DEFAULT_MEMCLID_PORT, MEMCLID_POOL_MAX_SIZE, MEMCLID_POOL_IDLE_TIMEOUT
+from .memclid_socket import MemclidSocket
+from .svc_memclid import MemclidUtility
+
+class MemclidPool:
+    """
+    Thread safe pool of connected MemclidSockets
+
+    A connection is checked out for a single call and checked back in right after, so many threads can share
+    a few connections. At most maxSize connections are open at once, checkout waits (up to timeout seconds,
+    forever if it is None) for one to be checked in when all of them are in use. Idle connections are
+    closed once they haven't been used for idleTimeout seconds, and are health checked before being handed out.
+
+    The get/gets/set/add/replace/append/prepend/cas/delete/incr/decr/setMany/setFile/getFile methods work like the
+    MemclidUtility ones on a connection borrowed from the pool, hooks are called for every request like the ones of a MemclidUtility
+    and nearCache (a MemclidNearCache), compressor (a MemclidCompressor) and serializer (a MemclidSerializer)
+    are shared by all the calls. The connections are opened to the unix domain socket at socketPath when it is given,
+    with socketOptions as the keyword arguments of every MemclidSocket (noDelay, keepAlive, connectTimeout, readTimeout...).
+    The deadline every method takes (see MemclidUtility.execute) also bounds the wait for a connection, and a connection
+    whose request timed out is closed instead of being checked back in. droppedWrites is the number of noreply requests
+    that failed on any of the connections
+    """
+    def __init__(self, host=None, port=None, maxSize=MEMCLID_POOL_MAX_SIZE, idleTimeout=MEMCLID_POOL_IDLE_TIMEOUT, timeout=None, hooks=None, nearCache=None, compressor=None, serializer=None,
+            socketPath=None, socketOptions=None):
+        self.host = socketPath or host or DEFAULT_MEMCLID_HOST
+        self.port = None if socketPath else port or DEFAULT_MEMCLID_PORT
+        self.socketOptions = socketOptions or {}
+        self.maxSize = maxSize
+        self.idleTimeout = idleTimeout
+        self.timeout = timeout
+        self.hooks = list(hooks) if hooks else []
+        self.nearCache = nearCache
+        self.compressor = compressor
+        self.serializer = serializer
+        self.idle = deque() #(socket, time it was checked in), the most recently used socket is at the right end
+        self.opened = 0
+        self.droppedWrites = 0 #total of the droppedWrites of the connections (see MemclidSocket.sendNoreply)
+        self.condition = threading.Condition()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+    def checkout(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        deadline = None if timeout is None else time.monotonic()+timeout
+        with self.condition:
+            while True:
+                self.closeExpired()
+                while self.idle:
+                    #LIFO so that the connections used the least get old enough to be closed when the load drops
+                    memclidSocket, checkedInAt = self.idle.pop()
+                    if time.monotonic()-checkedInAt <= self.idleTimeout and self.isHealthy(memclidSocket):
+                        return memclidSocket
+                    self.discard(memclidSocket)
+                if self.opened < self.maxSize:
+                    self.opened = self.opened+1
+                    break
+                remaining = None if deadline is None else deadline-time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise MemclidPoolTimeoutError(self.host,self.port)
+                self.condition.wait(remaining)
+        #connecting is done outside the lock so that other threads can keep checking out idle connections
+        try:
+            memclidSocket = MemclidSocket(**self.socketOptions)
+            memclidSocket.connect(self.host,self.port)
+            return memclidSocket
+        except:
+            with self.condition:
+                self.opened = self.opened-1
+                self.condition.notify()
+            raise
+
+    def checkin(self, memclidSocket, broken=False):
+        """Returns a connection to the pool, broken connections (or ones with unread data, or that the socket marked broken) are closed instead"""
+        with self.condition:
+            if broken or memclidSocket.broken is not None or memclidSocket.bufferPos != len(memclidSocket.buffer):
+                self.discard(memclidSocket)
+            else:
+                self.idle.append((memclidSocket, time.monotonic()))
+            self.closeExpired()
+            self.condition.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        memclidSocket = self.checkout(timeout)
+        try:
+            yield memclidSocket
+        except BaseException:
+            #the request/response cycle may have been cut in half, so the connection can't be trusted anymore
+            self.checkin(memclidSocket, broken=True)
+            raise
+        self.checkin(memclidSocket)
+
+    def close(self):
+        with self.condition:
+            while self.idle:
+                memclidSocket, checkedInAt = self.idle.pop()
+                self.discard(memclidSocket)
+
+    def closeExpired(self):
+        #has to be called with the lock held, the connections idle the longest are at the left end
+        while self.idle and time.monotonic()-self.idle[0][1] > self.idleTimeout:
+            memclidSocket, checkedInAt = self.idle.popleft()
+            self.discard(memclidSocket)
+
+    def isHealthy(self, memclidSocket):
+        #An idle connection should have nothing to read, it is readable when the server closed it (or sent something unexpected)
+        try:
+            readable, writable, failed = select.select([memclidSocket.sock],[],[],0)
+            return len(readable) == 0
+        except:
+            return False
+
+    def discard(self, memclidSocket):
+        #has to be called with the lock held
+        self.opened = self.opened-1
+        try:
+            memclidSocket.disconnect()
+        except:
+            try:
+                memclidSocket.sock.close() #shutdown fails when the server already closed the connection
+            except:
+                pass
+
+    def execute(self, command, *args, deadline=None):
+        #with a deadline, waiting for a connection counts against it too
+        timeout = None
+        if deadline is not None:
+            timeout = deadline-time.monotonic() if self.timeout is None else min(self.timeout,deadline-time.monotonic())
+        with self.connection(timeout) as memclidSocket:
+            droppedWrites = memclidSocket.droppedWrites
+            try:
+                return getattr(MemclidUtility(memclidSocket,self.hooks,self.nearCache,self.compressor,self.serializer), command)(*args,deadline=deadline)
+            finally:
+                with self.condition:
+                    self.droppedWrites = self.droppedWrites + memclidSocket.droppedWrites - droppedWrites
+
+    def get(self,keys,deadline=None):
+        return self.execute("get",keys,deadline=deadline)
+
+    def set(self,key,value,flag,exptime,noreply=False,deadline=None):
+        return self.execute("set",key,value,flag,exptime,noreply,deadline=deadline)
+
+    def add(self,key,value,flag,exptime,noreply=False,deadline=None):
+        return self.execute("add",key,value,flag,exptime,noreply,deadline=deadline)
+
+    def replace(self,key,value,flag,exptime,noreply=False,deadline=None):
+        return self.execute("replace",key,value,flag,exptime,noreply,deadline=deadline)
+
+    def append(self,key,value,noreply=False,deadline=None):
+        return self.execute("append",key,value,noreply,deadline=deadline)
+
+    def prepend(self,key,value,noreply=False,deadline=None):
+        return self.execute("prepend",key,value,noreply,deadline=deadline)
+
+    def gets(self,keys,deadline=None):
+        return self.execute("gets",keys,deadline=deadline)
+
+    def cas(self,key,value,cas_unique,flag,exptime,deadline=None):
+        return self.execute("cas",key,value,cas_unique,flag,exptime,deadline=deadline)
+
+    def delete(self,key,noreply=False,deadline=None):
+        return self.execute("delete",key,noreply,deadline=deadline)
+
+    def incr(self,key,value,noreply=False,deadline=None):
+        return self.execute("incr",key,value,noreply,deadline=deadline)
+
+    def decr(self,key,value,noreply=False,deadline=None):
+        return self.execute("decr",key,value,noreply,deadline=deadline)
+
+    def setMany(self,items,flag,exptime,deadline=None):
+        return self.execute("setMany",items,flag,exptime,deadline=deadline)
+
+    def setFile(self,key,file,flag,exptime,noreply=False,size=None,deadline=None):
+        return self.execute("setFile",key,file,flag,exptime,noreply,size,deadline=deadline)
+
+    def getFile(self,key,file,deadline=None):
+        return self.execute("getFile",key,file,deadline=deadline)
@@ -1,25 +1,93 @@
+import os
 import socket
-import re
+import select
+import stat
+import time
 from .exceptions import *
+from .config import MEMCLID_RECV_CHUNK_SIZE, MEMCLID_SOCKET_NODELAY
+from .protocol import raiseIfError
 
 class MemclidSocket:
-    def __init__(self, sock=None):
+    def __init__(self, sock=None, noDelay=MEMCLID_SOCKET_NODELAY, keepAlive=False, sendBufferSize=None, receiveBufferSize=None, connectTimeout=None,
+            readTimeout=None, writeTimeout=None):
+        """sock is used as the connection when it is given, otherwise connect opens one with these options: noDelay sets
+        TCP_NODELAY so that small (pipelined) requests aren't held back by Nagle's algorithm, keepAlive sets SO_KEEPALIVE
+        so that the system probes idle connections, sendBufferSize and receiveBufferSize set SO_SNDBUF and SO_RCVBUF (the
+        system defaults otherwise) and connectTimeout is how many seconds connecting to an address can take (no limit by default)
+
+        readTimeout and writeTimeout are how many seconds a single receive or send can wait for the server (no limit by
+        default), see also setDeadline. Going past them raises MemclidTimeoutError and the connection can't be used anymore,
+        unless nothing of the request was sent yet"""
         try:
-            if sock is None:
-                self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            else:
-                self.sock = sock
+            self.sock = sock
+            self.readTimeout = readTimeout
+            self.writeTimeout = writeTimeout
+            self.deadline = None
+            self.appliedTimeout = None #timeout currently set on sock, only changed when another one is needed
+            self.timedOut = False
+            self.broken = None #why the connection can't be used anymore, requests are refused once it is set
+            self.noDelay = noDelay
+            self.keepAlive = keepAlive
+            self.sendBufferSize = sendBufferSize
+            self.receiveBufferSize = receiveBufferSize
+            self.connectTimeout = connectTimeout
+            self.buffer = bytearray()
+            self.bufferPos = 0
+            self.droppedWrites = 0 #noreply requests that couldn't be sent or that the server replied to with an error
+            self.noreplyPending = False
+            self.barrierPending = False #a barrier was sent ahead of the last request, its reply has to be read first
+            self.bytesSent = 0 #totals over the life of the connection, read by instrumentation
+            self.bytesReceived = 0
+            """bytes received from the server but not consumed yet live in buffer[bufferPos:], the consumed
+            prefix is only dropped once it grows past half of the buffer so that we dont memmove on every line"""
         except:
             raise MemclidConnectionError()
 
-    def connect(self, host, port):
+    def connect(self, host, port=None):
+        """Connects to memcached server over TCP at host:port, host being a name (every IPv4 and IPv6 address it
+        resolves to is tried in turn) or an address, or over the unix domain socket at the path host when port is None"""
         try:
             self.host=host
             self.port=port
-            self.sock.connect((host, port))
+            address = host if port is None else (host, port)
+            if self.sock is not None:
+                self.sock.connect(address)
+            elif port is None:
+                self.sock = self.openSocket(socket.AF_UNIX, address)
+            else:
+                self.sock = self.openTcpSocket(host, port)
             #print("Connected to Memcached server successfully" + " (host: " + str(host) + ", port: " + str(port) +")" )
         except: 
             raise MemclidConnectionError(host,port)
+
+    def openTcpSocket(self, host, port):
+        #connects to the first address of host that accepts the connection, like socket.create_connection
+        error = None
+        for family, socketType, proto, canonname, address in socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM):
+            try:
+                return self.openSocket(family, address)
+            except OSError as err:
+                error = err
+        raise error
+
+    def openSocket(self, family, address):
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            if family in (socket.AF_INET, socket.AF_INET6):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1 if self.noDelay else 0)
+                if self.keepAlive:
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            if self.sendBufferSize:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.sendBufferSize)
+            if self.receiveBufferSize:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.receiveBufferSize)
+            sock.settimeout(self.connectTimeout)
+            sock.connect(address)
+            sock.settimeout(self.appliedTimeout)
+            return sock
+        except:
+            sock.close()
+            raise
     
     def disconnect(self):
         try:
@@ -30,39 +98,331 @@ class MemclidSocket:
             """close does the actual memory related closing of the connection on python side, also its supposed to send a TSP
             RST (RESET) response to the server"""
             self.sock = None
+            self.buffer = bytearray()
+            self.bufferPos = 0
             #print("Disconnected from Memcached server successfully" + " (host: " + str(self.host) + ", port: " + str(self.port) +")" )
         except:
             raise MemclidDisconnectError(self.host,self.port)
     
-    def send(self, msg):
+    def setDeadline(self, deadline):
+        """Sending and receiving fail with MemclidTimeoutError once time.monotonic() is past deadline (until it is set
+        again, None removes it), so that all the requests of a call fit in one time budget. The read and write
+        timeouts still apply to every single receive and send"""
+        self.deadline = deadline
+
+    def waitFor(self, timeout, reading=False):
+        #sets the timeout of the next blocking call on the socket, shortened to the time left before the deadline
+        if self.deadline is not None:
+            remaining = self.deadline - time.monotonic()
+            if remaining <= 0:
+                #past the deadline what the server already sent is still read, nothing is waited for anymore
+                if reading and select.select([self.sock],[],[],0)[0]:
+                    return
+                raise socket.timeout()
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        if timeout != self.appliedTimeout:
+            self.sock.settimeout(timeout)
+            self.appliedTimeout = timeout
+
+    def timeoutError(self):
+        #a response may still arrive for the request that timed out, it would be read as the response to the next one
+        self.timedOut = True
+        self.broken = "A previous request timed out on the connection"
+        return MemclidTimeoutError(self.host,self.port)
+
+    def send(self, msg, noreply=False):
+        """Sends msg, noreply is set when the server won't reply to it (see sendNoreply)
+
+        The server may still reply with errors to the noreply requests sent before, even after msg is sent. So a
+        request expecting a reply is preceded by a barrier request, and the replies up to the one to the barrier are
+        read (and counted in droppedWrites) before the response to msg, see readBarrier"""
         try:
-            totalsent = 0
-            while totalsent < len(msg):
-                sent = self.sock.send(msg[totalsent:].encode())
-                if sent == 0:
-                    raise MemclidConnectionBreakError(self.host,self.port)
-                totalsent = totalsent + sent
-        except MemclidConnectionBreakError as err:
+            if self.broken is not None:
+                raise MemclidConnectionBreakError(self.host,self.port,self.broken)
+            if self.noreplyPending and noreply:
+                #keeps the errors from piling up on the connection while only noreply requests are sent
+                if not self.barrierPending:
+                    self.droppedWrites = self.droppedWrites + self.discardPending()
+            elif self.noreplyPending:
+                self.sendAll(self.barrierRequest())
+                self.noreplyPending = False
+                self.barrierPending = True
+            if isinstance(msg, str):
+                msg = msg.encode()
+            self.sendAll(msg)
+        except (MemclidConnectionBreakError, MemclidTimeoutError) as err:
             raise err
+        except socket.timeout:
+            raise self.timeoutError()
         except:
             raise MemclidSendError(self.host,self.port)
 
+    def sendAll(self, msg):
+        view = memoryview(msg).cast("B") #a partial send only advances the view, slicing it doesn't copy the rest of the message
+        totalsent = 0
+        while totalsent < len(view):
+            try:
+                self.waitFor(self.writeTimeout)
+                sent = self.sock.send(view[totalsent:])
+            except socket.timeout:
+                if totalsent == 0:
+                    #nothing of msg was written, so no response can arrive late and the connection can still be used
+                    raise MemclidTimeoutError(self.host,self.port,"The request couldn't be sent in time")
+                raise
+            if sent == 0:
+                raise MemclidConnectionBreakError(self.host,self.port)
+            totalsent = totalsent + sent
+        self.bytesSent = self.bytesSent + totalsent
+
+    def barrierRequest(self):
+        #every server replies to it, so the replies read before its own belong to the noreply requests sent before it
+        return b"version\r\n"
+
+    def readBarrier(self):
+        #called before reading the response to the request sent after the barrier
+        self.barrierPending = False
+        while not self.readLine().startswith(b"VERSION "):
+            self.droppedWrites = self.droppedWrites + 1
+
+    def sendNoreply(self, msg):
+        """Sends a request the server doesn't reply to when it succeeds
+
+        The writes that fail are counted in droppedWrites: the ones that couldn't be sent (the error is still raised)
+        and the ones the server replied to with an error, which are read before the response to the next request"""
+        try:
+            self.send(msg, noreply=True)
+            self.noreplyPending = True
+        except (MemclidConnectionBreakError, MemclidSendError, MemclidTimeoutError) as err:
+            self.droppedWrites = self.droppedWrites + 1
+            raise err
+
+    def sendFile(self, header, file, size, noreply=False):
+        """Sends header, then size bytes of file (opened in binary mode, from its current position) and the \r\n ending
+        the data block, without reading the file into memory: a regular file is copied to the socket by the kernel with
+        sendfile, any other file is read in blocks
+
+        With noreply the request is sent like with sendNoreply"""
+        try:
+            self.send(header, noreply)
+            self.waitFor(self.writeTimeout)
+            if self.isRegularFile(file):
+                sent = self.sock.sendfile(file, file.tell(), size)
+            else:
+                sent = self.sendBlocks(file, size)
+            self.bytesSent = self.bytesSent + sent
+            if sent < size:
+                #the server is still waiting for the rest of the data block, the connection can't be used anymore
+                self.broken = "A previous value was sent only in part on the connection"
+                raise MemclidConnectionBreakError(self.host,self.port,"The file ended before the whole value was sent")
+            self.send(b"\r\n", True)
+            if noreply:
+                self.noreplyPending = True
+        except (MemclidConnectionBreakError, MemclidTimeoutError) as err:
+            if noreply:
+                self.droppedWrites = self.droppedWrites + 1
+            raise err
+        except socket.timeout:
+            if noreply:
+                self.droppedWrites = self.droppedWrites + 1
+            raise self.timeoutError()
+        except:
+            if noreply:
+                self.droppedWrites = self.droppedWrites + 1
+            raise MemclidSendError(self.host,self.port)
+
+    def sendBlocks(self, file, size):
+        #sends up to size bytes of a file sendfile can't copy from (like a pipe), read in blocks of fixed size
+        block = memoryview(bytearray(min(size, MEMCLID_RECV_CHUNK_SIZE)))
+        sent = 0
+        while sent < size:
+            read = file.readinto(block[:size-sent])
+            if not read:
+                break
+            self.waitFor(self.writeTimeout)
+            self.sock.sendall(block[:read])
+            sent = sent + read
+        return sent
+
+    def isRegularFile(self, file):
+        try:
+            return stat.S_ISREG(os.fstat(file.fileno()).st_mode)
+        except (AttributeError, OSError, ValueError):
+            return False
+
+    def discardPending(self):
+        """Reads the error replies to noreply requests the server already sent and returns how many there were
+
+        Raises MemclidConnectionBreakError if the server closed the connection"""
+        try:
+            while select.select([self.sock],[],[],0)[0]:
+                self.fillBuffer()
+            discarded = 0
+            while self.responseBuffered():
+                self.readPendingResponse()
+                discarded = discarded + 1
+            return discarded
+        except (MemclidConnectionBreakError, socket.timeout) as err:
+            raise err
+        except:
+            #e.g. the connection was reset by the server
+            raise MemclidConnectionBreakError(self.host,self.port)
+
+    def responseBuffered(self):
+        #the responses to noreply requests can only be errors, which are single lines
+        return self.buffer.find(b"\r\n", self.bufferPos) != -1
+
+    def readPendingResponse(self):
+        return self.readLine()
+
+    def fillBuffer(self):
+        self.waitFor(self.readTimeout, reading=True)
+        chunk = self.sock.recv(MEMCLID_RECV_CHUNK_SIZE)
+        if len(chunk)==0:
+            raise MemclidConnectionBreakError(self.host,self.port,"It was possibly a bad request")
+        self.buffer += chunk
+        self.bytesReceived = self.bytesReceived + len(chunk)
+
+    def compactBuffer(self):
+        if self.bufferPos == len(self.buffer):
+            self.buffer.clear()
+            self.bufferPos = 0
+        elif self.bufferPos > len(self.buffer)//2:
+            del self.buffer[:self.bufferPos]
+            self.bufferPos = 0
+
+    def readLine(self):
+        #Returns one complete line (including the trailing \r\n) as bytes, receiving more data if required
+        searchFrom = self.bufferPos
+        while True:
+            end = self.buffer.find(b"\r\n", searchFrom)
+            if end != -1:
+                line = bytes(self.buffer[self.bufferPos:end+2])
+                self.bufferPos = end+2
+                self.compactBuffer()
+                return line
+            searchFrom = max(self.bufferPos, len(self.buffer)-1) #the \r could already be at the end of the buffer
+            self.fillBuffer()
+
+    def readExact(self, size):
+        #Returns exactly size bytes, big data blocks are received straight into a preallocated buffer
+        available = len(self.buffer) - self.bufferPos
+        if available >= size:
+            data = bytes(self.buffer[self.bufferPos:self.bufferPos+size])
+            self.bufferPos += size
+            self.compactBuffer()
+            return data
+        data = bytearray(size)
+        view = memoryview(data)
+        view[:available] = self.buffer[self.bufferPos:]
+        self.buffer.clear()
+        self.bufferPos = 0
+        filled = available
+        while filled < size:
+            self.waitFor(self.readTimeout, reading=True)
+            received = self.sock.recv_into(view[filled:])
+            if received == 0:
+                raise MemclidConnectionBreakError(self.host,self.port,"It was possibly a bad request")
+            filled = filled + received
+            self.bytesReceived = self.bytesReceived + received
+        return data
+
+    def readInto(self, file, size):
+        #Writes the next size bytes received to file, the ones already buffered first and the rest through a block of fixed size
+        available = min(len(self.buffer) - self.bufferPos, size)
+        if available:
+            file.write(self.buffer[self.bufferPos:self.bufferPos+available])
+            self.bufferPos += available
+            self.compactBuffer()
+        remaining = size - available
+        block = memoryview(bytearray(min(remaining, MEMCLID_RECV_CHUNK_SIZE)))
+        while remaining:
+            self.waitFor(self.readTimeout, reading=True)
+            received = self.sock.recv_into(block[:remaining])
+            if received == 0:
+                raise MemclidConnectionBreakError(self.host,self.port,"It was possibly a bad request")
+            file.write(block[:received])
+            remaining = remaining - received
+            self.bytesReceived = self.bytesReceived + received
+
+    def readResponse(self):
+        """Reads one complete response from the server as bytes
+        
+        Retrieval responses are read line by line until END, and each data block is read using the length
+        sent in its VALUE line, the data block of a meta VA response is read using the length in the VA line,
+        every other response is a single line"""
+        line = self.readLine()
+        if line.startswith(b"VA "):
+            size = line.split(b" ",2)[1].strip()
+            if not size.isdigit():
+                raise MemclidUnrecognizedResponseSentByServer(self.host,self.port,line.decode(errors="replace"))
+            return line+self.readExact(int(size)+2)
+        if not line.startswith(b"VALUE "):
+            return line
+        response = bytearray()
+        while line != b"END\r\n":
+            header = line.split()
+            if len(header) < 4 or header[0] != b"VALUE" or not header[3].isdigit():
+                raise MemclidUnrecognizedResponseSentByServer(self.host,self.port,line.decode(errors="replace"))
+            response += line
+            response += self.readExact(int(header[3])+2)
+            line = self.readLine()
+        response += line
+        return bytes(response)
     
     def receive(self):
         try:
-            data = self.sock.recv(3072).decode()
-            if len(data)==0:
-                raise MemclidConnectionBreakError(self.host,self.port,"It was possibly a bad request")
-            clientErrorResult = re.search("^CLIENT_ERROR\s(.*)\r\n$", data)
-            serverErrorResult = re.search("^SERVER_ERROR\s(.*)\r\n$", data)
-            if data=="ERROR\r\n":
-                raise MemclidErrorSentByServer(self.host,self.port)
-            elif clientErrorResult:
-                raise MemclidClientErrorSentByServer(self.host,self.port,clientErrorResult.group(1))
-            elif serverErrorResult:
-                raise MemclidServerErrorSentByServer(self.host,self.port,serverErrorResult.group(1))
+            if self.barrierPending:
+                self.readBarrier()
+            data = self.readResponse()
+            self.raiseIfError(data)
+            return data
+        except (MemclidConnectionBreakError,MemclidErrorSentByServer,MemclidClientErrorSentByServer,MemclidServerErrorSentByServer,MemclidUnrecognizedResponseSentByServer) as err:
+            raise err
+        except socket.timeout:
+            raise self.timeoutError()
+        except:
+            raise MemclidRecvError(self.host,self.port)
+
+    def receiveValueInto(self, file):
+        """Reads the response to a get of a single key, writing its data block to file as it is received instead of
+        keeping it in memory, returns (flag, number of bytes written) or None when the key wasn't found"""
+        try:
+            if self.barrierPending:
+                self.readBarrier()
+            line = self.readLine()
+            self.raiseIfError(line)
+            if line == b"END\r\n":
+                return None
+            header = line.split()
+            if len(header) < 4 or header[0] != b"VALUE" or not header[3].isdigit():
+                raise MemclidUnrecognizedResponseSentByServer(self.host,self.port,line.decode(errors="replace"))
+            size = int(header[3])
+            self.readInto(file, size)
+            ending = self.readExact(2)+self.readLine()
+            if ending != b"\r\nEND\r\n":
+                raise MemclidUnrecognizedResponseSentByServer(self.host,self.port,ending.decode(errors="replace"))
+            return header[2].decode(), size
+        except (MemclidConnectionBreakError,MemclidErrorSentByServer,MemclidClientErrorSentByServer,MemclidServerErrorSentByServer,MemclidUnrecognizedResponseSentByServer) as err:
+            raise err
+        except socket.timeout:
+            raise self.timeoutError()
+        except:
+            raise MemclidRecvError(self.host,self.port)
+
+    def receiveLine(self):
+        #Reads a single line for responses that are streamed line by line (like lru_crawler metadump)
+        try:
+            if self.barrierPending:
+                self.readBarrier()
+            data = self.readLine()
+            self.raiseIfError(data)
             return data
         except (MemclidConnectionBreakError,MemclidErrorSentByServer,MemclidClientErrorSentByServer,MemclidServerErrorSentByServer) as err:
             raise err
+        except socket.timeout:
+            raise self.timeoutError()
         except:
-            raise MemclidRecvError(self.host,self.port)
\ No newline at end of file
+            raise MemclidRecvError(self.host,self.port)
+
+    def raiseIfError(self, data):
+        raiseIfError(data,self.host,self.port)
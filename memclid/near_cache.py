@@ -0,0 +1,161 @@
+import threading
+import time
+from collections import OrderedDict
+from .constants import *
+from .config import MEMCLID_NEAR_CACHE_MAX_BYTES, MEMCLID_NEAR_CACHE_TTL
+from .serialization import MemclidResult
+
+ENTRY_OVERHEAD = 120 #bytes counted for every entry on top of its key and value (entry, ordered dict node and strings)
+RELATIVE_EXPTIME_MAX = 60*60*24*30 #larger exptimes are absolute unix times
+
+class NearCacheEntry:
+    #value is None for an entry only remembering when the item expires on the server (written but not fetched since),
+    #the value of a MemclidResult is kept as its data and deserialized again by loads on every hit
+    __slots__ = ("value", "loads", "flag", "casUnique", "expiresAt", "itemExpiresAt", "size")
+
+    def __init__(self, value, loads, flag, casUnique, expiresAt, itemExpiresAt, size):
+        self.value = value
+        self.loads = loads
+        self.flag = flag
+        self.casUnique = casUnique
+        self.expiresAt = expiresAt
+        self.itemExpiresAt = itemExpiresAt
+        self.size = size
+
+class MemclidNearCache:
+    """
+    In-process LRU cache of the values fetched with get/gets, kept in front of the server by a MemclidUtility
+
+        nearCache = MemclidNearCache(maxBytes=16*1024*1024, ttl=5)
+        memclidUtility = MemclidUtility(memclidSocket, nearCache=nearCache)
+
+    A value is served locally for ttl seconds after it was fetched, or until the item expires on the server when
+    that is earlier (the expiry is known for the items written through the cache). The least recently used values
+    are evicted once the entries take more than maxBytes. The writes and deletes made through a MemclidUtility
+    using the cache invalidate the key, writes made by other clients are only seen once the ttl ran out, so the
+    ttl is how stale a value can get. Only hits are cached. The cache is thread safe, so it can be shared by
+    the utilities of a MemclidPool or a MemclidClusterUtility
+
+    Attributes:
+        hits, misses -- keys served from the cache and keys that had to be fetched from the server
+        evictions -- entries removed to stay within maxBytes
+        invalidations -- keys removed because they were written or deleted
+        bytes -- estimated memory taken by the entries
+    """
+    def __init__(self, maxBytes=MEMCLID_NEAR_CACHE_MAX_BYTES, ttl=MEMCLID_NEAR_CACHE_TTL, clock=time.time):
+        self.maxBytes = maxBytes
+        self.ttl = ttl
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.entries = OrderedDict() #least recently used first
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookupMany(self, command, keys):
+        """Returns (mapping of key to result for the keys found in the cache, list of the other keys)
+
+        gets is only served with entries fetched with gets, so that the cas unique value is known"""
+        withCas = command == "gets"
+        results = {}
+        missing = []
+        with self.lock:
+            now = self.clock()
+            for key in keys:
+                entry = self.entries.get(key)
+                if entry is None or entry.value is None or (withCas and entry.casUnique is None):
+                    missing.append(key)
+                    continue
+                if entry.expiresAt <= now:
+                    self.remove(key)
+                    missing.append(key)
+                    continue
+                self.entries.move_to_end(key)
+                result = {"flag": entry.flag, "message": "Fetched the value for "+key, "status": STATUS_DATA_AVAILABLE}
+                if withCas:
+                    result["cas_unique"] = entry.casUnique
+                if entry.loads is None:
+                    result["value"] = entry.value
+                else:
+                    result = MemclidResult(result, entry.value, entry.loads)
+                results[key] = result
+            self.hits = self.hits+len(results)
+            self.misses = self.misses+len(missing)
+        return results, missing
+
+    def storeMany(self, command, results):
+        """Caches the values found by a get/gets (results is a mapping of key to result)"""
+        withCas = command == "gets"
+        with self.lock:
+            now = self.clock()
+            for key, result in results.items():
+                if result["status"] != STATUS_DATA_AVAILABLE:
+                    continue
+                previous = self.entries.get(key)
+                itemExpiresAt = previous.itemExpiresAt if previous is not None else None
+                expiresAt = now+self.ttl if itemExpiresAt is None else min(now+self.ttl, itemExpiresAt)
+                if expiresAt <= now:
+                    continue
+                if previous is not None:
+                    self.remove(key)
+                if isinstance(result, MemclidResult):
+                    value, loads = result.data, result.loads
+                    size = memoryview(value).nbytes
+                else:
+                    value, loads = result["value"], None
+                    size = len(value)
+                entry = NearCacheEntry(value, loads, result["flag"], result.get("cas_unique") if withCas else None,
+                    expiresAt, itemExpiresAt, len(key)+size+ENTRY_OVERHEAD)
+                self.add(key, entry)
+
+    def invalidate(self, key, exptime=None):
+        """Removes the value of key after it was written (with exptime when the write sets it) or deleted"""
+        with self.lock:
+            previous = self.entries.get(key)
+            if previous is not None:
+                self.remove(key)
+                self.invalidations = self.invalidations+1
+            if exptime is None:
+                itemExpiresAt = previous.itemExpiresAt if previous is not None else None
+            else:
+                itemExpiresAt = self.expiresAt(exptime)
+            if itemExpiresAt is not None and itemExpiresAt > self.clock():
+                #remembers the expiry of the item for when it is fetched again
+                self.add(key, NearCacheEntry(None, None, None, None, 0, itemExpiresAt, len(key)+ENTRY_OVERHEAD))
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "invalidations": self.invalidations, "entries": len(self.entries), "bytes": self.bytes}
+
+    def expiresAt(self, exptime):
+        #time the item expires on the server like memcached reads exptime, None when it never expires
+        if exptime == 0:
+            return None
+        if exptime < 0:
+            return self.clock()
+        if exptime <= RELATIVE_EXPTIME_MAX:
+            return self.clock()+exptime
+        return exptime
+
+    #add and remove have to be called with the lock held
+    def add(self, key, entry):
+        self.entries[key] = entry
+        self.bytes = self.bytes+entry.size
+        while self.bytes > self.maxBytes and self.entries:
+            evictedKey, evicted = self.entries.popitem(last=False)
+            self.bytes = self.bytes-evicted.size
+            self.evictions = self.evictions+1
+
+    def remove(self, key):
+        self.bytes = self.bytes-self.entries.pop(key).size
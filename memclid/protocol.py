@@ -0,0 +1,119 @@
+import re
+from .exceptions import MemclidErrorSentByServer, MemclidClientErrorSentByServer, MemclidServerErrorSentByServer
+
+#Kinds of responses sent by the memcached server for the text protocol
+RESPONSE_VALUES="VALUES" #VALUE <key> <flags> <bytes> [<cas unique>] blocks terminated by END
+RESPONSE_END="END" #a retrieval response without any values
+RESPONSE_STORED="STORED"
+RESPONSE_NOT_STORED="NOT_STORED"
+RESPONSE_EXISTS="EXISTS"
+RESPONSE_NOT_FOUND="NOT_FOUND"
+RESPONSE_DELETED="DELETED"
+RESPONSE_NUMBER="NUMBER" #the new value sent for incr/decr
+RESPONSE_ERROR="ERROR"
+RESPONSE_CLIENT_ERROR="CLIENT_ERROR"
+RESPONSE_SERVER_ERROR="SERVER_ERROR"
+RESPONSE_META="META" #response to a meta command (VA, HD, EN, NS, EX, NF or MN followed by the return flags)
+RESPONSE_UNKNOWN="UNKNOWN"
+
+META_CODES = (b"VA", b"HD", b"EN", b"NS", b"EX", b"NF", b"MN")
+
+#responses made of a single fixed line are classified with one dict lookup
+FIXED_RESPONSES = {
+    b"END\r\n": RESPONSE_END,
+    b"STORED\r\n": RESPONSE_STORED,
+    b"NOT_STORED\r\n": RESPONSE_NOT_STORED,
+    b"EXISTS\r\n": RESPONSE_EXISTS,
+    b"NOT_FOUND\r\n": RESPONSE_NOT_FOUND,
+    b"DELETED\r\n": RESPONSE_DELETED,
+    b"ERROR\r\n": RESPONSE_ERROR
+}
+NUMBER_RESPONSE = re.compile(rb"(\d+)\r\n")
+ERROR_RESPONSE = re.compile(rb"(CLIENT_ERROR|SERVER_ERROR) (.*)\r\n", re.DOTALL)
+
+def classifyResponse(data):
+    """Returns (kind of the response, argument) for a complete response sent by the server
+
+    The argument is the number for RESPONSE_NUMBER, the message sent by the server for
+    RESPONSE_CLIENT_ERROR/RESPONSE_SERVER_ERROR, the two letter code for RESPONSE_META and None for everything else"""
+    kind = FIXED_RESPONSES.get(data)
+    if kind is not None:
+        return kind, None
+    if data.startswith(b"VALUE "):
+        return RESPONSE_VALUES, None
+    if data[:2] in META_CODES and data[2:3] in (b" ", b"\r"):
+        return RESPONSE_META, data[:2].decode()
+    numberResult = NUMBER_RESPONSE.fullmatch(data)
+    if numberResult:
+        return RESPONSE_NUMBER, numberResult.group(1).decode()
+    errorResult = ERROR_RESPONSE.fullmatch(data)
+    if errorResult:
+        return errorResult.group(1).decode(), errorResult.group(2).decode(errors="replace")
+    return RESPONSE_UNKNOWN, None
+
+def raiseIfError(data, host, port):
+    """Raises the exception matching an ERROR, CLIENT_ERROR or SERVER_ERROR response sent by the server at host, port"""
+    kind, argument = classifyResponse(data)
+    if kind == RESPONSE_ERROR:
+        raise MemclidErrorSentByServer(host,port)
+    elif kind == RESPONSE_CLIENT_ERROR:
+        raise MemclidClientErrorSentByServer(host,port,argument)
+    elif kind == RESPONSE_SERVER_ERROR:
+        raise MemclidServerErrorSentByServer(host,port,argument)
+
+def parseValues(data, withCas):
+    """Yields (key, flag, value, cas unique) for every VALUE block of a RESPONSE_VALUES/RESPONSE_END response
+
+    The data block is sliced using the length sent in its VALUE line and returned as bytes.
+    Raises ValueError if the response isn't framed correctly"""
+    pos = 0
+    fields = 5 if withCas else 4
+    while True:
+        lineEnd = data.find(b"\r\n",pos)
+        if lineEnd == -1:
+            raise ValueError("Response not terminated by END")
+        if lineEnd == pos+3 and data[pos:lineEnd] == b"END":
+            if lineEnd+2 != len(data):
+                raise ValueError("Data after END")
+            return
+        header = data[pos:lineEnd].split(b" ")
+        if len(header) != fields or header[0] != b"VALUE" or not header[2].isdigit() or not header[3].isdigit():
+            raise ValueError("Invalid VALUE line")
+        valueStart = lineEnd+2
+        valueEnd = valueStart+int(header[3])
+        if data[valueEnd:valueEnd+2] != b"\r\n":
+            raise ValueError("Data block doesnt match the length in its VALUE line")
+        if withCas and not header[4].isdigit():
+            raise ValueError("Invalid cas unique value")
+        yield header[1].decode(), header[2].decode(), data[valueStart:valueEnd], header[4].decode() if withCas else None
+        pos = valueEnd+2
+
+def parseMetaResponse(data):
+    """Returns (code, return flags, value) for a meta response
+
+    The return flags are a mapping of the flag letter to its token (e.g. {"c": "1234", "t": "-1"}),
+    value is the data block of a VA response and None for the other codes.
+    Raises ValueError if the response isn't framed correctly"""
+    lineEnd = data.find(b"\r\n")
+    if lineEnd == -1:
+        raise ValueError("Response line not terminated")
+    tokens = data[:lineEnd].decode().split()
+    code = tokens[0]
+    value = None
+    if code == "VA":
+        if len(tokens) < 2 or not tokens[1].isdigit():
+            raise ValueError("Invalid VA line")
+        valueEnd = lineEnd+2+int(tokens[1])
+        if data[valueEnd:] != b"\r\n":
+            raise ValueError("Data block doesnt match the length in its VA line")
+        value = data[lineEnd+2:valueEnd]
+        tokens = tokens[2:]
+    else:
+        if lineEnd+2 != len(data):
+            raise ValueError("Data after the response line")
+        tokens = tokens[1:]
+    return code, {token[0]: token[1:] for token in tokens}, value
+
+def responseText(data):
+    #response sent by the server in a form that can be shown in an error message
+    return data.decode(errors="replace") if isinstance(data,(bytes,bytearray)) else str(data)
@@ -0,0 +1,119 @@
+import json
+import pickle
+from .exceptions import *
+from .constants import *
+
+class MemclidResult(dict):
+    """
+    Result of a key found by a retrieval made with a MemclidSerializer, the "value" is only deserialized the first
+    time it is read (result["value"], result.get("value"), iterating or comparing the result), so the values of
+    a large multi-get that aren't used are never deserialized
+
+    Attributes:
+        data -- the data block sent by the server
+        loads -- function turning data into the value
+    """
+    __slots__ = ("data", "loads")
+
+    def __init__(self, fields, data, loads):
+        dict.__init__(self, fields)
+        self.data = data
+        self.loads = loads
+
+    def __missing__(self, name):
+        if name != "value":
+            raise KeyError(name)
+        return dict.__getitem__(self.resolve(), "value")
+
+    def __contains__(self, name):
+        return name == "value" or dict.__contains__(self, name)
+
+    def get(self, name, default=None):
+        if name == "value":
+            self.resolve()
+        return dict.get(self, name, default)
+
+    def resolve(self):
+        if not dict.__contains__(self, "value"):
+            dict.__setitem__(self, "value", self.loads(self.data))
+        return self
+
+def resolving(name):
+    #the methods that see the whole dict deserialize the value first
+    method = getattr(dict, name)
+    def resolved(self, *args, **kwargs):
+        return method(self.resolve(), *args, **kwargs)
+    resolved.__name__ = name
+    return resolved
+
+for name in ("__iter__", "__len__", "__eq__", "__ne__", "__repr__", "keys", "items", "values", "copy", "pop", "setdefault"):
+    setattr(MemclidResult, name, resolving(name))
+
+class MemclidSerializer:
+    """
+    Turns the values given to a MemclidUtility into bytes and the bytes fetched back into values of the same type,
+    the type is kept in bits of the flag
+
+        memclidUtility = MemclidUtility(memclidSocket, serializer=MemclidSerializer())
+        memclidUtility.set("key", {"id": 1}, 0, 3600)
+        memclidUtility.get("key")["value"]  #{"id": 1}
+
+    bytes-like values are stored as they are (without copying them), str as UTF-8 (FLAG_TEXT), int as its digits
+    (FLAG_INTEGER) so that incr/decr work on it, and bool, float, None, dict, list and tuple as JSON (FLAG_JSON, so a
+    tuple comes back as a list). Other types are pickled (FLAG_PICKLE) when allowPickle is set, pickled values are only
+    loaded then too since unpickling data from the server can run code. More types can be added with register.
+    The bits of the serializer (and FLAG_COMPRESSED) can't be used in the flag given by the application, the flag of
+    the results is an int without them
+    """
+    def __init__(self, allowPickle=False):
+        self.allowPickle = allowPickle
+        self.encoders = {} #type to (type bit, dumps)
+        self.decoders = {0: bytes} #type bit to loads
+        self.typeBits = 0
+        self.register(FLAG_TEXT, [str], lambda value: value.encode(), lambda data: str(data, "utf-8"))
+        self.register(FLAG_INTEGER, [int], lambda value: b"%d" % value, int)
+        self.register(FLAG_JSON, [bool, float, type(None), dict, list, tuple],
+            lambda value: json.dumps(value, separators=(",", ":")).encode(), json.loads)
+        self.register(FLAG_PICKLE, [], self.pickleValue, self.unpickleValue)
+
+    def register(self, typeBit, types, dumps, loads):
+        """Stores the values of the given types with dumps (returning bytes-like) and typeBit set in their flag,
+        and loads the values fetched with typeBit (or replaces the functions of a bit already registered)"""
+        self.typeBits = self.typeBits | typeBit
+        self.decoders[typeBit] = loads
+        for valueType in types:
+            self.encoders[valueType] = (typeBit, dumps)
+
+    @property
+    def reservedBits(self):
+        return self.typeBits | FLAG_COMPRESSED
+
+    def dumps(self, value):
+        """Returns (data, type bit) for a value"""
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return value, 0
+        encoder = self.encoders.get(type(value))
+        if encoder is None:
+            for valueType, typeEncoder in self.encoders.items():
+                if isinstance(value, valueType):
+                    encoder = typeEncoder
+                    break
+        if encoder is None:
+            if not self.allowPickle:
+                raise TypeError(f"Values of type {type(value).__name__} can only be stored with allowPickle")
+            encoder = (FLAG_PICKLE, self.pickleValue)
+        typeBit, dumps = encoder
+        return dumps(value), typeBit
+
+    def pickleValue(self, value):
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def loader(self, flag):
+        """Returns the function turning the data fetched with flag into its value"""
+        #several type bits are only set on values that weren't stored by a serializer, they are returned as bytes
+        return self.decoders.get(flag & self.typeBits, bytes)
+
+    def unpickleValue(self, data):
+        if not self.allowPickle:
+            raise TypeError("Pickled values are only loaded with allowPickle")
+        return pickle.loads(data)
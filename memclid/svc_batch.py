@@ -0,0 +1,109 @@
+import shlex
+from collections import deque
+from .exceptions import *
+
+def isValidKey(key):
+    return key != "" and len(key.encode()) <= 250 and not any(char.isspace() or ord(char) < 32 for char in key)
+
+class MemclidBatch:
+    """
+    Pipelines commands given as text over the socket of a MemclidUtility
+
+    Every line holds one command with the same arguments (and defaults) as the memclid CLI commands, e.g.
+        set KEY [VALUE] [FLAG] [EXPTIME]
+        cas CAS_UNIQUE KEY [VALUE] [FLAG] [EXPTIME]
+        get KEY [KEY ...]
+    Empty lines and lines starting with # are skipped
+    """
+    def __init__(self, memclidUtility, window):
+        self.utility = memclidUtility
+        self.sock = memclidUtility.sock
+        self.window = window
+
+    def run(self, lines):
+        """Yields (command, result, error) for every command in the order the commands were given"""
+        return self.pipeline(self.prepareLines(lines))
+
+    def prepareLines(self, lines):
+        for line in lines:
+            command = line.strip()
+            if command == "" or command.startswith("#"):
+                continue
+            try:
+                msg, parse = self.prepareCommand(command)
+                yield command, msg, parse, None
+            except MemclidInvalidCommandError as err:
+                yield command, None, None, err
+
+    def pipeline(self, requests):
+        """Sends the (label, msg, parse, error) requests and yields (label, result, error) for every one of them in order
+
+        Up to window requests are sent before waiting for a response, the responses come back in
+        the order of the requests so they are matched by popping the oldest request in flight.
+        Requests that already have an error are not sent but keep their place in the order. The requests are reported
+        to the hooks of the utility like the ones it executes"""
+        inFlight = deque()
+        for label, msg, parse, error in requests:
+            request = None
+            if error is None:
+                request = self.utility.sendPipelined(msg)
+            inFlight.append((label, request, parse, error))
+            while len(inFlight) >= self.window:
+                yield self.complete(*inFlight.popleft())
+        while inFlight:
+            yield self.complete(*inFlight.popleft())
+
+    def complete(self, label, request, parse, error):
+        if error is not None:
+            return label, None, error
+        try:
+            return label, self.utility.receivePipelined(request, parse), None
+        except (MemclidErrorSentByServer, MemclidClientErrorSentByServer, MemclidServerErrorSentByServer) as err:
+            #these are complete responses on their own, so the requests after this one are still matched correctly
+            return label, None, err
+
+    def prepareCommand(self, command):
+        try:
+            args = shlex.split(command)
+        except ValueError as err:
+            raise MemclidInvalidCommandError(command, str(err))
+        name, args = args[0].lower(), args[1:]
+        self.checkKeys(command, name, args)
+        try:
+            if name in ("get", "gets"):
+                if len(args) == 0:
+                    raise MemclidInvalidCommandError(command, "At least one key is required")
+                return self.utility.prepareRetrieval(name, list(dict.fromkeys(args)))
+            elif name in ("set", "add", "replace"):
+                key, value, flag, exptime = self.unpack(command, args, 1, ["", 0, 3600])
+                prepare = {"set": self.utility.prepareSet, "add": self.utility.prepareAdd, "replace": self.utility.prepareReplace}[name]
+                return prepare(key, value, int(flag), int(exptime))
+            elif name in ("append", "prepend"):
+                key, value = self.unpack(command, args, 1, [""])
+                prepare = {"append": self.utility.prepareAppend, "prepend": self.utility.preparePrepend}[name]
+                return prepare(key, value)
+            elif name == "cas":
+                cas_unique, key, value, flag, exptime = self.unpack(command, args, 2, ["", 0, 3600])
+                return self.utility.prepareCas(key, value, int(cas_unique), int(flag), int(exptime))
+            elif name == "delete":
+                key, = self.unpack(command, args, 1, [])
+                return self.utility.prepareDelete(key)
+            elif name in ("incr", "decr"):
+                key, value = self.unpack(command, args, 1, [0])
+                prepare = {"incr": self.utility.prepareIncr, "decr": self.utility.prepareDecr}[name]
+                return prepare(key, int(value))
+        except ValueError:
+            raise MemclidInvalidCommandError(command, "Flag, exptime, cas unique and incr/decr values must be integers")
+        raise MemclidInvalidCommandError(command, "Unknown command " + name)
+
+    def checkKeys(self, command, name, args):
+        #the text protocol separates arguments with spaces, so a quoted key with spaces would break the request
+        keys = args if name in ("get", "gets") else args[1:2] if name == "cas" else args[:1]
+        for key in keys:
+            if not isValidKey(key):
+                raise MemclidInvalidCommandError(command, "Keys can't be empty, longer than 250 bytes or contain whitespace/control characters")
+
+    def unpack(self, command, args, required, defaults):
+        if len(args) < required or len(args) > required + len(defaults):
+            raise MemclidInvalidCommandError(command, "Wrong number of arguments")
+        return args + defaults[len(args) - required:]
@@ -0,0 +1,317 @@
+import asyncio
+import itertools
+import random
+import string
+import threading
+import time
+from .exceptions import *
+from .constants import *
+from .histogram import MemclidHistogram
+from .memclid_socket import MemclidSocket
+from .svc_memclid import MemclidUtility
+from .async_memclid_socket import AsyncMemclidSocket
+from .async_svc_memclid import AsyncMemclidUtility
+
+BENCH_COMMANDS = ("get", "set", "incr", "cas")
+
+#errors after which the connection can't be used anymore, the worker using it stops
+CONNECTION_ERRORS = (MemclidConnectionBreakError, MemclidSendError, MemclidRecvError, MemclidUnrecognizedResponseSentByServer)
+
+def parseMix(mix):
+    """Parses a command mix like "get=80,set=15,incr=3,cas=2" into a mapping of command to weight"""
+    weights = {}
+    for part in mix.split(","):
+        name, separator, weight = part.strip().partition("=")
+        if name not in BENCH_COMMANDS or separator == "" or not weight.strip().isdigit():
+            raise ValueError(f"{part.strip()} is not in the format command=weight (commands are {', '.join(BENCH_COMMANDS)})")
+        weights[name] = weights.get(name, 0)+int(weight)
+    if sum(weights.values()) == 0:
+        raise ValueError("At least one command needs a weight above 0")
+    return weights
+
+def parseValueSize(spec):
+    """Parses a value size like "100" (fixed), "64-4096" (uniform) or "64-65536:log" (log-uniform, mostly small values)
+
+    Returns (minimum, maximum, logarithmic)"""
+    sizes, separator, distribution = spec.partition(":")
+    if distribution not in ("", "log"):
+        raise ValueError(f"Unknown value size distribution {distribution}")
+    low, dash, high = sizes.partition("-")
+    if not low.isdigit() or (dash and not high.isdigit()):
+        raise ValueError(f"{spec} is not in the format SIZE or MIN-MAX[:log]")
+    low, high = int(low), int(high) if dash else int(low)
+    if high < low or (distribution == "log" and low == 0):
+        raise ValueError(f"{spec} is not a valid size range")
+    return low, high, distribution == "log"
+
+class MemclidBench:
+    """
+    Load generator running a mix of get/set/incr/cas commands against a memcached server
+
+    Every worker (a thread or an asyncio task) has its own connection in threads mode, in async mode tasksPerConnection
+    tasks share every connection (their requests are pipelined). The commands are built and parsed by the prepare
+    methods of MemclidUtility, so the same code paths as the other commands are measured.
+
+    In closed loop every worker sends its next command as soon as the previous one completed. With a rate the
+    commands are started on a fixed schedule (open loop) and their latency is measured from the time they were
+    scheduled, so a slow server also shows up in the latency instead of only lowering the throughput.
+    Nothing is recorded during the warm-up. port None connects to the unix domain socket at the path host,
+    socketOptions are the keyword arguments of the sockets of threads mode (see MemclidSocket), a command going past
+    their readTimeout or writeTimeout is counted as an error and the worker carries on over a new connection
+    """
+    def __init__(self, host, port, connections=4, mix=None, keys=10000, distribution="uniform", zipfExponent=0.99,
+            valueSize=(100, 100, False), duration=10, warmup=2, rate=None, mode="threads", tasksPerConnection=1,
+            prefix="memclid:bench:", exptime=0, seed=None, socketClass=MemclidSocket, utilityClass=MemclidUtility, socketOptions=None):
+        self.host = host
+        self.port = port
+        self.connections = connections
+        self.mix = mix or {"get": 80, "set": 15, "incr": 3, "cas": 2}
+        self.keys = keys
+        self.duration = duration
+        self.warmup = warmup
+        self.rate = rate
+        self.mode = mode
+        self.tasksPerConnection = tasksPerConnection if mode == "async" else 1
+        self.prefix = prefix
+        self.exptime = exptime
+        self.seed = seed
+        self.socketClass = socketClass
+        self.utilityClass = utilityClass
+        self.socketOptions = socketOptions or {}
+        self.valueSize = valueSize
+        self.commands = list(self.mix)
+        self.commandWeights = list(itertools.accumulate(self.mix[command] for command in self.commands))
+        if distribution == "zipf":
+            #rank k (key k) is picked with a probability proportional to 1/k**zipfExponent
+            self.keyWeights = list(itertools.accumulate(1/rank**zipfExponent for rank in range(1, keys+1)))
+        else:
+            self.keyWeights = None
+        #values are slices of it, nothing is copied per command (letters and digits since get decodes the values as text)
+        self.payload = memoryview("".join(random.Random(seed).choices(string.ascii_letters+string.digits, k=valueSize[1])).encode())
+
+    def run(self):
+        """Runs the benchmark and returns the report (see report)"""
+        workers = self.connections*self.tasksPerConnection
+        self.start = time.perf_counter()+0.05 #lets every worker get ready before the first command
+        self.measureStart = self.start+self.warmup
+        self.end = self.measureStart+self.duration
+        self.workerRate = self.rate/workers if self.rate else None
+        if self.mode == "async":
+            results = asyncio.run(self.runTasks())
+        else:
+            results = [None]*workers
+            threads = [threading.Thread(target=self.runThread, args=(index, results), daemon=True) for index in range(workers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        return self.report(results)
+
+    def connectThread(self, stats):
+        #returns a connected socket, or None with the failure recorded in stats
+        memclidSocket = self.socketClass(**self.socketOptions)
+        try:
+            memclidSocket.connect(self.host, self.port)
+            return memclidSocket
+        except MemclidConnectionError as err:
+            stats["failure"] = err.message
+            return None
+
+    def disconnectThread(self, memclidSocket):
+        try:
+            memclidSocket.disconnect()
+        except MemclidDisconnectError:
+            pass
+
+    def runThread(self, index, results):
+        stats = self.newStats()
+        results[index] = stats
+        memclidSocket = self.connectThread(stats)
+        if memclidSocket is None:
+            return
+        utility = self.utilityClass(memclidSocket)
+        rng = random.Random(None if self.seed is None else self.seed+index)
+        try:
+            for scheduled in self.schedule(rng):
+                name, generator = self.operation(utility, rng)
+                error = None
+                try:
+                    request = next(generator)
+                    while True:
+                        request = generator.send(utility.execute(*request))
+                except StopIteration as result:
+                    outcome = result.value
+                except (MemclidErrorSentByServer, MemclidClientErrorSentByServer, MemclidServerErrorSentByServer) as err:
+                    outcome, error = None, err
+                except CONNECTION_ERRORS as err:
+                    stats["failure"] = err.message
+                    return
+                except MemclidTimeoutError as err:
+                    #counted as a failed command, the worker goes on over a new connection since the reply may still arrive
+                    self.record(stats, name, scheduled, None, err)
+                    self.disconnectThread(memclidSocket)
+                    memclidSocket = self.connectThread(stats)
+                    if memclidSocket is None:
+                        return
+                    utility = self.utilityClass(memclidSocket)
+                    continue
+                self.record(stats, name, scheduled, outcome, error)
+        finally:
+            if memclidSocket is not None:
+                self.disconnectThread(memclidSocket)
+
+    async def runTasks(self):
+        sockets = []
+        results = []
+        try:
+            for index in range(self.connections):
+                memclidSocket = AsyncMemclidSocket()
+                try:
+                    await memclidSocket.connect(self.host, self.port)
+                except MemclidConnectionError as err:
+                    results.append(dict(self.newStats(), failure=err.message))
+                    continue
+                sockets.append(memclidSocket)
+            tasks = []
+            for index in range(len(sockets)*self.tasksPerConnection):
+                stats = self.newStats()
+                results.append(stats)
+                tasks.append(self.runTask(AsyncMemclidUtility(sockets[index % len(sockets)]), index, stats))
+            await asyncio.gather(*tasks)
+        finally:
+            for memclidSocket in sockets:
+                try:
+                    await memclidSocket.disconnect()
+                except MemclidDisconnectError:
+                    pass
+        return results
+
+    async def runTask(self, utility, index, stats):
+        rng = random.Random(None if self.seed is None else self.seed+index)
+        for scheduled in self.schedule(rng):
+            delay = scheduled-time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            name, generator = self.operation(utility, rng)
+            error = None
+            try:
+                request = next(generator)
+                while True:
+                    request = generator.send(await utility.execute(*request))
+            except StopIteration as result:
+                outcome = result.value
+            except (MemclidErrorSentByServer, MemclidClientErrorSentByServer, MemclidServerErrorSentByServer) as err:
+                outcome, error = None, err
+            except CONNECTION_ERRORS as err:
+                stats["failure"] = err.message
+                return
+            self.record(stats, name, scheduled, outcome, error)
+
+    def schedule(self, rng):
+        """Yields the time every command is scheduled at until the end of the benchmark
+
+        In closed loop it's the time the command is sent, in open loop the time of the fixed schedule
+        (threads sleep until then here, async tasks sleep in runTask). Workers start at a random offset
+        of their interval so that they don't all send at the same moment"""
+        if self.workerRate is None:
+            while True:
+                now = time.perf_counter()
+                if now >= self.end:
+                    return
+                yield now
+        interval = 1/self.workerRate
+        scheduled = self.start+rng.random()*interval
+        while scheduled < self.end:
+            if self.mode != "async":
+                delay = scheduled-time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            yield scheduled
+            scheduled += interval
+
+    def operation(self, utility, rng):
+        """Picks the next command and returns (name, generator) where the generator yields the (msg, parse) requests
+        of the command, gets the parsed result of every one of them sent back and returns the outcome (hit or miss)"""
+        name = rng.choices(self.commands, cum_weights=self.commandWeights)[0]
+        if self.keyWeights is None:
+            index = rng.randrange(self.keys)
+        else:
+            index = rng.choices(range(self.keys), cum_weights=self.keyWeights)[0]
+        return name, getattr(self, name+"Operation")(utility, self.prefix+str(index), rng)
+
+    def value(self, rng):
+        low, high, logarithmic = self.valueSize
+        if logarithmic:
+            size = int(low*(high/low)**rng.random())
+        else:
+            size = rng.randint(low, high)
+        return self.payload[:size]
+
+    def getOperation(self, utility, key, rng):
+        result = yield utility.prepareRetrieval("get", [key])
+        return result[key]["status"] == STATUS_DATA_AVAILABLE
+
+    def setOperation(self, utility, key, rng):
+        result = yield utility.prepareSet(key, self.value(rng), 0, self.exptime)
+        return result["status"] == STATUS_RECORD_STORED
+
+    def incrOperation(self, utility, key, rng):
+        #counters have keys of their own since incr fails on values that aren't numbers, a missing counter is created
+        key = key+":counter"
+        result = yield utility.prepareIncr(key, 1)
+        if result["status"] == STATUS_RECORD_STORED:
+            return True
+        yield utility.prepareAdd(key, "1", 0, self.exptime)
+        return False
+
+    def casOperation(self, utility, key, rng):
+        #read-modify-write: gets then cas, a missing key is added
+        result = yield utility.prepareRetrieval("gets", [key])
+        if result[key]["status"] != STATUS_DATA_AVAILABLE:
+            yield utility.prepareAdd(key, self.value(rng), 0, self.exptime)
+            return False
+        result = yield utility.prepareCas(key, self.value(rng), result[key]["cas_unique"], 0, self.exptime)
+        return result["status"] == STATUS_RECORD_STORED
+
+    def newStats(self):
+        return {
+            "commands": {name: {"latency": MemclidHistogram(), "hits": 0, "errors": 0} for name in self.mix},
+            "failure": None
+        }
+
+    def record(self, stats, name, scheduled, outcome, error):
+        if scheduled < self.measureStart:
+            return
+        commandStats = stats["commands"][name]
+        commandStats["latency"].record((time.perf_counter()-scheduled)*1000000)
+        if error is not None:
+            commandStats["errors"] += 1
+        elif outcome:
+            commandStats["hits"] += 1
+
+    def report(self, results):
+        """Merges the stats of every worker
+
+        Returns a mapping with the duration, throughput (commands/sec), the latency histogram (microseconds) of all the
+        commands and for every command its histogram, hits (found in get/incr, stored in set/cas) and errors,
+        along with the failures of the workers that stopped early"""
+        total = MemclidHistogram()
+        commands = {}
+        for name in self.mix:
+            latency = MemclidHistogram()
+            hits = errors = 0
+            for stats in results:
+                if stats is not None:
+                    latency.merge(stats["commands"][name]["latency"])
+                    hits += stats["commands"][name]["hits"]
+                    errors += stats["commands"][name]["errors"]
+            total.merge(latency)
+            commands[name] = {"latency": latency, "hits": hits, "errors": errors}
+        return {
+            "duration": self.duration,
+            "operations": total.count,
+            "throughput": total.count/self.duration if self.duration > 0 else 0,
+            "latency": total,
+            "commands": commands,
+            "failures": [stats["failure"] for stats in results if stats is not None and stats["failure"] is not None]
+        }
@@ -0,0 +1,119 @@
+import os
+import zlib
+from .exceptions import *
+from .constants import *
+from .config import MEMCLID_CHUNK_SIZE, MEMCLID_CHUNK_READ_RETRIES
+from .svc_batch import isValidKey
+
+MANIFEST_MARKER = "memclidChunks" #key of the manifest holding the version of the chunks
+
+class MemclidChunkedStore:
+    """
+    Stores values larger than the item size limit of memcached server as several chunks
+
+        chunkedStore = MemclidChunkedStore(MemclidUtility(memclidSocket, serializer=MemclidSerializer()))
+        chunkedStore.set("artifact", data, 0, 3600)
+        chunkedStore.get("artifact")["value"]
+
+    A value larger than chunkSize bytes is split into chunks stored with pipelined sets under <key>:<version>:<index>,
+    then a manifest with the version, the number of chunks, the length and the crc32 of the value is stored under key
+    with cas (or add when the key doesn't exist), so a concurrent write of the same key makes one of the writes fail
+    instead of mixing their chunks. The chunks of the value replaced are deleted once the manifest is stored. get reads
+    the manifest and fetches all the chunks with one multi-key get into a buffer of the length of the value. A chunk
+    missing (evicted, or deleted by a write made meanwhile) or a crc32 that doesn't match is a torn read, the manifest
+    is read again up to retries times before the key is reported as missing. Smaller values are stored as a single item.
+
+    memclidUtility (a MemclidUtility, MemclidClusterUtility, which spreads the chunks over the servers, or MemclidPool)
+    needs a MemclidSerializer so that the chunks are read back as bytes and the manifest as JSON. The values are
+    returned as a bytearray (str values are stored as UTF-8)
+    """
+    def __init__(self, memclidUtility, chunkSize=MEMCLID_CHUNK_SIZE, retries=MEMCLID_CHUNK_READ_RETRIES):
+        self.utility = memclidUtility
+        self.chunkSize = chunkSize
+        self.retries = retries
+
+    def set(self, key, value, flag, exptime):
+        if isinstance(value, str):
+            value = value.encode()
+        view = memoryview(value).cast("B")
+        current = self.utility.gets(key)
+        if len(view) <= self.chunkSize:
+            result = self.store(key, bytes(view), flag, exptime, current)
+        else:
+            version = os.urandom(8).hex()
+            chunkKeys = self.chunkKeys(key, version, (len(view)+self.chunkSize-1)//self.chunkSize)
+            chunks = [(chunkKey, view[index*self.chunkSize:(index+1)*self.chunkSize]) for index, chunkKey in enumerate(chunkKeys)]
+            results = self.utility.setMany(chunks, 0, exptime)
+            if any(chunkResult["status"] != STATUS_RECORD_STORED for chunkResult in results.values()):
+                self.deleteChunks(chunkKeys)
+                return {"message": "The chunks of the value could not be stored", "status": STATUS_RECORD_NOT_STORED}
+            manifest = {MANIFEST_MARKER: version, "chunks": len(chunkKeys), "length": len(view), "crc32": zlib.crc32(view)}
+            result = self.store(key, manifest, flag, exptime, current)
+            if result["status"] != STATUS_RECORD_STORED:
+                self.deleteChunks(chunkKeys)
+                return result
+        if current["status"] == STATUS_DATA_AVAILABLE and self.isManifest(current["value"]):
+            self.deleteChunks(self.chunkKeys(key, current["value"][MANIFEST_MARKER], current["value"]["chunks"]))
+        return result
+
+    def get(self, key):
+        """Returns the result of key like MemclidUtility.get, with the value reassembled from its chunks"""
+        for attempt in range(self.retries+1):
+            result = self.utility.get(key)
+            if result["status"] != STATUS_DATA_AVAILABLE:
+                return result
+            manifest = result["value"]
+            if not self.isManifest(manifest):
+                #stored as a single item
+                return dict(result, value=bytearray(manifest)) if isinstance(manifest, bytes) else result
+            value = self.readChunks(key, manifest)
+            if value is not None:
+                return dict(result, value=value)
+        return {"flag": None, "value": None, "message": "The chunks of "+key+" kept changing while they were read", "status": STATUS_DATA_NOT_AVAILABLE}
+
+    def delete(self, key):
+        current = self.utility.get(key)
+        result = self.utility.delete(key)
+        if current["status"] == STATUS_DATA_AVAILABLE and self.isManifest(current["value"]):
+            self.deleteChunks(self.chunkKeys(key, current["value"][MANIFEST_MARKER], current["value"]["chunks"]))
+        return result
+
+    def store(self, key, value, flag, exptime, current):
+        #the manifest (or small value) only replaces the item read before the chunks were written
+        if current["status"] == STATUS_DATA_AVAILABLE:
+            result = self.utility.cas(key, value, current["cas_unique"], flag, exptime)
+        else:
+            result = self.utility.add(key, value, flag, exptime)
+        if result["status"] != STATUS_RECORD_STORED:
+            return {"message": "The key was modified while the value was stored, it was not stored", "status": STATUS_RECORD_NOT_STORED}
+        return result
+
+    def readChunks(self, key, manifest):
+        #returns the value, or None for a torn read
+        chunkKeys = self.chunkKeys(key, manifest[MANIFEST_MARKER], manifest["chunks"])
+        results = self.utility.get(chunkKeys)
+        value = bytearray(manifest["length"])
+        view = memoryview(value)
+        offset = 0
+        for chunkKey in chunkKeys:
+            chunk = results[chunkKey]
+            if chunk["status"] != STATUS_DATA_AVAILABLE or offset+len(chunk["value"]) > len(value):
+                return None
+            view[offset:offset+len(chunk["value"])] = chunk["value"]
+            offset = offset+len(chunk["value"])
+        if offset != len(value) or zlib.crc32(value) != manifest["crc32"]:
+            return None
+        return value
+
+    def chunkKeys(self, key, version, count):
+        chunkKeys = [f"{key}:{version}:{index}" for index in range(count)]
+        if not isValidKey(chunkKeys[-1]):
+            raise MemclidInvalidCommandError("set", "The key is too long to name its chunks")
+        return chunkKeys
+
+    def deleteChunks(self, chunkKeys):
+        for chunkKey in chunkKeys:
+            self.utility.delete(chunkKey, noreply=True)
+
+    def isManifest(self, value):
+        return isinstance(value, dict) and MANIFEST_MARKER in value
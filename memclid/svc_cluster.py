@@ -0,0 +1,169 @@
+from collections import deque
+from .exceptions import *
+from .hash_ring import MemclidHashRing
+from .svc_memclid import MemclidUtility
+
+class MemclidClusterUtility:
+    """
+    MemclidUtility for a cluster of memcached servers
+
+    Every key is sent to the server picked for it by a ketama MemclidHashRing, so the keys are placed the same
+    way as by other ketama clients. Multi key get/gets are split per server, the requests for all the servers
+    are sent before waiting for any response and the results are merged back in the order of the keys
+
+    Attributes:
+        ring -- MemclidHashRing of the servers
+        utilities -- MemclidUtility for every server (in the same order as the servers of the ring)
+    """
+    def __init__(self, servers, memclidSockets, utilityClass=MemclidUtility, hooks=None, nearCache=None, compressor=None, serializer=None):
+        """servers is a list of (host, port, weight) and memclidSockets the connected MemclidSocket for each one of them,
+        utilityClass is the MemclidUtility used for every server (MemclidBinaryUtility for the binary protocol)
+        and hooks, nearCache, compressor and serializer are given to all of them (see MemclidUtility)"""
+        self.ring = MemclidHashRing(servers)
+        self.nearCache = nearCache
+        self.utilities = [utilityClass(memclidSocket,hooks,nearCache,compressor,serializer) for memclidSocket in memclidSockets]
+
+    def utilityFor(self, key):
+        return self.utilities[self.ring.getServer(key)]
+
+    def get(self,keys,deadline=None):
+        return self.retrieve("get",keys,deadline)
+
+    def set(self,key,value,flag,exptime,noreply=False,deadline=None):
+        return self.utilityFor(key).set(key,value,flag,exptime,noreply,deadline)
+
+    def add(self,key,value,flag,exptime,noreply=False,deadline=None):
+        return self.utilityFor(key).add(key,value,flag,exptime,noreply,deadline)
+
+    def replace(self,key,value,flag,exptime,noreply=False,deadline=None):
+        return self.utilityFor(key).replace(key,value,flag,exptime,noreply,deadline)
+
+    def append(self,key,value,noreply=False,deadline=None):
+        return self.utilityFor(key).append(key,value,noreply,deadline)
+
+    def prepend(self,key,value,noreply=False,deadline=None):
+        return self.utilityFor(key).prepend(key,value,noreply,deadline)
+
+    def gets(self,keys,deadline=None):
+        return self.retrieve("gets",keys,deadline)
+
+    def cas(self,key,value,cas_unique,flag,exptime,deadline=None):
+        return self.utilityFor(key).cas(key,value,cas_unique,flag,exptime,deadline)
+
+    def delete(self,key,noreply=False,deadline=None):
+        return self.utilityFor(key).delete(key,noreply,deadline)
+
+    def incr(self,key,value,noreply=False,deadline=None):
+        return self.utilityFor(key).incr(key,value,noreply,deadline)
+
+    def decr(self,key,value,noreply=False,deadline=None):
+        return self.utilityFor(key).decr(key,value,noreply,deadline)
+
+    def setMany(self,items,flag,exptime,deadline=None):
+        itemsByServer = {}
+        for key, value in items:
+            itemsByServer.setdefault(self.ring.getServer(key),[]).append((key,value))
+        results = {}
+        for server, serverItems in itemsByServer.items():
+            results.update(self.utilities[server].setMany(serverItems,flag,exptime,deadline))
+        return results
+
+    def setFile(self,key,file,flag,exptime,noreply=False,size=None,deadline=None):
+        return self.utilityFor(key).setFile(key,file,flag,exptime,noreply,size,deadline)
+
+    def getFile(self,key,file,deadline=None):
+        return self.utilityFor(key).getFile(key,file,deadline)
+
+    def metaGet(self,key,value=True,cas=False,ttl=False,lastAccess=False,opaque=None,deadline=None):
+        return self.utilityFor(key).metaGet(key,value,cas,ttl,lastAccess,opaque,deadline)
+
+    def metaGetMany(self,keys,value=True,cas=False,ttl=False,lastAccess=False,deadline=None):
+        keys = list(dict.fromkeys(keys))
+        keysByServer = {}
+        for key in keys:
+            keysByServer.setdefault(self.ring.getServer(key),[]).append(key)
+        results = {}
+        for server, serverKeys in keysByServer.items():
+            results.update(self.utilities[server].metaGetMany(serverKeys,value,cas,ttl,lastAccess,deadline))
+        return {key: results[key] for key in keys}
+
+    def metaSet(self,key,value,flag=0,exptime=0,cas_unique=None,mode="set",returnCas=False,opaque=None,deadline=None):
+        return self.utilityFor(key).metaSet(key,value,flag,exptime,cas_unique,mode,returnCas,opaque,deadline)
+
+    def metaDelete(self,key,cas_unique=None,opaque=None,deadline=None):
+        return self.utilityFor(key).metaDelete(key,cas_unique,opaque,deadline)
+
+    def metaArithmetic(self,key,delta=1,decrement=False,initial=None,exptime=0,opaque=None,deadline=None):
+        return self.utilityFor(key).metaArithmetic(key,delta,decrement,initial,exptime,opaque,deadline)
+
+    def retrieve(self,command,keys,deadline=None):
+        """The requests for all the servers are sent before the responses are read, a server that doesn't reply
+        before the deadline (or a timeout of its socket) only makes its own keys timed out"""
+        if isinstance(keys,str):
+            return getattr(self.utilityFor(keys),command)(keys,deadline)
+        keys = list(dict.fromkeys(keys))
+        results = {}
+        missing = keys
+        if self.nearCache is not None:
+            results, missing = self.nearCache.lookupMany(command,keys)
+        keysByServer = {}
+        for key in missing:
+            keysByServer.setdefault(self.ring.getServer(key),[]).append(key)
+        involved = [self.utilities[server] for server in keysByServer]
+        if deadline is not None:
+            for utility in involved:
+                utility.sock.setDeadline(deadline)
+        utility = None
+        inFlight = deque()
+        timedOut = set()
+        try:
+            for server, serverKeys in keysByServer.items():
+                utility = self.utilities[server]
+                for keysInRequest in utility.splitKeys(command,serverKeys):
+                    msg, parse = utility.prepareRetrieval(command,keysInRequest)
+                    request = None
+                    if utility not in timedOut:
+                        try:
+                            request = utility.sendPipelined(msg)
+                        except MemclidTimeoutError:
+                            timedOut.add(utility)
+                    inFlight.append((utility,keysInRequest,request,parse))
+            while inFlight:
+                utility, keysInRequest, request, parse = inFlight.popleft()
+                if utility not in timedOut:
+                    try:
+                        fetched = utility.receivePipelined(request,parse)
+                    except MemclidTimeoutError:
+                        timedOut.add(utility)
+                if utility in timedOut:
+                    results.update({key: utility.timedOutRetrievalResult(command,key) for key in keysInRequest})
+                    continue
+                if self.nearCache is not None:
+                    self.nearCache.storeMany(command,fetched)
+                results.update(fetched)
+            return {key: results[key] for key in keys}
+        except Exception as err:
+            if not isinstance(err,(MemclidErrorSentByServer,MemclidClientErrorSentByServer,MemclidServerErrorSentByServer)):
+                timedOut.add(utility) #nothing more can be read from the connection that failed
+            self.drain(inFlight,timedOut)
+            self.handleAllExceptions(err)
+        finally:
+            if deadline is not None:
+                for involvedUtility in involved:
+                    involvedUtility.sock.setDeadline(None)
+
+    def drain(self,inFlight,failed):
+        #reads the responses still in flight once a server failed, so that the connections of the other servers stay in sync
+        for utility, keysInRequest, request, parse in inFlight:
+            if request is None or utility in failed:
+                continue
+            try:
+                utility.receivePipelined(request,parse)
+            except (MemclidErrorSentByServer,MemclidClientErrorSentByServer,MemclidServerErrorSentByServer):
+                pass #a complete response, the next ones are still matched with their requests
+            except Exception:
+                failed.add(utility)
+
+    def handleAllExceptions(self,err):
+        #the errors hold the host and port of the server they come from, so any utility can report them
+        self.utilities[0].handleAllExceptions(err)
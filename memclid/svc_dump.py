@@ -0,0 +1,130 @@
+import time
+import base64
+from urllib.parse import unquote
+from .exceptions import *
+from .constants import *
+from .config import MEMCLID_MAX_COMMAND_LINE_LENGTH
+from .protocol import classifyResponse, parseValues, responseText, RESPONSE_END, RESPONSE_VALUES
+from .svc_batch import MemclidBatch
+
+class MemclidDumper:
+    """
+    Streams the items held by the memcached server using "lru_crawler metadump all"
+
+    The metadata is read line by line from the socket of metadumpUtility while the values are fetched
+    with pipelined multi-key gets over the socket of valueUtility (the server keeps writing the metadump
+    on its own connection, so the gets need a second one). Only window batches of keys are held at a time.
+    Items are yielded as dicts with key, value, flag, exptime, ttl, size and last_access where exptime is
+    what the item should be stored with again (0 or an absolute unix time) and ttl is the remaining time to live.
+    The values are fetched as the bytes stored with their flag as it is (whatever client compressed or serialized
+    them), a value that isn't valid UTF-8 is yielded base64 encoded with "encoding": "base64" so that every item
+    can be written as JSON and loaded back as it was by MemclidLoader
+    """
+    def __init__(self, metadumpUtility, valueUtility, window, batchSize, prefix=None, minSize=None, maxSize=None, minTtl=None, maxTtl=None, withValues=True):
+        self.metadumpSock = metadumpUtility.sock
+        self.valueUtility = valueUtility
+        self.window = window
+        self.batchSize = batchSize
+        self.prefix = prefix
+        self.minSize = minSize
+        self.maxSize = maxSize
+        self.minTtl = minTtl
+        self.maxTtl = maxTtl
+        self.withValues = withValues
+
+    def run(self):
+        batches = self.batches(self.filter(self.metadata()))
+        if not self.withValues:
+            for batch in batches:
+                for item in batch:
+                    del item["value"], item["flag"]
+                    yield item
+            return
+        requests = self.prepareBatches(batches)
+        for batch, result, error in MemclidBatch(self.valueUtility, self.window).pipeline(requests):
+            if error is not None:
+                raise error
+            for item in batch:
+                keyResult = result[item["key"]]
+                if keyResult["status"] != STATUS_DATA_AVAILABLE:
+                    continue #the item expired or was evicted/deleted after it was listed
+                item["flag"], value = keyResult["flag"], keyResult["value"]
+                try:
+                    item["value"] = value.decode()
+                except UnicodeDecodeError:
+                    item["value"] = base64.b64encode(value).decode()
+                    item["encoding"] = "base64"
+                yield item
+
+    def metadata(self):
+        self.metadumpSock.send(b"lru_crawler metadump all\r\n")
+        now = int(time.time())
+        while True:
+            line = self.metadumpSock.receiveLine().decode()
+            if line == "END\r\n":
+                return
+            fields = dict(field.split("=",1) for field in line.split() if "=" in field)
+            if "key" not in fields or "exp" not in fields or "size" not in fields:
+                #BUSY is sent when the crawler is already running
+                raise MemclidUnrecognizedResponseSentByServer(self.metadumpSock.host,self.metadumpSock.port,line)
+            exp = int(fields["exp"])
+            yield {
+                "key": unquote(fields["key"]),
+                "value": None,
+                "flag": None,
+                "exptime": 0 if exp < 0 else exp,
+                "ttl": None if exp < 0 else max(exp-now,0),
+                "size": int(fields["size"]),
+                "last_access": int(fields["la"]) if "la" in fields else None
+            }
+
+    def filter(self, items):
+        for item in items:
+            if self.prefix is not None and not item["key"].startswith(self.prefix):
+                continue
+            if self.minSize is not None and item["size"] < self.minSize:
+                continue
+            if self.maxSize is not None and item["size"] > self.maxSize:
+                continue
+            #items that never expire have an infinite ttl
+            if self.minTtl is not None and item["ttl"] is not None and item["ttl"] < self.minTtl:
+                continue
+            if self.maxTtl is not None and (item["ttl"] is None or item["ttl"] > self.maxTtl):
+                continue
+            yield item
+
+    def batches(self, items):
+        #Groups the items so that every group can be fetched with one get without crossing the server's line length limit
+        batch = []
+        msgLength = len("get\r\n")
+        for item in items:
+            if batch and (len(batch) == self.batchSize or msgLength+len(item["key"])+1 > MEMCLID_MAX_COMMAND_LINE_LENGTH):
+                yield batch
+                batch = []
+                msgLength = len("get\r\n")
+            batch.append(item)
+            msgLength = msgLength+len(item["key"])+1
+        if batch:
+            yield batch
+
+    def prepareBatches(self, batches):
+        for batch in batches:
+            #the same key can show up twice while the crawler walks the LRU
+            keys = list(dict.fromkeys(item["key"] for item in batch))
+            yield batch, self.valueUtility.retrievalRequest("get", keys), lambda data, keys=keys: self.parseRawValues(data, keys), None
+
+    def parseRawValues(self, data, keys):
+        #same as the results of a multi key get, with the values kept as the bytes stored and the flags as int
+        results = {key: {"flag": None, "value": None, "status": STATUS_DATA_NOT_AVAILABLE} for key in keys}
+        kind, argument = classifyResponse(data)
+        if kind == RESPONSE_END:
+            return results
+        sock = self.valueUtility.sock
+        if kind != RESPONSE_VALUES:
+            raise MemclidUnrecognizedResponseSentByServer(sock.host,sock.port,responseText(data))
+        try:
+            for key, flag, value, casUnique in parseValues(data, False):
+                results[key] = {"flag": int(flag), "value": bytes(value), "status": STATUS_DATA_AVAILABLE}
+        except ValueError:
+            raise MemclidUnrecognizedResponseSentByServer(sock.host,sock.port,responseText(data))
+        return results
@@ -0,0 +1,88 @@
+import csv
+import json
+import base64
+import binascii
+from .exceptions import *
+from .svc_batch import MemclidBatch, isValidKey
+
+class MemclidLoader:
+    """
+    Streams rows of key, value, flag and exptime from a CSV or JSONL file into the memcached server
+
+    The rows are read one at a time and sent with the storage command of a MemclidUtility
+    pipelined through MemclidBatch, so the file is never loaded into memory as a whole.
+        CSV   -- key,value[,flag[,exptime]] (a first row starting with "key" is treated as a header)
+        JSONL -- {"key": ..., "value": ..., "flag": ..., "exptime": ...} (values that are not strings are stored as JSON)
+    flag and exptime fall back to the defaults given to the loader when a row doesn't have them. A JSONL row with
+    "encoding": "base64" (written by the dump command for the values that aren't valid UTF-8) has its value stored
+    as the bytes it decodes to
+    """
+    def __init__(self, memclidUtility, window, command="set", flag=0, exptime=3600):
+        self.utility = memclidUtility
+        self.window = window
+        self.prepare = {"set": memclidUtility.prepareSet, "add": memclidUtility.prepareAdd, "replace": memclidUtility.prepareReplace}[command]
+        self.flag = flag
+        self.exptime = exptime
+
+    def run(self, file, fileFormat):
+        """Yields (row label, result, error) for every row of the file in order"""
+        return MemclidBatch(self.utility, self.window).pipeline(self.prepareRows(file, fileFormat))
+
+    def prepareRows(self, file, fileFormat):
+        rows = self.readCsv(file) if fileFormat == "csv" else self.readJsonl(file)
+        for rowNumber, row in rows:
+            label = "Row " + str(rowNumber)
+            try:
+                key, value, flag, exptime = self.parseRow(row)
+                label = label + " (" + key + ")"
+                msg, parse = self.prepare(key, value, flag, exptime)
+                yield label, msg, parse, None
+            except MemclidInvalidCommandError as err:
+                yield label, None, None, err
+
+    def readCsv(self, file):
+        for rowNumber, row in enumerate(csv.reader(file), start=1):
+            if rowNumber == 1 and row and row[0].strip().lower() == "key":
+                continue
+            if not row:
+                continue
+            yield rowNumber, row
+
+    def readJsonl(self, file):
+        for rowNumber, line in enumerate(file, start=1):
+            if line.strip() == "":
+                continue
+            try:
+                yield rowNumber, json.loads(line)
+            except ValueError as err:
+                yield rowNumber, err
+
+    def parseRow(self, row):
+        if isinstance(row, ValueError):
+            raise MemclidInvalidCommandError(reason="Not valid JSON: " + str(row), message="Invalid row")
+        if isinstance(row, list):
+            if len(row) < 2 or len(row) > 4:
+                raise MemclidInvalidCommandError(reason="Expected key,value[,flag[,exptime]]", message="Invalid row")
+            row = dict(zip(["key", "value", "flag", "exptime"], row))
+        elif not isinstance(row, dict) or "key" not in row or "value" not in row:
+            raise MemclidInvalidCommandError(reason="Expected an object with key and value", message="Invalid row")
+        key = str(row["key"])
+        value = row["value"]
+        encoding = row.get("encoding")
+        if encoding == "base64":
+            try:
+                value = base64.b64decode(value, validate=True)
+            except (TypeError, binascii.Error):
+                raise MemclidInvalidCommandError(reason="The value is not valid base64", message="Invalid row")
+        elif encoding not in (None, "utf-8"):
+            raise MemclidInvalidCommandError(reason="Unknown encoding " + str(encoding), message="Invalid row")
+        elif not isinstance(value, str):
+            value = json.dumps(value, separators=(",", ":"))
+        if not isValidKey(key):
+            raise MemclidInvalidCommandError(reason="Keys can't be empty, longer than 250 bytes or contain whitespace/control characters", message="Invalid row")
+        try:
+            flag = int(self.flag if row.get("flag") in (None, "") else row["flag"])
+            exptime = int(self.exptime if row.get("exptime") in (None, "") else row["exptime"])
+        except (TypeError, ValueError):
+            raise MemclidInvalidCommandError(reason="flag and exptime must be integers", message="Invalid row")
+        return key, value, flag, exptime
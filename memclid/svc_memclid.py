@@ -1,312 +1,968 @@
+import os
+import stat
+import time
 import click
-import re
 from .exceptions import *
 from .constants import *
+from .config import MEMCLID_MAX_COMMAND_LINE_LENGTH, MEMCLID_BATCH_WINDOW
+from .protocol import *
+from .instrumentation import MemclidCommandEvent, commandOutcome
+from .serialization import MemclidResult
 
 class MemclidUtility:
-    def __init__(self, memclidSocket):
+    def __init__(self, memclidSocket, hooks=None, nearCache=None, compressor=None, serializer=None):
+        """hooks are called with a MemclidCommandEvent for every request once it completed, see addHook
+
+        get/gets are served from nearCache (a MemclidNearCache) when it holds the keys, the writes and deletes
+        made with this utility invalidate the keys in it. The values of set/add/replace/cas are compressed
+        by compressor (a MemclidCompressor) and the ones fetched with get/gets decompressed. With a serializer
+        (a MemclidSerializer) the values can be of any type it knows instead of str, see MemclidSerializer"""
         self.sock = memclidSocket
+        self.hooks = list(hooks) if hooks else []
+        self.nearCache = nearCache
+        self.compressor = compressor
+        self.serializer = serializer
+
+    def addHook(self, hook):
+        """hook is called with a MemclidCommandEvent (command, keys, bytes sent and received, send/wait/parse times
+        and outcome) after every request, including the failed ones. It runs on the thread of the request, so it
+        has to be cheap (MemclidMetrics only updates counters and histograms). Requests are only timed when there are hooks"""
+        self.hooks.append(hook)
+
+    def removeHook(self, hook):
+        self.hooks.remove(hook)
     
-    def get(self,key):
+    def get(self,keys,deadline=None):
+        """Fetches a single key (returns its result) or a list of keys (returns a mapping of key to result)"""
         try:
-            finalResult = {
-                "flag": None,
-                "value": None,
-                "message": "",
-                "status": ""
-            }
-            msg = "get "+key+"\r\n"
-            self.sock.send(msg)
-            data = self.sock.receive()
-            valueReceivedRegEx = "^VALUE\s"+key+"\s(\d+)\s\d+\r\n(.*)\r\nEND\r\n$"
-            valueNotReceivedRegEx = "^END\r\n$"
-            valueReceivedResult = re.search(valueReceivedRegEx,data)
-            valueNotReceivedResult = re.search(valueNotReceivedRegEx,data)
-            if valueReceivedResult:
-                finalResult["flag"]=valueReceivedResult.group(1)
-                finalResult["value"]=valueReceivedResult.group(2)
-                finalResult["message"]="Fetched the value for "+key
-                finalResult["status"]=STATUS_DATA_AVAILABLE
-            elif valueNotReceivedResult:
-                finalResult["status"]=STATUS_DATA_NOT_AVAILABLE
-                finalResult["message"]="No value found for "+key
-            else:
-                raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,data)
-            return finalResult
+            return self.retrieve("get",keys,deadline)
         except Exception as err:
             self.handleAllExceptions(err)
 
-    def set(self,key,value,flag,exptime):
+    def set(self,key,value,flag,exptime,noreply=False,deadline=None):
         try:
-            finalResult = {
-                "message": "",
-                "status": ""
-            }
-            msg = "set "+key+" "+str(flag)+" "+str(exptime)+" "+str(len(value))+"\r\n"+value+"\r\n"
-            self.sock.send(msg)
-            data = self.sock.receive()
-            storedRegex = "^STORED\r\n$"
-            notStoredRegex = "^NOT_STORED\r\n$"
-            storedResult = re.search(storedRegex,data)
-            notStoredResult = re.search(notStoredRegex,data)
-            if storedResult:
-                finalResult["status"]=STATUS_RECORD_STORED
-                finalResult["message"]="The data was saved successfully"
-            elif notStoredResult:
-                finalResult["status"]=STATUS_RECORD_NOT_STORED
-                finalResult["message"]="The data could not be stored"
-            else:
-                raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,data)
-            return finalResult
+            return self.execute(*self.prepareSet(key,value,flag,exptime,noreply),noreply,deadline)
         except Exception as err:
             self.handleAllExceptions(err)
+        finally:
+            self.invalidate(key,exptime)
 
-    def add(self,key,value,flag,exptime):
+    def add(self,key,value,flag,exptime,noreply=False,deadline=None):
         try:
-            finalResult = {
-                "message": "",
-                "status": ""
-            }
-            msg = "add "+key+" "+str(flag)+" "+str(exptime)+" "+str(len(value))+"\r\n"+value+"\r\n"
-            self.sock.send(msg)
-            data = self.sock.receive()
-            storedRegex = "^STORED\r\n$"
-            notStoredRegex = "^NOT_STORED\r\n$"
-            storedResult = re.search(storedRegex,data)
-            notStoredResult = re.search(notStoredRegex,data)
-            if storedResult:
-                finalResult["status"]=STATUS_RECORD_STORED
-                finalResult["message"]="The data was saved successfully"
-            elif notStoredResult:
-                finalResult["status"]=STATUS_RECORD_NOT_STORED
-                finalResult["message"]="The record is already stored in memcached server. It could not be stored due to the preconditions of the command executed."
-            else:
-                raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,data)
-            return finalResult
+            return self.execute(*self.prepareAdd(key,value,flag,exptime,noreply),noreply,deadline)
         except Exception as err:
             self.handleAllExceptions(err)
+        finally:
+            self.invalidate(key,exptime)
 
-    def replace(self,key,value,flag,exptime):
+    def replace(self,key,value,flag,exptime,noreply=False,deadline=None):
         try:
-            finalResult = {
-                "message": "",
-                "status": ""
-            }
-            msg = "replace "+key+" "+str(flag)+" "+str(exptime)+" "+str(len(value))+"\r\n"+value+"\r\n"
-            self.sock.send(msg)
-            data = self.sock.receive()
-            storedRegex = "^STORED\r\n$"
-            notStoredRegex = "^NOT_STORED\r\n$"
-            storedResult = re.search(storedRegex,data)
-            notStoredResult = re.search(notStoredRegex,data)
-            if storedResult:
-                finalResult["status"]=STATUS_RECORD_STORED
-                finalResult["message"]="The value for the key was replaced successfully"
-            elif notStoredResult:
-                finalResult["status"]=STATUS_RECORD_NOT_STORED
-                finalResult["message"]="The key doesnt exist in the memcached server. It could not be stored due to the preconditions of the command executed."
-            else:
-                raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,data)
-            return finalResult
+            return self.execute(*self.prepareReplace(key,value,flag,exptime,noreply),noreply,deadline)
         except Exception as err:
             self.handleAllExceptions(err)
+        finally:
+            self.invalidate(key,exptime)
 
-    def append(self,key,value):
+    def append(self,key,value,noreply=False,deadline=None):
         try:
-            finalResult = {
-                "message": "",
-                "status": ""
-            }
-            msg = "append "+key+" 0 3600 "+str(len(value))+"\r\n"+value+"\r\n" 
-            #the flag and exptime aren't changed by append but they are still required when sending the request
-            self.sock.send(msg)
-            data = self.sock.receive()
-            storedRegex = "^STORED\r\n$"
-            notStoredRegex = "^NOT_STORED\r\n$"
-            storedResult = re.search(storedRegex,data)
-            notStoredResult = re.search(notStoredRegex,data)
-            if storedResult:
-                finalResult["status"]=STATUS_RECORD_STORED
-                finalResult["message"]="The value was appended successfully"
-            elif notStoredResult:
-                finalResult["status"]=STATUS_RECORD_NOT_STORED
-                finalResult["message"]="The key most likely doesnt exist in the memcached server. It could not be stored."
-            else:
-                raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,data)
-            return finalResult
+            return self.execute(*self.prepareAppend(key,value,noreply),noreply,deadline)
         except Exception as err:
             self.handleAllExceptions(err)
+        finally:
+            self.invalidate(key)
 
-    def prepend(self,key,value):
+    def prepend(self,key,value,noreply=False,deadline=None):
         try:
-            finalResult = {
-                "message": "",
-                "status": ""
-            }
-            msg = "prepend "+key+" 0 3600 "+str(len(value))+"\r\n"+value+"\r\n" 
-            #the flag and exptime aren't changed by append but they are still required when sending the request
-            self.sock.send(msg)
-            data = self.sock.receive()
-            storedRegex = "^STORED\r\n$"
-            notStoredRegex = "^NOT_STORED\r\n$"
-            storedResult = re.search(storedRegex,data)
-            notStoredResult = re.search(notStoredRegex,data)
-            if storedResult:
-                finalResult["status"]=STATUS_RECORD_STORED
-                finalResult["message"]="The value was prepended successfully"
-            elif notStoredResult:
-                finalResult["status"]=STATUS_RECORD_NOT_STORED
-                finalResult["message"]="The key most likely doesnt exist in the memcached server. It could not be stored."
-            else:
-                raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,data)
-            return finalResult
+            return self.execute(*self.preparePrepend(key,value,noreply),noreply,deadline)
         except Exception as err:
             self.handleAllExceptions(err)
+        finally:
+            self.invalidate(key)
 
-    def gets(self,key):
+    def gets(self,keys,deadline=None):
+        """Fetches a single key (returns its result) or a list of keys (returns a mapping of key to result) along with the cas unique values"""
         try:
-            finalResult = {
-                "flag": None,
-                "value": None,
-                "cas_unique": None,
-                "message": "",
-                "status": ""
-            }
-            msg = "gets "+key+"\r\n"
-            self.sock.send(msg)
-            data = self.sock.receive()
-            valueReceivedRegEx = "^VALUE\s"+key+"\s(\d+)\s\d+\s(\d+)\r\n(.*)\r\nEND\r\n$"
-            valueNotReceivedRegEx = "^END\r\n$"
-            valueReceivedResult = re.search(valueReceivedRegEx,data)
-            valueNotReceivedResult = re.search(valueNotReceivedRegEx,data)
-            if valueReceivedResult:
-                finalResult["flag"]=valueReceivedResult.group(1)
-                finalResult["value"]=valueReceivedResult.group(3)
-                finalResult["cas_unique"]=valueReceivedResult.group(2)
-                finalResult["message"]="Fetched the value for "+key
-                finalResult["status"]=STATUS_DATA_AVAILABLE
-            elif valueNotReceivedResult:
-                finalResult["status"]=STATUS_DATA_NOT_AVAILABLE
-                finalResult["message"]="No value found for "+key
-            else:
-                raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,data)
-            return finalResult
+            return self.retrieve("gets",keys,deadline)
         except Exception as err:
             self.handleAllExceptions(err)
 
-    def cas(self,key,value,cas_unique,flag,exptime):
+    def cas(self,key,value,cas_unique,flag,exptime,deadline=None):
         try:
-            finalResult = {
-                "message": "",
-                "status": ""
-            }
-            msg = "cas "+key+" "+str(flag)+" "+str(exptime)+" "+str(len(value))+" "+str(cas_unique)+"\r\n"+value+"\r\n"
-            self.sock.send(msg)
-            data = self.sock.receive()
-            storedRegex = "^STORED\r\n$"
-            existsRegex = "^EXISTS\r\n$"
-            notFoundRegex = "^NOT_FOUND\r\n$"
-            storedResult = re.search(storedRegex,data)
-            existsResult = re.search(existsRegex,data)
-            notFoundResult = re.search(notFoundRegex,data)
-            if storedResult:
-                finalResult["status"]=STATUS_RECORD_STORED
-                finalResult["message"]="The value for the key was set successfully"
-            elif existsResult:
-                finalResult["status"]=STATUS_RECORD_NOT_STORED
-                finalResult["message"]="The value was modified since it was last fetched. It could not be stored due to the preconditions of the command executed."
-            elif notFoundResult:
-                finalResult["status"]=STATUS_RECORD_NOT_STORED
-                finalResult["message"]="The key doesnt exist in the memcached server. It could not be stored due to the preconditions of the command executed."
-            else:
-                raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,data)
-            return finalResult
+            return self.execute(*self.prepareCas(key,value,cas_unique,flag,exptime),deadline=deadline)
         except Exception as err:
             self.handleAllExceptions(err)
+        finally:
+            self.invalidate(key,exptime)
 
-    def delete(self,key):
+    def delete(self,key,noreply=False,deadline=None):
         try:
-            finalResult = {
-                "message": "",
-                "status": ""
-            }
-            msg = "delete "+key+"\r\n"
-            self.sock.send(msg)
-            data = self.sock.receive()
-            deletedRegex = "^DELETED\r\n$"
-            notFoundRegex = "^NOT_FOUND\r\n$"
-            deletedResult = re.search(deletedRegex,data)
-            notFoundResult = re.search(notFoundRegex,data)
-            if deletedResult:
-                finalResult["status"]=STATUS_RECORD_DELETED
-                finalResult["message"]="The data was deleted successfully"
-            elif notFoundResult:
-                finalResult["status"]=STATUS_RECORD_NOT_DELETED
-                finalResult["message"]="The record was not found in the memcached server. It could not be deleted due to the preconditions of the command executed."
-            else:
-                raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,data)
-            return finalResult
+            return self.execute(*self.prepareDelete(key,noreply),noreply,deadline)
         except Exception as err:
             self.handleAllExceptions(err)
+        finally:
+            self.invalidate(key)
     
-    def incr(self,key,value):
+    def incr(self,key,value,noreply=False,deadline=None):
         try:
-            finalResult = {
-                "updated_value": None,
-                "message": "",
-                "status": ""
-            }
-            msg = "incr "+key+" "+str(value)+"\r\n"
+            return self.execute(*self.prepareIncr(key,value,noreply),noreply,deadline)
+        except Exception as err:
+            self.handleAllExceptions(err)
+        finally:
+            self.invalidate(key)
+
+    def decr(self,key,value,noreply=False,deadline=None):
+        try:
+            return self.execute(*self.prepareDecr(key,value,noreply),noreply,deadline)
+        except Exception as err:
+            self.handleAllExceptions(err)
+        finally:
+            self.invalidate(key)
+
+    def setMany(self,items,flag,exptime,deadline=None):
+        """Stores a list of (key, value) with pipelined set requests (returns a mapping of key to result)"""
+        try:
+            items = list(items)
+            prepared = [self.prepareSet(key,value,flag,exptime) for key, value in items]
+            return dict(zip([key for key, value in items],self.executeMany(prepared,deadline)))
+        except Exception as err:
+            self.handleAllExceptions(err)
+        finally:
+            for key, value in items:
+                self.invalidate(key,exptime)
+
+    def setFile(self,key,file,flag,exptime,noreply=False,size=None,deadline=None):
+        """Stores the content of file (opened in binary mode, from its current position) as the value of key without
+        reading it into memory, see MemclidSocket.sendFile
+
+        size is the number of bytes stored, the rest of the file by default (it has to be given for a pipe). The value
+        is stored as it is, it isn't serialized or compressed"""
+        try:
+            self.checkFlag("set",flag)
+            if size is None:
+                size = self.fileSize("set",file)
+            msg = self.storageHeader("set",key,flag,exptime,size,noreply=noreply)
+            return self.executeStream(msg,lambda: self.sock.sendFile(msg,file,size,noreply),
+                lambda: self.parseStorageResponse(self.sock.receive(),
+                    "The data was saved successfully",
+                    "The data could not be stored"),noreply,deadline)
+        except Exception as err:
+            self.handleAllExceptions(err)
+        finally:
+            self.invalidate(key,exptime)
+
+    def getFile(self,key,file,deadline=None):
+        """Fetches the value of key into file (opened in binary mode) while it is received, without holding it in memory
+
+        Returns the result of get with the number of bytes written as "size" instead of the value. The value is written
+        as it is stored, so a value compressed by a MemclidCompressor stays compressed (FLAG_COMPRESSED is set in its flag)"""
+        try:
+            msg = self.fileRetrievalRequest(key)
+            return self.executeStream(msg,lambda: self.sock.send(msg),
+                lambda: self.fileResult(key,self.sock.receiveValueInto(file)),deadline=deadline)
+        except Exception as err:
+            self.handleAllExceptions(err)
+
+    def metaGet(self,key,value=True,cas=False,ttl=False,lastAccess=False,opaque=None,deadline=None):
+        """Fetches the value along with any of its cas unique, remaining ttl and seconds since last access in one request"""
+        try:
+            return self.execute(*self.prepareMetaGet(key,value,cas,ttl,lastAccess,opaque),deadline=deadline)
+        except Exception as err:
+            self.handleAllExceptions(err)
+
+    def metaGetMany(self,keys,value=True,cas=False,ttl=False,lastAccess=False,deadline=None):
+        """Same as metaGet for a list of keys (returns a mapping of key to result)
+
+        The requests are sent in quiet mode, so the server only replies for the keys it has"""
+        try:
+            keys = list(dict.fromkeys(keys))
+            prepared = [self.prepareMetaGet(key,value,cas,ttl,lastAccess,str(index),quiet=True) for index, key in enumerate(keys)]
+            return dict(zip(keys,self.executeQuiet(prepared,b"EN\r\n",deadline)))
+        except Exception as err:
+            self.handleAllExceptions(err)
+
+    def metaSet(self,key,value,flag=0,exptime=0,cas_unique=None,mode="set",returnCas=False,opaque=None,deadline=None):
+        """Stores the value with the given mode (set, add, replace, append or prepend)
+
+        Only stores it if cas_unique still matches when it is given, returnCas gets the new cas unique value in the same request"""
+        try:
+            return self.execute(*self.prepareMetaSet(key,value,flag,exptime,cas_unique,mode,returnCas,opaque),deadline=deadline)
+        except Exception as err:
+            self.handleAllExceptions(err)
+        finally:
+            self.invalidate(key,exptime if mode in ("set","add","replace") else None)
+
+    def metaSetMany(self,items,flag=0,exptime=0,mode="set",deadline=None):
+        """Same as metaSet for a list of (key, value) (returns a mapping of key to result)
+
+        The requests are sent in quiet mode, so the server only replies for the keys that could not be stored"""
+        try:
+            items = list(items)
+            prepared = [self.prepareMetaSet(key,value,flag,exptime,None,mode,False,str(index),quiet=True) for index, (key, value) in enumerate(items)]
+            return dict(zip([key for key, value in items],self.executeQuiet(prepared,b"HD\r\n",deadline)))
+        except Exception as err:
+            self.handleAllExceptions(err)
+        finally:
+            for key, value in items:
+                self.invalidate(key,exptime if mode in ("set","add","replace") else None)
+
+    def metaDelete(self,key,cas_unique=None,opaque=None,deadline=None):
+        try:
+            return self.execute(*self.prepareMetaDelete(key,cas_unique,opaque),deadline=deadline)
+        except Exception as err:
+            self.handleAllExceptions(err)
+        finally:
+            self.invalidate(key)
+
+    def metaArithmetic(self,key,delta=1,decrement=False,initial=None,exptime=0,opaque=None,deadline=None):
+        """Increments (or decrements) the value and returns the updated value
+
+        When initial is given a missing key is created with that value (and exptime) instead of failing"""
+        try:
+            return self.execute(*self.prepareMetaArithmetic(key,delta,decrement,initial,exptime,opaque),deadline=deadline)
+        except Exception as err:
+            self.handleAllExceptions(err)
+        finally:
+            self.invalidate(key)
+
+    def execute(self,msg,parse,noreply=False,deadline=None):
+        """Sends the request and parses the response for it
+
+        With noreply the server doesn't reply, so the request is only sent (failed writes are counted by the socket).
+        With a deadline (a time.monotonic() value) MemclidTimeoutError is raised when the request isn't sent and its
+        response received by then, see MemclidSocket.setDeadline"""
+        if deadline is not None:
+            self.sock.setDeadline(deadline)
+            try:
+                return self.execute(msg,parse,noreply)
+            finally:
+                self.sock.setDeadline(None)
+        if self.hooks:
+            return self.executeObserved(msg,parse,noreply)
+        if noreply:
+            self.sock.sendNoreply(msg)
+            return self.noreplyResult()
+        self.sock.send(msg)
+        return parse(self.sock.receive())
+
+    def executeObserved(self,msg,parse,noreply):
+        #same as execute, timing every phase of the request for the hooks
+        times = [time.perf_counter()]
+        data = result = error = None
+        try:
+            if noreply:
+                self.sock.sendNoreply(msg)
+                times.append(time.perf_counter())
+                result = self.noreplyResult()
+                return result
             self.sock.send(msg)
+            times.append(time.perf_counter())
             data = self.sock.receive()
-            storedRegex = "^(\d+)\r\n$"
-            notFoundRegex = "^NOT_FOUND\r\n$"
-            storedResult = re.search(storedRegex,data)
-            notFoundResult = re.search(notFoundRegex,data)
-            if storedResult:
-                finalResult["updated_value"]=storedResult.group(1)
-                finalResult["status"]=STATUS_RECORD_STORED
-                finalResult["message"]="The value for the key was incremented successfully"
-            elif notFoundResult:
-                finalResult["status"]=STATUS_RECORD_NOT_STORED
-                finalResult["message"]="The key doesnt exist in the memcached server. It could not be incremented due to the preconditions of the command executed."
-            else:
-                raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,data)
-            return finalResult
+            times.append(time.perf_counter())
+            result = parse(data)
+            times.append(time.perf_counter())
+            return result
         except Exception as err:
-            self.handleAllExceptions(err)
+            error = err
+            raise
+        finally:
+            self.notifyHooks(msg,data,result,error,times)
 
-    def decr(self,key,value):
+    def executeStream(self,msg,send,receive,noreply=False,deadline=None):
+        """Same as execute for the requests streaming their value from or to a file, send() sends the request (starting
+        with msg) and receive() reads the response into the result, the hooks get the bytes counted by the socket"""
+        if deadline is not None:
+            self.sock.setDeadline(deadline)
+            try:
+                return self.executeStream(msg,send,receive,noreply)
+            finally:
+                self.sock.setDeadline(None)
+        times = [time.perf_counter()]
+        sent, received = self.sock.bytesSent, self.sock.bytesReceived
+        result = error = None
+        try:
+            send()
+            times.append(time.perf_counter())
+            result = self.noreplyResult() if noreply else receive()
+            if not noreply:
+                times += [time.perf_counter()]*2
+            return result
+        except Exception as err:
+            error = err
+            raise
+        finally:
+            if self.hooks:
+                self.notifyHooks(msg,None,result,error,times,(self.sock.bytesSent-sent,self.sock.bytesReceived-received))
+
+    def noreplyResult(self):
+        return {
+            "message": "The request was sent without waiting for a reply",
+            "status": STATUS_REQUEST_SENT
+        }
+
+    def timedOutResult(self):
+        return {
+            "message": "The request timed out before the reply of the server was received",
+            "status": STATUS_TIMED_OUT
+        }
+
+    def executeMany(self,prepared,deadline=None):
+        """Sends the requests in groups of MEMCLID_BATCH_WINDOW and parses the responses of a group in order before sending the next one
+
+        When the deadline (or a timeout of the socket) is reached the requests whose response wasn't received get a
+        timed out result and the results of the other ones are still returned. An error sent by the server for a
+        request is raised once the rest of the responses of its group were read, so that the connection can still be used"""
+        if deadline is not None:
+            self.sock.setDeadline(deadline)
+            try:
+                return self.executeMany(prepared)
+            finally:
+                self.sock.setDeadline(None)
+        results = []
+        try:
+            for groupStart in range(0,len(prepared),MEMCLID_BATCH_WINDOW):
+                group = prepared[groupStart:groupStart+MEMCLID_BATCH_WINDOW]
+                if self.hooks:
+                    self.executeGroupObserved(group,results)
+                    continue
+                self.sock.send(b"".join(msg for msg, parse in group))
+                serverError = None
+                for msg, parse in group:
+                    try:
+                        results.append(parse(self.sock.receive()))
+                    except (MemclidErrorSentByServer, MemclidClientErrorSentByServer, MemclidServerErrorSentByServer) as err:
+                        #a complete response on its own, the responses after it still match their requests
+                        serverError = serverError or err
+                if serverError is not None:
+                    raise serverError
+        except MemclidTimeoutError:
+            results += [self.timedOutResult() for index in range(len(results),len(prepared))]
+        return results
+
+    def executeGroupObserved(self,group,results):
+        #same as a group of executeMany (appending the results), the requests share the send time and wait from the end of the send until their response was read
+        start = time.perf_counter()
+        try:
+            self.sock.send(b"".join(msg for msg, parse in group))
+        except Exception as err:
+            for msg, parse in group:
+                self.notifyHooks(msg,None,None,err,[start])
+            raise
+        sent = time.perf_counter()
+        serverError = None
+        for index, (msg, parse) in enumerate(group):
+            data = None
+            try:
+                data = self.sock.receive()
+                received = time.perf_counter()
+                results.append(parse(data))
+            except (MemclidErrorSentByServer, MemclidClientErrorSentByServer, MemclidServerErrorSentByServer) as err:
+                self.notifyHooks(msg,None,None,err,[start,sent,time.perf_counter()])
+                serverError = serverError or err
+                continue
+            except Exception as err:
+                for failedMsg, failedParse in group[index:]:
+                    self.notifyHooks(failedMsg,data,None,err,[start,sent])
+                    data = None
+                raise
+            self.notifyHooks(msg,data,results[-1],None,[start,sent,received,time.perf_counter()])
+        if serverError is not None:
+            raise serverError
+
+    def sendPipelined(self,msg):
+        """Sends a request whose response is read later with receivePipelined, for the callers keeping several
+        requests in flight (like the batch command or the multi key gets of a cluster), returns what
+        receivePipelined needs to report the request to the hooks"""
+        start = time.perf_counter()
         try:
-            finalResult = {
-                "updated_value": None,
-                "message": "",
-                "status": ""
-            }
-            msg = "decr "+key+" "+str(value)+"\r\n"
             self.sock.send(msg)
+        except Exception as err:
+            if self.hooks:
+                self.notifyHooks(msg,None,None,err,[start])
+            raise
+        return msg, start, time.perf_counter()
+
+    def receivePipelined(self,request,parse):
+        #reads and parses the response to a request sent with sendPipelined, its wait time runs from the end of its send
+        msg, start, sent = request
+        times = [start,sent]
+        data = result = error = None
+        try:
             data = self.sock.receive()
-            storedRegex = "^(\d+)\r\n$"
-            notFoundRegex = "^NOT_FOUND\r\n$"
-            storedResult = re.search(storedRegex,data)
-            notFoundResult = re.search(notFoundRegex,data)
-            if storedResult:
-                finalResult["updated_value"]=storedResult.group(1)
-                finalResult["status"]=STATUS_RECORD_STORED
-                finalResult["message"]="The value for the key was decremented successfully"
-            elif notFoundResult:
-                finalResult["status"]=STATUS_RECORD_NOT_STORED
-                finalResult["message"]="The key doesnt exist in the memcached server. It could not be decremented due to the preconditions of the command executed."
-            else:
-                raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,data)
-            return finalResult
+            times.append(time.perf_counter())
+            result = parse(data)
+            times.append(time.perf_counter())
+            return result
         except Exception as err:
-            self.handleAllExceptions(err)
+            error = err
+            raise
+        finally:
+            if self.hooks:
+                self.notifyHooks(msg,data,result,error,times)
+
+    def executeQuiet(self,prepared,impliedResponse,deadline=None):
+        """Pipelines quiet meta requests (sent with their index as opaque) and returns the results in order
+
+        Every group of requests is followed by mn, the server replies to it with MN once it has handled all of them,
+        so every response read before MN belongs to a request of the group. The requests the server didn't reply to
+        are parsed as if impliedResponse was sent for them. When the deadline (or a timeout of the socket) is reached
+        the requests without a result yet get a timed out result"""
+        if deadline is not None:
+            self.sock.setDeadline(deadline)
+            try:
+                return self.executeQuiet(prepared,impliedResponse)
+            finally:
+                self.sock.setDeadline(None)
+        results = [None]*len(prepared)
+        try:
+            self.executeQuietGroups(prepared,impliedResponse,results)
+        except MemclidTimeoutError:
+            #a quiet request without a response before MN isn't a known miss, MN wasn't received
+            results = [self.timedOutResult() if result is None else result for result in results]
+        return results
+
+    def executeQuietGroups(self,prepared,impliedResponse,results):
+        for groupStart in range(0,len(prepared),MEMCLID_BATCH_WINDOW):
+            group = prepared[groupStart:groupStart+MEMCLID_BATCH_WINDOW]
+            #with hooks, the send time and the (data, time read, time parsed) of every response are kept for the events
+            times = [time.perf_counter()] if self.hooks else None
+            responses = {}
+            try:
+                self.sock.send(b"".join(msg for msg, parse in group)+b"mn\r\n")
+                if times:
+                    times.append(time.perf_counter())
+                serverError = None
+                while True:
+                    try:
+                        data = self.sock.receive()
+                    except (MemclidErrorSentByServer, MemclidClientErrorSentByServer, MemclidServerErrorSentByServer) as err:
+                        #keep reading until MN so that the connection can still be used
+                        serverError = serverError or err
+                        continue
+                    code, flags, value = self.parseMeta(data)
+                    if code == "MN":
+                        break
+                    index = int(flags.get("O","-1"))
+                    if index < groupStart or index >= groupStart+len(group):
+                        raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,responseText(data))
+                    received = time.perf_counter() if times else None
+                    results[index] = prepared[index][1](data)
+                    if times:
+                        responses[index] = (data,received,time.perf_counter())
+                if serverError is not None:
+                    raise serverError
+                received = time.perf_counter() if times else None
+                for index in range(groupStart,groupStart+len(group)):
+                    if results[index] is None:
+                        results[index] = prepared[index][1](impliedResponse)
+                        if times:
+                            responses[index] = (impliedResponse,received,time.perf_counter())
+            except Exception as err:
+                if times:
+                    for index in range(groupStart,groupStart+len(group)):
+                        self.notifyHooks(prepared[index][0],None,None,err,times)
+                raise
+            if times:
+                for index in range(groupStart,groupStart+len(group)):
+                    data, received, parsed = responses[index]
+                    self.notifyHooks(prepared[index][0],data,results[index],None,times+[received,parsed])
+
+    def notifyHooks(self,msg,data,result,error,times,sizes=None):
+        """Calls the hooks with the event of a request, times are the perf_counter values taken before sending it
+        and after it was sent, its response read and parsed (the ones not reached when it failed are missing).
+        sizes are the bytes sent and received when they aren't the ones of msg and data"""
+        command, keys = self.describeRequest(msg)
+        outcome, hits = commandOutcome(result,error)
+        phases = [times[index+1]-times[index] for index in range(len(times)-1)]+[0,0,0]
+        if sizes is None:
+            sizes = (memoryview(msg).nbytes,0 if data is None else self.responseSize(data))
+        event = MemclidCommandEvent(command,keys,sizes[0],sizes[1],
+            phases[0],phases[1],phases[2],outcome,hits,error)
+        for hook in self.hooks:
+            hook(event)
+
+    def describeRequest(self,msg):
+        #returns the command name and the number of keys of a request built by the prepare methods
+        tokens = bytes(msg[:msg.find(b"\r\n")]).split(b" ")
+        command = tokens[0].decode(errors="replace")
+        return command, len(tokens)-1 if command in ("get","gets") else 1
+
+    def responseSize(self,data):
+        return len(data)
+
+    #Every prepare method returns the request to be sent to the server along with the function that parses the response
+    #for it into the final result. Keeping the two apart lets callers (like the batch command) pipeline several requests
+    #before reading the responses back in order.
+
+    def prepareRetrieval(self,command,keys):
+        msg = self.retrievalRequest(command,keys)
+        return msg, lambda data: self.parseRetrievalResponse(data,command,keys)
+
+    def prepareSet(self,key,value,flag,exptime,noreply=False):
+        value, flag = self.encodeValue("set",value,flag)
+        msg = self.storageRequest("set",key,value,flag,exptime,noreply=noreply)
+        return msg, lambda data: self.parseStorageResponse(data,
+            "The data was saved successfully",
+            "The data could not be stored")
+
+    def prepareAdd(self,key,value,flag,exptime,noreply=False):
+        value, flag = self.encodeValue("add",value,flag)
+        msg = self.storageRequest("add",key,value,flag,exptime,noreply=noreply)
+        return msg, lambda data: self.parseStorageResponse(data,
+            "The data was saved successfully",
+            "The record is already stored in memcached server. It could not be stored due to the preconditions of the command executed.")
+
+    def prepareReplace(self,key,value,flag,exptime,noreply=False):
+        value, flag = self.encodeValue("replace",value,flag)
+        msg = self.storageRequest("replace",key,value,flag,exptime,noreply=noreply)
+        return msg, lambda data: self.parseStorageResponse(data,
+            "The value for the key was replaced successfully",
+            "The key doesnt exist in the memcached server. It could not be stored due to the preconditions of the command executed.")
+
+    def prepareAppend(self,key,value,noreply=False):
+        msg = self.storageRequest("append",key,value,0,3600,noreply=noreply)
+        #the flag and exptime aren't changed by append but they are still required when sending the request
+        return msg, lambda data: self.parseStorageResponse(data,
+            "The value was appended successfully",
+            "The key most likely doesnt exist in the memcached server. It could not be stored.")
+
+    def preparePrepend(self,key,value,noreply=False):
+        msg = self.storageRequest("prepend",key,value,0,3600,noreply=noreply)
+        #the flag and exptime aren't changed by prepend but they are still required when sending the request
+        return msg, lambda data: self.parseStorageResponse(data,
+            "The value was prepended successfully",
+            "The key most likely doesnt exist in the memcached server. It could not be stored.")
+
+    def prepareCas(self,key,value,cas_unique,flag,exptime):
+        value, flag = self.encodeValue("cas",value,flag)
+        msg = self.storageRequest("cas",key,value,flag,exptime,cas_unique)
+        return msg, self.parseCasResponse
+
+    def prepareDelete(self,key,noreply=False):
+        msg = self.deleteRequest(key,noreply)
+        return msg, self.parseDeleteResponse
+
+    def prepareIncr(self,key,value,noreply=False):
+        msg = self.arithmeticRequest("incr",key,value,noreply)
+        return msg, lambda data: self.parseArithmeticResponse(data,
+            "The value for the key was incremented successfully",
+            "The key doesnt exist in the memcached server. It could not be incremented due to the preconditions of the command executed.")
+
+    def prepareDecr(self,key,value,noreply=False):
+        msg = self.arithmeticRequest("decr",key,value,noreply)
+        return msg, lambda data: self.parseArithmeticResponse(data,
+            "The value for the key was decremented successfully",
+            "The key doesnt exist in the memcached server. It could not be decremented due to the preconditions of the command executed.")
+
+    def prepareMetaGet(self,key,value=True,cas=False,ttl=False,lastAccess=False,opaque=None,quiet=False):
+        flags = ["v","f"] if value else []
+        flags += (["c"] if cas else [])+(["t"] if ttl else [])+(["l"] if lastAccess else [])
+        msg = self.metaRequest("mg",key,flags,opaque,quiet)
+        return msg, lambda data: self.parseMetaGetResponse(data,key)
+
+    def prepareMetaSet(self,key,value,flag=0,exptime=0,cas_unique=None,mode="set",returnCas=False,opaque=None,quiet=False):
+        if isinstance(value,str):
+            value = value.encode()
+        flags = ["T"+str(exptime),"F"+str(flag),"M"+META_SET_MODES[mode]]
+        flags += (["C"+str(cas_unique)] if cas_unique is not None else [])+(["c"] if returnCas else [])
+        msg = self.metaRequest("ms "+key+" "+str(memoryview(value).nbytes),None,flags,opaque,quiet)
+        return b"".join((msg,value,b"\r\n")), self.parseMetaSetResponse
+
+    def prepareMetaDelete(self,key,cas_unique=None,opaque=None,quiet=False):
+        flags = ["C"+str(cas_unique)] if cas_unique is not None else []
+        msg = self.metaRequest("md",key,flags,opaque,quiet)
+        return msg, self.parseMetaDeleteResponse
+
+    def prepareMetaArithmetic(self,key,delta=1,decrement=False,initial=None,exptime=0,opaque=None,quiet=False):
+        flags = ["v","D"+str(delta)]+(["MD"] if decrement else [])
+        if initial is not None:
+            flags += ["N"+str(exptime),"J"+str(initial)]
+        msg = self.metaRequest("ma",key,flags,opaque,quiet)
+        return msg, self.parseMetaArithmeticResponse
+
+    def metaRequest(self,command,key,flags,opaque,quiet):
+        tokens = [command] if key is None else [command,key]
+        tokens += flags
+        if opaque is not None:
+            tokens.append("O"+str(opaque))
+        if quiet:
+            tokens.append("q")
+        return (" ".join(tokens)+"\r\n").encode()
+
+    def encodeValue(self,command,value,flag):
+        #returns the value and flag a value is stored with, serialized and compressed when there is a serializer/compressor
+        if self.serializer is None and self.compressor is None:
+            return value, flag
+        self.checkFlag(command,flag)
+        flag = int(flag)
+        if self.serializer is not None:
+            try:
+                value, typeBit = self.serializer.dumps(value)
+            except TypeError as err:
+                raise MemclidInvalidCommandError(command,str(err))
+            flag = flag | typeBit
+        if self.compressor is not None:
+            return self.compressor.compress(value,flag)
+        return value, flag
+
+    def checkFlag(self,command,flag):
+        #the bits of the flag used by the serializer and compressor can't be set by the application
+        if self.serializer is None and self.compressor is None:
+            return
+        reservedBits = self.serializer.reservedBits if self.serializer is not None else FLAG_COMPRESSED
+        if int(flag) & reservedBits:
+            raise MemclidInvalidCommandError(command,f"The bits {reservedBits} of the flag are reserved for the type and compression of the values")
+
+    def fileSize(self,command,file):
+        #bytes left in a regular file after its current position
+        try:
+            fileStat = os.fstat(file.fileno())
+        except (AttributeError, OSError, ValueError):
+            fileStat = None
+        if fileStat is None or not stat.S_ISREG(fileStat.st_mode):
+            raise MemclidInvalidCommandError(command,"The size of the value has to be given when it isn't read from a regular file")
+        return max(fileStat.st_size-file.tell(),0)
+
+    def fileResult(self,key,received):
+        #result of getFile from the (flag, size) written by MemclidSocket.receiveValueInto
+        if received is None:
+            return {"flag": None, "size": None, "message": "No value found for "+key, "status": STATUS_DATA_NOT_AVAILABLE}
+        flag, size = received
+        return {"flag": flag, "size": size, "message": "Fetched the value for "+key, "status": STATUS_DATA_AVAILABLE}
+
+    def hitResult(self,key,value,flag,casUnique=None):
+        """Returns the result of a key found by a retrieval from its data block and flag (and cas unique value for gets)
+
+        The value is decompressed when it was compressed, then decoded as str (and the flag returned as str), a value
+        that isn't valid UTF-8 is returned as bytes. With a serializer the result is a MemclidResult deserializing
+        the value when it is read and the flag an int"""
+        if self.compressor is not None:
+            value, flag = self.compressor.decompress(value,int(flag))
+        result = {"flag": flag, "value": None, "message": "Fetched the value for "+key, "status": STATUS_DATA_AVAILABLE}
+        if casUnique is not None:
+            result["cas_unique"] = casUnique
+        if self.serializer is None:
+            result["value"] = self.textValue(value)
+            if isinstance(result["value"],bytes):
+                result["message"] = "Fetched the value for "+key+" (not valid UTF-8, returned as bytes)"
+            result["flag"] = str(flag)
+            return result
+        del result["value"]
+        result["flag"] = int(flag) & ~self.serializer.reservedBits
+        return MemclidResult(result,value,self.serializer.loader(int(flag)))
+
+    def textValue(self,value):
+        #decodes a value fetched without a serializer, binary values are kept as bytes so that they don't fail the other keys
+        try:
+            return value.decode()
+        except UnicodeDecodeError:
+            return bytes(value)
+
+    def retrievalRequest(self,command,keys):
+        return (command+" "+" ".join(keys)+"\r\n").encode()
+
+    def deleteRequest(self,key,noreply=False):
+        return ("delete "+key+(" noreply" if noreply else "")+"\r\n").encode()
+
+    def arithmeticRequest(self,command,key,value,noreply=False):
+        return (command+" "+key+" "+str(value)+(" noreply" if noreply else "")+"\r\n").encode()
+
+    def storageRequest(self,command,key,value,flag,exptime,cas_unique=None,noreply=False):
+        """Builds a storage request as a single bytes buffer
+
+        value can be str (encoded once here) or any bytes-like object (used as it is), the length sent
+        to the server is the length of the data block in bytes"""
+        if isinstance(value,str):
+            value = value.encode()
+        header = self.storageHeader(command,key,flag,exptime,memoryview(value).nbytes,cas_unique,noreply)
+        return b"".join((header,value,b"\r\n"))
+
+    def storageHeader(self,command,key,flag,exptime,size,cas_unique=None,noreply=False):
+        #the command line of a storage request, sent before a data block of size bytes
+        header = command+" "+key+" "+str(flag)+" "+str(exptime)+" "+str(size)
+        if cas_unique is not None:
+            header = header+" "+str(cas_unique)
+        if noreply:
+            header = header+" noreply"
+        return (header+"\r\n").encode()
+
+    def fileRetrievalRequest(self,key):
+        return self.retrievalRequest("get",[key])
+
+    def parseStorageResponse(self,data,storedMessage,notStoredMessage):
+        finalResult = {
+            "message": "",
+            "status": ""
+        }
+        kind, argument = classifyResponse(data)
+        if kind == RESPONSE_STORED:
+            finalResult["status"]=STATUS_RECORD_STORED
+            finalResult["message"]=storedMessage
+        elif kind == RESPONSE_NOT_STORED:
+            finalResult["status"]=STATUS_RECORD_NOT_STORED
+            finalResult["message"]=notStoredMessage
+        else:
+            raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,responseText(data))
+        return finalResult
+
+    def parseCasResponse(self,data):
+        finalResult = {
+            "message": "",
+            "status": ""
+        }
+        kind, argument = classifyResponse(data)
+        if kind == RESPONSE_STORED:
+            finalResult["status"]=STATUS_RECORD_STORED
+            finalResult["message"]="The value for the key was set successfully"
+        elif kind == RESPONSE_EXISTS:
+            finalResult["status"]=STATUS_RECORD_NOT_STORED
+            finalResult["message"]="The value was modified since it was last fetched. It could not be stored due to the preconditions of the command executed."
+        elif kind == RESPONSE_NOT_FOUND:
+            finalResult["status"]=STATUS_RECORD_NOT_STORED
+            finalResult["message"]="The key doesnt exist in the memcached server. It could not be stored due to the preconditions of the command executed."
+        else:
+            raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,responseText(data))
+        return finalResult
+
+    def parseDeleteResponse(self,data):
+        finalResult = {
+            "message": "",
+            "status": ""
+        }
+        kind, argument = classifyResponse(data)
+        if kind == RESPONSE_DELETED:
+            finalResult["status"]=STATUS_RECORD_DELETED
+            finalResult["message"]="The data was deleted successfully"
+        elif kind == RESPONSE_NOT_FOUND:
+            finalResult["status"]=STATUS_RECORD_NOT_DELETED
+            finalResult["message"]="The record was not found in the memcached server. It could not be deleted due to the preconditions of the command executed."
+        else:
+            raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,responseText(data))
+        return finalResult
+
+    def parseArithmeticResponse(self,data,storedMessage,notFoundMessage):
+        finalResult = {
+            "updated_value": None,
+            "message": "",
+            "status": ""
+        }
+        kind, argument = classifyResponse(data)
+        if kind == RESPONSE_NUMBER:
+            finalResult["updated_value"]=argument
+            finalResult["status"]=STATUS_RECORD_STORED
+            finalResult["message"]=storedMessage
+        elif kind == RESPONSE_NOT_FOUND:
+            finalResult["status"]=STATUS_RECORD_NOT_STORED
+            finalResult["message"]=notFoundMessage
+        else:
+            raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,responseText(data))
+        return finalResult
+
+    def parseMeta(self,data):
+        kind, code = classifyResponse(data)
+        if kind != RESPONSE_META:
+            raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,responseText(data))
+        try:
+            return parseMetaResponse(data)
+        except ValueError:
+            raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,responseText(data))
+
+    def parseMetaGetResponse(self,data,key):
+        finalResult = {
+            "flag": None,
+            "value": None,
+            "cas_unique": None,
+            "ttl": None,
+            "last_access": None,
+            "opaque": None,
+            "message": "",
+            "status": ""
+        }
+        code, flags, value = self.parseMeta(data)
+        if code in ("VA","HD"):
+            finalResult["flag"]=flags.get("f")
+            finalResult["value"]=self.textValue(value) if value is not None else None
+            finalResult["cas_unique"]=flags.get("c")
+            finalResult["ttl"]=flags.get("t")
+            finalResult["last_access"]=flags.get("l")
+            finalResult["opaque"]=flags.get("O")
+            finalResult["status"]=STATUS_DATA_AVAILABLE
+            finalResult["message"]="Fetched the value for "+key if code == "VA" else "The key exists in the memcached server"
+        elif code == "EN":
+            finalResult["opaque"]=flags.get("O")
+            finalResult["status"]=STATUS_DATA_NOT_AVAILABLE
+            finalResult["message"]="No value found for "+key
+        else:
+            raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,responseText(data))
+        return finalResult
+
+    def parseMetaSetResponse(self,data):
+        finalResult = {
+            "cas_unique": None,
+            "opaque": None,
+            "message": "",
+            "status": ""
+        }
+        code, flags, value = self.parseMeta(data)
+        finalResult["opaque"]=flags.get("O")
+        if code == "HD":
+            finalResult["cas_unique"]=flags.get("c")
+            finalResult["status"]=STATUS_RECORD_STORED
+            finalResult["message"]="The data was saved successfully"
+        elif code == "NS":
+            finalResult["status"]=STATUS_RECORD_NOT_STORED
+            finalResult["message"]="The data could not be stored due to the preconditions of the command executed."
+        elif code == "EX":
+            finalResult["status"]=STATUS_RECORD_NOT_STORED
+            finalResult["message"]="The value was modified since it was last fetched. It could not be stored due to the preconditions of the command executed."
+        elif code == "NF":
+            finalResult["status"]=STATUS_RECORD_NOT_STORED
+            finalResult["message"]="The key doesnt exist in the memcached server. It could not be stored due to the preconditions of the command executed."
+        else:
+            raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,responseText(data))
+        return finalResult
+
+    def parseMetaDeleteResponse(self,data):
+        finalResult = {
+            "opaque": None,
+            "message": "",
+            "status": ""
+        }
+        code, flags, value = self.parseMeta(data)
+        finalResult["opaque"]=flags.get("O")
+        if code == "HD":
+            finalResult["status"]=STATUS_RECORD_DELETED
+            finalResult["message"]="The data was deleted successfully"
+        elif code == "NF":
+            finalResult["status"]=STATUS_RECORD_NOT_DELETED
+            finalResult["message"]="The record was not found in the memcached server. It could not be deleted due to the preconditions of the command executed."
+        elif code == "EX":
+            finalResult["status"]=STATUS_RECORD_NOT_DELETED
+            finalResult["message"]="The value was modified since it was last fetched. It could not be deleted due to the preconditions of the command executed."
+        else:
+            raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,responseText(data))
+        return finalResult
+
+    def parseMetaArithmeticResponse(self,data):
+        finalResult = {
+            "updated_value": None,
+            "opaque": None,
+            "message": "",
+            "status": ""
+        }
+        code, flags, value = self.parseMeta(data)
+        finalResult["opaque"]=flags.get("O")
+        if code in ("VA","HD"):
+            finalResult["updated_value"]=value.decode() if value is not None else None
+            finalResult["status"]=STATUS_RECORD_STORED
+            finalResult["message"]="The value for the key was updated successfully"
+        elif code == "NF":
+            finalResult["status"]=STATUS_RECORD_NOT_STORED
+            finalResult["message"]="The key doesnt exist in the memcached server. It could not be updated due to the preconditions of the command executed."
+        elif code in ("NS","EX"):
+            finalResult["status"]=STATUS_RECORD_NOT_STORED
+            finalResult["message"]="The value could not be updated due to the preconditions of the command executed."
+        else:
+            raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,responseText(data))
+        return finalResult
+
+    def retrieve(self,command,keys,deadline=None):
+        """Fetches the keys, with several requests when they don't fit on one command line
+
+        When the deadline (or a timeout of the socket) is reached before every response was received, the keys
+        not fetched yet get a timed out result for a multi-key get and MemclidTimeoutError is raised for a single key"""
+        if deadline is not None:
+            self.sock.setDeadline(deadline)
+            try:
+                return self.retrieve(command,keys)
+            finally:
+                self.sock.setDeadline(None)
+        singleKey = isinstance(keys,str)
+        if singleKey:
+            keys = [keys]
+        keys = list(dict.fromkeys(keys)) #removes duplicate keys while keeping the order
+        finalResult = {}
+        missing = keys
+        if self.nearCache is not None:
+            finalResult, missing = self.nearCache.lookupMany(command,keys)
+        keyGroups = self.splitKeys(command,missing) if missing else []
+        for index, keysInRequest in enumerate(keyGroups):
+            try:
+                fetched = self.execute(*self.prepareRetrieval(command,keysInRequest))
+            except MemclidTimeoutError:
+                if singleKey:
+                    raise
+                for timedOutKeys in keyGroups[index:]:
+                    finalResult.update({key: self.timedOutRetrievalResult(command,key) for key in timedOutKeys})
+                break
+            if self.nearCache is not None:
+                self.nearCache.storeMany(command,fetched)
+            finalResult.update(fetched)
+        if singleKey:
+            return finalResult[keys[0]]
+        if self.nearCache is not None:
+            return {key: finalResult[key] for key in keys}
+        return finalResult
+
+    def timedOutRetrievalResult(self,command,key):
+        result = {
+            "flag": None,
+            "value": None,
+            "message": "The request for "+key+" timed out before the reply of the server was received",
+            "status": STATUS_TIMED_OUT
+        }
+        if command == "gets":
+            result["cas_unique"] = None
+        return result
+
+    def invalidate(self,key,exptime=None):
+        if self.nearCache is not None:
+            self.nearCache.invalidate(key,exptime)
+
+    def splitKeys(self,command,keys):
+        #Splits the keys into as few requests as possible without crossing the server's line length limit
+        keyGroups = [[]]
+        msgLength = len(command)+2
+        for key in keys:
+            if keyGroups[-1] and msgLength+len(key)+1 > MEMCLID_MAX_COMMAND_LINE_LENGTH:
+                keyGroups.append([])
+                msgLength = len(command)+2
+            keyGroups[-1].append(key)
+            msgLength = msgLength+len(key)+1
+        return keyGroups
+
+    def parseRetrievalResponse(self,data,command,keys):
+        """Returns a mapping of every requested key to its result for a response terminated by END"""
+        withCas = command == "gets"
+        finalResult = {}
+        for key in keys:
+            finalResult[key] = {
+                "flag": None,
+                "value": None,
+                "message": "No value found for "+key,
+                "status": STATUS_DATA_NOT_AVAILABLE
+            }
+            if withCas:
+                finalResult[key]["cas_unique"] = None
+        kind, argument = classifyResponse(data)
+        if kind == RESPONSE_END:
+            return finalResult
+        if kind != RESPONSE_VALUES:
+            raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,responseText(data))
+        try:
+            hits = list(parseValues(data,withCas))
+        except ValueError:
+            raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,responseText(data))
+        for key, flag, value, casUnique in hits:
+            if key not in finalResult:
+                #a value sent for a key that wasn't requested
+                raise MemclidUnrecognizedResponseSentByServer(self.sock.host,self.sock.port,responseText(data))
+            finalResult[key] = self.hitResult(key,value,flag,casUnique)
+        return finalResult
 
     def handleAllExceptions(self,err):
         try:
             raise err
-        except (MemclidConnectionError, MemclidDisconnectError, MemclidConnectionBreakError, MemclidSendError, MemclidRecvError, MemclidErrorSentByServer, MemclidClientErrorSentByServer, MemclidServerErrorSentByServer, MemclidUnrecognizedResponseSentByServer) as err:
+        except (MemclidConnectionError, MemclidDisconnectError, MemclidConnectionBreakError, MemclidSendError, MemclidRecvError, MemclidErrorSentByServer, MemclidClientErrorSentByServer, MemclidServerErrorSentByServer, MemclidUnrecognizedResponseSentByServer, MemclidInvalidCommandError, MemclidPoolTimeoutError, MemclidTimeoutError) as err:
             click.echo(err.message)
         except :
             click.echo("An unexpected error occured")
@@ -0,0 +1,135 @@
+import select
+import shlex
+import time
+import click
+
+try:
+    import readline #arrow key navigation and history, not available on every platform
+except ImportError:
+    readline = None
+
+from .config import MEMCLID_SHELL_HISTORY_LENGTH
+
+class MemclidShell:
+    """
+    Interactive shell that runs the memclid commands over the connections opened once for the whole session
+
+    Every line is split like a command line (values with spaces can be quoted) and given to the click command
+    of the same name, so the commands take exactly the same arguments and options as on the command line,
+    e.g. "set KEY VALUE -et 60" or "get KEY1 KEY2". Besides the memclid commands the shell understands
+    help [COMMAND], history and exit/quit
+    """
+    def __init__(self, group, ctx, timing=True, historyFile=None):
+        """group is the memclid click group, ctx the click context holding the connected memclid Context as obj"""
+        self.group = group
+        self.ctx = ctx
+        self.timing = timing
+        self.historyFile = historyFile
+        self.history = []
+
+    def run(self, prompt="memclid> "):
+        self.loadHistory()
+        try:
+            while True:
+                try:
+                    line = input(prompt)
+                except KeyboardInterrupt:
+                    #ctrl-c only drops the line being typed
+                    click.echo()
+                    continue
+                except EOFError:
+                    click.echo()
+                    break
+                if not self.execute(line):
+                    break
+        finally:
+            self.saveHistory()
+
+    def execute(self, line):
+        """Runs one line of input, returns False when the shell has to exit"""
+        try:
+            args = shlex.split(line)
+        except ValueError as err:
+            click.echo(f"Invalid command. {err}")
+            return True
+        if len(args) == 0:
+            return True
+        self.history.append(line)
+        name = args[0]
+        if name in ("exit", "quit"):
+            return False
+        if name == "history":
+            for index, command in enumerate(self.history[-MEMCLID_SHELL_HISTORY_LENGTH:], start=1):
+                click.echo(f"{index:5}  {command}")
+            return True
+        if name == "help":
+            if len(args) == 1:
+                self.echoCommands()
+                return True
+            name, args = args[1], [args[1], "--help"]
+        command = self.group.get_command(self.ctx, name)
+        if command is None or name == "shell":
+            click.echo(f"Unknown command {name}, use help to list the commands")
+            return True
+        start = time.perf_counter()
+        try:
+            with command.make_context(name, args[1:], parent=self.ctx) as commandCtx:
+                command.invoke(commandCtx)
+        except click.exceptions.Exit:
+            pass #--help
+        except click.ClickException as err:
+            err.show()
+        except click.Abort:
+            pass #the error was already shown by the command
+        #the connection is opened again if the command broke it (a timed out key is reported without an error)
+        if self.connectionBroken():
+            self.reconnect()
+        if self.timing:
+            click.echo(f"({(time.perf_counter()-start)*1000:.2f} ms)")
+        return True
+
+    def echoCommands(self):
+        click.echo("Commands (use help COMMAND for their arguments and options):")
+        for name in self.group.list_commands(self.ctx):
+            if name != "shell":
+                click.echo(f"  {name:10}{self.group.get_command(self.ctx, name).get_short_help_str(60)}")
+        click.echo(f"  {'history':10}List the commands run in this session")
+        click.echo(f"  {'exit':10}Exit the shell (or ctrl-d)")
+
+    def connectionBroken(self):
+        """a healthy connection has nothing left to read once a command completed, so a socket marked broken (e.g. a reply
+        can still arrive after a timeout), with unread data or readable was closed or is out of sync, like in MemclidPool.checkin"""
+        for memclidSocket in self.ctx.obj.MEMCLID_SOCKETS:
+            if memclidSocket.broken is not None or memclidSocket.bufferPos != len(memclidSocket.buffer):
+                return True
+            try:
+                readable, writable, failed = select.select([memclidSocket.sock],[],[],0)
+            except (OSError, ValueError, TypeError):
+                return True
+            if readable:
+                return True
+        return False
+
+    def reconnect(self):
+        click.echo("Reconnecting to the memcached server")
+        try:
+            self.ctx.obj.reconnect()
+        except click.Abort:
+            pass #the error was shown, the next command tries again
+
+    def loadHistory(self):
+        if readline is None or self.historyFile is None:
+            return
+        readline.set_history_length(MEMCLID_SHELL_HISTORY_LENGTH)
+        try:
+            readline.read_history_file(self.historyFile)
+        except OSError:
+            pass #first session
+
+    def saveHistory(self):
+        if readline is None or self.historyFile is None:
+            return
+        try:
+            readline.write_history_file(self.historyFile)
+        except OSError:
+            click.echo(f"Couldn't save the command history to {self.historyFile}")
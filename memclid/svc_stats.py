@@ -0,0 +1,100 @@
+import time
+from .exceptions import *
+
+#groups of statistics that can be requested, None is the general statistics
+STATS_GROUPS = ("settings", "slabs", "items")
+
+#counters shown per second by the watch mode
+STATS_RATE_COUNTERS = ("cmd_get", "cmd_set", "get_hits", "get_misses", "evictions", "bytes_read", "bytes_written")
+
+#gauges shown as they are by the watch mode
+STATS_GAUGES = ("curr_connections", "curr_items", "bytes")
+
+def parseStatValue(value):
+    """Returns the value of a STAT line as an int or a float when it is a number, as a string otherwise"""
+    for kind in (int, float):
+        try:
+            return kind(value)
+        except ValueError:
+            pass
+    return value
+
+def hitRatio(hits, misses):
+    #None when there was no get to compute it from
+    return hits/(hits+misses) if hits+misses > 0 else None
+
+class MemclidStats:
+    """
+    Reads the statistics of one or more memcached servers with the stats command
+
+    Every socket of memclidSockets is asked in turn and the results are returned as a mapping of "host:port"
+    (or the path of a unix domain socket) to the parsed statistics. The slabs and items statistics are grouped per slab class under "classes"
+    (e.g. stats["classes"][1]["chunk_size"]), the statistics that aren't per class stay at the top level
+    """
+    def __init__(self, memclidSockets):
+        self.memclidSockets = memclidSockets
+
+    def fetch(self, group=None):
+        #a unix domain socket is named by its path
+        return {sock.host if sock.port is None else f"{sock.host}:{sock.port}": self.fetchOne(sock, group) for sock in self.memclidSockets}
+
+    def fetchOne(self, sock, group=None):
+        stats = {}
+        for name, value in self.statLines(sock, group):
+            stats[name] = parseStatValue(value)
+        if group in ("slabs", "items"):
+            return self.groupClasses(stats, group)
+        return stats
+
+    def statLines(self, sock, group):
+        sock.send(b"stats\r\n" if group is None else b"stats %s\r\n" % group.encode())
+        while True:
+            line = sock.receiveLine().decode(errors="replace")
+            if line == "END\r\n":
+                return
+            parts = line.rstrip("\r\n").split(" ", 2)
+            if len(parts) < 2 or parts[0] != "STAT":
+                raise MemclidUnrecognizedResponseSentByServer(sock.host, sock.port, line)
+            yield parts[1], parts[2] if len(parts) > 2 else ""
+
+    def groupClasses(self, stats, group):
+        #"stats slabs" names the per class statistics <class>:<name> and "stats items" items:<class>:<name>
+        grouped = {"classes": {}}
+        for name, value in stats.items():
+            parts = name.split(":")
+            if group == "items" and len(parts) == 3 and parts[0] == "items":
+                parts = parts[1:]
+            if len(parts) == 2 and parts[0].isdigit():
+                grouped["classes"].setdefault(int(parts[0]), {})[parts[1]] = value
+            else:
+                grouped[name] = value
+        return grouped
+
+    def sample(self):
+        """Returns (time of the sample, general statistics of every server) to compute rates with"""
+        return time.monotonic(), self.fetch()
+
+def totalStats(statsList):
+    """Adds up the STATS_RATE_COUNTERS and STATS_GAUGES of the general statistics of many servers"""
+    return {name: sum(stats.get(name, 0) for stats in statsList) for name in STATS_RATE_COUNTERS+STATS_GAUGES}
+
+def statsRates(previous, current, elapsed):
+    """
+    Returns the per second rates of the STATS_RATE_COUNTERS between two samples of the general statistics of
+    a server taken elapsed seconds apart, the STATS_GAUGES of the current sample and the hit ratio of the gets
+    made in between (hit_ratio), previous is None for the first sample and only the gauges and the overall hit
+    ratio are returned then. A counter lower than before (the server restarted or its stats were reset) counts from 0
+    """
+    rates = {name: current.get(name) for name in STATS_GAUGES}
+    if previous is None or elapsed <= 0:
+        for name in STATS_RATE_COUNTERS:
+            rates[name+"/sec"] = None
+        rates["hit_ratio"] = hitRatio(current.get("get_hits", 0), current.get("get_misses", 0))
+        return rates
+    deltas = {}
+    for name in STATS_RATE_COUNTERS:
+        value, before = current.get(name, 0), previous.get(name, 0)
+        deltas[name] = value-before if value >= before else value
+        rates[name+"/sec"] = deltas[name]/elapsed
+    rates["hit_ratio"] = hitRatio(deltas["get_hits"], deltas["get_misses"])
+    return rates
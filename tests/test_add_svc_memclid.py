@@ -31,14 +31,14 @@ class TestAddMemclidUtility(unittest.TestCase):
             TEST 1 : Check if correct add request is being made and
             storing the key-value pair using add successfully leads to a success result in the application
         """
-        self.memclidSocket.receive.return_value = "STORED\r\n"
+        self.memclidSocket.receive.return_value = b"STORED\r\n"
         expectedResult = {
             "message": "The data was saved successfully",
             "status": STATUS_RECORD_STORED
         }
 
         actualResult=self.memclidUtility.add("testKey","testValue",10,3600)
-        self.memclidSocket.send.assert_called_once_with(msg="add testKey 10 3600 9\r\ntestValue\r\n")
+        self.memclidSocket.send.assert_called_once_with(msg=b"add testKey 10 3600 9\r\ntestValue\r\n")
         self.memclidSocket.receive.assert_called_once();
         self.assertDictEqual(actualResult,expectedResult)
 
@@ -48,14 +48,14 @@ class TestAddMemclidUtility(unittest.TestCase):
             TEST 2 : Check if correct add request is being made and
             failure while storing the key-value pair using add leads to a failure result in the application
         """
-        self.memclidSocket.receive.return_value = "NOT_STORED\r\n"
+        self.memclidSocket.receive.return_value = b"NOT_STORED\r\n"
         expectedResult = {
             "message": "The record is already stored in memcached server. It could not be stored due to the preconditions of the command executed.",
             "status": STATUS_RECORD_NOT_STORED
         }
 
         actualResult=self.memclidUtility.add("testKey","testValue",10,3600)
-        self.memclidSocket.send.assert_called_once_with(msg="add testKey 10 3600 9\r\ntestValue\r\n")
+        self.memclidSocket.send.assert_called_once_with(msg=b"add testKey 10 3600 9\r\ntestValue\r\n")
         self.memclidSocket.receive.assert_called_once();
         self.assertDictEqual(actualResult,expectedResult)
 
@@ -65,7 +65,7 @@ class TestAddMemclidUtility(unittest.TestCase):
             TEST 3 : Check if MemclidUnrecognizedResponseSentByServer is raised and handled when an invalid response is sent by the server
 
         """
-        self.memclidSocket.receive.return_value = "RANDOM_RESPONSE_SENT_BY_SERVER\r\n"
+        self.memclidSocket.receive.return_value = b"RANDOM_RESPONSE_SENT_BY_SERVER\r\n"
 
         with self.assertRaises(click.exceptions.Abort):
             self.memclidUtility.add("testKey","testValue",0,3600)
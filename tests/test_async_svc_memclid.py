@@ -0,0 +1,138 @@
+import sys
+import os
+import io
+import asyncio
+import click
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+sys.path.append(os.path.join(os.getcwd(),'..'))
+
+import unittest
+from memclid.constants import STATUS_DATA_AVAILABLE, STATUS_DATA_NOT_AVAILABLE, STATUS_RECORD_STORED
+from memclid.exceptions import MemclidConnectionBreakError
+from memclid.async_svc_memclid import AsyncMemclidUtility
+from memclid.async_memclid_socket import AsyncMemclidSocket
+
+class TestAsyncMemclidUtility(unittest.IsolatedAsyncioTestCase):
+    """
+    Essentially these unit tests test that the requests made concurrently on one AsyncMemclidSocket are
+    matched with their responses, against a server on localhost that answers every get with the key itself
+    as the value and every storage command with STORED
+    """
+    async def asyncSetUp(self):
+        self.requests = []
+        self.server = await asyncio.start_server(self.handle,"127.0.0.1",0)
+        self.memclidSocket = AsyncMemclidSocket()
+        await self.memclidSocket.connect("127.0.0.1",self.server.sockets[0].getsockname()[1])
+        self.memclidUtility = AsyncMemclidUtility(self.memclidSocket)
+
+    async def asyncTearDown(self):
+        await self.memclidSocket.disconnect()
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readuntil(b"\r\n")
+                self.requests.append(line)
+                args = line.split()
+                if args[0] == b"get":
+                    for key in args[1:]:
+                        if key != b"missingKey":
+                            writer.write(b"VALUE "+key+b" 0 "+str(len(key)).encode()+b"\r\n"+key+b"\r\n")
+                    writer.write(b"END\r\n")
+                elif args[0] == b"set":
+                    await reader.readexactly(int(args[4])+2)
+                    writer.write(b"STORED\r\n")
+                elif args[0] == b"mg":
+                    writer.write(b"VA "+str(len(args[1])).encode()+b" f0\r\n"+args[1]+b"\r\n")
+                elif args[0] == b"close":
+                    writer.close()
+                    return
+                else:
+                    writer.write(b"ERROR\r\n")
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            writer.close()
+
+    async def test_async_concurrent_requests(self):
+
+        """
+            TEST 1 : Check if concurrent requests are pipelined and every caller gets the response for its own request
+        """
+        keys = ["testKey"+str(i) for i in range(200)]
+
+        results = await asyncio.gather(*(self.memclidUtility.get(key) for key in keys))
+        self.assertEqual([result["value"] for result in results],keys)
+        self.assertTrue(all(result["status"] == STATUS_DATA_AVAILABLE for result in results))
+
+    async def test_async_multiple_keys_and_set(self):
+
+        """
+            TEST 2 : Check if the multi key get and the storage commands work the same way as in MemclidUtility
+        """
+        setResult, getResult = await asyncio.gather(
+            self.memclidUtility.set("testKey","testValue",0,3600),
+            self.memclidUtility.get(["testKey","missingKey"])
+        )
+        self.assertEqual(self.requests[0],b"set testKey 0 3600 9\r\n")
+        self.assertEqual(setResult["status"],STATUS_RECORD_STORED)
+        self.assertEqual(getResult["testKey"]["status"],STATUS_DATA_AVAILABLE)
+        self.assertEqual(getResult["missingKey"]["status"],STATUS_DATA_NOT_AVAILABLE)
+
+    async def test_async_error_sent_by_server(self):
+
+        """
+            TEST 3 : Check if an error sent by the server fails only the request it was sent for
+        """
+        results = await asyncio.gather(
+            self.memclidUtility.incr("testKey",1),
+            self.memclidUtility.get("testKey"),
+            return_exceptions=True
+        )
+        self.assertIsInstance(results[0],click.exceptions.Abort)
+        self.assertEqual(results[1]["value"],"testKey")
+
+    async def test_async_connection_closed(self):
+
+        """
+            TEST 4 : Check if the requests waiting for a response fail when the server closes the connection
+        """
+        with self.assertRaises(MemclidConnectionBreakError):
+            await self.memclidUtility.execute("close\r\n",lambda data: data)
+        with self.assertRaises(click.exceptions.Abort):
+            await self.memclidUtility.get("testKey")
+
+    async def test_async_many_keys_and_meta(self):
+
+        """
+            TEST 5 : Check if setMany and metaGetMany are awaited on the connection and setFile is refused by the async client
+        """
+        keys = ["testKey"+str(i) for i in range(20)]
+        setResults = await self.memclidUtility.setMany([(key,"testValue") for key in keys],0,0)
+        self.assertEqual([setResults[key]["status"] for key in keys],[STATUS_RECORD_STORED]*len(keys))
+        getResults = await self.memclidUtility.metaGetMany(keys)
+        self.assertEqual([getResults[key]["value"] for key in keys],keys)
+        self.assertEqual(self.requests[-1],b"mg testKey19 v f\r\n")
+        output = io.StringIO()
+        with self.assertRaises(click.exceptions.Abort):
+            with redirect_stdout(output):
+                self.memclidUtility.setFile("testKey",io.BytesIO(b"testValue"),0,0)
+        self.assertIn("async client",output.getvalue())
+
+    async def test_async_connect_cancelled(self):
+
+        """
+            TEST 6 : Check if a connect that doesn't finish in time is cancelled by asyncio.wait_for instead of failing as a connection error
+        """
+        async def hang(*args):
+            await asyncio.sleep(10)
+        memclidSocket = AsyncMemclidSocket()
+        with patch("memclid.async_memclid_socket.asyncio.open_connection",hang):
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(memclidSocket.connect("127.0.0.1",11211),0.05)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import sys
+import os
+
+sys.path.append(os.path.join(os.getcwd(),'..'))
+
+import unittest
+from unittest.mock import create_autospec, call
+from memclid.constants import STATUS_DATA_AVAILABLE, STATUS_RECORD_STORED, STATUS_RECORD_DELETED
+from memclid.exceptions import MemclidInvalidCommandError, MemclidClientErrorSentByServer
+from memclid.svc_memclid import MemclidUtility
+from memclid.svc_batch import MemclidBatch
+from memclid.memclid_socket import MemclidSocket
+
+class TestBatchMemclidUtility(unittest.TestCase):
+    """
+    Essentially these unit tests test that the commands of a batch are pipelined and that
+    the responses sent by the Memcached server are matched back to the commands in order
+    """
+    def setUp(self):
+        self.memclidSocket = create_autospec(MemclidSocket)
+        self.memclidSocket.host = "localhost"
+        self.memclidSocket.port = 11211
+        self.memclidUtility = MemclidUtility(self.memclidSocket)
+
+    def tearDown(self):
+        self.memclidUtility = None
+        self.memclidSocket = None
+
+    def test_batch_responses_matched_in_order(self):
+
+        """
+            TEST 1 : Check if the requests for every command are sent and
+            the responses are matched back to the commands in the order they were given
+        """
+        self.memclidSocket.receive.side_effect = [b"STORED\r\n", b"VALUE testKey 0 9\r\ntestValue\r\nEND\r\n", b"DELETED\r\n"]
+
+        results = list(MemclidBatch(self.memclidUtility,10).run(["set testKey testValue\n", "\n", "# comment\n", "get testKey\n", "delete testKey\n"]))
+        self.memclidSocket.send.assert_has_calls([
+            call(b"set testKey 0 3600 9\r\ntestValue\r\n"),
+            call(b"get testKey\r\n"),
+            call(b"delete testKey\r\n")
+        ])
+        self.assertEqual([command for command, result, error in results], ["set testKey testValue", "get testKey", "delete testKey"])
+        self.assertEqual(results[0][1]["status"],STATUS_RECORD_STORED)
+        self.assertEqual(results[1][1]["testKey"]["status"],STATUS_DATA_AVAILABLE)
+        self.assertEqual(results[1][1]["testKey"]["value"],"testValue")
+        self.assertEqual(results[2][1]["status"],STATUS_RECORD_DELETED)
+
+    def test_batch_window_limits_requests_in_flight(self):
+
+        """
+            TEST 2 : Check if no more than window requests are sent before a response is read
+        """
+        events = []
+        self.memclidSocket.send.side_effect = lambda msg: events.append("send")
+        def receive():
+            events.append("receive")
+            return b"STORED\r\n"
+        self.memclidSocket.receive.side_effect = receive
+
+        results = list(MemclidBatch(self.memclidUtility,2).run(["set key"+str(i)+" value" for i in range(4)]))
+        self.assertEqual(len(results),4)
+        self.assertEqual(events,["send","send","receive","send","receive","send","receive","receive"])
+
+    def test_batch_invalid_command(self):
+
+        """
+            TEST 3 : Check if an invalid command is reported without sending anything to the server
+        """
+        results = list(MemclidBatch(self.memclidUtility,10).run(["incr testKey notANumber", "set", "unknown testKey", 'set "test key" testValue']))
+        self.memclidSocket.send.assert_not_called()
+        self.assertEqual(len(results),4)
+        for command, result, error in results:
+            self.assertIsNone(result)
+            self.assertIsInstance(error,MemclidInvalidCommandError)
+
+    def test_batch_error_sent_by_server(self):
+
+        """
+            TEST 4 : Check if an error sent by the server fails only the command it was sent for
+        """
+        self.memclidSocket.receive.side_effect = [MemclidClientErrorSentByServer("localhost",11211,"bad data chunk"), b"STORED\r\n"]
+
+        results = list(MemclidBatch(self.memclidUtility,10).run(["set key1 value1", "set key2 value2"]))
+        self.assertIsInstance(results[0][2],MemclidClientErrorSentByServer)
+        self.assertEqual(results[1][1]["status"],STATUS_RECORD_STORED)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import sys
+import os
+import random
+
+sys.path.append(os.path.join(os.getcwd(),'..'))
+
+import unittest
+from memclid.svc_bench import MemclidBench, parseMix, parseValueSize
+from memclid.fake_server import MemclidFakeServer
+
+class TestMemclidBench(unittest.TestCase):
+    """
+    Essentially these unit tests test the parsing of the bench options and that a benchmark
+    run against the fake server reports the commands it sent
+    """
+    def setUp(self):
+        self.server = MemclidFakeServer().start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_parse_mix(self):
+
+        """
+            TEST 1 : Check if the command mix is parsed into weights and invalid mixes are refused
+        """
+        self.assertEqual(parseMix("get=80, set=20"),{"get": 80, "set": 20})
+        for mix in ["get", "get=x", "delete=1", "get=0"]:
+            with self.assertRaises(ValueError):
+                parseMix(mix)
+
+    def test_parse_value_size(self):
+
+        """
+            TEST 2 : Check if fixed, uniform and log-uniform value sizes are parsed
+        """
+        self.assertEqual(parseValueSize("100"),(100,100,False))
+        self.assertEqual(parseValueSize("10-2000"),(10,2000,False))
+        self.assertEqual(parseValueSize("10-2000:log"),(10,2000,True))
+        for spec in ["x", "10-", "20-10", "0-10:log", "10-20:pareto"]:
+            with self.assertRaises(ValueError):
+                parseValueSize(spec)
+
+    def test_zipf_keys_are_skewed(self):
+
+        """
+            TEST 3 : Check if the first keys are picked far more often with the zipf distribution
+        """
+        memclidBench = MemclidBench("127.0.0.1",self.server.port,keys=1000,distribution="zipf",seed=1)
+        rng = random.Random(1)
+        picks = [rng.choices(range(1000), cum_weights=memclidBench.keyWeights)[0] for index in range(2000)]
+        self.assertGreater(picks.count(0), 2000/1000*20)
+
+    def test_closed_loop_threads(self):
+
+        """
+            TEST 4 : Check if a closed loop run with threads sends the whole mix and measures the latency of every command
+        """
+        memclidBench = MemclidBench("127.0.0.1",self.server.port,connections=2,mix={"get": 1, "set": 1, "incr": 1, "cas": 1},
+            keys=10,valueSize=(1,50,False),duration=0.3,warmup=0.1,seed=1)
+        report = memclidBench.run()
+        self.assertEqual(report["failures"],[])
+        self.assertGreater(report["operations"],0)
+        self.assertEqual(report["latency"].count,sum(command["latency"].count for command in report["commands"].values()))
+        self.assertGreater(report["commands"]["get"]["hits"],0)
+        self.assertEqual(report["commands"]["set"]["hits"],report["commands"]["set"]["latency"].count)
+        for command in report["commands"].values():
+            self.assertGreater(command["latency"].count,0)
+            self.assertEqual(command["errors"],0)
+
+    def test_open_loop_async(self):
+
+        """
+            TEST 5 : Check if an open loop run with asyncio tasks sends the commands at the given rate
+        """
+        memclidBench = MemclidBench("127.0.0.1",self.server.port,connections=1,mix={"get": 1},duration=0.5,warmup=0,
+            rate=200,mode="async",tasksPerConnection=2)
+        report = memclidBench.run()
+        self.assertEqual(report["failures"],[])
+        self.assertAlmostEqual(report["operations"],100,delta=10)
+
+    def test_connection_failure_reported(self):
+
+        """
+            TEST 6 : Check if workers that can't connect are reported instead of stopping the benchmark
+        """
+        self.server.stop()
+        memclidBench = MemclidBench("127.0.0.1",self.server.port,connections=2,duration=0.1,warmup=0)
+        report = memclidBench.run()
+        self.assertEqual(len(report["failures"]),2)
+        self.assertEqual(report["operations"],0)
+
+    def test_timeouts_counted_as_errors(self):
+
+        """
+            TEST 7 : Check if commands timing out are counted as errors and the workers keep running over new connections
+        """
+        self.server.latency = 0.05
+        memclidBench = MemclidBench("127.0.0.1",self.server.port,connections=2,mix={"get": 1},duration=0.3,warmup=0,
+            socketOptions={"readTimeout": 0.01})
+        report = memclidBench.run()
+        self.assertEqual(report["failures"],[])
+        self.assertGreater(report["operations"],2)
+        self.assertEqual(report["commands"]["get"]["errors"],report["operations"])
+
+if __name__ == '__main__':
+    unittest.main()
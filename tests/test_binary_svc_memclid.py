@@ -0,0 +1,183 @@
+import sys
+import os
+import click
+import socket
+
+sys.path.append(os.path.join(os.getcwd(),'..'))
+
+import unittest
+from unittest.mock import create_autospec
+from memclid.constants import *
+from memclid.binary_protocol import *
+from memclid.binary_svc_memclid import MemclidBinaryUtility
+from memclid.binary_memclid_socket import MemclidBinarySocket
+from memclid.exceptions import MemclidClientErrorSentByServer
+
+def responsePacket(opcode, status=0, key=b"", extras=b"", value=b"", opaque=0, cas=0):
+    header = HEADER.pack(RESPONSE_MAGIC, opcode, len(key), len(extras), 0, status, len(extras)+len(key)+len(value), opaque, cas)
+    return header+extras+key+value
+
+class TestBinaryMemclidUtility(unittest.TestCase):
+    """
+    Essentially these unit tests test that the binary requests are built correctly and that the
+    response packets sent by the Memcached server are interpreted like their text protocol counterparts
+    """
+    def setUp(self):
+        self.memclidSocket = create_autospec(MemclidBinarySocket)
+        self.memclidSocket.host = "localhost"
+        self.memclidSocket.port = 11211
+        self.memclidUtility = MemclidBinaryUtility(self.memclidSocket)
+
+    def tearDown(self):
+        self.memclidUtility = None
+        self.memclidSocket = None
+
+    def test_binary_set(self):
+
+        """
+            TEST 1 : Check if the set request is a SET packet with flags and exptime in the extras
+        """
+        self.memclidSocket.receive.return_value = [BinaryPacket(OPCODE_SET,STATUS_NO_ERROR,0,1,b"",b"",b"")]
+
+        actualResult = self.memclidUtility.set("testKey","testValue",10,60)
+        self.memclidSocket.send.assert_called_once_with(msg=packRequest(OPCODE_SET,"testKey",STORAGE_EXTRAS.pack(10,60),b"testValue"))
+        self.assertDictEqual(actualResult,{"message": "The data was saved successfully", "status": STATUS_RECORD_STORED})
+
+    def test_binary_add_existing_key(self):
+
+        """
+            TEST 2 : Check if KEY_EXISTS for add leads to the same not stored result as the text protocol
+        """
+        self.memclidSocket.receive.return_value = [BinaryPacket(OPCODE_ADD,STATUS_KEY_EXISTS,0,0,b"",b"",b"")]
+
+        actualResult = self.memclidUtility.add("testKey","testValue",0,60)
+        self.assertEqual(actualResult["status"],STATUS_RECORD_NOT_STORED)
+        self.assertEqual(actualResult["message"],"The record is already stored in memcached server. It could not be stored due to the preconditions of the command executed.")
+
+    def test_binary_cas(self):
+
+        """
+            TEST 3 : Check if the cas unique value is sent in the header and KEY_EXISTS means the value was modified
+        """
+        self.memclidSocket.receive.return_value = [BinaryPacket(OPCODE_SET,STATUS_KEY_EXISTS,0,0,b"",b"",b"")]
+
+        actualResult = self.memclidUtility.cas("testKey","testValue",42,0,60)
+        self.memclidSocket.send.assert_called_once_with(msg=packRequest(OPCODE_SET,"testKey",STORAGE_EXTRAS.pack(0,60),b"testValue",cas=42))
+        self.assertEqual(actualResult["status"],STATUS_RECORD_NOT_STORED)
+
+    def test_binary_get_many(self):
+
+        """
+            TEST 4 : Check if the keys are sent as GETKQ followed by a NOOP and the hits are matched by opaque
+        """
+        self.memclidSocket.receive.return_value = [
+            BinaryPacket(OPCODE_GETKQ,STATUS_NO_ERROR,1,77,FLAGS_EXTRAS.pack(5),b"k2",b"v2"),
+            BinaryPacket(OPCODE_NOOP,STATUS_NO_ERROR,2,0,b"",b"",b"")]
+
+        actualResult = self.memclidUtility.gets(["k1","k2"])
+        self.memclidSocket.send.assert_called_once_with(msg=packRequest(OPCODE_GETKQ,"k1",opaque=0)+packRequest(OPCODE_GETKQ,"k2",opaque=1)+packRequest(OPCODE_NOOP,opaque=2))
+        self.assertEqual(actualResult["k1"]["status"],STATUS_DATA_NOT_AVAILABLE)
+        self.assertDictEqual(actualResult["k2"],{
+            "flag": "5",
+            "value": "v2",
+            "cas_unique": "77",
+            "message": "Fetched the value for k2",
+            "status": STATUS_DATA_AVAILABLE
+        })
+
+    def test_binary_get_wrong_key(self):
+
+        """
+            TEST 5 : Check if a hit for a key that doesn't match its opaque is rejected
+        """
+        self.memclidSocket.receive.return_value = [
+            BinaryPacket(OPCODE_GETKQ,STATUS_NO_ERROR,0,0,FLAGS_EXTRAS.pack(0),b"other",b"v"),
+            BinaryPacket(OPCODE_NOOP,STATUS_NO_ERROR,1,0,b"",b"",b"")]
+
+        with self.assertRaises(click.exceptions.Abort):
+            self.memclidUtility.get(["k1"])
+
+    def test_binary_incr(self):
+
+        """
+            TEST 6 : Check if incr doesnt create missing keys and the 64 bit counter is returned as the updated value
+        """
+        self.memclidSocket.receive.return_value = [BinaryPacket(OPCODE_INCREMENT,STATUS_NO_ERROR,0,0,b"",b"",COUNTER_VALUE.pack(12))]
+
+        actualResult = self.memclidUtility.incr("testKey",2)
+        self.memclidSocket.send.assert_called_once_with(msg=packRequest(OPCODE_INCREMENT,"testKey",ARITHMETIC_EXTRAS.pack(2,0,ARITHMETIC_NO_CREATE)))
+        self.assertEqual(actualResult["updated_value"],"12")
+        self.assertEqual(actualResult["status"],STATUS_RECORD_STORED)
+
+    def test_binary_delete_not_found(self):
+
+        """
+            TEST 7 : Check if KEY_NOT_FOUND for delete leads to a not deleted result
+        """
+        self.memclidSocket.receive.return_value = [BinaryPacket(OPCODE_DELETE,STATUS_KEY_NOT_FOUND,0,0,b"",b"",b"Not found")]
+
+        self.assertEqual(self.memclidUtility.delete("testKey")["status"],STATUS_RECORD_NOT_DELETED)
+
+    def test_binary_set_many_quiet(self):
+
+        """
+            TEST 8 : Check if SETQ requests are followed by a NOOP and only the failures are replied to
+        """
+        self.memclidSocket.receive.return_value = [
+            BinaryPacket(OPCODE_SETQ,STATUS_ITEM_NOT_STORED,1,0,b"",b"",b""),
+            BinaryPacket(OPCODE_NOOP,STATUS_NO_ERROR,2,0,b"",b"",b"")]
+
+        actualResult = self.memclidUtility.setMany([("k1","a"),("k2","b")],0,60)
+        extras = STORAGE_EXTRAS.pack(0,60)
+        self.memclidSocket.send.assert_called_once_with(msg=packRequest(OPCODE_SETQ,"k1",extras,b"a",0)+packRequest(OPCODE_SETQ,"k2",extras,b"b",1)+packRequest(OPCODE_NOOP,opaque=2))
+        self.assertEqual(actualResult["k1"]["status"],STATUS_RECORD_STORED)
+        self.assertEqual(actualResult["k2"]["status"],STATUS_RECORD_NOT_STORED)
+
+    def test_binary_meta_not_available(self):
+
+        """
+            TEST 9 : Check if the meta commands are refused with the binary protocol
+        """
+        with self.assertRaises(click.exceptions.Abort):
+            self.memclidUtility.metaGet("testKey")
+        self.memclidSocket.send.assert_not_called()
+
+class TestBinaryMemclidSocket(unittest.TestCase):
+    """
+    Essentially these unit tests test that the response packets are read using the lengths in their headers
+    """
+    def setUp(self):
+        self.server, client = socket.socketpair()
+        self.memclidSocket = MemclidBinarySocket(client)
+        self.memclidSocket.host = "localhost"
+        self.memclidSocket.port = 11211
+
+    def tearDown(self):
+        self.server.close()
+        self.memclidSocket.sock.close()
+
+    def test_quiet_responses_until_noop(self):
+
+        """
+            TEST 1 : Check if the responses to quiet requests are collected until the NOOP response
+        """
+        self.server.sendall(responsePacket(OPCODE_GETKQ,key=b"k1",extras=FLAGS_EXTRAS.pack(3),value=b"v\r\n1")+responsePacket(OPCODE_NOOP,opaque=1))
+
+        packets = self.memclidSocket.receive()
+        self.assertEqual(len(packets),2)
+        self.assertEqual((packets[0].key,packets[0].extras,bytes(packets[0].value)),(b"k1",FLAGS_EXTRAS.pack(3),b"v\r\n1"))
+        self.assertEqual((packets[1].opcode,packets[1].opaque),(OPCODE_NOOP,1))
+
+    def test_error_status_raised_after_whole_response(self):
+
+        """
+            TEST 2 : Check if an error status is raised once the whole response is read
+        """
+        self.server.sendall(responsePacket(OPCODE_SETQ,status=STATUS_VALUE_TOO_LARGE,value=b"Too large")+responsePacket(OPCODE_NOOP)+responsePacket(OPCODE_NOOP,opaque=9))
+
+        with self.assertRaises(MemclidClientErrorSentByServer):
+            self.memclidSocket.receive()
+        self.assertEqual(self.memclidSocket.receive()[0].opaque,9)
+
+if __name__ == '__main__':
+    unittest.main()
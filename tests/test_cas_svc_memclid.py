@@ -31,14 +31,14 @@ class TestCasMemclidUtility(unittest.TestCase):
             TEST 1 : Check if correct cas request is being made and
             replacing the value for an already exisitng and not modified key successfully leads to a success result in the application
         """
-        self.memclidSocket.receive.return_value = "STORED\r\n"
+        self.memclidSocket.receive.return_value = b"STORED\r\n"
         expectedResult = {
             "message": "The value for the key was set successfully",
             "status": STATUS_RECORD_STORED
         }
 
         actualResult=self.memclidUtility.cas("testKey","testValueNew",8,1000,3600)
-        self.memclidSocket.send.assert_called_once_with(msg="cas testKey 1000 3600 12 8\r\ntestValueNew\r\n")
+        self.memclidSocket.send.assert_called_once_with(msg=b"cas testKey 1000 3600 12 8\r\ntestValueNew\r\n")
         self.memclidSocket.receive.assert_called_once();
         self.assertDictEqual(actualResult,expectedResult)
 
@@ -50,14 +50,14 @@ class TestCasMemclidUtility(unittest.TestCase):
             since it was last fetched
             leads to a failure result in the application
         """
-        self.memclidSocket.receive.return_value = "EXISTS\r\n"
+        self.memclidSocket.receive.return_value = b"EXISTS\r\n"
         expectedResult = {
             "message": "The value was modified since it was last fetched. It could not be stored due to the preconditions of the command executed.",
             "status": STATUS_RECORD_NOT_STORED
         }
 
         actualResult=self.memclidUtility.cas("testKey","testValueNew",8,1000,3600)
-        self.memclidSocket.send.assert_called_once_with(msg="cas testKey 1000 3600 12 8\r\ntestValueNew\r\n")
+        self.memclidSocket.send.assert_called_once_with(msg=b"cas testKey 1000 3600 12 8\r\ntestValueNew\r\n")
         self.memclidSocket.receive.assert_called_once();
         self.assertDictEqual(actualResult,expectedResult)
 
@@ -69,14 +69,14 @@ class TestCasMemclidUtility(unittest.TestCase):
             since it was last fetched
             leads to a failure result in the application
         """
-        self.memclidSocket.receive.return_value = "NOT_FOUND\r\n"
+        self.memclidSocket.receive.return_value = b"NOT_FOUND\r\n"
         expectedResult = {
             "message": "The key doesnt exist in the memcached server. It could not be stored due to the preconditions of the command executed.",
             "status": STATUS_RECORD_NOT_STORED
         }
 
         actualResult=self.memclidUtility.cas("testKey","testValueNew",8,1000,3600)
-        self.memclidSocket.send.assert_called_once_with(msg="cas testKey 1000 3600 12 8\r\ntestValueNew\r\n")
+        self.memclidSocket.send.assert_called_once_with(msg=b"cas testKey 1000 3600 12 8\r\ntestValueNew\r\n")
         self.memclidSocket.receive.assert_called_once();
         self.assertDictEqual(actualResult,expectedResult)
 
@@ -86,7 +86,7 @@ class TestCasMemclidUtility(unittest.TestCase):
             TEST 4 : Check if MemclidUnrecognizedResponseSentByServer is raised and handled when an invalid response is sent by the server
 
         """
-        self.memclidSocket.receive.return_value = "UNKNOWN_RESPONSE_SENT_BY_SERVER\r\n"
+        self.memclidSocket.receive.return_value = b"UNKNOWN_RESPONSE_SENT_BY_SERVER\r\n"
 
         with self.assertRaises(click.exceptions.Abort):
             self.memclidUtility.cas("testKey","testValueNew",8,1000,3600)
@@ -0,0 +1,109 @@
+import sys
+import os
+import io
+import click
+from contextlib import redirect_stdout
+
+sys.path.append(os.path.join(os.getcwd(),'..'))
+
+import unittest
+from memclid.constants import *
+from memclid.fake_server import MemclidFakeServer
+from memclid.memclid_socket import MemclidSocket
+from memclid.svc_memclid import MemclidUtility
+from memclid.serialization import MemclidSerializer
+from memclid.svc_chunked import MemclidChunkedStore
+
+class TestMemclidChunkedStore(unittest.TestCase):
+    """
+    Essentially these unit tests test that the values larger than the item size limit are stored as chunks behind
+    a manifest and read back whole, or reported as missing when their chunks changed
+    """
+    def setUp(self):
+        self.server = MemclidFakeServer(itemSizeMax=1000).start()
+        self.memclidSocket = MemclidSocket()
+        self.memclidSocket.connect(self.server.host,self.server.port)
+        self.memclidUtility = MemclidUtility(self.memclidSocket,serializer=MemclidSerializer())
+        self.chunkedStore = MemclidChunkedStore(self.memclidUtility,chunkSize=900,retries=1)
+        self.value = bytes(range(256))*20
+
+    def tearDown(self):
+        self.memclidSocket.disconnect()
+        self.server.stop()
+
+    def chunkKeys(self):
+        return sorted(key for key in self.server.items if key.startswith(b"testKey:"))
+
+    def test_large_value_round_trip(self):
+
+        """
+            TEST 1 : Check if a value above the item size limit is stored as chunks and fetched back whole
+        """
+        with self.assertRaises(click.Abort):
+            with redirect_stdout(io.StringIO()):
+                self.memclidUtility.set("plainKey",self.value,0,0)
+        result = self.chunkedStore.set("testKey",self.value,4,0)
+        self.assertEqual(result["status"],STATUS_RECORD_STORED)
+        self.assertEqual(len(self.chunkKeys()),6)
+        manifest = self.memclidUtility.get("testKey")
+        self.assertEqual((manifest["value"]["chunks"],manifest["value"]["length"],manifest["flag"]),(6,len(self.value),4))
+        result = self.chunkedStore.get("testKey")
+        self.assertEqual((result["value"],result["flag"]),(bytearray(self.value),4))
+
+    def test_small_value(self):
+
+        """
+            TEST 2 : Check if a value within the chunk size is stored as a single item and str values as UTF-8
+        """
+        self.chunkedStore.set("testKey","café",0,0)
+        self.assertEqual(self.server.items[b"testKey"].value,"café".encode())
+        self.assertEqual(self.chunkKeys(),[])
+        self.assertEqual(self.chunkedStore.get("testKey")["value"],bytearray("café".encode()))
+        self.assertEqual(self.chunkedStore.get("missingKey")["status"],STATUS_DATA_NOT_AVAILABLE)
+
+    def test_torn_read(self):
+
+        """
+            TEST 3 : Check if a value with a chunk missing or changed is reported as missing
+        """
+        self.chunkedStore.set("testKey",self.value,0,0)
+        chunkKeys = self.chunkKeys()
+        self.server.items[chunkKeys[2]].value = b"x"*900
+        self.assertEqual(self.chunkedStore.get("testKey")["status"],STATUS_DATA_NOT_AVAILABLE)
+        del self.server.items[chunkKeys[0]]
+        self.assertEqual(self.chunkedStore.get("testKey")["status"],STATUS_DATA_NOT_AVAILABLE)
+
+    def test_concurrent_write(self):
+
+        """
+            TEST 4 : Check if the manifest isn't stored when the key changed after it was read and its chunks are removed
+        """
+        self.chunkedStore.set("testKey","first",0,0)
+        gets = self.memclidUtility.gets
+        def racingGets(key):
+            result = gets(key)
+            self.memclidUtility.set("testKey","second",0,0)
+            return result
+        self.memclidUtility.gets = racingGets
+        result = self.chunkedStore.set("testKey",self.value,0,0)
+        self.assertEqual(result["status"],STATUS_RECORD_NOT_STORED)
+        self.assertEqual(self.memclidUtility.get("testKey")["value"],"second")
+        self.assertEqual(self.chunkKeys(),[])
+
+    def test_overwrite_and_delete(self):
+
+        """
+            TEST 5 : Check if the chunks of a value are removed once it is overwritten or deleted
+        """
+        self.chunkedStore.set("testKey",self.value,0,0)
+        firstChunks = self.chunkKeys()
+        self.chunkedStore.set("testKey",self.value[::-1],0,0)
+        self.assertEqual(self.chunkedStore.get("testKey")["value"],bytearray(self.value[::-1]))
+        self.assertTrue(set(firstChunks).isdisjoint(self.chunkKeys()))
+        self.assertEqual(len(self.chunkKeys()),6)
+        self.assertEqual(self.chunkedStore.delete("testKey")["status"],STATUS_RECORD_DELETED)
+        self.assertEqual(self.memclidUtility.get("testKey")["status"],STATUS_DATA_NOT_AVAILABLE)
+        self.assertEqual(self.chunkKeys(),[])
+
+if __name__ == '__main__':
+    unittest.main()
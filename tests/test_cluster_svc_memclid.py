@@ -0,0 +1,126 @@
+import sys
+import os
+import hashlib
+import io
+import click
+from contextlib import redirect_stdout
+
+sys.path.append(os.path.join(os.getcwd(),'..'))
+
+import unittest
+from unittest.mock import create_autospec
+from memclid.constants import STATUS_DATA_AVAILABLE, STATUS_DATA_NOT_AVAILABLE, STATUS_RECORD_STORED
+from memclid.exceptions import MemclidServerErrorSentByServer, MemclidConnectionBreakError
+from memclid.hash_ring import MemclidHashRing
+from memclid.svc_cluster import MemclidClusterUtility
+from memclid.memclid_socket import MemclidSocket
+
+SERVERS = [("10.0.0.1",11211,1),("10.0.0.2",11211,1),("10.0.0.3",11211,2)]
+
+class TestMemclidHashRing(unittest.TestCase):
+    """
+    Essentially these unit tests test that keys are spread over the servers the way ketama does it
+    """
+    def test_ring_points(self):
+
+        """
+            TEST 1 : Check if every server gets 4 points for each of its digests (40 per server scaled by its weight)
+        """
+        ring = MemclidHashRing(SERVERS)
+        self.assertEqual(len(ring.points),4*(30+30+60))
+        self.assertEqual(ring.points,sorted(ring.points))
+        self.assertEqual(ring.pointServers.count(2),240)
+
+    def test_ring_lookup(self):
+
+        """
+            TEST 2 : Check if a key is mapped to the first point at or after its hash, wrapping around the ring
+        """
+        ring = MemclidHashRing(SERVERS)
+        for key in ["key"+str(i) for i in range(500)]:
+            point = ring.pointFromDigest(hashlib.md5(key.encode()).digest(),0)
+            following = [index for position, index in enumerate(ring.pointServers) if ring.points[position] >= point]
+            self.assertEqual(ring.getServer(key),following[0] if following else ring.pointServers[0])
+
+    def test_ring_consistency(self):
+
+        """
+            TEST 3 : Check if adding a server only moves keys to the new server
+        """
+        keys = ["key"+str(i) for i in range(2000)]
+        ring = MemclidHashRing(SERVERS[:2])
+        biggerRing = MemclidHashRing(SERVERS[:2]+[("10.0.0.3",11211,1)])
+        moved = [key for key in keys if ring.getServer(key) != biggerRing.getServer(key)]
+        self.assertTrue(all(biggerRing.getServer(key) == 2 for key in moved))
+        self.assertTrue(400 < len(moved) < 950)
+
+class TestClusterMemclidUtility(unittest.TestCase):
+    """
+    Essentially these unit tests test that the commands are sent to the server owning the key
+    and that multi key requests are split per server
+    """
+    def setUp(self):
+        self.memclidSockets = []
+        for host, port, weight in SERVERS:
+            memclidSocket = create_autospec(MemclidSocket)
+            memclidSocket.host = host
+            memclidSocket.port = port
+            memclidSocket.receive.return_value = b"END\r\n"
+            self.memclidSockets.append(memclidSocket)
+        self.memclidUtility = MemclidClusterUtility(SERVERS,self.memclidSockets)
+
+    def test_cluster_routes_key(self):
+
+        """
+            TEST 1 : Check if a storage command is only sent to the server of the key
+        """
+        server = self.memclidUtility.ring.getServer("testKey")
+        self.memclidSockets[server].receive.return_value = b"STORED\r\n"
+
+        result = self.memclidUtility.set("testKey","testValue",0,3600)
+        self.assertEqual(result["status"],STATUS_RECORD_STORED)
+        for index, memclidSocket in enumerate(self.memclidSockets):
+            self.assertEqual(memclidSocket.send.call_count,1 if index == server else 0)
+
+    def test_cluster_multiple_keys(self):
+
+        """
+            TEST 2 : Check if a multi key get sends one request to every server with the keys of that server
+            and the results are merged in the order of the keys
+        """
+        keys = ["key"+str(i) for i in range(30)]
+        keysByServer = {}
+        for key in keys:
+            keysByServer.setdefault(self.memclidUtility.ring.getServer(key),[]).append(key)
+        firstKey = keysByServer[0][0]
+        self.memclidSockets[0].receive.return_value = ("VALUE "+firstKey+" 0 5\r\nvalue\r\nEND\r\n").encode()
+
+        results = self.memclidUtility.get(keys)
+        for server, memclidSocket in enumerate(self.memclidSockets):
+            memclidSocket.send.assert_called_once_with(("get "+" ".join(keysByServer[server])+"\r\n").encode())
+        self.assertEqual(list(results.keys()),keys)
+        self.assertEqual(results[firstKey]["status"],STATUS_DATA_AVAILABLE)
+        self.assertEqual(results[keysByServer[1][0]]["status"],STATUS_DATA_NOT_AVAILABLE)
+
+    def test_cluster_failed_server_drained(self):
+
+        """
+            TEST 3 : Check if the responses of the other servers are still read when reading the response of one server fails
+        """
+        keys = ["key"+str(i) for i in range(30)]
+        #the server of the first key has its response read first
+        failed = self.memclidUtility.ring.getServer(keys[0])
+        host, port, weight = SERVERS[failed]
+        for failure in (MemclidServerErrorSentByServer(host,port,"out of memory"),MemclidConnectionBreakError(host,port)):
+            for memclidSocket in self.memclidSockets:
+                memclidSocket.receive.reset_mock()
+            self.memclidSockets[failed].receive.side_effect = failure
+            output = io.StringIO()
+            with self.assertRaises(click.Abort):
+                with redirect_stdout(output):
+                    self.memclidUtility.get(keys)
+            self.assertIn(host,output.getvalue())
+            self.assertEqual([memclidSocket.receive.call_count for memclidSocket in self.memclidSockets],[1,1,1])
+
+if __name__ == '__main__':
+    unittest.main()
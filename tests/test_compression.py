@@ -0,0 +1,124 @@
+import sys
+import os
+import io
+import json
+import string
+import zlib
+import click
+from contextlib import redirect_stdout
+
+sys.path.append(os.path.join(os.getcwd(),'..'))
+
+import unittest
+from unittest.mock import create_autospec
+from memclid.constants import *
+from memclid.binary_protocol import *
+from memclid.fake_server import MemclidFakeServer
+from memclid.memclid_socket import MemclidSocket
+from memclid.svc_memclid import MemclidUtility
+from memclid.binary_memclid_socket import MemclidBinarySocket
+from memclid.binary_svc_memclid import MemclidBinaryUtility
+from memclid.compression import MemclidCompressor
+
+class ReversingCodec:
+    #stand-in codec making every value smaller by dropping its first byte
+    def compress(self, data):
+        return bytes(data)[1:][::-1]
+
+    def decompress(self, data):
+        return b"x"+bytes(data)[::-1]
+
+class TestMemclidCompression(unittest.TestCase):
+    """
+    Essentially these unit tests test that the large values are stored compressed with the compressed bit
+    of the flag set and that get/gets decompress them and hide the bit
+    """
+    def setUp(self):
+        self.server = MemclidFakeServer().start()
+        self.memclidSocket = MemclidSocket()
+        self.memclidSocket.connect(self.server.host,self.server.port)
+        self.compressor = MemclidCompressor(threshold=100)
+        self.memclidUtility = MemclidUtility(self.memclidSocket,compressor=self.compressor)
+        self.plainUtility = MemclidUtility(self.memclidSocket)
+
+    def tearDown(self):
+        self.memclidSocket.disconnect()
+        self.server.stop()
+
+    def test_large_values_compressed(self):
+
+        """
+            TEST 1 : Check if a value above the threshold is stored compressed and fetched back as it was
+        """
+        document = json.dumps([{"id": index, "name": "item", "tags": ["a","b"]} for index in range(200)])
+        self.memclidUtility.set("documentKey",document,4,0)
+        self.memclidUtility.set("smallKey","small",4,0)
+        stored = self.server.items[b"documentKey"]
+        self.assertEqual(stored.flags,4 | FLAG_COMPRESSED)
+        self.assertEqual(zlib.decompress(stored.value).decode(),document)
+        self.assertEqual(self.server.items[b"smallKey"].flags,4)
+        result = self.memclidUtility.gets(["documentKey","smallKey"])
+        self.assertEqual((result["documentKey"]["value"],result["documentKey"]["flag"]),(document,"4"))
+        self.assertEqual((result["smallKey"]["value"],result["smallKey"]["flag"]),("small","4"))
+        stats = self.compressor.stats()
+        self.assertEqual((stats["compressed"],stats["decompressed"]),(1,1))
+        self.assertEqual(stats["bytesIn"],len(document))
+        self.assertGreater(stats["ratio"],5)
+
+    def test_incompressible_values(self):
+
+        """
+            TEST 2 : Check if a value that doesn't get smaller is stored as it is and append never compresses
+        """
+        value = string.printable[:100]
+        self.memclidUtility.set("uniqueKey",value,0,0)
+        self.assertEqual((self.server.items[b"uniqueKey"].value,self.server.items[b"uniqueKey"].flags),(value.encode(),0))
+        self.assertEqual((self.compressor.skipped,self.compressor.stats()["ratio"]),(1,None))
+        self.memclidUtility.set("appendKey","value",0,0)
+        self.memclidUtility.append("appendKey","a"*500)
+        self.assertEqual(self.server.items[b"appendKey"].flags,0)
+        self.assertEqual(self.memclidUtility.get("appendKey")["value"],"value"+"a"*500)
+
+    def test_reserved_flag_bit(self):
+
+        """
+            TEST 3 : Check if storing a value with the compressed bit of the flag set is refused
+        """
+        with self.assertRaises(click.Abort):
+            with redirect_stdout(io.StringIO()):
+                self.memclidUtility.set("testKey","value",FLAG_COMPRESSED,0)
+        self.assertNotIn(b"testKey",self.server.items)
+
+    def test_pluggable_codec(self):
+
+        """
+            TEST 4 : Check if another codec can be given and is used on both sides
+        """
+        memclidUtility = MemclidUtility(self.memclidSocket,compressor=MemclidCompressor(ReversingCodec(),threshold=3))
+        memclidUtility.replace("testKey","xabc",0,0)
+        memclidUtility.add("testKey","xabc",0,0)
+        self.assertEqual(self.server.items[b"testKey"].value,b"cba")
+        self.assertEqual(memclidUtility.get("testKey")["value"],"xabc")
+
+    def test_binary_protocol(self):
+
+        """
+            TEST 5 : Check if the binary requests and responses are compressed and decompressed the same way
+        """
+        memclidSocket = create_autospec(MemclidBinarySocket)
+        memclidSocket.host = "localhost"
+        memclidSocket.port = 11211
+        memclidUtility = MemclidBinaryUtility(memclidSocket,compressor=MemclidCompressor(threshold=10))
+        memclidSocket.receive.return_value = [BinaryPacket(OPCODE_SET,STATUS_NO_ERROR,0,1,b"",b"",b"")]
+        memclidUtility.set("testKey","a"*100,1,60)
+        compressed = zlib.compress(b"a"*100,6)
+        memclidSocket.send.assert_called_once_with(msg=packRequest(OPCODE_SET,"testKey",STORAGE_EXTRAS.pack(1 | FLAG_COMPRESSED,60),compressed))
+        memclidSocket.receive.return_value = [
+            BinaryPacket(OPCODE_GETKQ,STATUS_NO_ERROR,0,1,FLAGS_EXTRAS.pack(1 | FLAG_COMPRESSED),b"testKey",compressed),
+            BinaryPacket(OPCODE_NOOP,STATUS_NO_ERROR,1,0,b"",b"",b"")
+        ]
+        result = memclidUtility.get(["testKey"])
+        self.assertEqual((result["testKey"]["value"],result["testKey"]["flag"]),("a"*100,"1"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import sys
+import os
+import socket
+import asyncio
+import tempfile
+import click
+
+sys.path.append(os.path.join(os.getcwd(),'..'))
+
+import unittest
+from memclid.constants import *
+from memclid.exceptions import MemclidConnectionError
+from memclid.fake_server import MemclidFakeServer
+from memclid.memclid_socket import MemclidSocket
+from memclid.async_memclid_socket import AsyncMemclidSocket
+from memclid.svc_memclid import MemclidUtility
+from memclid.memclid_pool import MemclidPool
+from memclid.cli import parseServers
+
+def ipv6Available():
+    try:
+        with socket.socket(socket.AF_INET6, socket.SOCK_STREAM) as sock:
+            sock.bind(("::1", 0))
+        return True
+    except OSError:
+        return False
+
+class TestConnectMemclidSocket(unittest.TestCase):
+    """
+    Essentially these unit tests test that MemclidSocket connects over unix domain sockets, IPv4 and IPv6
+    with the socket options it is given
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name,"memcached.sock")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_unix_socket(self):
+
+        """
+            TEST 1 : Check if a socket without port connects to the unix domain socket at the path, also from a pool and asyncio
+        """
+        with MemclidFakeServer(path=self.path) as server:
+            memclidSocket = MemclidSocket()
+            memclidSocket.connect(self.path)
+            self.assertEqual(memclidSocket.sock.family,socket.AF_UNIX)
+            memclidUtility = MemclidUtility(memclidSocket)
+            memclidUtility.set("testKey","testValue",0,0)
+            self.assertEqual(memclidUtility.get("testKey")["value"],"testValue")
+            memclidSocket.disconnect()
+            with MemclidPool(socketPath=self.path) as pool:
+                self.assertEqual(pool.get("testKey")["value"],"testValue")
+            async def fetch():
+                asyncSocket = AsyncMemclidSocket()
+                await asyncSocket.connect(self.path)
+                try:
+                    return await asyncSocket.request(b"get testKey\r\n")
+                finally:
+                    await asyncSocket.disconnect()
+            self.assertEqual(asyncio.run(fetch()),b"VALUE testKey 0 9\r\ntestValue\r\nEND\r\n")
+
+    @unittest.skipUnless(ipv6Available(),"IPv6 isn't available")
+    def test_ipv6(self):
+
+        """
+            TEST 2 : Check if a socket connects to an IPv6 address
+        """
+        with MemclidFakeServer(host="::1") as server:
+            memclidSocket = MemclidSocket()
+            memclidSocket.connect("::1",server.port)
+            self.assertEqual(memclidSocket.sock.family,socket.AF_INET6)
+            self.assertEqual(MemclidUtility(memclidSocket).set("testKey","testValue",0,0)["status"],STATUS_RECORD_STORED)
+            memclidSocket.disconnect()
+
+    def test_socket_options(self):
+
+        """
+            TEST 3 : Check if TCP_NODELAY is set by default and the other options are set when given
+        """
+        with MemclidFakeServer() as server:
+            memclidSocket = MemclidSocket()
+            memclidSocket.connect(server.host,server.port)
+            self.assertNotEqual(memclidSocket.sock.getsockopt(socket.IPPROTO_TCP,socket.TCP_NODELAY),0)
+            self.assertEqual(memclidSocket.sock.getsockopt(socket.SOL_SOCKET,socket.SO_KEEPALIVE),0)
+            self.assertIsNone(memclidSocket.sock.gettimeout())
+            memclidSocket.disconnect()
+            memclidSocket = MemclidSocket(noDelay=False,keepAlive=True,sendBufferSize=65536,receiveBufferSize=65536,connectTimeout=1)
+            memclidSocket.connect(server.host,server.port)
+            self.assertEqual(memclidSocket.sock.getsockopt(socket.IPPROTO_TCP,socket.TCP_NODELAY),0)
+            self.assertNotEqual(memclidSocket.sock.getsockopt(socket.SOL_SOCKET,socket.SO_KEEPALIVE),0)
+            self.assertGreaterEqual(memclidSocket.sock.getsockopt(socket.SOL_SOCKET,socket.SO_SNDBUF),65536)
+            self.assertGreaterEqual(memclidSocket.sock.getsockopt(socket.SOL_SOCKET,socket.SO_RCVBUF),65536)
+            self.assertIsNone(memclidSocket.sock.gettimeout())
+            memclidSocket.disconnect()
+
+    def test_connection_errors(self):
+
+        """
+            TEST 4 : Check if failing to connect raises MemclidConnectionError naming the socket
+        """
+        with self.assertRaises(MemclidConnectionError) as context:
+            MemclidSocket().connect(self.path)
+        self.assertIn("(socket: "+self.path+")",context.exception.message)
+        with socket.socket() as unused:
+            unused.bind(("127.0.0.1",0))
+            port = unused.getsockname()[1]
+        with self.assertRaises(MemclidConnectionError) as context:
+            MemclidSocket().connect("127.0.0.1",port)
+        self.assertIn(f"(host: 127.0.0.1, port: {port})",context.exception.message)
+
+    def test_servers_option(self):
+
+        """
+            TEST 5 : Check if IPv6 addresses are accepted in brackets in the list of servers
+        """
+        self.assertEqual(parseServers(None,None,"[::1]:11212:2,[fe80::1],host:11213"),
+            [("::1",11212,2),("fe80::1",11211,1),("host",11213,1)])
+        for server in ("[::1","[::1]11211","::1:11211:2:3"):
+            with self.assertRaises(click.BadParameter):
+                parseServers(None,None,server)
+
+if __name__ == '__main__':
+    unittest.main()
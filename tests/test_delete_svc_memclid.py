@@ -31,14 +31,14 @@ class TestDeleteMemclidUtility(unittest.TestCase):
             TEST 1 : Check if correct delete request is being made and
             deleting the key-value pair using delete successfully leads to a success result in the application
         """
-        self.memclidSocket.receive.return_value = "DELETED\r\n"
+        self.memclidSocket.receive.return_value = b"DELETED\r\n"
         expectedResult = {
             "message": "The data was deleted successfully",
             "status": STATUS_RECORD_DELETED
         }
 
         actualResult=self.memclidUtility.delete("testKey")
-        self.memclidSocket.send.assert_called_once_with(msg="delete testKey\r\n")
+        self.memclidSocket.send.assert_called_once_with(msg=b"delete testKey\r\n")
         self.memclidSocket.receive.assert_called_once();
         self.assertDictEqual(actualResult,expectedResult)
 
@@ -48,14 +48,14 @@ class TestDeleteMemclidUtility(unittest.TestCase):
             TEST 2 : Check if correct delete request is being made and
             failure while deleting the key-value pair using delete leads to a failure result in the application
         """
-        self.memclidSocket.receive.return_value = "NOT_FOUND\r\n"
+        self.memclidSocket.receive.return_value = b"NOT_FOUND\r\n"
         expectedResult = {
             "message": "The record was not found in the memcached server. It could not be deleted due to the preconditions of the command executed.",
             "status": STATUS_RECORD_NOT_DELETED
         }
 
         actualResult=self.memclidUtility.delete("testKey")
-        self.memclidSocket.send.assert_called_once_with(msg="delete testKey\r\n")
+        self.memclidSocket.send.assert_called_once_with(msg=b"delete testKey\r\n")
         self.memclidSocket.receive.assert_called_once();
         self.assertDictEqual(actualResult,expectedResult)
 
@@ -65,7 +65,7 @@ class TestDeleteMemclidUtility(unittest.TestCase):
             TEST 3 : Check if MemclidUnrecognizedResponseSentByServer is raised and handled when an invalid response is sent by the server
 
         """
-        self.memclidSocket.receive.return_value = "RANDOM_RESPONSE_SENT_BY_SERVER\r\n"
+        self.memclidSocket.receive.return_value = b"RANDOM_RESPONSE_SENT_BY_SERVER\r\n"
 
         with self.assertRaises(click.exceptions.Abort):
             self.memclidUtility.delete("testKey")
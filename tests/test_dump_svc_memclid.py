@@ -0,0 +1,120 @@
+import sys
+import os
+import io
+import json
+import click
+
+sys.path.append(os.path.join(os.getcwd(),'..'))
+
+import unittest
+from unittest.mock import create_autospec, call
+from memclid.exceptions import MemclidUnrecognizedResponseSentByServer
+from memclid.svc_memclid import MemclidUtility
+from memclid.svc_dump import MemclidDumper
+from memclid.memclid_socket import MemclidSocket
+from memclid.svc_load import MemclidLoader
+from memclid.fake_server import MemclidFakeServer
+from memclid.compression import MemclidCompressor
+from memclid.constants import FLAG_COMPRESSED
+
+class TestDumpMemclidUtility(unittest.TestCase):
+    """
+    Essentially these unit tests test that the metadump sent by the Memcached server is parsed and filtered
+    and that the values are fetched in multi-key get requests over the second connection
+    """
+    def setUp(self):
+        self.metadumpSocket = create_autospec(MemclidSocket)
+        self.metadumpSocket.host = "localhost"
+        self.metadumpSocket.port = 11211
+        self.valueSocket = create_autospec(MemclidSocket)
+        self.valueSocket.host = "localhost"
+        self.valueSocket.port = 11211
+        self.metadumpUtility = MemclidUtility(self.metadumpSocket)
+        self.valueUtility = MemclidUtility(self.valueSocket)
+
+    def tearDown(self):
+        self.metadumpUtility = None
+        self.valueUtility = None
+
+    def test_dump_items_with_values(self):
+
+        """
+            TEST 1 : Check if the metadump is requested, the keys are url decoded and
+            the values are fetched in batches of the given size
+        """
+        self.metadumpSocket.receiveLine.side_effect = [
+            b"key=test%25Key1 exp=-1 la=1700000000 cas=1 fetch=no cls=1 size=70\r\n",
+            b"key=testKey2 exp=-1 la=1700000000 cas=2 fetch=no cls=1 size=70\r\n",
+            b"key=testKey3 exp=-1 la=1700000000 cas=3 fetch=no cls=1 size=70\r\n",
+            b"END\r\n"
+        ]
+        self.valueSocket.receive.side_effect = [
+            b"VALUE test%Key1 0 6\r\nvalue1\r\nEND\r\n",
+            b"VALUE testKey3 5 6\r\nvalue3\r\nEND\r\n"
+        ]
+
+        items = list(MemclidDumper(self.metadumpUtility,self.valueUtility,10,2).run())
+        self.metadumpSocket.send.assert_called_once_with(b"lru_crawler metadump all\r\n")
+        self.valueSocket.send.assert_has_calls([call(b"get test%Key1 testKey2\r\n"),call(b"get testKey3\r\n")])
+        self.assertEqual(items,[
+            {"key": "test%Key1", "value": "value1", "flag": 0, "exptime": 0, "ttl": None, "size": 70, "last_access": 1700000000},
+            {"key": "testKey3", "value": "value3", "flag": 5, "exptime": 0, "ttl": None, "size": 70, "last_access": 1700000000}
+        ])
+
+    def test_dump_filters(self):
+
+        """
+            TEST 2 : Check if the prefix, size and ttl filters are applied without fetching any values when only keys are dumped
+        """
+        self.metadumpSocket.receiveLine.side_effect = [
+            b"key=user:1 exp=-1 la=1 cas=1 fetch=no cls=1 size=70\r\n",
+            b"key=user:2 exp=-1 la=1 cas=2 fetch=no cls=1 size=700\r\n",
+            b"key=user:3 exp=4102444800 la=1 cas=3 fetch=no cls=1 size=80\r\n",
+            b"key=session:1 exp=-1 la=1 cas=4 fetch=no cls=1 size=70\r\n",
+            b"END\r\n"
+        ]
+
+        items = list(MemclidDumper(self.metadumpUtility,self.valueUtility,10,100,prefix="user:",maxSize=100,minTtl=3600,withValues=False).run())
+        self.valueSocket.send.assert_not_called()
+        self.assertEqual([item["key"] for item in items],["user:1","user:3"])
+        self.assertNotIn("value",items[0])
+
+    def test_dump_busy_crawler(self):
+
+        """
+            TEST 3 : Check if a response other than the metadump (like BUSY) is treated as an unrecognized response
+        """
+        self.metadumpSocket.receiveLine.return_value = b"BUSY currently processing crawler request\r\n"
+
+        with self.assertRaises(MemclidUnrecognizedResponseSentByServer):
+            list(MemclidDumper(self.metadumpUtility,self.valueUtility,10,100).run())
+
+    def test_dump_and_load_binary_values(self):
+
+        """
+            TEST 4 : Check if values that aren't valid UTF-8 (binary or compressed) are dumped base64 encoded
+            with their flag and loaded back as they were stored
+        """
+        with MemclidFakeServer() as source, MemclidFakeServer() as target:
+            sockets = [MemclidSocket() for index in range(3)]
+            for memclidSocket, server in zip(sockets,[source,source,target]):
+                memclidSocket.connect(server.host,server.port)
+            MemclidUtility(sockets[0]).set("textKey","testValue",4,0)
+            MemclidUtility(sockets[0]).set("binaryKey",b"\xff\x00\xfe",2,0)
+            MemclidUtility(sockets[0],compressor=MemclidCompressor(threshold=10)).set("compressedKey","x"*200,0,0)
+
+            items = list(MemclidDumper(MemclidUtility(sockets[0]),MemclidUtility(sockets[1]),10,100).run())
+            byKey = {item["key"]: item for item in items}
+            self.assertEqual((byKey["textKey"]["value"],"encoding" in byKey["textKey"]),("testValue",False))
+            self.assertEqual((byKey["binaryKey"]["encoding"],byKey["binaryKey"]["flag"]),("base64",2))
+            self.assertEqual(byKey["compressedKey"]["flag"],FLAG_COMPRESSED)
+            lines = io.StringIO("".join(json.dumps(item)+"\n" for item in items))
+            results = list(MemclidLoader(MemclidUtility(sockets[2]),10).run(lines,"jsonl"))
+            self.assertTrue(all(error is None for label, result, error in results))
+            for key, item in source.items.items():
+                self.assertEqual((target.items[key].value,target.items[key].flags),(item.value,item.flags))
+            for memclidSocket in sockets:
+                memclidSocket.disconnect()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+import sys
+import os
+import io
+import asyncio
+import time
+import click
+from contextlib import redirect_stdout
+
+sys.path.append(os.path.join(os.getcwd(),'..'))
+
+import unittest
+from memclid.constants import *
+from memclid.exceptions import MemclidServerErrorSentByServer, MemclidConnectionBreakError
+from memclid.fake_server import MemclidFakeServer
+from memclid.memclid_socket import MemclidSocket
+from memclid.svc_memclid import MemclidUtility
+from memclid.async_memclid_socket import AsyncMemclidSocket
+from memclid.async_svc_memclid import AsyncMemclidUtility
+
+class TestMemclidFakeServer(unittest.TestCase):
+    """
+    Essentially these unit tests test MemclidUtility over a real connection to the fake server, which covers
+    the framing of large and fragmented responses, pipelining, expiry, CAS, eviction and the injected faults
+    """
+    def setUp(self):
+        self.now = 1000000000
+        self.server = MemclidFakeServer(clock=lambda: self.now).start()
+        self.memclidSocket = MemclidSocket()
+        self.memclidSocket.connect(self.server.host,self.server.port)
+        self.memclidUtility = MemclidUtility(self.memclidSocket)
+
+    def tearDown(self):
+        self.memclidSocket.disconnect()
+        self.server.stop()
+
+    def execute(self, prepared):
+        return self.memclidUtility.execute(*prepared)
+
+    def test_fragmented_large_values(self):
+
+        """
+            TEST 1 : Check if large values split into many small writes by the server are read back whole
+        """
+        self.server.fragmentSize = 1000
+        self.server.fragmentDelay = 0
+        value = "0123456789"*50000
+        self.assertEqual(self.memclidUtility.set("largeKey",value,7,0)["status"],STATUS_RECORD_STORED)
+        result = self.memclidUtility.get(["largeKey","missingKey"])
+        self.assertEqual(result["largeKey"]["value"],value)
+        self.assertEqual(result["largeKey"]["flag"],"7")
+        self.assertEqual(result["missingKey"]["status"],STATUS_DATA_NOT_AVAILABLE)
+
+    def test_pipelined_requests(self):
+
+        """
+            TEST 2 : Check if pipelined storage and quiet meta requests are all answered in order
+        """
+        items = [("key"+str(index),"value"+str(index)) for index in range(300)]
+        results = self.memclidUtility.setMany(items,0,0)
+        self.assertTrue(all(result["status"] == STATUS_RECORD_STORED for result in results.values()))
+        results = self.memclidUtility.metaGetMany([key for key, value in items]+["missingKey"],cas=True)
+        self.assertEqual(results["key299"]["value"],"value299")
+        self.assertEqual(results["missingKey"]["status"],STATUS_DATA_NOT_AVAILABLE)
+
+    def test_expiry(self):
+
+        """
+            TEST 3 : Check if relative and absolute exptimes expire the items and touch extends them
+        """
+        self.memclidUtility.set("relativeKey","value",0,10)
+        self.memclidUtility.set("absoluteKey","value",0,self.now+100)
+        self.memclidUtility.set("expiredKey","value",0,-1)
+        self.now += 10
+        result = self.memclidUtility.get(["relativeKey","absoluteKey","expiredKey"])
+        self.assertEqual(result["relativeKey"]["status"],STATUS_DATA_NOT_AVAILABLE)
+        self.assertEqual(result["absoluteKey"]["status"],STATUS_DATA_AVAILABLE)
+        self.assertEqual(result["expiredKey"]["status"],STATUS_DATA_NOT_AVAILABLE)
+        self.assertEqual(self.memclidUtility.metaGet("absoluteKey",ttl=True)["ttl"],"90")
+        self.memclidSocket.send(b"touch absoluteKey 0\r\n")
+        self.assertEqual(self.memclidSocket.receive(),b"TOUCHED\r\n")
+        self.now += 1000
+        self.assertEqual(self.memclidUtility.get(["absoluteKey"])["absoluteKey"]["status"],STATUS_DATA_AVAILABLE)
+
+    def test_cas(self):
+
+        """
+            TEST 4 : Check if cas only stores the value when the item wasn't modified since it was fetched
+        """
+        self.memclidUtility.set("casKey","first",0,0)
+        casUnique = self.memclidUtility.gets(["casKey"])["casKey"]["cas_unique"]
+        self.assertEqual(self.memclidUtility.cas("casKey","second",casUnique,0,0)["status"],STATUS_RECORD_STORED)
+        self.assertEqual(self.memclidUtility.cas("casKey","third",casUnique,0,0)["status"],STATUS_RECORD_NOT_STORED)
+        self.assertEqual(self.memclidUtility.get(["casKey"])["casKey"]["value"],"second")
+
+    def test_lru_eviction(self):
+
+        """
+            TEST 5 : Check if the least recently used items are evicted once the memory limit is reached
+        """
+        self.server.maxBytes = 3*(100+4+48)
+        for key in ["key1","key2","key3"]:
+            self.memclidUtility.set(key,"x"*100,0,0)
+        self.memclidUtility.get(["key1"])
+        self.memclidUtility.set("key4","x"*100,0,0)
+        result = self.memclidUtility.get(["key1","key2","key3","key4"])
+        self.assertEqual(result["key2"]["status"],STATUS_DATA_NOT_AVAILABLE)
+        for key in ["key1","key3","key4"]:
+            self.assertEqual(result[key]["status"],STATUS_DATA_AVAILABLE)
+        self.assertEqual(self.server.stats["evictions"],1)
+
+    def test_injected_faults(self):
+
+        """
+            TEST 6 : Check if injected errors are sent instead of the response and an injected close breaks the connection
+        """
+        self.server.injectError("incr",b"SERVER_ERROR out of memory\r\n")
+        self.memclidUtility.set("counterKey","1",0,0)
+        with self.assertRaises(MemclidServerErrorSentByServer):
+            self.execute(self.memclidUtility.prepareIncr("counterKey",1))
+        self.assertEqual(self.execute(self.memclidUtility.prepareIncr("counterKey",1))["updated_value"],"2")
+        self.server.injectError("get",None)
+        with self.assertRaises(MemclidConnectionBreakError):
+            self.execute(self.memclidUtility.prepareRetrieval("get",["counterKey"]))
+        self.memclidSocket.sock.close()
+        self.memclidSocket = MemclidSocket()
+        self.memclidSocket.connect(self.server.host,self.server.port)
+
+    def test_latency(self):
+
+        """
+            TEST 7 : Check if the injected latency delays every response
+        """
+        self.server.latency = 0.05
+        start = time.perf_counter()
+        self.memclidUtility.delete("missingKey")
+        self.assertGreaterEqual(time.perf_counter()-start,0.05)
+
+    def test_set_many_server_error(self):
+
+        """
+            TEST 8 : Check if an error sent for one of the pipelined sets is raised once the other replies were read
+        """
+        self.server.itemSizeMax = 1000
+        items = [("k1","1"),("k2","x"*2000),("k3","3"),("k4","4")]
+        output = io.StringIO()
+        with self.assertRaises(click.Abort):
+            with redirect_stdout(output):
+                self.memclidUtility.setMany(items,0,0)
+        self.assertIn("object too large for cache",output.getvalue())
+        self.assertEqual(self.memclidSocket.bufferPos,len(self.memclidSocket.buffer))
+        result = self.memclidUtility.get(["k1","k2","k4"])
+        self.assertEqual([result[key]["status"] for key in ("k1","k2","k4")],[STATUS_DATA_AVAILABLE,STATUS_DATA_NOT_AVAILABLE,STATUS_DATA_AVAILABLE])
+
+class TestAsyncMemclidFakeServer(unittest.IsolatedAsyncioTestCase):
+    """
+    Essentially this unit test tests that concurrent requests pipelined by AsyncMemclidSocket on one
+    connection to the fake server get their own responses
+    """
+    async def asyncSetUp(self):
+        self.server = MemclidFakeServer(fragmentSize=7,fragmentDelay=0).start()
+        self.memclidSocket = AsyncMemclidSocket()
+        await self.memclidSocket.connect(self.server.host,self.server.port)
+        self.memclidUtility = AsyncMemclidUtility(self.memclidSocket)
+
+    async def asyncTearDown(self):
+        await self.memclidSocket.disconnect()
+        self.server.stop()
+
+    async def test_concurrent_requests(self):
+
+        """
+            TEST 1 : Check if the responses of concurrent gets are matched with their requests
+        """
+        await asyncio.gather(*[self.memclidUtility.set("key"+str(index),"value"+str(index),0,0) for index in range(50)])
+        results = await asyncio.gather(*[self.memclidUtility.get(["key"+str(index)]) for index in range(50)])
+        for index, result in enumerate(results):
+            self.assertEqual(result["key"+str(index)]["value"],"value"+str(index))
+
+if __name__ == '__main__':
+    unittest.main()
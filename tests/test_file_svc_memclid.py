@@ -0,0 +1,140 @@
+import sys
+import os
+import io
+import click
+import tempfile
+from contextlib import redirect_stdout
+
+sys.path.append(os.path.join(os.getcwd(),'..'))
+
+import unittest
+from memclid.constants import *
+from memclid.config import MEMCLID_RECV_CHUNK_SIZE
+from memclid.fake_server import MemclidFakeServer
+from memclid.memclid_socket import MemclidSocket
+from memclid.svc_memclid import MemclidUtility
+from memclid.compression import MemclidCompressor
+from memclid.near_cache import MemclidNearCache
+
+class RecordingFile(io.RawIOBase):
+    #binary file keeping the size of every write instead of the data
+    def __init__(self):
+        self.writes = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.writes.append(memoryview(data).nbytes)
+        return self.writes[-1]
+
+class TestMemclidFileStreaming(unittest.TestCase):
+    """
+    Essentially these unit tests test that values are stored from files and fetched into files as they are
+    sent and received, without going through str or being held in memory whole
+    """
+    def setUp(self):
+        self.server = MemclidFakeServer().start()
+        self.memclidSocket = MemclidSocket()
+        self.memclidSocket.connect(self.server.host,self.server.port)
+        self.memclidUtility = MemclidUtility(self.memclidSocket)
+        self.value = os.urandom(300*1024)
+        self.valueFile = tempfile.TemporaryFile()
+        self.valueFile.write(self.value)
+        self.valueFile.seek(0)
+
+    def tearDown(self):
+        self.valueFile.close()
+        self.memclidSocket.disconnect()
+        self.server.stop()
+
+    def test_file_round_trip(self):
+
+        """
+            TEST 1 : Check if a binary file is stored as it is and fetched back into another file
+        """
+        result = self.memclidUtility.setFile("testKey",self.valueFile,4,0)
+        self.assertEqual(result["status"],STATUS_RECORD_STORED)
+        self.assertEqual((self.server.items[b"testKey"].value,self.server.items[b"testKey"].flags),(self.value,4))
+        with tempfile.TemporaryFile() as outputFile:
+            result = self.memclidUtility.getFile("testKey",outputFile)
+            self.assertEqual((result["status"],result["size"],result["flag"]),(STATUS_DATA_AVAILABLE,len(self.value),"4"))
+            outputFile.seek(0)
+            self.assertEqual(outputFile.read(),self.value)
+
+    def test_constant_memory(self):
+
+        """
+            TEST 2 : Check if the value is written in blocks of at most the receive size and the connection is still usable after it
+        """
+        self.memclidUtility.setFile("testKey",self.valueFile,0,0)
+        self.memclidUtility.set("otherKey","value",0,0)
+        outputFile = RecordingFile()
+        self.memclidUtility.getFile("testKey",outputFile)
+        self.assertEqual(sum(outputFile.writes),len(self.value))
+        self.assertLessEqual(max(outputFile.writes),MEMCLID_RECV_CHUNK_SIZE)
+        self.assertEqual(self.memclidUtility.get("otherKey")["value"],"value")
+
+    def test_missing_key(self):
+
+        """
+            TEST 3 : Check if nothing is written for a key that doesn't exist
+        """
+        outputFile = io.BytesIO()
+        result = self.memclidUtility.getFile("missingKey",outputFile)
+        self.assertEqual((result["status"],result["size"]),(STATUS_DATA_NOT_AVAILABLE,None))
+        self.assertEqual(outputFile.getvalue(),b"")
+
+    def test_pipe_and_part_of_file(self):
+
+        """
+            TEST 4 : Check if the size has to be given for a pipe and only the rest of a file from its position is stored
+        """
+        readEnd, writeEnd = os.pipe()
+        with os.fdopen(readEnd,"rb") as pipe:
+            os.write(writeEnd,b"piped value")
+            os.close(writeEnd)
+            with self.assertRaises(click.Abort):
+                with redirect_stdout(io.StringIO()):
+                    self.memclidUtility.setFile("pipeKey",pipe,0,0)
+            self.memclidUtility.setFile("pipeKey",pipe,0,0,size=11)
+        self.assertEqual(self.server.items[b"pipeKey"].value,b"piped value")
+        self.valueFile.seek(1000)
+        self.memclidUtility.setFile("testKey",self.valueFile,0,0,noreply=True)
+        self.assertEqual(self.memclidUtility.get("pipeKey")["value"],"piped value")
+        self.assertEqual(self.server.items[b"testKey"].value,self.value[1000:])
+
+    def test_near_cache_and_reserved_bits(self):
+
+        """
+            TEST 5 : Check if storing a file invalidates the near cache and the reserved bits of the flag are refused
+        """
+        memclidUtility = MemclidUtility(self.memclidSocket,nearCache=MemclidNearCache(),compressor=MemclidCompressor())
+        memclidUtility.set("testKey","old",0,0)
+        memclidUtility.get("testKey")
+        with tempfile.TemporaryFile() as valueFile:
+            valueFile.write(b"new value")
+            valueFile.seek(0)
+            memclidUtility.setFile("testKey",valueFile,0,0)
+        self.assertEqual(memclidUtility.get("testKey")["value"],"new value")
+        with self.assertRaises(click.Abort):
+            with redirect_stdout(io.StringIO()):
+                memclidUtility.setFile("otherKey",self.valueFile,FLAG_COMPRESSED,0)
+        self.assertNotIn(b"otherKey",self.server.items)
+
+    def test_file_shorter_than_size(self):
+
+        """
+            TEST 6 : Check if a file ending before size fails and the connection waiting for the rest of the value is refused afterwards
+        """
+        with self.assertRaises(click.Abort):
+            with redirect_stdout(io.StringIO()):
+                self.memclidUtility.setFile("testKey",self.valueFile,0,0,size=len(self.value)+10)
+        output = io.StringIO()
+        with self.assertRaises(click.Abort):
+            with redirect_stdout(output):
+                self.memclidUtility.get("testKey")
+        self.assertIn("sent only in part",output.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,6 +7,7 @@ sys.path.append(os.path.join(os.getcwd(),'..'))
 import unittest
 from unittest.mock import create_autospec
 from memclid.constants import STATUS_DATA_AVAILABLE, STATUS_DATA_NOT_AVAILABLE
+from memclid.config import MEMCLID_MAX_COMMAND_LINE_LENGTH
 from memclid.svc_memclid import MemclidUtility
 from memclid.memclid_socket import MemclidSocket
 
@@ -31,7 +32,7 @@ class TestGetMemclidUtility(unittest.TestCase):
             TEST 1 : Check if correct get request is being made and 
             correct value is fetched (given it exists in the memcached server)
         """
-        self.memclidSocket.receive.return_value = "VALUE testKey 10 9\r\ntestValue\r\nEND\r\n"
+        self.memclidSocket.receive.return_value = b"VALUE testKey 10 9\r\ntestValue\r\nEND\r\n"
         expectedResult = {
             "flag": "10",
             "value": "testValue",
@@ -40,7 +41,7 @@ class TestGetMemclidUtility(unittest.TestCase):
         }
 
         actualResult=self.memclidUtility.get("testKey")
-        self.memclidSocket.send.assert_called_once_with(msg="get testKey\r\n")
+        self.memclidSocket.send.assert_called_once_with(msg=b"get testKey\r\n")
         self.memclidSocket.receive.assert_called_once();
         self.assertDictEqual(actualResult,expectedResult)
 
@@ -50,7 +51,7 @@ class TestGetMemclidUtility(unittest.TestCase):
             TEST 2 : Check if correct get request is being made  and
             key not being present in the memcached server is handled properly
         """
-        self.memclidSocket.receive.return_value = "END\r\n"
+        self.memclidSocket.receive.return_value = b"END\r\n"
         expectedResult = {
             "flag": None,
             "value": None,
@@ -59,7 +60,7 @@ class TestGetMemclidUtility(unittest.TestCase):
         }
 
         actualResult=self.memclidUtility.get("testKey")
-        self.memclidSocket.send.assert_called_once_with(msg="get testKey\r\n")
+        self.memclidSocket.send.assert_called_once_with(msg=b"get testKey\r\n")
         self.memclidSocket.receive.assert_called_once();
         self.assertDictEqual(actualResult,expectedResult)
     
@@ -69,7 +70,7 @@ class TestGetMemclidUtility(unittest.TestCase):
             TEST 3 : Check if MemclidUnrecognizedResponseSentByServer is raised and handled when an invalid response is sent by the server
 
         """
-        self.memclidSocket.receive.return_value = "INVALID_RESPONSE_FROM_SERVER\r\n"
+        self.memclidSocket.receive.return_value = b"INVALID_RESPONSE_FROM_SERVER\r\n"
 
         with self.assertRaises(click.exceptions.Abort):
             self.memclidUtility.get("testKey")
@@ -86,6 +87,73 @@ class TestGetMemclidUtility(unittest.TestCase):
         with self.assertRaises(click.exceptions.Abort):
             self.memclidUtility.get("testKey")
 
+    def test_get_multiple_keys(self):
+
+        """
+            TEST 5 : Check if a single get request is made for multiple keys and
+            the response is split into a result for every key (including the missing ones)
+        """
+        self.memclidSocket.receive.return_value = b"VALUE key1 0 6\r\nvalue1\r\nVALUE key3 5 8\r\nval\r\nue3\r\nEND\r\n"
+
+        actualResult=self.memclidUtility.get(["key1","key2","key3"])
+        self.memclidSocket.send.assert_called_once_with(msg=b"get key1 key2 key3\r\n")
+        self.memclidSocket.receive.assert_called_once();
+        self.assertDictEqual(actualResult,{
+            "key1": {"flag": "0", "value": "value1", "message": "Fetched the value for key1", "status": STATUS_DATA_AVAILABLE},
+            "key2": {"flag": None, "value": None, "message": "No value found for key2", "status": STATUS_DATA_NOT_AVAILABLE},
+            "key3": {"flag": "5", "value": "val\r\nue3", "message": "Fetched the value for key3", "status": STATUS_DATA_AVAILABLE}
+        })
+
+    def test_get_long_key_list_is_split(self):
+
+        """
+            TEST 6 : Check if a key list that doesnt fit in one command line is sent as multiple get requests
+        """
+        self.memclidSocket.receive.return_value = b"END\r\n"
+        keys = ["key"+str(i).zfill(96) for i in range(50)]
+
+        actualResult=self.memclidUtility.get(keys)
+        sentMessages = [call.args[0] for call in self.memclidSocket.send.call_args_list]
+        self.assertGreater(len(sentMessages),1)
+        self.assertEqual(self.memclidSocket.receive.call_count,len(sentMessages))
+        self.assertTrue(all(len(msg) <= MEMCLID_MAX_COMMAND_LINE_LENGTH for msg in sentMessages))
+        self.assertEqual(b" ".join(msg[4:-2] for msg in sentMessages)," ".join(keys).encode())
+        self.assertEqual(list(actualResult.keys()),keys)
+
+    def test_get_unrequested_key_in_response(self):
+
+        """
+            TEST 7 : Check if a value sent for a key that was not requested is treated as an unrecognized response
+        """
+        self.memclidSocket.receive.return_value = b"VALUE otherKey 0 6\r\nvalue1\r\nEND\r\n"
+
+        with self.assertRaises(click.exceptions.Abort):
+            self.memclidUtility.get(["key1","key2"])
+
+    def test_get_key_with_regex_metacharacters(self):
+
+        """
+            TEST 8 : Check if keys containing regex metacharacters are matched literally
+        """
+        self.memclidSocket.receive.return_value = b"VALUE user.*(1)+ 0 5\r\nvalue\r\nEND\r\n"
+
+        actualResult=self.memclidUtility.get("user.*(1)+")
+        self.assertEqual(actualResult["value"],"value")
+        self.assertEqual(actualResult["status"],STATUS_DATA_AVAILABLE)
+
+
+    def test_get_binary_value_with_text_values(self):
+
+        """
+            TEST 9 : Check if a value that isn't valid UTF-8 is returned as bytes without failing the other keys
+        """
+        self.memclidSocket.receive.return_value = b"VALUE textKey 0 4\r\ntext\r\nVALUE binaryKey 0 2\r\n\xff\xfe\r\nEND\r\n"
+
+        actualResult=self.memclidUtility.get(["textKey","binaryKey"])
+        self.assertEqual(actualResult["textKey"]["value"],"text")
+        self.assertEqual(actualResult["binaryKey"]["value"],b"\xff\xfe")
+        self.assertEqual(actualResult["binaryKey"]["status"],STATUS_DATA_AVAILABLE)
+
 
 if __name__ == '__main__':
     unittest.main()
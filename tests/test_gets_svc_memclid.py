@@ -31,7 +31,7 @@ class TestGetsMemclidUtility(unittest.TestCase):
             TEST 1 : Check if correct gets request is being made and 
             correct value is fetched (given it exists in the memcached server)
         """
-        self.memclidSocket.receive.return_value = "VALUE testKey 10 9 8\r\ntestValue\r\nEND\r\n"
+        self.memclidSocket.receive.return_value = b"VALUE testKey 10 9 8\r\ntestValue\r\nEND\r\n"
         expectedResult = {
             "flag": "10",
             "value": "testValue",
@@ -41,7 +41,7 @@ class TestGetsMemclidUtility(unittest.TestCase):
         }
 
         actualResult=self.memclidUtility.gets("testKey")
-        self.memclidSocket.send.assert_called_once_with(msg="gets testKey\r\n")
+        self.memclidSocket.send.assert_called_once_with(msg=b"gets testKey\r\n")
         self.memclidSocket.receive.assert_called_once();
         self.assertDictEqual(actualResult,expectedResult)
 
@@ -51,7 +51,7 @@ class TestGetsMemclidUtility(unittest.TestCase):
             TEST 2 : Check if correct gets request is being made  and
             key not being present in the memcached server is handled properly
         """
-        self.memclidSocket.receive.return_value = "END\r\n"
+        self.memclidSocket.receive.return_value = b"END\r\n"
         expectedResult = {
             "flag": None,
             "value": None,
@@ -61,7 +61,7 @@ class TestGetsMemclidUtility(unittest.TestCase):
         }
 
         actualResult=self.memclidUtility.gets("testKey")
-        self.memclidSocket.send.assert_called_once_with(msg="gets testKey\r\n")
+        self.memclidSocket.send.assert_called_once_with(msg=b"gets testKey\r\n")
         self.memclidSocket.receive.assert_called_once();
         self.assertDictEqual(actualResult,expectedResult)
     
@@ -71,7 +71,7 @@ class TestGetsMemclidUtility(unittest.TestCase):
             TEST 3 : Check if MemclidUnrecognizedResponseSentByServer is raised and handled when an invalid response is sent by the server
 
         """
-        self.memclidSocket.receive.return_value = "INVALID_RESPONSE_FROM_SERVER\r\n"
+        self.memclidSocket.receive.return_value = b"INVALID_RESPONSE_FROM_SERVER\r\n"
 
         with self.assertRaises(click.exceptions.Abort):
             self.memclidUtility.gets("testKey")
@@ -88,6 +88,22 @@ class TestGetsMemclidUtility(unittest.TestCase):
         with self.assertRaises(click.exceptions.Abort):
             self.memclidUtility.gets("testKey")
 
+    def test_gets_multiple_keys(self):
+
+        """
+            TEST 5 : Check if a single gets request is made for multiple keys and
+            the response is split into a result (with the cas unique value) for every key
+        """
+        self.memclidSocket.receive.return_value = b"VALUE key1 0 6 11\r\nvalue1\r\nEND\r\n"
+
+        actualResult=self.memclidUtility.gets(["key1","key2"])
+        self.memclidSocket.send.assert_called_once_with(msg=b"gets key1 key2\r\n")
+        self.memclidSocket.receive.assert_called_once();
+        self.assertDictEqual(actualResult,{
+            "key1": {"flag": "0", "value": "value1", "cas_unique": "11", "message": "Fetched the value for key1", "status": STATUS_DATA_AVAILABLE},
+            "key2": {"flag": None, "value": None, "cas_unique": None, "message": "No value found for key2", "status": STATUS_DATA_NOT_AVAILABLE}
+        })
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
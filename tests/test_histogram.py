@@ -0,0 +1,54 @@
+import sys
+import os
+
+sys.path.append(os.path.join(os.getcwd(),'..'))
+
+import unittest
+from memclid.histogram import MemclidHistogram
+
+class TestMemclidHistogram(unittest.TestCase):
+    """
+    Essentially these unit tests test that the percentiles read from the histogram are within its precision
+    """
+    def test_small_values_exact(self):
+
+        """
+            TEST 1 : Check if values that get a bucket of their own are reported exactly
+        """
+        histogram = MemclidHistogram()
+        for value in range(1,101):
+            histogram.record(value)
+        self.assertEqual(histogram.percentile(50),50)
+        self.assertEqual(histogram.percentile(99),99)
+        self.assertEqual(histogram.percentile(100),100)
+        self.assertEqual((histogram.count,histogram.min,histogram.max,histogram.mean()),(100,1,100,50.5))
+
+    def test_large_values_precision(self):
+
+        """
+            TEST 2 : Check if large values are reported with less than 2% error and never below their real value
+        """
+        for value in [128, 1000, 123456, 98765432]:
+            histogram = MemclidHistogram()
+            histogram.record(value)
+            histogram.record(value*3)
+            reported = histogram.percentile(50)
+            self.assertGreaterEqual(reported,value)
+            self.assertLess(reported,value*1.02)
+
+    def test_merge(self):
+
+        """
+            TEST 3 : Check if merged histograms give the percentiles of all the values
+        """
+        first, second = MemclidHistogram(), MemclidHistogram()
+        for value in range(1000):
+            (first if value % 2 else second).record(value)
+        merged = MemclidHistogram().merge(first).merge(second)
+        self.assertEqual(merged.count,1000)
+        self.assertEqual((merged.min,merged.max),(0,999))
+        self.assertAlmostEqual(merged.percentile(99.9),998,delta=998*0.02)
+        self.assertIsNone(MemclidHistogram().percentile(50))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -32,7 +32,7 @@ class TestIncrMemclidUtility(unittest.TestCase):
             incrementing the value corresponding to the key using incr 
             successfully leads to a success result in the application
         """
-        self.memclidSocket.receive.return_value = "10\r\n"
+        self.memclidSocket.receive.return_value = b"10\r\n"
         expectedResult = {
             "updated_value": "10",
             "message": "The value for the key was incremented successfully",
@@ -40,7 +40,7 @@ class TestIncrMemclidUtility(unittest.TestCase):
         }
 
         actualResult=self.memclidUtility.incr("testKey",5)
-        self.memclidSocket.send.assert_called_once_with(msg="incr testKey 5\r\n")
+        self.memclidSocket.send.assert_called_once_with(msg=b"incr testKey 5\r\n")
         self.memclidSocket.receive.assert_called_once();
         self.assertDictEqual(actualResult,expectedResult)
 
@@ -51,7 +51,7 @@ class TestIncrMemclidUtility(unittest.TestCase):
             failure while incrementing the value corresponding to the key
             using incr leads to a failure result in the application
         """
-        self.memclidSocket.receive.return_value = "NOT_FOUND\r\n"
+        self.memclidSocket.receive.return_value = b"NOT_FOUND\r\n"
         expectedResult = {
             "updated_value": None,
             "message": "The key doesnt exist in the memcached server. It could not be incremented due to the preconditions of the command executed.",
@@ -59,7 +59,7 @@ class TestIncrMemclidUtility(unittest.TestCase):
         }
 
         actualResult=self.memclidUtility.incr("testKey",5)
-        self.memclidSocket.send.assert_called_once_with(msg="incr testKey 5\r\n")
+        self.memclidSocket.send.assert_called_once_with(msg=b"incr testKey 5\r\n")
         self.memclidSocket.receive.assert_called_once();
         self.assertDictEqual(actualResult,expectedResult)
 
@@ -69,7 +69,7 @@ class TestIncrMemclidUtility(unittest.TestCase):
             TEST 3 : Check if MemclidUnrecognizedResponseSentByServer is raised and handled when an invalid response is sent by the server
 
         """
-        self.memclidSocket.receive.return_value = "RANDOM_RESPONSE_SENT_BY_SERVER\r\n"
+        self.memclidSocket.receive.return_value = b"RANDOM_RESPONSE_SENT_BY_SERVER\r\n"
 
         with self.assertRaises(click.exceptions.Abort):
             self.memclidUtility.incr("testKey",5)
@@ -0,0 +1,152 @@
+import sys
+import os
+import io
+import click
+from contextlib import redirect_stdout
+
+sys.path.append(os.path.join(os.getcwd(),'..'))
+
+import unittest
+from memclid.exceptions import MemclidServerErrorSentByServer
+from memclid.fake_server import MemclidFakeServer
+from memclid.memclid_socket import MemclidSocket
+from memclid.svc_memclid import MemclidUtility
+from memclid.binary_svc_memclid import MemclidBinaryUtility
+from memclid.instrumentation import MemclidMetrics
+from memclid.svc_cluster import MemclidClusterUtility
+from memclid.svc_batch import MemclidBatch
+
+class TestMemclidInstrumentation(unittest.TestCase):
+    """
+    Essentially these unit tests test that the hooks of a MemclidUtility get an event with the sizes, timings and
+    outcome of every request sent to the fake server, and that MemclidMetrics adds them up
+    """
+    def setUp(self):
+        self.server = MemclidFakeServer().start()
+        self.memclidSocket = MemclidSocket()
+        self.memclidSocket.connect(self.server.host,self.server.port)
+        self.events = []
+        self.memclidUtility = MemclidUtility(self.memclidSocket,[self.events.append])
+
+    def tearDown(self):
+        self.memclidSocket.disconnect()
+        self.server.stop()
+
+    def test_command_events(self):
+
+        """
+            TEST 1 : Check if every request gets an event with its command, keys, sizes, timings and outcome
+        """
+        self.memclidUtility.set("testKey","testValue",0,0)
+        self.memclidUtility.get(["testKey","missingKey"])
+        self.memclidUtility.delete("missingKey",noreply=True)
+        setEvent, getEvent, deleteEvent = self.events
+        self.assertEqual((setEvent.command,setEvent.keys,setEvent.outcome),("set",1,"stored"))
+        self.assertEqual(setEvent.bytesSent,len(b"set testKey 0 0 9\r\ntestValue\r\n"))
+        self.assertEqual(setEvent.bytesReceived,len(b"STORED\r\n"))
+        self.assertEqual((getEvent.command,getEvent.keys,getEvent.outcome,getEvent.hits),("get",2,"partial",1))
+        self.assertEqual(getEvent.bytesReceived,len(b"VALUE testKey 0 9\r\ntestValue\r\nEND\r\n"))
+        self.assertEqual((deleteEvent.command,deleteEvent.outcome,deleteEvent.bytesReceived),("delete","sent",0))
+        for event in self.events:
+            self.assertGreater(event.sendTime,0)
+            self.assertIsNone(event.error)
+        self.assertGreater(getEvent.waitTime,0)
+        self.assertGreater(getEvent.parseTime,0)
+
+    def test_pipelined_events(self):
+
+        """
+            TEST 2 : Check if pipelined and quiet meta requests get an event each
+        """
+        self.memclidUtility.setMany([("key"+str(index),"value") for index in range(150)],0,0)
+        self.assertEqual(len(self.events),150)
+        self.assertTrue(all(event.command == "set" and event.outcome == "stored" for event in self.events))
+        self.events.clear()
+        self.memclidUtility.metaGetMany(["key1","missingKey"])
+        self.assertEqual([(event.command,event.outcome) for event in self.events],[("mg","hit"),("mg","miss")])
+        self.assertEqual(self.events[1].bytesReceived,len(b"EN\r\n"))
+
+    def test_error_events(self):
+
+        """
+            TEST 3 : Check if a request that fails gets an error event and the error is still raised
+        """
+        self.server.injectError("incr")
+        with self.assertRaises(MemclidServerErrorSentByServer):
+            self.memclidUtility.execute(*self.memclidUtility.prepareIncr("counterKey",1))
+        self.assertEqual(self.events[0].outcome,"error")
+        self.assertIsInstance(self.events[0].error,MemclidServerErrorSentByServer)
+        self.memclidUtility.removeHook(self.events.append)
+        with self.assertRaises(click.Abort):
+            with redirect_stdout(io.StringIO()):
+                self.server.injectError("incr")
+                self.memclidUtility.incr("counterKey",1)
+        self.assertEqual(len(self.events),1)
+
+    def test_metrics(self):
+
+        """
+            TEST 4 : Check if MemclidMetrics counts the requests, outcomes and bytes and keeps their latencies
+        """
+        metrics = MemclidMetrics()
+        self.memclidUtility.addHook(metrics)
+        self.memclidUtility.set("testKey","testValue",0,0)
+        for index in range(10):
+            self.memclidUtility.get(["testKey","missingKey"] if index % 2 else ["testKey"])
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["get"]["count"],10)
+        self.assertEqual(snapshot["get"]["keys"],15)
+        self.assertEqual(snapshot["get"]["hits"],10)
+        self.assertEqual(snapshot["get"]["outcomes"],{"hit": 5, "partial": 5})
+        self.assertEqual(snapshot["set"]["bytesReceived"],len(b"STORED\r\n"))
+        self.assertEqual(snapshot["get"]["latency"].count,10)
+        self.assertGreater(snapshot["get"]["latency"].percentile(99),0)
+        metrics.reset()
+        self.assertEqual(metrics.snapshot(),{})
+
+    def test_binary_requests(self):
+
+        """
+            TEST 5 : Check if binary requests are described with their command and number of keys
+        """
+        memclidUtility = MemclidBinaryUtility(None)
+        self.assertEqual(memclidUtility.describeRequest(memclidUtility.retrievalRequest("get",["key1","key2"])),("get",2))
+        self.assertEqual(memclidUtility.describeRequest(memclidUtility.storageRequest("cas","key1","value",0,0,5)),("cas",1))
+        self.assertEqual(memclidUtility.describeRequest(memclidUtility.deleteRequest("key1",True)),("delete",1))
+
+    def test_cluster_and_batch_events(self):
+
+        """
+            TEST 6 : Check if the multi key gets of a cluster and the commands of a batch get an event each
+        """
+        with MemclidFakeServer() as otherServer:
+            servers = [(self.server.host,self.server.port,1),(otherServer.host,otherServer.port,1)]
+            otherSocket = MemclidSocket()
+            otherSocket.connect(otherServer.host,otherServer.port)
+            clusterUtility = MemclidClusterUtility(servers,[self.memclidSocket,otherSocket],hooks=[self.events.append])
+            keys = ["key"+str(index) for index in range(20)]
+            clusterUtility.get(keys)
+            self.assertEqual(len(self.events),2)
+            self.assertEqual(sum(event.keys for event in self.events),20)
+            self.assertTrue(all(event.command == "get" and event.outcome == "miss" for event in self.events))
+            otherSocket.disconnect()
+        self.events.clear()
+        results = list(MemclidBatch(self.memclidUtility,10).run(["set testKey testValue","get testKey","incr testKey 1"]))
+        self.assertEqual(len(results),3)
+        self.assertEqual([(event.command,event.outcome) for event in self.events],[("set","stored"),("get","hit"),("incr","error")])
+
+    def test_large_value_bytes_received(self):
+
+        """
+            TEST 7 : Check if the bytes of a large value received straight into its buffer are counted
+        """
+        value = "x"*500*1024
+        self.memclidUtility.set("largeKey",value,0,0)
+        received = self.memclidSocket.bytesReceived
+        self.memclidUtility.get("largeKey")
+        response = len(b"VALUE largeKey 0 %d\r\n" % len(value))+len(value)+len(b"\r\nEND\r\n")
+        self.assertEqual(self.memclidSocket.bytesReceived-received,response)
+        self.assertEqual(self.events[-1].bytesReceived,response)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import sys
+import os
+import io
+
+sys.path.append(os.path.join(os.getcwd(),'..'))
+
+import unittest
+from unittest.mock import create_autospec, call
+from memclid.constants import STATUS_RECORD_STORED, STATUS_RECORD_NOT_STORED
+from memclid.exceptions import MemclidInvalidCommandError
+from memclid.svc_memclid import MemclidUtility
+from memclid.svc_load import MemclidLoader
+from memclid.memclid_socket import MemclidSocket
+
+class TestLoadMemclidUtility(unittest.TestCase):
+    """
+    Essentially these unit tests test that the rows of a CSV/JSONL file are converted into
+    storage requests and that the responses are matched back to the rows
+    """
+    def setUp(self):
+        self.memclidSocket = create_autospec(MemclidSocket)
+        self.memclidSocket.host = "localhost"
+        self.memclidSocket.port = 11211
+        self.memclidSocket.receive.return_value = b"STORED\r\n"
+        self.memclidUtility = MemclidUtility(self.memclidSocket)
+
+    def tearDown(self):
+        self.memclidUtility = None
+        self.memclidSocket = None
+
+    def test_load_csv(self):
+
+        """
+            TEST 1 : Check if the header row is skipped and
+            missing flag and exptime columns fall back to the defaults of the loader
+        """
+        file = io.StringIO('key,value,flag,exptime\ntestKey1,"test, value",5,60\ntestKey2,testValue\n')
+
+        results = list(MemclidLoader(self.memclidUtility,10,"set",1,120).run(file,"csv"))
+        self.memclidSocket.send.assert_has_calls([
+            call(b"set testKey1 5 60 11\r\ntest, value\r\n"),
+            call(b"set testKey2 1 120 9\r\ntestValue\r\n")
+        ])
+        self.assertEqual([label for label, result, error in results],["Row 2 (testKey1)","Row 3 (testKey2)"])
+        self.assertEqual(results[0][1]["status"],STATUS_RECORD_STORED)
+
+    def test_load_jsonl(self):
+
+        """
+            TEST 2 : Check if the JSONL rows are stored with the given storage command and
+            values that are not strings are stored as JSON
+        """
+        self.memclidSocket.receive.return_value = b"NOT_STORED\r\n"
+        file = io.StringIO('{"key": "testKey1", "value": {"a": [1, 2]}, "flag": 0}\n\n{"key": "testKey2", "value": "testValue", "exptime": 0}\n')
+
+        results = list(MemclidLoader(self.memclidUtility,10,"add").run(file,"jsonl"))
+        self.memclidSocket.send.assert_has_calls([
+            call(b'add testKey1 0 3600 11\r\n{"a":[1,2]}\r\n'),
+            call(b"add testKey2 0 0 9\r\ntestValue\r\n")
+        ])
+        self.assertEqual(len(results),2)
+        self.assertEqual(results[1][1]["status"],STATUS_RECORD_NOT_STORED)
+
+    def test_load_invalid_rows(self):
+
+        """
+            TEST 3 : Check if invalid rows are reported as failures without being sent
+        """
+        file = io.StringIO('not json\n{"value": "testValue"}\n{"key": "test key", "value": "testValue"}\n{"key": "testKey", "value": "testValue", "flag": "abc"}\n')
+
+        results = list(MemclidLoader(self.memclidUtility,10).run(file,"jsonl"))
+        self.memclidSocket.send.assert_not_called()
+        self.assertEqual(len(results),4)
+        for label, result, error in results:
+            self.assertIsInstance(error,MemclidInvalidCommandError)
+
+    def test_load_base64_value(self):
+
+        """
+            TEST 4 : Check if a JSONL row with a base64 encoded value is stored as the bytes it decodes to
+        """
+        file = io.StringIO('{"key": "binaryKey", "value": "/wD+", "flag": 2, "encoding": "base64"}\n{"key": "badKey", "value": "!", "encoding": "base64"}\n')
+
+        results = list(MemclidLoader(self.memclidUtility,10,"set",0,0).run(file,"jsonl"))
+        self.memclidSocket.send.assert_called_once_with(b"set binaryKey 2 0 3\r\n\xff\x00\xfe\r\n")
+        self.assertIsInstance(results[1][2],MemclidInvalidCommandError)
+
+if __name__ == '__main__':
+    unittest.main()
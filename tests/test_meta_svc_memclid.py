@@ -0,0 +1,172 @@
+import sys
+import os
+import click
+
+sys.path.append(os.path.join(os.getcwd(),'..'))
+
+import unittest
+from unittest.mock import create_autospec, call
+from memclid.constants import *
+from memclid.exceptions import MemclidClientErrorSentByServer
+from memclid.svc_memclid import MemclidUtility
+from memclid.memclid_socket import MemclidSocket
+
+class TestMetaMemclidUtility(unittest.TestCase):
+    """
+    Essentially these unit tests test that the application can interpret the messages sent by
+    the Memcached server (through socket connection) for the meta commands and that it handles it correctly
+    """
+    def setUp(self):
+        self.memclidSocket = create_autospec(MemclidSocket)
+        self.memclidSocket.host = "localhost"
+        self.memclidSocket.port = 11211
+        self.memclidUtility = MemclidUtility(self.memclidSocket)
+
+    def tearDown(self):
+        self.memclidUtility = None
+        self.memclidSocket = None
+
+    def test_meta_get_hit(self):
+
+        """
+            TEST 1 : Check if correct mg request is being made and the value and its metadata are returned
+        """
+        self.memclidSocket.receive.return_value = b"VA 9 f10 c42 t-1 l3\r\ntestValue\r\n"
+        expectedResult = {
+            "flag": "10",
+            "value": "testValue",
+            "cas_unique": "42",
+            "ttl": "-1",
+            "last_access": "3",
+            "opaque": None,
+            "message": "Fetched the value for testKey",
+            "status": STATUS_DATA_AVAILABLE
+        }
+
+        actualResult = self.memclidUtility.metaGet("testKey",cas=True,ttl=True,lastAccess=True)
+        self.memclidSocket.send.assert_called_once_with(msg=b"mg testKey v f c t l\r\n")
+        self.assertDictEqual(actualResult,expectedResult)
+
+    def test_meta_get_miss(self):
+
+        """
+            TEST 2 : Check if a miss (EN) leads to a data not available result
+        """
+        self.memclidSocket.receive.return_value = b"EN\r\n"
+
+        actualResult = self.memclidUtility.metaGet("testKey")
+        self.memclidSocket.send.assert_called_once_with(msg=b"mg testKey v f\r\n")
+        self.assertEqual(actualResult["status"],STATUS_DATA_NOT_AVAILABLE)
+        self.assertEqual(actualResult["message"],"No value found for testKey")
+
+    def test_meta_get_without_value(self):
+
+        """
+            TEST 3 : Check if only the metadata is fetched when the value isn't requested
+        """
+        self.memclidSocket.receive.return_value = b"HD t120 O7\r\n"
+
+        actualResult = self.memclidUtility.metaGet("testKey",value=False,ttl=True,opaque=7)
+        self.memclidSocket.send.assert_called_once_with(msg=b"mg testKey t O7\r\n")
+        self.assertEqual(actualResult["status"],STATUS_DATA_AVAILABLE)
+        self.assertIsNone(actualResult["value"])
+        self.assertEqual(actualResult["ttl"],"120")
+        self.assertEqual(actualResult["opaque"],"7")
+
+    def test_meta_get_many_quiet(self):
+
+        """
+            TEST 4 : Check if the keys are pipelined in quiet mode followed by mn and
+            the keys the server didn't reply to are misses
+        """
+        self.memclidSocket.receive.side_effect = [b"VA 2 f0 O1\r\nv2\r\n", b"MN\r\n"]
+
+        actualResult = self.memclidUtility.metaGetMany(["k1","k2","k3"])
+        self.memclidSocket.send.assert_called_once_with(msg=b"mg k1 v f O0 q\r\nmg k2 v f O1 q\r\nmg k3 v f O2 q\r\nmn\r\n")
+        self.assertEqual(list(actualResult),["k1","k2","k3"])
+        self.assertEqual(actualResult["k1"]["status"],STATUS_DATA_NOT_AVAILABLE)
+        self.assertEqual(actualResult["k2"]["status"],STATUS_DATA_AVAILABLE)
+        self.assertEqual(actualResult["k2"]["value"],"v2")
+        self.assertEqual(actualResult["k3"]["status"],STATUS_DATA_NOT_AVAILABLE)
+
+    def test_meta_set_stored(self):
+
+        """
+            TEST 5 : Check if correct ms request is being made and the new cas unique value is returned
+        """
+        self.memclidSocket.receive.return_value = b"HD c43\r\n"
+
+        actualResult = self.memclidUtility.metaSet("testKey","testValue",10,60,returnCas=True)
+        self.memclidSocket.send.assert_called_once_with(msg=b"ms testKey 9 T60 F10 MS c\r\ntestValue\r\n")
+        self.assertEqual(actualResult["status"],STATUS_RECORD_STORED)
+        self.assertEqual(actualResult["cas_unique"],"43")
+
+    def test_meta_set_cas_mismatch(self):
+
+        """
+            TEST 6 : Check if a cas mismatch (EX) leads to a not stored result
+        """
+        self.memclidSocket.receive.return_value = b"EX\r\n"
+
+        actualResult = self.memclidUtility.metaSet("testKey","testValue",0,0,cas_unique=42,mode="replace")
+        self.memclidSocket.send.assert_called_once_with(msg=b"ms testKey 9 T0 F0 MR C42\r\ntestValue\r\n")
+        self.assertEqual(actualResult["status"],STATUS_RECORD_NOT_STORED)
+
+    def test_meta_set_many_quiet(self):
+
+        """
+            TEST 7 : Check if only the failures are replied to in quiet mode
+        """
+        self.memclidSocket.receive.side_effect = [b"NS O1\r\n", b"MN\r\n"]
+
+        actualResult = self.memclidUtility.metaSetMany([("k1","a"),("k2","bc")],mode="add")
+        self.memclidSocket.send.assert_called_once_with(msg=b"ms k1 1 T0 F0 ME O0 q\r\na\r\nms k2 2 T0 F0 ME O1 q\r\nbc\r\nmn\r\n")
+        self.assertEqual(actualResult["k1"]["status"],STATUS_RECORD_STORED)
+        self.assertEqual(actualResult["k2"]["status"],STATUS_RECORD_NOT_STORED)
+
+    def test_meta_quiet_error_drains_until_mn(self):
+
+        """
+            TEST 8 : Check if an error for one of the quiet requests is raised only once all the responses are read
+        """
+        self.memclidSocket.receive.side_effect = [MemclidClientErrorSentByServer("localhost",11211,"bad data chunk"), b"MN\r\n"]
+
+        with self.assertRaises(click.exceptions.Abort):
+            self.memclidUtility.metaSetMany([("k1","a"),("k2","b")])
+        self.assertEqual(self.memclidSocket.receive.call_count,2)
+
+    def test_meta_delete(self):
+
+        """
+            TEST 9 : Check if correct md request is being made and the result is interpreted
+        """
+        self.memclidSocket.receive.side_effect = [b"HD\r\n", b"NF\r\n"]
+
+        self.assertEqual(self.memclidUtility.metaDelete("testKey",cas_unique=42)["status"],STATUS_RECORD_DELETED)
+        self.assertEqual(self.memclidUtility.metaDelete("testKey")["status"],STATUS_RECORD_NOT_DELETED)
+        self.memclidSocket.send.assert_has_calls([call(msg=b"md testKey C42\r\n"),call(msg=b"md testKey\r\n")])
+
+    def test_meta_arithmetic(self):
+
+        """
+            TEST 10 : Check if correct ma request is being made and the updated value is returned
+        """
+        self.memclidSocket.receive.return_value = b"VA 1\r\n5\r\n"
+
+        actualResult = self.memclidUtility.metaArithmetic("testKey",2,decrement=True,initial=5,exptime=60)
+        self.memclidSocket.send.assert_called_once_with(msg=b"ma testKey v D2 MD N60 J5\r\n")
+        self.assertEqual(actualResult["status"],STATUS_RECORD_STORED)
+        self.assertEqual(actualResult["updated_value"],"5")
+
+    def test_meta_invalid_response(self):
+
+        """
+            TEST 11 : Check if MemclidUnrecognizedResponseSentByServer is raised and handled when an invalid response is sent by the server
+        """
+        self.memclidSocket.receive.return_value = b"STORED\r\n"
+
+        with self.assertRaises(click.exceptions.Abort):
+            self.memclidUtility.metaSet("testKey","testValue")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import sys
+import os
+
+sys.path.append(os.path.join(os.getcwd(),'..'))
+
+import unittest
+from memclid.constants import *
+from memclid.fake_server import MemclidFakeServer
+from memclid.memclid_socket import MemclidSocket
+from memclid.svc_memclid import MemclidUtility
+from memclid.svc_cluster import MemclidClusterUtility
+from memclid.near_cache import MemclidNearCache, ENTRY_OVERHEAD
+
+class TestMemclidNearCache(unittest.TestCase):
+    """
+    Essentially these unit tests test that get/gets are served from the near cache until the ttl (or the
+    expiry of the item) runs out, that the writes made with the utility invalidate the keys and that the
+    least recently used entries are evicted to stay within the memory budget
+    """
+    def setUp(self):
+        self.now = 1000000000
+        self.server = MemclidFakeServer().start()
+        self.memclidSocket = MemclidSocket()
+        self.memclidSocket.connect(self.server.host,self.server.port)
+        self.nearCache = MemclidNearCache(ttl=10,clock=lambda: self.now)
+        self.memclidUtility = MemclidUtility(self.memclidSocket,nearCache=self.nearCache)
+        self.otherUtility = MemclidUtility(self.memclidSocket)
+
+    def tearDown(self):
+        self.memclidSocket.disconnect()
+        self.server.stop()
+
+    def test_hits_served_locally(self):
+
+        """
+            TEST 1 : Check if a fetched value is served from the near cache until the ttl runs out
+        """
+        self.otherUtility.set("testKey","first",5,0)
+        self.assertEqual(self.memclidUtility.get("testKey")["value"],"first")
+        self.otherUtility.set("testKey","second",5,0)
+        result = self.memclidUtility.get(["missingKey","testKey"])
+        self.assertEqual(list(result),["missingKey","testKey"])
+        self.assertEqual((result["testKey"]["value"],result["testKey"]["flag"]),("first","5"))
+        self.assertEqual(result["missingKey"]["status"],STATUS_DATA_NOT_AVAILABLE)
+        self.assertEqual(self.server.stats["get_hits"],1)
+        self.assertEqual((self.nearCache.hits,self.nearCache.misses),(1,2))
+        self.now += 10
+        self.assertEqual(self.memclidUtility.get("testKey")["value"],"second")
+
+    def test_writes_invalidate(self):
+
+        """
+            TEST 2 : Check if the writes and deletes made with the utility invalidate the key
+        """
+        self.memclidUtility.set("testKey","1",0,0)
+        self.memclidUtility.get("testKey")
+        self.memclidUtility.incr("testKey",4)
+        self.assertEqual(self.memclidUtility.get("testKey")["value"],"5")
+        self.memclidUtility.delete("testKey")
+        self.assertEqual(self.memclidUtility.get("testKey")["status"],STATUS_DATA_NOT_AVAILABLE)
+        self.assertEqual(self.nearCache.invalidations,2)
+
+    def test_gets_and_item_exptime(self):
+
+        """
+            TEST 3 : Check if gets is only served with a known cas unique and the ttl is capped by the exptime of the item
+        """
+        self.memclidUtility.set("testKey","value",0,3)
+        self.memclidUtility.get("testKey")
+        casUnique = self.memclidUtility.gets("testKey")["cas_unique"]
+        self.assertEqual(self.memclidUtility.gets("testKey")["cas_unique"],casUnique)
+        self.assertEqual(self.server.stats["cmd_get"],2)
+        self.now += 3
+        self.assertEqual(self.nearCache.lookupMany("get",["testKey"]),({},["testKey"]))
+
+    def test_lru_eviction(self):
+
+        """
+            TEST 4 : Check if the least recently used entries are evicted once the memory budget is reached
+        """
+        self.nearCache.maxBytes = 3*(4+100+ENTRY_OVERHEAD)
+        for key in ["key1","key2","key3","key4"]:
+            self.otherUtility.set(key,"x"*100,0,0)
+        self.memclidUtility.get(["key1","key2","key3"])
+        self.memclidUtility.get("key1")
+        self.memclidUtility.get("key4")
+        results, missing = self.nearCache.lookupMany("get",["key1","key2","key3","key4"])
+        self.assertEqual(missing,["key2"])
+        self.assertEqual(self.nearCache.stats()["evictions"],1)
+        self.assertLessEqual(self.nearCache.bytes,self.nearCache.maxBytes)
+
+    def test_cluster(self):
+
+        """
+            TEST 5 : Check if a cluster only fetches the keys missing from the shared near cache
+        """
+        clusterUtility = MemclidClusterUtility([(self.server.host,self.server.port,1)],[self.memclidSocket],nearCache=self.nearCache)
+        clusterUtility.set("key1","value1",0,0)
+        clusterUtility.set("key2","value2",0,0)
+        clusterUtility.get(["key1"])
+        result = clusterUtility.get(["key1","key2"])
+        self.assertEqual((result["key1"]["value"],result["key2"]["value"]),("value1","value2"))
+        self.assertEqual(self.server.stats["cmd_get"],2)
+
+if __name__ == '__main__':
+    unittest.main()
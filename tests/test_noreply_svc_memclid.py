@@ -0,0 +1,136 @@
+import sys
+import os
+import click
+import socket
+
+sys.path.append(os.path.join(os.getcwd(),'..'))
+
+import unittest
+from unittest.mock import create_autospec
+from memclid.constants import STATUS_REQUEST_SENT
+from memclid.exceptions import MemclidConnectionBreakError
+from memclid.svc_memclid import MemclidUtility
+from memclid.memclid_socket import MemclidSocket
+from memclid.memclid_pool import MemclidPool
+from memclid.fake_server import MemclidFakeServer
+
+class TestNoreplyMemclidUtility(unittest.TestCase):
+    """
+    Essentially these unit tests test that noreply requests are sent without waiting for a response
+    """
+    def setUp(self):
+        self.memclidSocket = create_autospec(MemclidSocket)
+        self.memclidSocket.host = "localhost"
+        self.memclidSocket.port = 11211
+        self.memclidUtility = MemclidUtility(self.memclidSocket)
+
+    def tearDown(self):
+        self.memclidUtility = None
+        self.memclidSocket = None
+
+    def test_noreply_requests(self):
+
+        """
+            TEST 1 : Check if the noreply requests are sent with noreply and no response is read
+        """
+        expectedResult = {
+            "message": "The request was sent without waiting for a reply",
+            "status": STATUS_REQUEST_SENT
+        }
+
+        self.assertDictEqual(self.memclidUtility.set("testKey","testValue",10,60,noreply=True),expectedResult)
+        self.assertDictEqual(self.memclidUtility.append("testKey","!",noreply=True),expectedResult)
+        self.assertDictEqual(self.memclidUtility.delete("testKey",noreply=True),expectedResult)
+        self.assertDictEqual(self.memclidUtility.decr("testKey",2,noreply=True),expectedResult)
+        self.assertEqual([args.args[0] for args in self.memclidSocket.sendNoreply.call_args_list],[
+            b"set testKey 10 60 9 noreply\r\ntestValue\r\n",
+            b"append testKey 0 3600 1 noreply\r\n!\r\n",
+            b"delete testKey noreply\r\n",
+            b"decr testKey 2 noreply\r\n"])
+        self.memclidSocket.send.assert_not_called()
+        self.memclidSocket.receive.assert_not_called()
+
+    def test_noreply_connection_break(self):
+
+        """
+            TEST 2 : Check if a failed noreply request is handled like the other requests
+        """
+        self.memclidSocket.sendNoreply.side_effect = MemclidConnectionBreakError("localhost",11211)
+
+        with self.assertRaises(click.exceptions.Abort):
+            self.memclidUtility.incr("testKey",1,noreply=True)
+
+class TestNoreplyMemclidSocket(unittest.TestCase):
+    """
+    Essentially these unit tests test that the socket counts the noreply requests that failed
+    """
+    def setUp(self):
+        self.server, client = socket.socketpair()
+        self.memclidSocket = MemclidSocket(client)
+        self.memclidSocket.host = "localhost"
+        self.memclidSocket.port = 11211
+
+    def tearDown(self):
+        self.server.close()
+        self.memclidSocket.sock.close()
+
+    def test_error_reply_counted_as_dropped_write(self):
+
+        """
+            TEST 1 : Check if an error sent for a noreply request is discarded before the response to the next request is read
+        """
+        self.memclidSocket.sendNoreply(b"set testKey 0 0 100 noreply\r\nshort\r\n")
+        self.server.sendall(b"CLIENT_ERROR bad data chunk\r\n")
+        self.server.recv(1024)
+        self.memclidSocket.send(b"get testKey\r\n")
+        self.assertEqual(self.server.recv(1024),b"version\r\nget testKey\r\n")
+        self.server.sendall(b"VERSION 1.6.21\r\nEND\r\n")
+
+        self.assertEqual(self.memclidSocket.receive(),b"END\r\n")
+        self.assertEqual(self.memclidSocket.droppedWrites,1)
+
+    def test_closed_connection_detected(self):
+
+        """
+            TEST 2 : Check if a connection closed by the server is detected when the next noreply request is sent
+        """
+        self.memclidSocket.sendNoreply(b"delete testKey noreply\r\n")
+        self.server.close()
+
+        with self.assertRaises(MemclidConnectionBreakError):
+            self.memclidSocket.sendNoreply(b"delete otherKey noreply\r\n")
+        self.assertEqual(self.memclidSocket.droppedWrites,1)
+
+    def test_late_error_reply(self):
+
+        """
+            TEST 3 : Check if an error sent for a noreply request after the next request was sent isn't read as its response
+        """
+        self.memclidSocket.sendNoreply(b"set bigKey 0 0 5 noreply\r\nvalue\r\n")
+        self.memclidSocket.send(b"get testKey\r\n")
+        self.server.recv(1024)
+        self.server.sendall(b"SERVER_ERROR object too large for cache\r\nVERSION 1.6.21\r\nEND\r\n")
+
+        self.assertEqual(self.memclidSocket.receive(),b"END\r\n")
+        self.assertEqual(self.memclidSocket.droppedWrites,1)
+        self.memclidSocket.send(b"get testKey\r\n")
+        self.assertEqual(self.server.recv(1024),b"get testKey\r\n")
+
+class TestNoreplyMemclidPool(unittest.TestCase):
+    """
+    Essentially these unit tests test that the noreply requests failing on a slow server are counted by the pool
+    """
+    def test_dropped_writes_total(self):
+
+        """
+            TEST 1 : Check if an error arriving late for a noreply set is counted and the next get still gets its own response
+        """
+        with MemclidFakeServer(itemSizeMax=1000,latency=0.02) as server:
+            with MemclidPool(server.host,server.port,maxSize=1) as pool:
+                pool.set("testKey","testValue",0,0)
+                self.assertEqual(pool.set("bigKey","x"*2000,0,0,noreply=True)["status"],STATUS_REQUEST_SENT)
+                self.assertEqual(pool.get("testKey")["value"],"testValue")
+                self.assertEqual(pool.droppedWrites,1)
+
+if __name__ == '__main__':
+    unittest.main()
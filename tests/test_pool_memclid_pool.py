@@ -0,0 +1,129 @@
+import sys
+import os
+import socket
+import threading
+import time
+
+sys.path.append(os.path.join(os.getcwd(),'..'))
+
+import unittest
+from unittest.mock import create_autospec, patch
+from memclid.constants import STATUS_RECORD_STORED
+from memclid.exceptions import MemclidPoolTimeoutError
+from memclid.memclid_pool import MemclidPool
+from memclid.memclid_socket import MemclidSocket
+
+class TestMemclidPool(unittest.TestCase):
+    """
+    Essentially these unit tests test that the pool hands out, reuses and discards connections correctly,
+    the connections are opened to a listening socket on localhost that never answers
+    """
+    def setUp(self):
+        self.server = socket.create_server(("127.0.0.1",0))
+        self.port = self.server.getsockname()[1]
+        self.pool = MemclidPool("127.0.0.1",self.port,maxSize=2)
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.close()
+
+    def test_pool_reuses_connection(self):
+
+        """
+            TEST 1 : Check if a checked in connection is handed out again instead of opening a new one
+        """
+        memclidSocket = self.pool.checkout()
+        self.pool.checkin(memclidSocket)
+
+        self.assertIs(self.pool.checkout(),memclidSocket)
+        self.assertEqual(self.pool.opened,1)
+
+    def test_pool_max_size(self):
+
+        """
+            TEST 2 : Check if checkout times out when all the connections are in use and
+            succeeds once a connection is checked in by another thread
+        """
+        first = self.pool.checkout()
+        self.pool.checkout()
+
+        with self.assertRaises(MemclidPoolTimeoutError):
+            self.pool.checkout(timeout=0.05)
+        threading.Timer(0.05,self.pool.checkin,args=(first,)).start()
+        self.assertIs(self.pool.checkout(timeout=5),first)
+        self.assertEqual(self.pool.opened,2)
+
+    def test_pool_discards_broken_connection(self):
+
+        """
+            TEST 3 : Check if a connection checked in as broken is closed and
+            a connection failing inside the connection block is checked in as broken
+        """
+        memclidSocket = self.pool.checkout()
+        self.pool.checkin(memclidSocket,broken=True)
+        self.assertEqual(self.pool.opened,0)
+
+        with self.assertRaises(RuntimeError):
+            with self.pool.connection() as memclidSocket:
+                raise RuntimeError("Request failed")
+        self.assertEqual(self.pool.opened,0)
+        self.assertEqual(len(self.pool.idle),0)
+
+    def test_pool_discards_stale_connection(self):
+
+        """
+            TEST 4 : Check if idle connections closed by the server or idle for too long are not handed out
+        """
+        memclidSocket = self.pool.checkout()
+        self.pool.checkin(memclidSocket)
+        serverSide, address = self.server.accept()
+        serverSide.close()
+        self.assertIsNot(self.pool.checkout(),memclidSocket)
+        self.assertEqual(self.pool.opened,1)
+
+        pool = MemclidPool("127.0.0.1",self.port,idleTimeout=-1)
+        memclidSocket = pool.checkout()
+        pool.checkin(memclidSocket)
+        self.assertIsNot(pool.checkout(),memclidSocket)
+        pool.close()
+
+    def test_pool_utility_methods(self):
+
+        """
+            TEST 5 : Check if the MemclidUtility methods run on a borrowed connection that is checked back in
+        """
+        memclidSocket = create_autospec(MemclidSocket)
+        memclidSocket.buffer = bytearray()
+        memclidSocket.bufferPos = 0
+        memclidSocket.timedOut = False
+        memclidSocket.broken = None
+        memclidSocket.droppedWrites = 0
+        memclidSocket.receive.return_value = b"STORED\r\n"
+
+        with patch("memclid.memclid_pool.MemclidSocket",return_value=memclidSocket):
+            result = self.pool.set("testKey","testValue",0,3600)
+        memclidSocket.send.assert_called_once_with(msg=b"set testKey 0 3600 9\r\ntestValue\r\n")
+        self.assertEqual(result["status"],STATUS_RECORD_STORED)
+        self.assertEqual(len(self.pool.idle),1)
+
+    def test_pool_closes_old_idle_connections(self):
+
+        """
+            TEST 6 : Check if the connections idle for too long are closed while the most recently used one keeps being handed out
+        """
+        pool = MemclidPool("127.0.0.1",self.port,maxSize=5,idleTimeout=0.5)
+        memclidSockets = [pool.checkout() for index in range(5)]
+        for memclidSocket in memclidSockets:
+            pool.checkin(memclidSocket)
+        time.sleep(0.3)
+        memclidSocket = pool.checkout()
+        pool.checkin(memclidSocket)
+        time.sleep(0.3)
+        self.assertIs(pool.checkout(),memclidSocket)
+        self.assertEqual((pool.opened,len(pool.idle)),(1,0))
+        pool.checkin(memclidSocket)
+        self.assertTrue(all(other.sock is None for other in memclidSockets if other is not memclidSocket))
+        pool.close()
+
+if __name__ == '__main__':
+    unittest.main()
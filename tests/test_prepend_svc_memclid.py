@@ -31,14 +31,14 @@ class TestPrependMemclidUtility(unittest.TestCase):
             TEST 1 : Check if correct prepend request is being made and
             prepending the value for an already exisiting key successfully leads to a success result in the application
         """
-        self.memclidSocket.receive.return_value = "STORED\r\n"
+        self.memclidSocket.receive.return_value = b"STORED\r\n"
         expectedResult = {
             "message": "The value was prepended successfully",
             "status": STATUS_RECORD_STORED
         }
 
         actualResult=self.memclidUtility.prepend("testKey","prependedValue")
-        self.memclidSocket.send.assert_called_once_with(msg="prepend testKey 0 3600 14\r\nprependedValue\r\n")
+        self.memclidSocket.send.assert_called_once_with(msg=b"prepend testKey 0 3600 14\r\nprependedValue\r\n")
         self.memclidSocket.receive.assert_called_once();
         self.assertDictEqual(actualResult,expectedResult)
 
@@ -48,14 +48,14 @@ class TestPrependMemclidUtility(unittest.TestCase):
             TEST 2 : Check if correct prepend request is being made and
             failure while storing the key-value pair using prepend leads to a failure result in the application
         """
-        self.memclidSocket.receive.return_value = "NOT_STORED\r\n"
+        self.memclidSocket.receive.return_value = b"NOT_STORED\r\n"
         expectedResult = {
             "message": "The key most likely doesnt exist in the memcached server. It could not be stored.",
             "status": STATUS_RECORD_NOT_STORED
         }
 
         actualResult=self.memclidUtility.prepend("testKey","prependedValue")
-        self.memclidSocket.send.assert_called_once_with(msg="prepend testKey 0 3600 14\r\nprependedValue\r\n")
+        self.memclidSocket.send.assert_called_once_with(msg=b"prepend testKey 0 3600 14\r\nprependedValue\r\n")
         self.memclidSocket.receive.assert_called_once();
         self.assertDictEqual(actualResult,expectedResult)
 
@@ -65,7 +65,7 @@ class TestPrependMemclidUtility(unittest.TestCase):
             TEST 3 : Check if MemclidUnrecognizedResponseSentByServer is raised and handled when an invalid response is sent by the server
 
         """
-        self.memclidSocket.receive.return_value = "UNKNOWN_RESPONSE_SENT_BY_SERVER\r\n"
+        self.memclidSocket.receive.return_value = b"UNKNOWN_RESPONSE_SENT_BY_SERVER\r\n"
 
         with self.assertRaises(click.exceptions.Abort):
             self.memclidUtility.prepend("testKey","prependedValue")
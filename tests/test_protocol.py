@@ -0,0 +1,63 @@
+import sys
+import os
+
+sys.path.append(os.path.join(os.getcwd(),'..'))
+
+import unittest
+from memclid.protocol import *
+
+class TestProtocol(unittest.TestCase):
+    """
+    Essentially these unit tests test that every response sent by the Memcached server is classified correctly
+    """
+    def test_classify_responses(self):
+
+        """
+            TEST 1 : Check if every kind of response is classified along with its argument
+        """
+        self.assertEqual(classifyResponse(b"STORED\r\n"),(RESPONSE_STORED,None))
+        self.assertEqual(classifyResponse(b"NOT_STORED\r\n"),(RESPONSE_NOT_STORED,None))
+        self.assertEqual(classifyResponse(b"EXISTS\r\n"),(RESPONSE_EXISTS,None))
+        self.assertEqual(classifyResponse(b"NOT_FOUND\r\n"),(RESPONSE_NOT_FOUND,None))
+        self.assertEqual(classifyResponse(b"DELETED\r\n"),(RESPONSE_DELETED,None))
+        self.assertEqual(classifyResponse(b"END\r\n"),(RESPONSE_END,None))
+        self.assertEqual(classifyResponse(b"VALUE testKey 0 1\r\na\r\nEND\r\n"),(RESPONSE_VALUES,None))
+        self.assertEqual(classifyResponse(b"42\r\n"),(RESPONSE_NUMBER,"42"))
+        self.assertEqual(classifyResponse(b"ERROR\r\n"),(RESPONSE_ERROR,None))
+        self.assertEqual(classifyResponse(b"CLIENT_ERROR bad data chunk\r\n"),(RESPONSE_CLIENT_ERROR,"bad data chunk"))
+        self.assertEqual(classifyResponse(b"SERVER_ERROR out of memory\r\n"),(RESPONSE_SERVER_ERROR,"out of memory"))
+        self.assertEqual(classifyResponse(b"STORED\r\nSTORED\r\n"),(RESPONSE_UNKNOWN,None))
+        self.assertEqual(classifyResponse(b"-1\r\n"),(RESPONSE_UNKNOWN,None))
+
+    def test_parse_values(self):
+
+        """
+            TEST 2 : Check if the data blocks are sliced using their lengths
+        """
+        values = list(parseValues(b"VALUE key1 1 4 10\r\nEND\r\r\nVALUE key2 2 0 11\r\n\r\nEND\r\n",True))
+        self.assertEqual(values,[("key1","1",b"END\r","10"),("key2","2",b"","11")])
+
+    def test_parse_values_invalid(self):
+
+        """
+            TEST 3 : Check if responses with wrong lengths, missing END or trailing data are rejected
+        """
+        for data in [b"VALUE key1 0 5\r\nabc\r\nEND\r\n", b"VALUE key1 0 3\r\nabc\r\n", b"END\r\nEND\r\n", b"VALUE key1 0 3 1\r\nabc\r\nEND\r\n"]:
+            with self.assertRaises(ValueError):
+                list(parseValues(data,False))
+
+    def test_parse_meta_responses(self):
+
+        """
+            TEST 4 : Check if meta responses are classified and split into their code, return flags and data block
+        """
+        self.assertEqual(classifyResponse(b"HD c42\r\n"),(RESPONSE_META,"HD"))
+        self.assertEqual(classifyResponse(b"MN\r\n"),(RESPONSE_META,"MN"))
+        self.assertEqual(parseMetaResponse(b"VA 5 f1 t-1\r\nab\r\nc\r\n"),("VA",{"f":"1","t":"-1"},b"ab\r\nc"))
+        self.assertEqual(parseMetaResponse(b"EN\r\n"),("EN",{},None))
+        for data in [b"VA 4\r\nabc\r\n", b"VA x\r\n\r\n", b"HD\r\nHD\r\n"]:
+            with self.assertRaises(ValueError):
+                parseMetaResponse(data)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import sys
+import os
+
+sys.path.append(os.path.join(os.getcwd(),'..'))
+
+import unittest
+from memclid.memclid_socket import MemclidSocket
+from memclid.exceptions import MemclidConnectionBreakError, MemclidServerErrorSentByServer
+
+class FragmentingSocket:
+    """
+    Stand-in for a raw socket that hands out the server response in fixed size fragments,
+    the way a big response arrives over several TCP segments
+    """
+    def __init__(self, response, fragmentSize):
+        self.response = response
+        self.fragmentSize = fragmentSize
+        self.pos = 0
+
+    def recv(self, size):
+        size = min(size, self.fragmentSize)
+        chunk = self.response[self.pos:self.pos+size]
+        self.pos += len(chunk)
+        return chunk
+
+    def recv_into(self, view):
+        chunk = self.recv(len(view))
+        view[:len(chunk)] = chunk
+        return len(chunk)
+
+class TestReceiveMemclidSocket(unittest.TestCase):
+    """
+    Essentially these unit tests test that a complete response is read from the socket
+    irrespective of how the bytes are split across recv calls
+    """
+    def createSocket(self, response, fragmentSize):
+        memclidSocket = MemclidSocket(FragmentingSocket(response, fragmentSize))
+        memclidSocket.host = "localhost"
+        memclidSocket.port = 11211
+        return memclidSocket
+
+    def test_receive_large_value(self):
+
+        """
+            TEST 1 : Check if a value much larger than a single recv call is read completely
+        """
+        value = "x"*500000
+        response = "VALUE testKey 0 "+str(len(value))+"\r\n"+value+"\r\nEND\r\n"
+        memclidSocket = self.createSocket(response.encode(), 1400)
+
+        self.assertEqual(memclidSocket.receive(), response.encode())
+
+    def test_receive_value_containing_crlf(self):
+
+        """
+            TEST 2 : Check if the data block is read using its length and not by looking for END
+        """
+        response = "VALUE testKey 0 11\r\nab\r\nEND\r\ncd\r\nEND\r\n"
+        memclidSocket = self.createSocket(response.encode(), 3)
+
+        self.assertEqual(memclidSocket.receive(), response.encode())
+
+    def test_receive_consecutive_responses(self):
+
+        """
+            TEST 3 : Check if responses arriving in the same segment are returned one at a time
+        """
+        memclidSocket = self.createSocket(b"STORED\r\nVALUE testKey 5 3\r\nabc\r\nEND\r\nNOT_FOUND\r\n", 4096)
+
+        self.assertEqual(memclidSocket.receive(), b"STORED\r\n")
+        self.assertEqual(memclidSocket.receive(), b"VALUE testKey 5 3\r\nabc\r\nEND\r\n")
+        self.assertEqual(memclidSocket.receive(), b"NOT_FOUND\r\n")
+
+    def test_receive_server_error(self):
+
+        """
+            TEST 4 : Check if SERVER_ERROR split across segments is still raised
+        """
+        memclidSocket = self.createSocket(b"SERVER_ERROR object too large for cache\r\n", 5)
+
+        with self.assertRaises(MemclidServerErrorSentByServer):
+            memclidSocket.receive()
+
+    def test_receive_connection_closed_mid_value(self):
+
+        """
+            TEST 5 : Check if the server closing the connection in the middle of a data block is reported
+        """
+        memclidSocket = self.createSocket(b"VALUE testKey 0 100\r\nabc", 10)
+
+        with self.assertRaises(MemclidConnectionBreakError):
+            memclidSocket.receive()
+
+if __name__ == '__main__':
+    unittest.main()
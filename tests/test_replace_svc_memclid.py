@@ -31,14 +31,14 @@ class TestReplaceMemclidUtility(unittest.TestCase):
             TEST 1 : Check if correct replace request is being made and
             replacing the value for an already exisitng key successfully leads to a success result in the application
         """
-        self.memclidSocket.receive.return_value = "STORED\r\n"
+        self.memclidSocket.receive.return_value = b"STORED\r\n"
         expectedResult = {
             "message": "The value for the key was replaced successfully",
             "status": STATUS_RECORD_STORED
         }
 
         actualResult=self.memclidUtility.replace("testKey","testValueNew",1000,3600)
-        self.memclidSocket.send.assert_called_once_with(msg="replace testKey 1000 3600 12\r\ntestValueNew\r\n")
+        self.memclidSocket.send.assert_called_once_with(msg=b"replace testKey 1000 3600 12\r\ntestValueNew\r\n")
         self.memclidSocket.receive.assert_called_once();
         self.assertDictEqual(actualResult,expectedResult)
 
@@ -48,14 +48,14 @@ class TestReplaceMemclidUtility(unittest.TestCase):
             TEST 2 : Check if correct replace request is being made and
             failure while storing the key-value pair using add leads to a failure result in the application
         """
-        self.memclidSocket.receive.return_value = "NOT_STORED\r\n"
+        self.memclidSocket.receive.return_value = b"NOT_STORED\r\n"
         expectedResult = {
             "message": "The key doesnt exist in the memcached server. It could not be stored due to the preconditions of the command executed.",
             "status": STATUS_RECORD_NOT_STORED
         }
 
         actualResult=self.memclidUtility.replace("testKey","testValueNew",1000,3600)
-        self.memclidSocket.send.assert_called_once_with(msg="replace testKey 1000 3600 12\r\ntestValueNew\r\n")
+        self.memclidSocket.send.assert_called_once_with(msg=b"replace testKey 1000 3600 12\r\ntestValueNew\r\n")
         self.memclidSocket.receive.assert_called_once();
         self.assertDictEqual(actualResult,expectedResult)
 
@@ -65,7 +65,7 @@ class TestReplaceMemclidUtility(unittest.TestCase):
             TEST 3 : Check if MemclidUnrecognizedResponseSentByServer is raised and handled when an invalid response is sent by the server
 
         """
-        self.memclidSocket.receive.return_value = "UNKNOWN_RESPONSE_SENT_BY_SERVER\r\n"
+        self.memclidSocket.receive.return_value = b"UNKNOWN_RESPONSE_SENT_BY_SERVER\r\n"
 
         with self.assertRaises(click.exceptions.Abort):
             self.memclidUtility.replace("testKey","testValueNew",1000,3600)
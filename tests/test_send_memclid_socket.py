@@ -0,0 +1,68 @@
+import sys
+import os
+
+sys.path.append(os.path.join(os.getcwd(),'..'))
+
+import unittest
+from memclid.memclid_socket import MemclidSocket
+from memclid.exceptions import MemclidConnectionBreakError
+
+class PartialSendSocket:
+    """
+    Stand-in for a raw socket that only accepts a few bytes per send call, like a socket with a full send buffer
+    """
+    def __init__(self, maxBytesPerSend):
+        self.maxBytesPerSend = maxBytesPerSend
+        self.received = bytearray()
+        self.sentBuffers = []
+
+    def send(self, data):
+        self.sentBuffers.append(data)
+        accepted = bytes(data[:self.maxBytesPerSend])
+        self.received += accepted
+        return len(accepted)
+
+class TestSendMemclidSocket(unittest.TestCase):
+    """
+    Essentially these unit tests test that the whole message is sent irrespective of how many bytes
+    the socket accepts per send call
+    """
+    def createSocket(self, rawSocket):
+        memclidSocket = MemclidSocket(rawSocket)
+        memclidSocket.host = "localhost"
+        memclidSocket.port = 11211
+        return memclidSocket
+
+    def test_send_partial_sends(self):
+
+        """
+            TEST 1 : Check if a large message is sent completely over many partial sends
+            without copying the remaining message for every send
+        """
+        rawSocket = PartialSendSocket(1000)
+        msg = b"set testKey 0 0 100000\r\n"+b"x"*100000+b"\r\n"
+
+        self.createSocket(rawSocket).send(msg)
+        self.assertEqual(bytes(rawSocket.received),msg)
+        self.assertTrue(all(isinstance(buffer,memoryview) for buffer in rawSocket.sentBuffers))
+
+    def test_send_str_message(self):
+
+        """
+            TEST 2 : Check if str messages are encoded and sent
+        """
+        rawSocket = PartialSendSocket(3)
+
+        self.createSocket(rawSocket).send("get kéy\r\n")
+        self.assertEqual(bytes(rawSocket.received),"get kéy\r\n".encode())
+
+    def test_send_connection_broken(self):
+
+        """
+            TEST 3 : Check if the socket accepting no bytes is reported as a broken connection
+        """
+        with self.assertRaises(MemclidConnectionBreakError):
+            self.createSocket(PartialSendSocket(0)).send(b"get testKey\r\n")
+
+if __name__ == '__main__':
+    unittest.main()
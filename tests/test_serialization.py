@@ -0,0 +1,113 @@
+import sys
+import os
+import io
+import click
+from contextlib import redirect_stdout
+from decimal import Decimal
+
+sys.path.append(os.path.join(os.getcwd(),'..'))
+
+import unittest
+from memclid.constants import *
+from memclid.fake_server import MemclidFakeServer
+from memclid.memclid_socket import MemclidSocket
+from memclid.svc_memclid import MemclidUtility
+from memclid.compression import MemclidCompressor
+from memclid.near_cache import MemclidNearCache
+from memclid.serialization import MemclidSerializer, MemclidResult
+
+class TestMemclidSerializer(unittest.TestCase):
+    """
+    Essentially these unit tests test that the values are stored with their type in the flag and fetched back
+    with the same type, only deserialized once they are read
+    """
+    def setUp(self):
+        self.server = MemclidFakeServer().start()
+        self.memclidSocket = MemclidSocket()
+        self.memclidSocket.connect(self.server.host,self.server.port)
+        self.memclidUtility = MemclidUtility(self.memclidSocket,serializer=MemclidSerializer())
+
+    def tearDown(self):
+        self.memclidSocket.disconnect()
+        self.server.stop()
+
+    def test_types_round_trip(self):
+
+        """
+            TEST 1 : Check if bytes, str, int and JSON values are stored with their type bit and fetched back as they were
+        """
+        values = {"bytesKey": b"\x00\xff", "textKey": "café", "intKey": 42, "jsonKey": {"id": 1, "tags": ["a"]},
+            "listKey": [1, 2.5, None, True], "boolKey": False}
+        for key, value in values.items():
+            self.memclidUtility.set(key,value,4,0)
+        self.assertEqual(self.server.items[b"intKey"].value,b"42")
+        self.assertEqual(self.server.items[b"intKey"].flags,4 | FLAG_INTEGER)
+        self.assertEqual(self.server.items[b"textKey"].flags,4 | FLAG_TEXT)
+        self.assertEqual(self.server.items[b"bytesKey"].flags,4)
+        self.assertEqual(self.server.items[b"jsonKey"].flags,4 | FLAG_JSON)
+        results = self.memclidUtility.gets(list(values))
+        for key, value in values.items():
+            self.assertEqual(results[key]["value"],value)
+            self.assertIs(type(results[key]["value"]),type(value))
+            self.assertEqual(results[key]["flag"],4)
+
+    def test_incr_on_int(self):
+
+        """
+            TEST 2 : Check if an int is stored natively so that incr works on it and it is still fetched as an int
+        """
+        self.memclidUtility.set("counterKey",41,0,0)
+        self.assertEqual(self.memclidUtility.incr("counterKey",1)["updated_value"],"42")
+        self.assertEqual(self.memclidUtility.get("counterKey")["value"],42)
+
+    def test_lazy_decoding(self):
+
+        """
+            TEST 3 : Check if a value is only deserialized when it is read
+        """
+        calls = []
+        serializer = MemclidSerializer()
+        serializer.register(FLAG_JSON,[dict],lambda value: b"{}",lambda data: calls.append(data) or {})
+        memclidUtility = MemclidUtility(self.memclidSocket,serializer=serializer)
+        memclidUtility.set("jsonKey",{},0,0)
+        result = memclidUtility.get("jsonKey")
+        self.assertIsInstance(result,MemclidResult)
+        self.assertEqual((result["status"],"value" in result,calls),(STATUS_DATA_AVAILABLE,True,[]))
+        self.assertEqual(result["value"],{})
+        self.assertEqual(dict(result)["value"],{})
+        self.assertEqual(calls,[b"{}"])
+
+    def test_pickle_opt_in(self):
+
+        """
+            TEST 4 : Check if other types are refused unless pickle is allowed and the reserved bits can't be used
+        """
+        with self.assertRaises(click.Abort):
+            with redirect_stdout(io.StringIO()):
+                self.memclidUtility.set("decimalKey",Decimal("1.5"),0,0)
+        with self.assertRaises(click.Abort):
+            with redirect_stdout(io.StringIO()):
+                self.memclidUtility.set("textKey","value",FLAG_TEXT,0)
+        self.assertEqual(len(self.server.items),0)
+        memclidUtility = MemclidUtility(self.memclidSocket,serializer=MemclidSerializer(allowPickle=True))
+        memclidUtility.set("decimalKey",Decimal("1.5"),0,0)
+        self.assertEqual(memclidUtility.get("decimalKey")["value"],Decimal("1.5"))
+        with self.assertRaises(TypeError):
+            self.memclidUtility.get("decimalKey")["value"]
+
+    def test_with_compression_and_near_cache(self):
+
+        """
+            TEST 5 : Check if serialized values are compressed and served from the near cache with a fresh copy on every hit
+        """
+        nearCache = MemclidNearCache()
+        memclidUtility = MemclidUtility(self.memclidSocket,nearCache=nearCache,compressor=MemclidCompressor(threshold=10),serializer=MemclidSerializer())
+        document = {"items": list(range(100))}
+        memclidUtility.set("jsonKey",document,0,0)
+        self.assertEqual(self.server.items[b"jsonKey"].flags,FLAG_JSON | FLAG_COMPRESSED)
+        memclidUtility.get("jsonKey")["value"]["items"].clear()
+        self.assertEqual(memclidUtility.get("jsonKey")["value"],document)
+        self.assertEqual(nearCache.hits,1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -31,14 +31,14 @@ class TestSetMemclidUtility(unittest.TestCase):
             TEST 1 : Check if correct set request is being made and 
             storing the key-value pair successfully leads to a success result in the application
         """
-        self.memclidSocket.receive.return_value = "STORED\r\n"
+        self.memclidSocket.receive.return_value = b"STORED\r\n"
         expectedResult = {
             "message": "The data was saved successfully",
             "status": STATUS_RECORD_STORED
         }
 
         actualResult=self.memclidUtility.set("testKey","testValue",10,60)
-        self.memclidSocket.send.assert_called_once_with(msg="set testKey 10 60 9\r\ntestValue\r\n")
+        self.memclidSocket.send.assert_called_once_with(msg=b"set testKey 10 60 9\r\ntestValue\r\n")
         self.memclidSocket.receive.assert_called_once();
         self.assertDictEqual(actualResult,expectedResult)
 
@@ -48,14 +48,14 @@ class TestSetMemclidUtility(unittest.TestCase):
             TEST 2 : Check if correct set request is being made and 
             failure while storing the key-value pair leads to a failure result in the application
         """
-        self.memclidSocket.receive.return_value = "NOT_STORED\r\n"
+        self.memclidSocket.receive.return_value = b"NOT_STORED\r\n"
         expectedResult = {
             "message": "The data could not be stored",
             "status": STATUS_RECORD_NOT_STORED
         }
 
         actualResult=self.memclidUtility.set("testKey","testValue",10,60)
-        self.memclidSocket.send.assert_called_once_with(msg="set testKey 10 60 9\r\ntestValue\r\n")
+        self.memclidSocket.send.assert_called_once_with(msg=b"set testKey 10 60 9\r\ntestValue\r\n")
         self.memclidSocket.receive.assert_called_once();
         self.assertDictEqual(actualResult,expectedResult)
 
@@ -65,7 +65,7 @@ class TestSetMemclidUtility(unittest.TestCase):
             TEST 3 : Check if MemclidUnrecognizedResponseSentByServer is raised and handled when an invalid response is sent by the server
 
         """
-        self.memclidSocket.receive.return_value = "UNRECOGNIZED_RESPONSE_SENT_BY_SERVER\r\n"
+        self.memclidSocket.receive.return_value = b"UNRECOGNIZED_RESPONSE_SENT_BY_SERVER\r\n"
 
         with self.assertRaises(click.exceptions.Abort):
             self.memclidUtility.set("testKey","testValue",0,3600)
@@ -81,5 +81,26 @@ class TestSetMemclidUtility(unittest.TestCase):
 
         with self.assertRaises(click.exceptions.Abort):
             self.memclidUtility.set("testKey","testValue",0,3600)
+
+    def test_set_non_ascii_value(self):
+
+        """
+            TEST 5 : Check if the length sent for a str value is its length in bytes once encoded
+        """
+        self.memclidSocket.receive.return_value = b"STORED\r\n"
+
+        self.memclidUtility.set("testKey","vålüe",0,3600)
+        self.memclidSocket.send.assert_called_once_with(msg="set testKey 0 3600 7\r\nvålüe\r\n".encode())
+
+    def test_set_bytes_value(self):
+
+        """
+            TEST 6 : Check if bytes values are sent as they are
+        """
+        self.memclidSocket.receive.return_value = b"STORED\r\n"
+
+        self.memclidUtility.set("testKey",b"\x00\xff\r\n",0,3600)
+        self.memclidSocket.send.assert_called_once_with(msg=b"set testKey 0 3600 4\r\n\x00\xff\r\n\r\n")
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,115 @@
+import sys
+import os
+import io
+import click
+from contextlib import redirect_stdout, redirect_stderr
+
+sys.path.append(os.path.join(os.getcwd(),'..'))
+
+import unittest
+from unittest.mock import create_autospec
+from memclid.constants import *
+from memclid.svc_memclid import MemclidUtility
+from memclid.fake_server import MemclidFakeServer
+from memclid.svc_shell import MemclidShell
+from memclid.cli import cli, Context
+
+class TestMemclidShell(unittest.TestCase):
+    """
+    Essentially these unit tests test that the lines typed in the shell run the memclid commands
+    with the same arguments as on the command line, over the connection of the session
+    """
+    def setUp(self):
+        self.memclidUtility = create_autospec(MemclidUtility)
+        memclidContext = Context()
+        memclidContext.MEMCLID_UTILITY = self.memclidUtility
+        memclidContext.MEMCLID_SOCKETS = []
+        self.memclidShell = MemclidShell(cli, click.Context(cli, info_name="memclid", obj=memclidContext), timing=False)
+
+    def tearDown(self):
+        self.memclidShell = None
+        self.memclidUtility = None
+
+    def execute(self, line):
+        output = io.StringIO()
+        with redirect_stdout(output), redirect_stderr(output):
+            running = self.memclidShell.execute(line)
+        return running, output.getvalue()
+
+    def test_command_grammar(self):
+
+        """
+            TEST 1 : Check if a line is run like the command line with quoted values, defaults and options
+        """
+        self.memclidUtility.set.return_value = {"message": "The data was saved successfully", "status": STATUS_RECORD_STORED}
+
+        running, output = self.execute('set testKey "test value" -et 60 --noreply')
+        self.memclidUtility.set.assert_called_once_with("testKey","test value",0,60,True)
+        self.assertTrue(running)
+        self.assertEqual(output,"The data was saved successfully\n")
+
+    def test_usage_error(self):
+
+        """
+            TEST 2 : Check if wrong arguments only show the usage error and keep the shell running
+        """
+        running, output = self.execute("incr")
+        self.assertTrue(running)
+        self.assertIn("Missing argument 'KEY'",output)
+        self.memclidUtility.incr.assert_not_called()
+
+    def test_unknown_command(self):
+
+        """
+            TEST 3 : Check if unknown commands and the shell command itself are refused
+        """
+        for line in ["bogus key", "shell"]:
+            running, output = self.execute(line)
+            self.assertTrue(running)
+            self.assertIn("Unknown command",output)
+
+    def test_history_and_exit(self):
+
+        """
+            TEST 4 : Check if the lines are kept in the history and exit stops the shell
+        """
+        self.execute("bogus")
+        running, output = self.execute("history")
+        self.assertIn("1  bogus",output)
+        self.assertIn("2  history",output)
+        self.assertFalse(self.execute("exit")[0])
+
+    def test_timing(self):
+
+        """
+            TEST 5 : Check if the time taken is shown after every command when timing is on
+        """
+        self.memclidShell.timing = True
+        self.memclidUtility.delete.return_value = {"message": "The data was deleted successfully", "status": STATUS_RECORD_DELETED}
+
+        running, output = self.execute("delete testKey")
+        self.assertRegex(output,r"The data was deleted successfully\n\(\d+\.\d\d ms\)\n")
+
+    def test_reconnect_after_timeout(self):
+
+        """
+            TEST 6 : Check if the connection is opened again after a command timed out, without waiting for the late reply
+        """
+        with MemclidFakeServer() as server:
+            memclidContext = Context(server.host,server.port,socketOptions={"readTimeout": 0.1})
+            memclidContext.__enter__()
+            memclidShell = MemclidShell(cli, click.Context(cli, info_name="memclid", obj=memclidContext), timing=False)
+            server.latency = 1
+            output = io.StringIO()
+            with redirect_stdout(output), redirect_stderr(output):
+                memclidShell.execute("get testKey")
+            self.assertIn("Reconnecting to the memcached server",output.getvalue())
+            server.latency = 0
+            output = io.StringIO()
+            with redirect_stdout(output), redirect_stderr(output):
+                memclidShell.execute("set testKey testValue")
+            self.assertEqual(output.getvalue(),"The data was saved successfully\n")
+            memclidContext.disconnectAll()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import sys
+import os
+
+sys.path.append(os.path.join(os.getcwd(),'..'))
+
+import unittest
+from unittest.mock import create_autospec
+from memclid.exceptions import MemclidUnrecognizedResponseSentByServer
+from memclid.fake_server import MemclidFakeServer
+from memclid.memclid_socket import MemclidSocket
+from memclid.svc_memclid import MemclidUtility
+from memclid.svc_stats import MemclidStats, statsRates, totalStats
+
+class TestStatsMemclidUtility(unittest.TestCase):
+    """
+    Essentially these unit tests test that the stats sent by one or more fake servers are parsed into
+    numbers grouped per slab class, and that the rates per second are computed from two samples
+    """
+    def setUp(self):
+        self.servers = [MemclidFakeServer().start(), MemclidFakeServer().start()]
+        self.memclidSockets = []
+        for server in self.servers:
+            memclidSocket = MemclidSocket()
+            memclidSocket.connect(server.host,server.port)
+            self.memclidSockets.append(memclidSocket)
+        self.memclidStats = MemclidStats(self.memclidSockets)
+
+    def tearDown(self):
+        for memclidSocket in self.memclidSockets:
+            memclidSocket.disconnect()
+        for server in self.servers:
+            server.stop()
+
+    def test_general_stats(self):
+
+        """
+            TEST 1 : Check if the general stats of every server are parsed into numbers and strings
+        """
+        memclidUtility = MemclidUtility(self.memclidSockets[0])
+        memclidUtility.set("testKey","testValue",0,0)
+        memclidUtility.get(["testKey","missingKey"])
+        results = self.memclidStats.fetch()
+        first, second = (f"{server.host}:{server.port}" for server in self.servers)
+        self.assertEqual(list(results),[first,second])
+        self.assertEqual((results[first]["get_hits"],results[first]["get_misses"],results[first]["curr_items"]),(1,1,1))
+        self.assertEqual(results[second]["curr_items"],0)
+        self.assertIsInstance(results[first]["version"],str)
+
+    def test_slabs_and_items_stats(self):
+
+        """
+            TEST 2 : Check if the slabs and items stats are grouped per slab class
+        """
+        MemclidUtility(self.memclidSockets[0]).set("testKey","testValue",0,0)
+        slabs = self.memclidStats.fetchOne(self.memclidSockets[0],"slabs")
+        self.assertEqual(slabs["active_slabs"],1)
+        self.assertEqual(slabs["classes"][1]["used_chunks"],1)
+        self.assertEqual(self.memclidStats.fetchOne(self.memclidSockets[0],"items")["classes"][1]["number"],1)
+        self.assertEqual(self.memclidStats.fetchOne(self.memclidSockets[1],"items"),{"classes": {}})
+        self.assertEqual(self.memclidStats.fetchOne(self.memclidSockets[1],"settings")["evictions"],"on")
+
+    def test_unrecognized_response(self):
+
+        """
+            TEST 3 : Check if a line that isn't a STAT line raises MemclidUnrecognizedResponseSentByServer
+        """
+        memclidSocket = create_autospec(MemclidSocket)
+        memclidSocket.host = "localhost"
+        memclidSocket.port = 11211
+        memclidSocket.receiveLine.side_effect = [b"STAT pid 1\r\n",b"BUSY\r\n"]
+        with self.assertRaises(MemclidUnrecognizedResponseSentByServer):
+            MemclidStats([memclidSocket]).fetch()
+        memclidSocket.send.assert_called_once_with(b"stats\r\n")
+
+    def test_rates(self):
+
+        """
+            TEST 4 : Check if the rates are the deltas per second and a counter that went back counts from 0
+        """
+        previous = {"cmd_get": 100, "get_hits": 80, "get_misses": 20, "evictions": 5, "bytes_read": 1000, "curr_connections": 3}
+        current = {"cmd_get": 300, "get_hits": 230, "get_misses": 70, "evictions": 2, "bytes_read": 5000, "curr_connections": 4}
+        rates = statsRates(previous,current,2)
+        self.assertEqual((rates["cmd_get/sec"],rates["get_hits/sec"],rates["bytes_read/sec"]),(100,75,2000))
+        self.assertEqual(rates["evictions/sec"],1)
+        self.assertEqual(rates["hit_ratio"],0.75)
+        self.assertEqual(rates["curr_connections"],4)
+        firstRates = statsRates(None,current,0)
+        self.assertIsNone(firstRates["get_hits/sec"])
+        self.assertAlmostEqual(firstRates["hit_ratio"],230/300)
+        self.assertIsNone(statsRates(current,current,1)["hit_ratio"])
+        self.assertEqual(totalStats([previous,current])["get_hits"],310)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import sys
+import os
+import io
+import time
+import click
+from contextlib import redirect_stdout
+
+sys.path.append(os.path.join(os.getcwd(),'..'))
+
+import unittest
+from memclid.constants import *
+from memclid.fake_server import MemclidFakeServer
+from memclid.memclid_socket import MemclidSocket
+from memclid.svc_memclid import MemclidUtility
+from memclid.svc_cluster import MemclidClusterUtility
+from memclid.memclid_pool import MemclidPool
+
+class TestMemclidTimeout(unittest.TestCase):
+    """
+    Essentially these unit tests test that a request taking longer than the timeouts of the socket or the deadline
+    of the call is abandoned, with the results received before it kept for the multi-key calls
+    """
+    def setUp(self):
+        self.server = MemclidFakeServer().start()
+        self.memclidSocket = MemclidSocket()
+        self.memclidSocket.connect(self.server.host,self.server.port)
+        self.memclidUtility = MemclidUtility(self.memclidSocket)
+
+    def tearDown(self):
+        self.memclidSocket.disconnect()
+        self.server.stop()
+
+    def test_read_timeout(self):
+
+        """
+            TEST 1 : Check if a reply slower than the read timeout aborts the request and the connection isn't used anymore
+        """
+        memclidSocket = MemclidSocket(readTimeout=0.05)
+        memclidSocket.connect(self.server.host,self.server.port)
+        memclidUtility = MemclidUtility(memclidSocket)
+        self.assertEqual(memclidUtility.set("testKey","testValue",0,0)["status"],STATUS_RECORD_STORED)
+        self.server.latency = 0.3
+        output = io.StringIO()
+        with self.assertRaises(click.Abort):
+            with redirect_stdout(output):
+                memclidUtility.get("testKey")
+        self.assertIn("didn't reply in time",output.getvalue())
+        self.assertTrue(memclidSocket.timedOut)
+        with self.assertRaises(click.Abort):
+            with redirect_stdout(io.StringIO()):
+                memclidUtility.get("testKey")
+        memclidSocket.disconnect()
+
+    def test_get_partial_results(self):
+
+        """
+            TEST 2 : Check if the keys of the requests not answered before the deadline are timed out and the other ones fetched
+        """
+        keys = ["testKey"+str(index).zfill(32) for index in range(80)]
+        self.memclidUtility.setMany([(key,"testValue") for key in keys],0,0)
+        self.assertEqual(len(self.memclidUtility.splitKeys("get",keys)),2)
+        self.server.latency = 0.3
+        results = self.memclidUtility.get(keys,deadline=time.monotonic()+0.45)
+        statuses = [results[key]["status"] for key in keys]
+        firstRequest = len(self.memclidUtility.splitKeys("get",keys)[0])
+        self.assertEqual(statuses,[STATUS_DATA_AVAILABLE]*firstRequest+[STATUS_TIMED_OUT]*(len(keys)-firstRequest))
+        self.assertIsNone(results[keys[-1]]["value"])
+        self.assertIsNone(self.memclidSocket.deadline)
+
+    def test_set_many_partial_results(self):
+
+        """
+            TEST 3 : Check if the pipelined sets whose reply didn't arrive before the deadline are timed out
+        """
+        self.server.latency = 0.1
+        items = [("testKey"+str(index),"testValue") for index in range(6)]
+        results = self.memclidUtility.setMany(items,0,0,deadline=time.monotonic()+0.25)
+        statuses = [results[key]["status"] for key, value in items]
+        self.assertEqual(statuses[0],STATUS_RECORD_STORED)
+        self.assertEqual(statuses[-1],STATUS_TIMED_OUT)
+        stored = statuses.count(STATUS_RECORD_STORED)
+        self.assertEqual(statuses,[STATUS_RECORD_STORED]*stored+[STATUS_TIMED_OUT]*(len(items)-stored))
+
+    def test_cluster_slow_server(self):
+
+        """
+            TEST 4 : Check if a server of a cluster that doesn't reply in time only makes its own keys timed out
+        """
+        with MemclidFakeServer(latency=0.5) as slowServer:
+            servers = [(self.server.host,self.server.port,1),(slowServer.host,slowServer.port,1)]
+            memclidSockets = [MemclidSocket(),MemclidSocket()]
+            for memclidSocket, (host, port, weight) in zip(memclidSockets,servers):
+                memclidSocket.connect(host,port)
+            clusterUtility = MemclidClusterUtility(servers,memclidSockets)
+            keys = ["testKey"+str(index) for index in range(20)]
+            start = time.monotonic()
+            results = clusterUtility.get(keys,deadline=start+0.2)
+            self.assertLess(time.monotonic()-start,0.45)
+            for key in keys:
+                slow = clusterUtility.ring.getServer(key) == 1
+                self.assertEqual(results[key]["status"],STATUS_TIMED_OUT if slow else STATUS_DATA_NOT_AVAILABLE)
+            self.assertEqual([memclidSocket.timedOut for memclidSocket in memclidSockets],[False,True])
+            for memclidSocket in memclidSockets:
+                memclidSocket.disconnect()
+
+    def test_pool_discards_timed_out_connection(self):
+
+        """
+            TEST 5 : Check if an expired deadline fails without waiting and the pool closes the connection that timed out
+        """
+        with MemclidPool(self.server.host,self.server.port) as pool:
+            pool.set("testKey","testValue",0,0)
+            self.assertEqual(len(pool.idle),1)
+            self.server.latency = 0.5
+            start = time.monotonic()
+            with self.assertRaises(click.Abort):
+                with redirect_stdout(io.StringIO()):
+                    pool.get("testKey",deadline=start-1)
+            self.assertLess(time.monotonic()-start,0.25)
+            self.assertEqual((len(pool.idle),pool.opened),(0,0))
+            self.server.latency = 0
+            self.assertEqual(pool.get("testKey",deadline=time.monotonic()+5)["value"],"testValue")
+            self.assertEqual(len(pool.idle),1)
+
+    def test_expired_deadline_keeps_connection(self):
+
+        """
+            TEST 6 : Check if a request whose deadline passed before it was sent fails without making the connection unusable
+        """
+        self.assertEqual(self.memclidUtility.set("testKey","testValue",0,0)["status"],STATUS_RECORD_STORED)
+        output = io.StringIO()
+        with self.assertRaises(click.Abort):
+            with redirect_stdout(output):
+                self.memclidUtility.set("testKey","otherValue",0,0,deadline=time.monotonic()-1)
+        self.assertIn("couldn't be sent in time",output.getvalue())
+        self.assertFalse(self.memclidSocket.timedOut)
+        self.assertEqual(self.memclidUtility.get("testKey")["value"],"testValue")
+
+if __name__ == '__main__':
+    unittest.main()